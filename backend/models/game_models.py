@@ -43,10 +43,17 @@ class GameStatus(str, Enum):
     FINISHED = "finished"
 
 
+# ============================================================
+# Pack content models - validate imported packs; unknown keys are kept
+# ============================================================
+class PackContent(BaseModel):
+    model_config = ConfigDict(extra="allow")
+
+
 # ============================================================
 # PERIL! (Jeopardy-style) Models
 # ============================================================
-class PerilClue(BaseModel):
+class PerilClue(PackContent):
     value: int
     difficulty: int
     clue_text: str
@@ -56,12 +63,12 @@ class PerilClue(BaseModel):
     answered: bool = False
 
 
-class PerilCategory(BaseModel):
+class PerilCategory(PackContent):
     category_title: str
     clues: List[PerilClue]
 
 
-class PerilGame(BaseModel):
+class PerilGame(PackContent):
     game_name: str = "PERIL!"
     categories: List[PerilCategory]
 
@@ -69,20 +76,20 @@ class PerilGame(BaseModel):
 # ============================================================
 # SURVEY SAYS! (Family Feud-style) Models
 # ============================================================
-class SurveyAnswer(BaseModel):
+class SurveyAnswer(PackContent):
     answer: str
     percent: int
     revealed: bool = False
 
 
-class SurveyQuestion(BaseModel):
+class SurveyQuestion(PackContent):
     question: str
     answers: List[SurveyAnswer]
     strikes: int = 0
     max_strikes: int = 3
 
 
-class SurveySaysGame(BaseModel):
+class SurveySaysGame(PackContent):
     game_name: str = "SURVEY SAYS!"
     survey_questions: List[SurveyQuestion]
 
@@ -90,7 +97,7 @@ class SurveySaysGame(BaseModel):
 # ============================================================
 # UR FINAL ANSWER! (Millionaire-style) Models
 # ============================================================
-class MillionaireQuestion(BaseModel):
+class MillionaireQuestion(PackContent):
     point_value: int
     difficulty: int
     question_text: str
@@ -99,7 +106,7 @@ class MillionaireQuestion(BaseModel):
     lifelines_used: List[str] = []
 
 
-class UrFinalAnswerGame(BaseModel):
+class UrFinalAnswerGame(PackContent):
     game_name: str = "UR FINAL ANSWER!"
     questions: List[MillionaireQuestion]
     available_lifelines: List[str] = ["50-50", "Ask the Audience", "Phone a Friend"]
@@ -108,14 +115,14 @@ class UrFinalAnswerGame(BaseModel):
 # ============================================================
 # LAST CALL STANDING (Elimination-style) Models
 # ============================================================
-class LastCallQuestion(BaseModel):
+class LastCallQuestion(PackContent):
     difficulty: int
     question_text: str
     choices: Dict[str, str]
     correct_answer: str
 
 
-class LastCallStandingGame(BaseModel):
+class LastCallStandingGame(PackContent):
     game_name: str = "LAST CALL STANDING"
     questions: List[LastCallQuestion]
 
@@ -123,7 +130,7 @@ class LastCallStandingGame(BaseModel):
 # ============================================================
 # PICK OR PASS! (Deal or No Deal-style) Models
 # ============================================================
-class PickOrPassCase(BaseModel):
+class PickOrPassCase(PackContent):
     case_number: int
     case_value: int
     question_text: str
@@ -134,7 +141,7 @@ class PickOrPassCase(BaseModel):
     opened: bool = False
 
 
-class PickOrPassGame(BaseModel):
+class PickOrPassGame(PackContent):
     game_name: str = "PICK OR PASS!"
     cases: List[PickOrPassCase]
 
@@ -142,7 +149,7 @@ class PickOrPassGame(BaseModel):
 # ============================================================
 # LINK REACTION (Chain-style) Models
 # ============================================================
-class LinkQuestion(BaseModel):
+class LinkQuestion(PackContent):
     chain_value: int
     penalty_value: int
     question_text: str
@@ -150,7 +157,7 @@ class LinkQuestion(BaseModel):
     wrong_answers: List[str]
 
 
-class LinkReactionGame(BaseModel):
+class LinkReactionGame(PackContent):
     game_name: str = "LINK REACTION"
     questions: List[LinkQuestion]
 
@@ -158,7 +165,7 @@ class LinkReactionGame(BaseModel):
 # ============================================================
 # SPIN TO WIN! (Wheel of Fortune-style) Models
 # ============================================================
-class SpinPuzzle(BaseModel):
+class SpinPuzzle(PackContent):
     category: str
     puzzle_with_blanks: str
     full_answer: str
@@ -167,7 +174,7 @@ class SpinPuzzle(BaseModel):
     solved: bool = False
 
 
-class SpinToWinGame(BaseModel):
+class SpinToWinGame(PackContent):
     game_name: str = "SPIN TO WIN!"
     puzzles: List[SpinPuzzle]
 
@@ -175,14 +182,14 @@ class SpinToWinGame(BaseModel):
 # ============================================================
 # CLOSEST WINS! (Price Is Right-style) Models
 # ============================================================
-class ClosestWinsQuestion(BaseModel):
+class ClosestWinsQuestion(PackContent):
     question_text: str
     correct_number: float
     acceptable_range: float
     over_rule: bool  # If true, going over disqualifies
 
 
-class ClosestWinsGame(BaseModel):
+class ClosestWinsGame(PackContent):
     game_name: str = "CLOSEST WINS!"
     numbers: List[ClosestWinsQuestion]
 
@@ -190,14 +197,14 @@ class ClosestWinsGame(BaseModel):
 # ============================================================
 # CHAINED UP (Word Chain-style) Models
 # ============================================================
-class WordChain(BaseModel):
+class WordChain(PackContent):
     chain_title: str
     words: List[str]
     explanation: str
     current_position: int = 0
 
 
-class ChainedUpGame(BaseModel):
+class ChainedUpGame(PackContent):
     game_name: str = "CHAINED UP"
     chains: List[WordChain]
 
@@ -205,18 +212,19 @@ class ChainedUpGame(BaseModel):
 # ============================================================
 # NO WHAMMY! (Press Your Luck-style) Models
 # ============================================================
-class BoardPanel(BaseModel):
+class BoardPanel(PackContent):
     panel: int
     content: Union[str, int]  # "WHAMMY!" or point value
+    weight: float = Field(default=1.0, ge=0)  # Relative chance of landing here
 
 
-class SpinQuestion(BaseModel):
+class SpinQuestion(PackContent):
     question_text: str
     choices: Dict[str, str]
     correct_answer: str
 
 
-class NoWhammyGame(BaseModel):
+class NoWhammyGame(PackContent):
     game_name: str = "NO WHAMMY!"
     board: List[BoardPanel]
     spin_questions: List[SpinQuestion]
@@ -225,7 +233,7 @@ class NoWhammyGame(BaseModel):
 # ============================================================
 # BACK TO SCHOOL! (5th Grader-style) Models
 # ============================================================
-class SchoolQuestion(BaseModel):
+class SchoolQuestion(PackContent):
     subject: str
     grade_level: int
     question_text: str
@@ -233,7 +241,7 @@ class SchoolQuestion(BaseModel):
     correct_answer: str
 
 
-class BackToSchoolGame(BaseModel):
+class BackToSchoolGame(PackContent):
     game_name: str = "BACK TO SCHOOL!"
     questions: List[SchoolQuestion]
 
@@ -241,19 +249,19 @@ class BackToSchoolGame(BaseModel):
 # ============================================================
 # QUIZ CHASE (Trivial Pursuit-style) Models
 # ============================================================
-class QuizChaseQuestion(BaseModel):
+class QuizChaseQuestion(PackContent):
     difficulty: int
     question_text: str
     choices: Dict[str, str]
     correct_answer: str
 
 
-class QuizChaseCategory(BaseModel):
+class QuizChaseCategory(PackContent):
     category_title: str
     questions: List[QuizChaseQuestion]
 
 
-class QuizChaseGame(BaseModel):
+class QuizChaseGame(PackContent):
     game_name: str = "QUIZ CHASE"
     categories: List[QuizChaseCategory]
 
@@ -261,14 +269,14 @@ class QuizChaseGame(BaseModel):
 # ============================================================
 # PKWY LIVE! (HQ Trivia-style) Models
 # ============================================================
-class PKWYLiveQuestion(BaseModel):
+class PKWYLiveQuestion(PackContent):
     difficulty: int
     question_text: str
     choices: Dict[str, str]
     correct_answer: str
 
 
-class PKWYLiveGame(BaseModel):
+class PKWYLiveGame(PackContent):
     game_name: str = "PKWY LIVE!"
     questions: List[PKWYLiveQuestion]
 
@@ -332,7 +340,9 @@ class GameSession(BaseModel):
     status: str = GameStatus.WAITING.value
     current_question_index: int = 0
     current_round: int = 1
+    version: int = 0  # Bumped on every state transition (optimistic concurrency)
     content: Optional[Dict[str, Any]] = None  # Stores the game-specific content
+    content_hash: Optional[str] = None  # Reference held in pack_contents while this content is loaded
     players: List[Player] = []
     created_at: str = Field(default_factory=lambda: datetime.now(timezone.utc).isoformat())
     started_at: Optional[str] = None
@@ -370,8 +380,10 @@ class GamePack(BaseModel):
     name: str
     description: str = ""
     game_format: str
-    content: Dict[str, Any]  # The full game content JSON
+    content_hash: str  # Key of the content in pack_contents (see services/content_store.py)
     tags: List[str] = []
+    version: int = 0  # Bumped on every edit (see services/pack_versions.py)
+    base_version: int = 0  # Version whose full content content_hash holds; later ones are deltas
     created_at: str = Field(default_factory=lambda: datetime.now(timezone.utc).isoformat())
     updated_at: str = Field(default_factory=lambda: datetime.now(timezone.utc).isoformat())
 
@@ -3,11 +3,17 @@ Demo Bot System - AI opponents for demo mode
 Creates realistic bot players that answer questions automatically
 """
 from fastapi import APIRouter, HTTPException
+from pymongo import UpdateOne
 from typing import List
 import random
 import asyncio
 from datetime import datetime, timezone
 
+from services.content_cache import load_shared_content
+from services.live_patch import OVERRIDES_FIELD, content_with_overrides
+from services.event_log import event_log
+from services.websocket_manager import apply_mass_scores
+
 router = APIRouter(prefix="/demo", tags=["demo"])
 
 # Will be set by main server
@@ -76,6 +82,8 @@ async def add_demo_bots(game_code: str, count: int = 5):
         {"code": game_code.upper()},
         {"$set": {"players": existing_players}}
     )
+    for bot in bots_added:
+        await event_log.append(db, game["id"], "player:joined", {"player": bot}, source="demo")
     
     return {
         "message": f"Added {len(bots_added)} demo bots",
@@ -98,14 +106,17 @@ async def simulate_bot_answers(game_code: str, correct_rate: float = 0.6):
     if not bots:
         return {"message": "No active bots in game"}
     
-    content = game.get("content", {})
+    shared = await load_shared_content(db, game)
     current_index = game.get("current_question_index", 0)
     game_format = game.get("game_format", "")
+    # Patched questions count, as they do for players
+    content = content_with_overrides(game_format, shared.content, game.get(OVERRIDES_FIELD)) if shared else {}
     
     # Get correct answer based on format
     correct_answer = get_correct_answer(game_format, content, current_index)
     
     results = []
+    scored = []
     for bot in bots:
         # Determine if bot answers correctly (based on correct_rate)
         is_correct = random.random() < correct_rate
@@ -120,14 +131,7 @@ async def simulate_bot_answers(game_code: str, correct_rate: float = 0.6):
             time_bonus = int(base_points * 0.3 * (1 - time_taken / 10))
             points = base_points + max(0, time_bonus)
         
-        # Update bot score
-        for p in players:
-            if p["id"] == bot["id"]:
-                p["score"] += points
-                if is_correct:
-                    p["correct_answers"] += 1
-                break
-        
+        scored.append({"player_id": bot["id"], "points": points, "correct": is_correct})
         results.append({
             "bot_name": bot["name"],
             "correct": is_correct,
@@ -135,11 +139,20 @@ async def simulate_bot_answers(game_code: str, correct_rate: float = 0.6):
             "time_taken": round(time_taken, 2)
         })
     
-    # Save updated scores
-    await db.games.update_one(
-        {"code": game_code.upper()},
-        {"$set": {"players": players}}
-    )
+    # Save updated scores - one positional $inc per bot, so players scoring meanwhile are kept
+    await db.games.bulk_write([
+        UpdateOne(
+            {"code": game_code.upper(), "players.id": event_data["player_id"]},
+            {"$inc": {"players.$.score": event_data["points"],
+                      "players.$.correct_answers": 1 if event_data["correct"] else 0}}
+        )
+        for event_data in scored
+    ], ordered=False)
+    apply_mass_scores(game_code.upper(), [
+        {"player_id": e["player_id"], "points_earned": e["points"], "correct": e["correct"]} for e in scored
+    ])
+    for event_data in scored:
+        await event_log.append(db, game["id"], "player:scored", event_data, source="demo")
     
     return {
         "message": f"Simulated answers for {len(results)} bots",
@@ -163,6 +176,9 @@ async def remove_demo_bots(game_code: str):
         {"code": game_code.upper()},
         {"$set": {"players": human_players}}
     )
+    await event_log.append(db, game["id"], "players:removed", {
+        "player_ids": [p["id"] for p in players if p.get("is_bot", False)]
+    }, source="demo")
     
     return {
         "message": f"Removed {bots_removed} demo bots",
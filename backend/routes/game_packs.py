@@ -2,13 +2,28 @@
 Game Packs Routes - Import and manage game content
 """
 from fastapi import APIRouter, HTTPException, status, UploadFile, File
-from typing import List, Optional
-from datetime import datetime, timezone
+from fastapi.responses import StreamingResponse
+from typing import Any, Dict, List, Optional
+import asyncio
 import json
+import shutil
+import tempfile
 
 from models.game_models import (
     GamePack, GamePackCreate, GamePackResponse, GameFormat
 )
+from services.bulk_import import import_archive
+from services.content_store import put_content, release, retain
+from services.format_detect import classify_content
+from services.pack_patch import PatchError, patch_pack
+from services.pack_search import pack_search
+from services.pack_stream import PackStreamError, PackTooLarge, stream_pack
+from services.pack_versions import (
+    VERSION_PROJECTION, VersionConflict, commit_version, content_at, drop_history, list_versions, load_pack_content,
+    store_legacy_content
+)
+from services.pack_validation import MAX_REPORTED_ERRORS, PackValidationError, validate_pack
+from services.sheet_import import SheetError, convert_sheet, read_sheet
 
 router = APIRouter(prefix="/game-packs", tags=["game-packs"])
 
@@ -21,70 +36,37 @@ def set_db(database):
     db = database
 
 
-# Map game names to format enum
-GAME_NAME_MAP = {
-    "PERIL!": GameFormat.PERIL.value,
-    "SURVEY SAYS!": GameFormat.SURVEY_SAYS.value,
-    "UR FINAL ANSWER!": GameFormat.UR_FINAL_ANSWER.value,
-    "LAST CALL STANDING": GameFormat.LAST_CALL_STANDING.value,
-    "PICK OR PASS!": GameFormat.PICK_OR_PASS.value,
-    "LINK REACTION": GameFormat.LINK_REACTION.value,
-    "SPIN TO WIN!": GameFormat.SPIN_TO_WIN.value,
-    "CLOSEST WINS!": GameFormat.CLOSEST_WINS.value,
-    "CHAINED UP": GameFormat.CHAINED_UP.value,
-    "NO WHAMMY!": GameFormat.NO_WHAMMY.value,
-    "BACK TO SCHOOL!": GameFormat.BACK_TO_SCHOOL.value,
-    "QUIZ CHASE": GameFormat.QUIZ_CHASE.value,
-    "PKWY LIVE!": GameFormat.PKWY_LIVE.value,
-    "GAME NIGHT MIX": GameFormat.GAME_NIGHT_MIX.value,
-}
+def detect_game_format(content: dict) -> str:
+    """Detect game format from content structure; 400 with the reasons if unknown"""
+    guess = classify_content(content)
+    if not guess.known:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Could not detect game format from content ({'; '.join(guess.reasons)}). "
+                   "Make sure 'game_name' field is present."
+        )
+    return guess.game_format
 
 
-def detect_game_format(content: dict) -> str:
-    """Detect game format from content structure"""
-    game_name = content.get("game_name", "")
-    
-    if game_name in GAME_NAME_MAP:
-        return GAME_NAME_MAP[game_name]
-    
-    # Check for mixed game night format
-    if "rounds" in content:
-        return GameFormat.GAME_NIGHT_MIX.value
-    
-    # Fallback detection based on content structure
-    if "categories" in content and "clues" in str(content):
-        return GameFormat.PERIL.value
-    if "survey_questions" in content:
-        return GameFormat.SURVEY_SAYS.value
-    if "puzzles" in content:
-        return GameFormat.SPIN_TO_WIN.value
-    if "chains" in content:
-        return GameFormat.CHAINED_UP.value
-    if "board" in content and "spin_questions" in content:
-        return GameFormat.NO_WHAMMY.value
-    if "cases" in content:
-        return GameFormat.PICK_OR_PASS.value
-    if "numbers" in content:
-        return GameFormat.CLOSEST_WINS.value
-    
-    # Check for question-based formats
-    if "questions" in content:
-        questions = content["questions"]
-        if questions and isinstance(questions, list) and len(questions) > 0:
-            sample = questions[0]
-            if "subject" in sample:
-                return GameFormat.BACK_TO_SCHOOL.value
-            if "chain_value" in sample:
-                return GameFormat.LINK_REACTION.value
-            if "point_value" in sample:
-                return GameFormat.UR_FINAL_ANSWER.value
-            if "difficulty" in sample:
-                # Could be LAST CALL STANDING or PKWY LIVE
-                if len(questions) >= 12:
-                    return GameFormat.LAST_CALL_STANDING.value
-                return GameFormat.PKWY_LIVE.value
-    
-    return "UNKNOWN"
+def invalid_content(e: PackValidationError) -> HTTPException:
+    """422 listing the problems found in a pack"""
+    return HTTPException(
+        status_code=422,
+        detail={
+            "message": str(e),
+            "game_format": e.game_format,
+            "error_count": e.count,
+            "errors": e.errors[:MAX_REPORTED_ERRORS]
+        }
+    )
+
+
+def validate_game_content(game_format: str, content: dict) -> dict:
+    """Normalized content for the format; 422 listing every problem if it does not fit"""
+    try:
+        return validate_pack(game_format, content)
+    except PackValidationError as e:
+        raise invalid_content(e)
 
 
 @router.post("", response_model=GamePackResponse, status_code=status.HTTP_201_CREATED)
@@ -92,23 +74,19 @@ async def create_game_pack(pack_data: GamePackCreate):
     """Create a new game pack from JSON content"""
     # Detect game format
     game_format = detect_game_format(pack_data.content)
-    
-    if game_format == "UNKNOWN":
-        raise HTTPException(
-            status_code=400,
-            detail="Could not detect game format from content. Make sure 'game_name' field is present."
-        )
+    content = validate_game_content(game_format, pack_data.content)
     
     pack = GamePack(
         name=pack_data.name,
         description=pack_data.description,
         game_format=game_format,
-        content=pack_data.content,
+        content_hash=await put_content(db, content),
         tags=pack_data.tags
     )
     
     pack_dict = pack.model_dump()
     await db.game_packs.insert_one(pack_dict)
+    await pack_search.index_pack(db, pack_dict, content)
     
     return GamePackResponse(
         id=pack.id,
@@ -131,37 +109,34 @@ async def upload_game_pack(
     if not file.filename.endswith('.json'):
         raise HTTPException(status_code=400, detail="File must be a JSON file")
     
-    try:
-        content_bytes = await file.read()
-        content = json.loads(content_bytes.decode('utf-8'))
-    except json.JSONDecodeError as e:
-        raise HTTPException(status_code=400, detail=f"Invalid JSON: {str(e)}")
-    
     # Use filename as name if not provided
     pack_name = name or file.filename.replace('.json', '')
     
     # Parse tags
     tag_list = [t.strip() for t in tags.split(',') if t.strip()] if tags else []
     
-    # Detect game format
-    game_format = detect_game_format(content)
-    
-    if game_format == "UNKNOWN":
-        raise HTTPException(
-            status_code=400,
-            detail="Could not detect game format from content. Make sure 'game_name' field is present."
-        )
+    # Parse, detect, validate and store the lists piece by piece
+    try:
+        game_format, content_hash, questions = await stream_pack(db, file.read)
+    except PackTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except PackStreamError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid JSON: {str(e)}")
+    except PackValidationError as e:
+        raise invalid_content(e)
     
     pack = GamePack(
         name=pack_name,
         description=description,
         game_format=game_format,
-        content=content,
+        content_hash=content_hash,
         tags=tag_list
     )
     
     pack_dict = pack.model_dump()
     await db.game_packs.insert_one(pack_dict)
+    # The upload was never held whole; its questions were indexed as they were read
+    await pack_search.index_pack(db, pack_dict, questions=questions)
     
     return GamePackResponse(
         id=pack.id,
@@ -173,6 +148,84 @@ async def upload_game_pack(
     )
 
 
+@router.post("/import")
+async def import_game_packs(file: UploadFile = File(...), tags: str = ""):
+    """Import every JSON pack in a ZIP archive; streams an NDJSON report line per file"""
+    if not file.filename.lower().endswith('.zip'):
+        raise HTTPException(status_code=400, detail="File must be a ZIP archive")
+    
+    tag_list = [t.strip() for t in tags.split(',') if t.strip()] if tags else []
+    
+    # The upload is closed once this handler returns, before the report streams
+    archive = tempfile.TemporaryFile()
+    await asyncio.to_thread(shutil.copyfileobj, file.file, archive)
+    
+    async def report():
+        try:
+            async for line in import_archive(db, archive, tag_list):
+                yield json.dumps(line) + "\n"
+        finally:
+            archive.close()
+    
+    return StreamingResponse(report(), media_type="application/x-ndjson")
+
+
+@router.post("/import-sheet")
+async def import_sheet(
+    file: UploadFile = File(...),
+    game_format: str = "",
+    name: Optional[str] = None,
+    description: str = "",
+    tags: str = ""  # Comma-separated tags
+):
+    """Build packs from a CSV/XLSX question bank; bad rows are reported, not imported"""
+    if not file.filename.lower().endswith(('.csv', '.xlsx', '.xls')):
+        raise HTTPException(status_code=400, detail="File must be a CSV or XLSX spreadsheet")
+    
+    pack_name = name or file.filename.rsplit('.', 1)[0]
+    tag_list = [t.strip() for t in tags.split(',') if t.strip()] if tags else []
+    
+    raw = await file.read()
+    try:
+        frame = await asyncio.to_thread(read_sheet, raw, file.filename)
+        result = await asyncio.to_thread(convert_sheet, frame, game_format, pack_name)
+    except SheetError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except PackValidationError as e:
+        raise invalid_content(e)
+    
+    if not result.packs:
+        raise HTTPException(
+            status_code=422,
+            detail={"message": "No usable rows in the sheet", "bad_rows": result.bad_rows, "errors": result.errors}
+        )
+    
+    packs = [
+        GamePack(
+            name=title, description=description, game_format=game_format,
+            content_hash=await put_content(db, content), tags=tag_list
+        )
+        for title, content in result.packs
+    ]
+    await db.game_packs.insert_many([pack.model_dump() for pack in packs])
+    for pack, (_, content) in zip(packs, result.packs):
+        await pack_search.index_pack(db, pack.model_dump(), content)
+    
+    return {
+        "packs": [
+            GamePackResponse(
+                id=p.id, name=p.name, description=p.description,
+                game_format=p.game_format, tags=p.tags, created_at=p.created_at
+            )
+            for p in packs
+        ],
+        "rows": result.rows,
+        "imported_rows": result.imported_rows,
+        "bad_rows": result.bad_rows,
+        "errors": result.errors
+    }
+
+
 @router.get("", response_model=List[GamePackResponse])
 async def get_all_game_packs(
     game_format: Optional[str] = None,
@@ -213,6 +266,34 @@ async def get_available_formats():
     }
 
 
+@router.get("/search")
+async def search_game_packs(
+    q: str = "",
+    game_format: Optional[str] = None,
+    tag: Optional[str] = None,
+    difficulty: Optional[int] = None,
+    kind: Optional[str] = None,  # "pack" or "question"
+    limit: int = 20,
+    offset: int = 0
+):
+    """Ranked full-text search over packs and their questions, with facet counts"""
+    if kind not in (None, "pack", "question"):
+        raise HTTPException(status_code=400, detail="kind must be 'pack' or 'question'")
+    if limit < 1 or offset < 0:
+        raise HTTPException(status_code=400, detail="limit must be positive and offset not negative")
+    
+    return pack_search.search(
+        q, limit=limit, offset=offset, game_format=game_format, tag=tag, difficulty=difficulty, kind=kind
+    )
+
+
+@router.post("/detect")
+async def detect_pack_format(content: dict):
+    """Guess a pack's format without saving it"""
+    guess = classify_content(content)
+    return {"game_format": guess.game_format, "confidence": guess.confidence, "reasons": guess.reasons}
+
+
 @router.get("/{pack_id}")
 async def get_game_pack(pack_id: str):
     """Get a specific game pack with full content"""
@@ -221,6 +302,9 @@ async def get_game_pack(pack_id: str):
     if not pack:
         raise HTTPException(status_code=404, detail="Game pack not found")
     
+    pack["content"] = await load_pack_content(db, pack)
+    for field in ("content_hash", "base_version", "chunked"):
+        pack.pop(field, None)
     return pack
 
 
@@ -228,35 +312,94 @@ async def get_game_pack(pack_id: str):
 async def update_game_pack(pack_id: str, pack_data: GamePackCreate):
     """Update a game pack"""
     game_format = detect_game_format(pack_data.content)
+    content = validate_game_content(game_format, pack_data.content)
     
-    result = await db.game_packs.update_one(
-        {"id": pack_id},
-        {
-            "$set": {
+    pack = await db.game_packs.find_one({"id": pack_id}, VERSION_PROJECTION)
+    if not pack:
+        raise HTTPException(status_code=404, detail="Game pack not found")
+    
+    # A full replace is a snapshot version: history before it stays replayable
+    try:
+        version = await commit_version(
+            db, pack,
+            content_hash=await put_content(db, content),
+            fields={
                 "name": pack_data.name,
                 "description": pack_data.description,
                 "game_format": game_format,
-                "content": pack_data.content,
-                "tags": pack_data.tags,
-                "updated_at": datetime.now(timezone.utc).isoformat()
+                "tags": pack_data.tags
             }
-        }
-    )
+        )
+    except VersionConflict as e:
+        raise HTTPException(status_code=409, detail=str(e))
     
-    if result.modified_count == 0:
+    await pack_search.refresh_pack(db, pack_id, content)
+    return {"message": "Game pack updated", "version": version}
+
+
+@router.patch("/{pack_id}")
+async def patch_game_pack(pack_id: str, ops: List[Dict[str, Any]], expected_version: Optional[int] = None):
+    """Edit a game pack with JSON-patch operations; only what they touch is validated again"""
+    pack = await db.game_packs.find_one({"id": pack_id}, VERSION_PROJECTION)
+    if not pack:
         raise HTTPException(status_code=404, detail="Game pack not found")
+    if expected_version is not None and expected_version != pack.get("version", 0):
+        raise HTTPException(
+            status_code=409,
+            detail=f"Game pack is at version {pack.get('version', 0)}, not {expected_version}"
+        )
+    
+    content = await load_pack_content(db, pack)
+    try:
+        content, delta = patch_pack(pack["game_format"], content, ops)
+    except PatchError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except PackValidationError as e:
+        raise invalid_content(e)
     
-    return {"message": "Game pack updated"}
+    try:
+        version = await commit_version(db, pack, ops=delta, content=content)
+    except VersionConflict as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    
+    await pack_search.refresh_pack(db, pack_id, content)
+    return {"message": "Game pack updated", "version": version}
+
+
+@router.get("/{pack_id}/versions")
+async def get_game_pack_versions(pack_id: str):
+    """A game pack's edit history, oldest first"""
+    versions = await list_versions(db, pack_id)
+    if not versions and not await db.game_packs.find_one({"id": pack_id}, {"_id": 0, "id": 1}):
+        raise HTTPException(status_code=404, detail="Game pack not found")
+    return {"versions": versions}
+
+
+@router.get("/{pack_id}/versions/{version}")
+async def get_game_pack_version(pack_id: str, version: int):
+    """A game pack's content as of an earlier version"""
+    content = await content_at(db, pack_id, version)
+    if content is None:
+        raise HTTPException(status_code=404, detail="Version not found")
+    return {"version": version, "content": content}
 
 
 @router.delete("/{pack_id}")
 async def delete_game_pack(pack_id: str):
     """Delete a game pack"""
-    result = await db.game_packs.delete_one({"id": pack_id})
+    pack = await db.game_packs.find_one_and_delete({"id": pack_id}, projection={"content_hash": 1})
     
-    if result.deleted_count == 0:
+    if not pack:
         raise HTTPException(status_code=404, detail="Game pack not found")
     
+    if pack.get("content_hash"):
+        await release(db, pack["content_hash"])
+    else:
+        # Saved before the content store and not migrated yet
+        await db.game_pack_chunks.delete_many({"pack_id": pack_id})
+    await drop_history(db, pack_id)
+    pack_search.remove_pack(pack_id)
+    
     return {"message": "Game pack deleted"}
 
 
@@ -267,17 +410,29 @@ async def duplicate_game_pack(pack_id: str, new_name: Optional[str] = None):
     
     if not original:
         raise HTTPException(status_code=404, detail="Game pack not found")
+    if not original.get("content_hash"):
+        original["content_hash"] = await store_legacy_content(db, pack_id)
+    
+    content = None
+    if original.get("version", 0) > original.get("base_version", 0):
+        # Edits since the last snapshot are deltas; the copy starts from the content they build
+        content = await load_pack_content(db, original)
+        content_hash = await put_content(db, content)
+    else:
+        # Same content, one more reference: no content is copied
+        content_hash = original["content_hash"]
+        await retain(db, content_hash)
     
     new_pack = GamePack(
         name=new_name or f"{original['name']} (Copy)",
         description=original.get("description", ""),
         game_format=original["game_format"],
-        content=original["content"],
+        content_hash=content_hash,
         tags=original.get("tags", [])
     )
-    
     pack_dict = new_pack.model_dump()
     await db.game_packs.insert_one(pack_dict)
+    await pack_search.index_pack(db, pack_dict, content)
     
     return GamePackResponse(
         id=new_pack.id,
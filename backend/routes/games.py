@@ -2,14 +2,27 @@
 Game Routes - CRUD operations for game sessions
 """
 from fastapi import APIRouter, HTTPException, status
-from typing import List, Optional
-from datetime import datetime, timezone
+from pymongo import ReturnDocument
+from typing import Any, Dict, List, Optional
 
 from models.game_models import (
     GameSession, GameSessionCreate, GameSessionResponse,
     Player, PlayerCreate, PlayerResponse,
     LeaderboardEntry, GameStatus, generate_id
 )
+from services.content_cache import intern_content, load_shared_content
+from services.room_state import set_room_content
+from services.websocket_manager import apply_mass_scores, current_distribution, manager, sync_room
+from services.answer_tally import load_distribution
+from services.content_store import put_content, release
+from services.live_patch import (
+    OVERRIDES_FIELD, QuestionConflict, QuestionNotFound, content_with_overrides, patch_game_question
+)
+from services.pack_patch import PatchError
+from services.pack_validation import PackValidationError
+from services.survivors import eliminate_players
+from services.game_state import GameNotFound, InvalidTransition, move_question, transition_status
+from services.event_log import event_log, list_events, rebuild_game
 
 router = APIRouter(prefix="/games", tags=["games"])
 
@@ -30,14 +43,15 @@ async def create_game(game_data: GameSessionCreate, custom_code: Optional[str] =
     # Allow custom code (e.g., "DEMO")
     if custom_code:
         # Check if code already exists
-        existing = await db.games.find_one({"code": custom_code.upper()})
+        existing = await db.games.find_one_and_delete({"code": custom_code.upper()}, projection={"content_hash": 1})
         if existing:
-            # Delete existing game with this code
-            await db.games.delete_one({"code": custom_code.upper()})
+            # The existing game with this code is replaced
+            await release(db, existing.get("content_hash"))
         game.code = custom_code.upper()
     
     game_dict = game.model_dump()
     await db.games.insert_one(game_dict)
+    await event_log.append(db, game.id, "game:created", game.model_dump(), source="rest")
     
     return GameSessionResponse(
         id=game.id,
@@ -89,7 +103,7 @@ async def get_game_by_code(game_code: str):
     if not game:
         raise HTTPException(status_code=404, detail="Game not found")
     
-    return game
+    return await _with_content(game)
 
 
 @router.get("/{game_id}")
@@ -100,144 +114,219 @@ async def get_game(game_id: str):
     if not game:
         raise HTTPException(status_code=404, detail="Game not found")
     
+    return await _with_content(game)
+
+
+async def _with_content(game: dict) -> dict:
+    """Game document with its content filled in from the shared copy (and its patched questions)"""
+    shared = await load_shared_content(db, game)
+    if shared is None:
+        game["content"] = None
+    else:
+        game["content"] = content_with_overrides(game.get("game_format", ""), shared.content, game.get(OVERRIDES_FIELD))
     return game
 
 
-@router.patch("/{game_id}/start")
-async def start_game(game_id: str):
-    """Start a game"""
-    result = await db.games.update_one(
-        {"id": game_id},
-        {
-            "$set": {
-                "status": GameStatus.ACTIVE.value,
-                "started_at": datetime.now(timezone.utc).isoformat()
-            }
-        }
-    )
+@router.get("/{game_id}/events")
+async def get_game_events(game_id: str, after_seq: int = 0, limit: int = 500):
+    """Get a game's event stream, oldest first"""
+    return await list_events(db, game_id, after_seq=after_seq, limit=min(limit, 5000))
+
+
+@router.get("/{game_id}/replay")
+async def replay_game(game_id: str, seq: Optional[int] = None, at: Optional[str] = None):
+    """Rebuild a game as of an event sequence number or ISO timestamp"""
+    state = await rebuild_game(db, game_id, at_seq=seq, at_time=at)
     
-    if result.modified_count == 0:
-        raise HTTPException(status_code=404, detail="Game not found")
+    if not state:
+        raise HTTPException(status_code=404, detail="No events recorded for this game")
     
-    return {"message": "Game started", "status": "active"}
+    return state
 
 
-@router.patch("/{game_id}/pause")
-async def pause_game(game_id: str):
-    """Pause a game"""
-    result = await db.games.update_one(
-        {"id": game_id},
-        {"$set": {"status": GameStatus.PAUSED.value}}
-    )
+@router.get("/{game_id}/questions/{question_index}/distribution")
+async def get_answer_distribution(game_id: str, question_index: int):
+    """How players answered a question - live while open, from analytics once closed"""
+    room = _live_room(game_id)
+    if room and question_index in room["tallies"]:
+        return current_distribution(room, question_index)
     
-    if result.modified_count == 0:
+    distribution = await load_distribution(db, game_id, question_index)
+    if not distribution:
+        raise HTTPException(status_code=404, detail="No answers recorded for this question")
+    
+    return distribution
+
+
+async def _apply_status_action(game_id: str, action: str, expected_version: Optional[int]) -> dict:
+    """Run a status transition and map state machine errors to HTTP errors"""
+    try:
+        game = await transition_status(db, {"id": game_id}, action, expected_version)
+    except GameNotFound:
         raise HTTPException(status_code=404, detail="Game not found")
+    except InvalidTransition as e:
+        raise HTTPException(status_code=409, detail=str(e))
     
-    return {"message": "Game paused", "status": "paused"}
+    sync_room(game)
+    return game
 
 
-@router.patch("/{game_id}/resume")
-async def resume_game(game_id: str):
-    """Resume a paused game"""
-    result = await db.games.update_one(
-        {"id": game_id},
-        {"$set": {"status": GameStatus.ACTIVE.value}}
-    )
+async def _apply_question_move(game_id: str, expected_version: Optional[int], **move) -> dict:
+    """Run a question move and map state machine errors to HTTP errors"""
+    room = _live_room(game_id)
+    question_count = len(room["plan"]) if room and room["plan"] else None
     
-    if result.modified_count == 0:
+    try:
+        game = await move_question(
+            db, {"id": game_id},
+            expected_version=expected_version, question_count=question_count, **move
+        )
+    except GameNotFound:
         raise HTTPException(status_code=404, detail="Game not found")
+    except InvalidTransition as e:
+        raise HTTPException(status_code=409, detail=str(e))
     
-    return {"message": "Game resumed", "status": "active"}
+    sync_room(game)
+    return game
+
+
+def _live_room(game_id: str) -> Optional[dict]:
+    """Loaded room for a game id, if this worker is hosting it"""
+    return manager.find_room(game_id)
+
+
+@router.patch("/{game_id}/start")
+async def start_game(game_id: str, expected_version: Optional[int] = None):
+    """Start a game"""
+    game = await _apply_status_action(game_id, "start", expected_version)
+    await event_log.append(db, game_id, "game:started", source="rest")
+    return {"message": "Game started", "status": "active", "version": game["version"]}
+
+
+@router.patch("/{game_id}/pause")
+async def pause_game(game_id: str, expected_version: Optional[int] = None):
+    """Pause a game"""
+    game = await _apply_status_action(game_id, "pause", expected_version)
+    await event_log.append(db, game_id, "game:paused", source="rest")
+    return {"message": "Game paused", "status": "paused", "version": game["version"]}
+
+
+@router.patch("/{game_id}/resume")
+async def resume_game(game_id: str, expected_version: Optional[int] = None):
+    """Resume a paused game"""
+    game = await _apply_status_action(game_id, "resume", expected_version)
+    await event_log.append(db, game_id, "game:resumed", source="rest")
+    return {"message": "Game resumed", "status": "active", "version": game["version"]}
 
 
 @router.patch("/{game_id}/finish")
-async def finish_game(game_id: str):
+async def finish_game(game_id: str, expected_version: Optional[int] = None):
     """Finish a game"""
-    result = await db.games.update_one(
-        {"id": game_id},
-        {
-            "$set": {
-                "status": GameStatus.FINISHED.value,
-                "finished_at": datetime.now(timezone.utc).isoformat()
-            }
-        }
-    )
-    
-    if result.modified_count == 0:
-        raise HTTPException(status_code=404, detail="Game not found")
-    
-    return {"message": "Game finished", "status": "finished"}
+    game = await _apply_status_action(game_id, "finish", expected_version)
+    await event_log.append(db, game_id, "game:finished", source="rest")
+    return {"message": "Game finished", "status": "finished", "version": game["version"]}
 
 
 @router.patch("/{game_id}/next-question")
-async def next_question(game_id: str):
-    """Move to next question"""
-    game = await db.games.find_one({"id": game_id}, {"_id": 0})
+async def next_question(game_id: str, from_index: Optional[int] = None, expected_version: Optional[int] = None):
+    """Move to next question (from_index rejects double taps)"""
+    game = await _apply_question_move(game_id, expected_version, delta=1, expected_index=from_index)
+    new_index = game["current_question_index"]
+    await event_log.append(db, game_id, "question:changed", {"question_index": new_index}, source="rest")
     
-    if not game:
-        raise HTTPException(status_code=404, detail="Game not found")
-    
-    new_index = game["current_question_index"] + 1
-    
-    await db.games.update_one(
-        {"id": game_id},
-        {"$set": {"current_question_index": new_index}}
-    )
-    
-    return {"message": "Next question", "current_question_index": new_index}
+    return {"message": "Next question", "current_question_index": new_index, "version": game["version"]}
 
 
 @router.patch("/{game_id}/previous-question")
-async def previous_question(game_id: str):
-    """Move to previous question"""
-    game = await db.games.find_one({"id": game_id}, {"_id": 0})
-    
-    if not game:
-        raise HTTPException(status_code=404, detail="Game not found")
-    
-    new_index = max(0, game["current_question_index"] - 1)
+async def previous_question(game_id: str, from_index: Optional[int] = None, expected_version: Optional[int] = None):
+    """Move to previous question (from_index rejects double taps)"""
+    game = await _apply_question_move(game_id, expected_version, delta=-1, expected_index=from_index)
+    new_index = game["current_question_index"]
+    await event_log.append(db, game_id, "question:changed", {"question_index": new_index}, source="rest")
     
-    await db.games.update_one(
-        {"id": game_id},
-        {"$set": {"current_question_index": new_index}}
-    )
-    
-    return {"message": "Previous question", "current_question_index": new_index}
+    return {"message": "Previous question", "current_question_index": new_index, "version": game["version"]}
 
 
 @router.patch("/{game_id}/set-question/{index}")
-async def set_question_index(game_id: str, index: int):
+async def set_question_index(game_id: str, index: int, expected_version: Optional[int] = None):
     """Set specific question index"""
-    await db.games.update_one(
-        {"id": game_id},
-        {"$set": {"current_question_index": index}}
-    )
+    game = await _apply_question_move(game_id, expected_version, index=index)
+    await event_log.append(db, game_id, "question:changed", {"question_index": index}, source="rest")
     
-    return {"message": "Question index set", "current_question_index": index}
+    return {"message": "Question index set", "current_question_index": index, "version": game["version"]}
 
 
 @router.patch("/{game_id}/content")
 async def update_game_content(game_id: str, content: dict):
     """Update game content (load a game pack)"""
-    result = await db.games.update_one(
+    content_hash = await put_content(db, content)
+    # The game keeps only the hash; its content is the shared stored copy
+    game = await db.games.find_one_and_update(
         {"id": game_id},
-        {"$set": {"content": content}}
+        # New content starts with a fresh board (seeded from its own flags)
+        {"$set": {"content_hash": content_hash}, "$unset": {"content": "", "room_state.board": "", OVERRIDES_FIELD: ""}},
+        projection={"_id": 0, "code": 1, "game_format": 1, "content_hash": 1}
     )
     
-    if result.modified_count == 0:
+    if not game:
+        await release(db, content_hash)
         raise HTTPException(status_code=404, detail="Game not found")
     
+    # The game's reference moves from the content it held to the new content
+    await release(db, game.get("content_hash"))
+    
+    await event_log.append(db, game_id, "content:updated", {"content_hash": content_hash}, source="rest")
+    
+    # Repoint a live room so it never serves stale content
+    if game["code"] in manager.game_rooms:
+        set_room_content(manager.game_rooms[game["code"]], game.get("game_format", ""), intern_content(content, content_hash))
+    
     return {"message": "Game content updated"}
 
 
+@router.patch("/{game_id}/questions/{question_index}")
+async def patch_game_question_route(game_id: str, question_index: int, ops: List[Dict[str, Any]],
+                                    expected_version: Optional[int] = None):
+    """Fix one question of a running game with JSON-patch operations (paths relative to the question)"""
+    try:
+        patch = await patch_game_question(db, game_id, question_index, ops, expected_version)
+    except GameNotFound:
+        raise HTTPException(status_code=404, detail="Game not found")
+    except QuestionNotFound as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except QuestionConflict as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except PatchError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except PackValidationError as e:
+        raise HTTPException(
+            status_code=422,
+            detail={"message": str(e), "game_format": e.game_format, "error_count": e.count, "errors": e.errors}
+        )
+    
+    # Live rooms pick the patch up from the event stream, like every other REST change
+    await event_log.append(db, game_id, "content:patched", patch, source="rest")
+    
+    return {
+        "message": "Question patched",
+        "question": patch["question"],
+        "version": patch["version"],
+        "rescored": len(patch["rescored"])
+    }
+
+
 @router.delete("/{game_id}")
 async def delete_game(game_id: str):
     """Delete a game"""
-    result = await db.games.delete_one({"id": game_id})
+    game = await db.games.find_one_and_delete({"id": game_id}, projection={"content_hash": 1})
     
-    if result.deleted_count == 0:
+    if not game:
         raise HTTPException(status_code=404, detail="Game not found")
     
+    await release(db, game.get("content_hash"))
+    # The event stream is kept for audit; only the cached sequence goes
+    event_log.forget(game_id)
+    
     return {"message": "Game deleted"}
 
 
@@ -264,6 +353,7 @@ async def join_game(game_code: str, player_data: PlayerCreate):
         {"code": game_code.upper()},
         {"$push": {"players": player.model_dump()}}
     )
+    await event_log.append(db, game["id"], "player:joined", {"player": player.model_dump()}, source="rest")
     
     return PlayerResponse(
         id=player.id,
@@ -314,51 +404,38 @@ async def get_leaderboard(game_code: str):
 @router.patch("/{game_code}/players/{player_id}/score")
 async def update_player_score(game_code: str, player_id: str, points: int, correct: bool = True):
     """Update a player's score"""
-    game = await db.games.find_one({"code": game_code.upper()}, {"_id": 0})
+    # Only the matched player's counters change, so concurrent score updates all land
+    game = await db.games.find_one_and_update(
+        {"code": game_code.upper(), "players.id": player_id},
+        {"$inc": {"players.$.score": points, "players.$.correct_answers": 1 if correct else 0}},
+        projection={"_id": 0, "id": 1, "players.$": 1},
+        return_document=ReturnDocument.AFTER
+    )
     
     if not game:
+        if await db.games.find_one({"code": game_code.upper()}, {"_id": 0, "id": 1}):
+            raise HTTPException(status_code=404, detail="Player not found")
         raise HTTPException(status_code=404, detail="Game not found")
     
-    players = game.get("players", [])
-    player_found = False
-    
-    for player in players:
-        if player["id"] == player_id:
-            player["score"] += points
-            if correct:
-                player["correct_answers"] += 1
-            player_found = True
-            break
-    
-    if not player_found:
-        raise HTTPException(status_code=404, detail="Player not found")
+    result = {"player_id": player_id, "points_earned": points, "correct": correct,
+              "new_score": game["players"][0]["score"]}
+    apply_mass_scores(game_code.upper(), [result])
+    await event_log.append(db, game["id"], "player:scored", {
+        "player_id": player_id, "points": points, "correct": correct
+    }, source="rest")
     
-    await db.games.update_one(
-        {"code": game_code.upper()},
-        {"$set": {"players": players}}
-    )
-    
-    return {"message": "Score updated", "new_score": player["score"]}
+    return {"message": "Score updated", "new_score": result["new_score"]}
 
 
 @router.patch("/{game_code}/players/{player_id}/eliminate")
 async def eliminate_player(game_code: str, player_id: str):
     """Eliminate a player (for elimination games)"""
-    game = await db.games.find_one({"code": game_code.upper()}, {"_id": 0})
+    game = await db.games.find_one({"code": game_code.upper()}, {"_id": 0, "id": 1})
     
     if not game:
         raise HTTPException(status_code=404, detail="Game not found")
     
-    players = game.get("players", [])
-    
-    for player in players:
-        if player["id"] == player_id:
-            player["eliminated"] = True
-            break
-    
-    await db.games.update_one(
-        {"code": game_code.upper()},
-        {"$set": {"players": players}}
-    )
+    await eliminate_players(db, {"code": game_code.upper()}, [player_id])
+    await event_log.append(db, game["id"], "player:eliminated", {"player_id": player_id}, source="rest")
     
     return {"message": "Player eliminated"}
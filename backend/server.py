@@ -2,7 +2,13 @@
 PKWY Tavern Game Suite - Backend Server
 Supports 13 game formats with real-time WebSocket communication
 """
-from fastapi import FastAPI, APIRouter, WebSocket, WebSocketDisconnect
+import time
+
+# Taken before heavy imports so startup benchmarks include import time
+PROCESS_STARTED = time.perf_counter()
+
+from fastapi import FastAPI, APIRouter, Depends, HTTPException, WebSocket, WebSocketDisconnect, Request
+from fastapi.responses import JSONResponse
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
 from motor.motor_asyncio import AsyncIOMotorClient
@@ -10,6 +16,7 @@ import os
 import logging
 from pathlib import Path
 import json
+import asyncio
 
 # Load environment
 ROOT_DIR = Path(__file__).parent
@@ -34,9 +41,32 @@ api_router = APIRouter(prefix="/api")
 from routes import games, game_packs, answers, demo
 from services.websocket_manager import (
     manager, 
+    load_room,
     handle_director_message, 
     handle_player_message
 )
+from services.migrations import run_migrations
+from services.resume_tokens import verify_resume_token
+from services.operator_auth import is_operator
+from services.readiness import StartupTracker, ping_database
+from services.room_state import warm_start_rooms
+from services.change_bridge import ChangeStreamBridge
+from services.autopilot import autopilots
+from services.bulk_import import shutdown_pool
+from services.content_store import collect_garbage
+from services.pack_search import pack_search
+
+startup = StartupTracker(PROCESS_STARTED)
+# Pushes REST-side game changes to connected sockets
+bridge = ChangeStreamBridge(manager)
+bridge_task = None
+search_task = None
+# Loads every live game and its content, which is what the request paths read first
+startup.register_warmup("rooms", lambda database: warm_start_rooms(database, manager))
+# Sweeps pack content left unreferenced by interrupted requests
+startup.register_warmup("content_gc", collect_garbage)
+# Builds the in-memory pack search index; pack_search.run keeps it in step after
+startup.register_warmup("pack_search", pack_search.sync)
 
 # Set database for routes
 games.set_db(db)
@@ -59,23 +89,77 @@ async def root():
 
 @api_router.get("/health")
 async def health_check():
-    return {"status": "healthy", "database": "connected"}
+    """Liveness probe - the process is up; database state is informational"""
+    ping = await ping_database(db)
+    return {"status": "healthy", "database": "connected" if ping["ok"] else "unreachable"}
+
+
+@api_router.get("/ready")
+async def readiness_check():
+    """Readiness probe - 503 until Mongo answers and background startup work is done"""
+    ping = await ping_database(db)
+    # A dead bridge means REST changes no longer reach this worker's sockets
+    ready = ping["ok"] and startup.is_ready() and not manager.draining and bridge.mode != "failed"
+    
+    return JSONResponse(
+        status_code=200 if ready else 503,
+        content={
+            "ready": ready,
+            "draining": manager.draining,
+            "database": ping,
+            "bridge": bridge.mode,
+            "startup": startup.report()
+        }
+    )
+
+
+def require_operator(request: Request):
+    """403 unless the caller is on this host or presents ADMIN_TOKEN"""
+    if not is_operator(request.client.host if request.client else None, request.headers):
+        raise HTTPException(status_code=403, detail="Operator access required")
+
+
+@api_router.post("/drain", dependencies=[Depends(require_operator)])
+async def drain_server(grace_seconds: float = 5.0):
+    """Drain live sockets before a deploy - call this, then send SIGTERM"""
+    result = await manager.drain(grace_seconds)
+    return {"message": "Draining", **result}
+
+
+@api_router.delete("/drain", dependencies=[Depends(require_operator)])
+async def cancel_drain():
+    """Take joins again after a deploy was called off; drained clients have already moved on"""
+    manager.undrain()
+    return {"message": "Drain cancelled"}
 
 
 # Include API router
 app.include_router(api_router)
 
 
+def is_resumed(websocket: WebSocket, game_code: str, role: str, player_id: str = None) -> bool:
+    """True if the client presented a valid resume token for this exact seat"""
+    token = websocket.query_params.get("resume")
+    claims = verify_resume_token(token) if token else None
+    if not claims:
+        return False
+    return (claims["game_code"], claims["role"], claims["player_id"]) == (game_code, role, player_id)
+
+
 # WebSocket endpoints
 @app.websocket("/ws/director/{game_code}")
 async def websocket_director(websocket: WebSocket, game_code: str):
     """WebSocket endpoint for Director Panel"""
-    await manager.connect_director(websocket, game_code.upper())
+    await load_room(game_code.upper(), db)
+    if not await manager.connect_director(websocket, game_code.upper()):
+        return
+    if is_resumed(websocket, game_code.upper(), "director"):
+        logger.info(f"Director resumed session in game {game_code.upper()}")
     try:
         while True:
             data = await websocket.receive_text()
             message = json.loads(data)
-            await handle_director_message(game_code.upper(), message, db)
+            await manager.track(handle_director_message(game_code.upper(), message, db))
     except WebSocketDisconnect:
         manager.disconnect_director(websocket, game_code.upper())
     except Exception as e:
@@ -86,7 +170,9 @@ async def websocket_director(websocket: WebSocket, game_code: str):
 @app.websocket("/ws/tv/{game_code}")
 async def websocket_tv(websocket: WebSocket, game_code: str):
     """WebSocket endpoint for TV Display"""
-    await manager.connect_tv(websocket, game_code.upper())
+    await load_room(game_code.upper(), db)
+    if not await manager.connect_tv(websocket, game_code.upper()):
+        return
     try:
         while True:
             # TV displays mostly receive, but can send heartbeats
@@ -105,25 +191,36 @@ async def websocket_tv(websocket: WebSocket, game_code: str):
 @app.websocket("/ws/player/{game_code}/{player_id}")
 async def websocket_player(websocket: WebSocket, game_code: str, player_id: str):
     """WebSocket endpoint for Players"""
-    await manager.connect_player(websocket, game_code.upper(), player_id)
+    await load_room(game_code.upper(), db)
+    resumed = is_resumed(websocket, game_code.upper(), "player", player_id)
+    if not await manager.connect_player(websocket, game_code.upper(), player_id, resumed=resumed):
+        return
     try:
         while True:
             data = await websocket.receive_text()
             message = json.loads(data)
-            await handle_player_message(game_code.upper(), player_id, message, db)
+            await manager.track(handle_player_message(game_code.upper(), player_id, message, db))
     except WebSocketDisconnect:
         manager.disconnect_player(game_code.upper(), player_id)
         
-        # Notify others of player disconnect
-        await manager.broadcast_to_game(game_code.upper(), {
-            "event": "player:disconnected",
-            "data": {"player_id": player_id}
-        })
+        # Notify others of player disconnect (a drain reconnects them elsewhere)
+        if not manager.draining:
+            await manager.broadcast_to_game(game_code.upper(), {
+                "event": "player:disconnected",
+                "data": {"player_id": player_id}
+            })
     except Exception as e:
         logging.error(f"Player WebSocket error: {e}")
         manager.disconnect_player(game_code.upper(), player_id)
 
 
+@app.middleware("http")
+async def track_first_request(request: Request, call_next):
+    response = await call_next(request)
+    startup.mark_request_served()
+    return response
+
+
 # CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -143,15 +240,31 @@ logger = logging.getLogger(__name__)
 
 @app.on_event("startup")
 async def startup_db():
-    """Initialize database indexes"""
-    # Create indexes for better query performance
-    await db.games.create_index("code", unique=True)
-    await db.games.create_index("status")
-    await db.game_packs.create_index("game_format")
-    await db.game_packs.create_index("tags")
-    logger.info("Database indexes created")
+    """Kick off index builds and cache warm-ups without blocking traffic"""
+    # Without its indexes and data migrations the worker must not take traffic
+    migrations = startup.start(
+        "indexes",
+        run_migrations(db, on_progress=lambda **p: startup.set_progress("indexes", **p)),
+        required=True
+    )
+    # Warm-ups read through the indexes, so let the builds land first
+    startup.start_warmups(db, after=migrations)
+    global bridge_task, search_task
+    bridge_task = asyncio.create_task(bridge.run(db))
+    search_task = asyncio.create_task(pack_search.run(db))
+    startup.mark_startup_complete()
 
 
 @app.on_event("shutdown")
 async def shutdown_db_client():
+    autopilots.stop_all()
+    shutdown_pool()
+    # Cheap if /api/drain already ran; otherwise hands off whatever is still connected
+    await manager.drain(grace_seconds=float(os.environ.get("DRAIN_GRACE_SECONDS", "5")))
+    bridge.stop()
+    if bridge_task:
+        bridge_task.cancel()
+    pack_search.stop()
+    if search_task:
+        search_task.cancel()
     client.close()
@@ -0,0 +1,89 @@
+"""
+Answer Tally - Live per-question answer distribution
+Counters update in O(1) as answers arrive and can be read at any time; they
+feed the reveal histogram, Ask the Audience and answer analytics
+"""
+from typing import Any, Dict, Iterable, Optional, Set
+from datetime import datetime, timezone
+
+ANALYTICS_COLLECTION = "answer_analytics"
+
+
+def answer_key(answer: Any) -> str:
+    """Bucket an answer so "b", "B " and "B" count as the same choice"""
+    return "" if answer is None else str(answer).strip().upper()
+
+
+class AnswerTally:
+    """Running counts for one question of one game"""
+
+    __slots__ = ("question_index", "answered", "correct", "counts", "correct_players")
+
+    def __init__(self, question_index: int):
+        self.question_index = question_index
+        self.answered = 0
+        self.correct = 0
+        self.counts: Dict[str, int] = {}
+        # Who got it right - elimination rounds knock out everyone else
+        self.correct_players: Set[str] = set()
+
+    def add(self, answer: Any, correct: bool, player_id: Optional[str] = None):
+        """Count one scored answer"""
+        key = answer_key(answer)
+        self.counts[key] = self.counts.get(key, 0) + 1
+        self.answered += 1
+        if correct:
+            self.correct += 1
+            if player_id:
+                self.correct_players.add(player_id)
+
+    def regrade(self, player_id: str, correct: bool):
+        """Move one counted answer between right and wrong after its question was fixed"""
+        if correct:
+            self.correct += 1
+            self.correct_players.add(player_id)
+        elif self.correct:
+            self.correct -= 1
+            self.correct_players.discard(player_id)
+
+    def distribution(self, choices: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+        """Counts and percentages per answer; listed choices are included even at zero"""
+        counts = dict(self.counts)
+        for choice in choices or ():
+            counts.setdefault(answer_key(choice), 0)
+        return {
+            "question_index": self.question_index,
+            "answered": self.answered,
+            "correct": self.correct,
+            "counts": counts,
+            "percentages": {
+                key: round(100 * n / self.answered) if self.answered else 0
+                for key, n in counts.items()
+            }
+        }
+
+
+def question_choices(question: Optional[Dict[str, Any]]) -> list:
+    """Choice letters of a multiple-choice question, empty for free-text formats"""
+    choices = (question or {}).get("choices")
+    return list(choices) if isinstance(choices, dict) else []
+
+
+async def save_tally(db, game_id: str, tally: AnswerTally, choices: Optional[Iterable[str]] = None):
+    """Write a closed question's distribution to the answer analytics"""
+    await db[ANALYTICS_COLLECTION].update_one(
+        {"game_id": game_id, "question_index": tally.question_index},
+        {"$set": {
+            **tally.distribution(choices),
+            "closed_at": datetime.now(timezone.utc).isoformat()
+        }},
+        upsert=True
+    )
+
+
+async def load_distribution(db, game_id: str, question_index: int) -> Optional[Dict[str, Any]]:
+    """Saved distribution of a closed question"""
+    return await db[ANALYTICS_COLLECTION].find_one(
+        {"game_id": game_id, "question_index": question_index},
+        {"_id": 0}
+    )
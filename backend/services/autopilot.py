@@ -0,0 +1,171 @@
+"""
+Autopilot - Server-driven PKWY LIVE! sessions
+Steps a room through question, timer, close, reveal, leaderboard and next on
+absolute loop-time deadlines, so hundreds of rooms share one event loop
+without drift. Commands go through the director handler, and director
+pauses and manual question moves are honoured
+"""
+from dataclasses import dataclass, asdict
+from typing import Awaitable, Callable, Dict, Optional
+import asyncio
+import logging
+import os
+
+from models.game_models import GameFormat, GameStatus
+
+logger = logging.getLogger(__name__)
+
+AUTOPILOT_FORMATS = {GameFormat.PKWY_LIVE.value}
+
+# Director handler: (game_code, {"event": ..., "data": ...}, db)
+Dispatch = Callable[[str, dict, object], Awaitable[None]]
+
+
+@dataclass
+class AutopilotTiming:
+    """Seconds spent in each phase of a question"""
+    question_seconds: float = float(os.environ.get("AUTOPILOT_QUESTION_SECONDS", "10"))
+    reveal_seconds: float = float(os.environ.get("AUTOPILOT_REVEAL_SECONDS", "5"))
+    leaderboard_seconds: float = float(os.environ.get("AUTOPILOT_LEADERBOARD_SECONDS", "5"))
+
+    @classmethod
+    def from_payload(cls, payload: dict) -> "AutopilotTiming":
+        timing = cls()
+        for field in asdict(timing):
+            if payload.get(field) is not None:
+                value = float(payload[field])
+                if value < 0:
+                    raise ValueError(f"{field} must not be negative")
+                setattr(timing, field, value)
+        return timing
+
+
+class TimelineInterrupted(Exception):
+    """The director moved to another question or ended the game mid-cycle"""
+
+
+class Autopilot:
+    """Runs one room's timeline"""
+
+    def __init__(self, game_code: str, room: dict, db, dispatch: Dispatch, timing: AutopilotTiming):
+        self.game_code = game_code
+        self.room = room
+        self.db = db
+        self.dispatch = dispatch
+        self.timing = timing
+        self.max_lateness = 0.0     # Worst seconds a step fired after its deadline
+        self._wake = asyncio.Event()
+        self._expected_index: Optional[int] = None
+
+    def poke(self):
+        """Re-check pause state and question index now rather than at the next deadline"""
+        self._wake.set()
+
+    async def _send(self, event: str, data: Optional[dict] = None):
+        await self.dispatch(self.game_code, {"event": event, "data": data or {}}, self.db)
+
+    async def _wait_until(self, deadline: float) -> float:
+        """Sleep to an absolute loop time; time spent paused pushes the deadline back"""
+        loop = asyncio.get_running_loop()
+        state = self.room["state"]
+        while True:
+            if state["status"] == GameStatus.PAUSED.value:
+                paused_at = loop.time()
+                while state["status"] == GameStatus.PAUSED.value:
+                    self._wake.clear()
+                    await self._wake.wait()
+                deadline += loop.time() - paused_at
+            if state["question_index"] != self._expected_index or state["status"] == GameStatus.FINISHED.value:
+                raise TimelineInterrupted()
+
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                self.max_lateness = max(self.max_lateness, -remaining)
+                return deadline
+            self._wake.clear()
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=remaining)
+            except asyncio.TimeoutError:
+                pass
+
+    async def run(self):
+        """Play questions until the last one, then finish the game"""
+        loop = asyncio.get_running_loop()
+        state = self.room["state"]
+        if state["status"] == GameStatus.WAITING.value:
+            await self._send("game:start")
+
+        while state["status"] not in (GameStatus.FINISHED.value, GameStatus.WAITING.value):
+            index = self._expected_index = state["question_index"]
+            last = index >= len(self.room["plan"]) - 1
+            t = self.timing
+            start = loop.time()
+            try:
+                await self._send("timer:start", {"duration": t.question_seconds})
+                deadline = await self._wait_until(start + t.question_seconds)
+                await self._send("question:close", {"question_index": index})
+                await self._send("answer:reveal", {"revealed": True, "question_index": index})
+                deadline = await self._wait_until(deadline + t.reveal_seconds)
+                await self._send("leaderboard:show")
+                await self._wait_until(deadline + t.leaderboard_seconds)
+            except TimelineInterrupted:
+                # Director jumped elsewhere - start that question's cycle fresh
+                continue
+
+            if last:
+                await self._send("game:finish")
+                break
+            await self._send("question:next", {"from_index": index})
+
+
+class AutopilotRegistry:
+    """Autopilots by game code, all on the current event loop"""
+
+    def __init__(self):
+        self.pilots: Dict[str, Autopilot] = {}
+        self.tasks: Dict[str, asyncio.Task] = {}
+
+    def is_running(self, game_code: str) -> bool:
+        task = self.tasks.get(game_code)
+        return task is not None and not task.done()
+
+    def start(self, game_code: str, room: dict, db, dispatch: Dispatch, timing: AutopilotTiming) -> Autopilot:
+        self.stop(game_code)
+        pilot = Autopilot(game_code, room, db, dispatch, timing)
+        task = asyncio.create_task(self._run(pilot))
+        self.pilots[game_code] = pilot
+        self.tasks[game_code] = task
+        return pilot
+
+    async def _run(self, pilot: Autopilot):
+        try:
+            await pilot.run()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Autopilot for {pilot.game_code} stopped: {e}")
+        finally:
+            if self.pilots.get(pilot.game_code) is pilot:
+                del self.pilots[pilot.game_code]
+                del self.tasks[pilot.game_code]
+
+    def poke(self, game_code: str):
+        pilot = self.pilots.get(game_code)
+        if pilot:
+            pilot.poke()
+
+    def stop(self, game_code: str) -> bool:
+        """Cancel a room's autopilot; True if one was running"""
+        task = self.tasks.pop(game_code, None)
+        self.pilots.pop(game_code, None)
+        if task is None or task.done():
+            return False
+        task.cancel()
+        return True
+
+    def stop_all(self):
+        for game_code in list(self.tasks):
+            self.stop(game_code)
+
+
+autopilots = AutopilotRegistry()
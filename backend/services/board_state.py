@@ -0,0 +1,103 @@
+"""
+Board State - Compact server-side board flags for board games
+Per-game bitsets indexed by the compiled question plan (or the NO WHAMMY!
+panel board) so a flip is O(1) and travels as a few-byte diff instead of the
+whole content
+"""
+from typing import Any, Dict, Optional
+import string
+
+from models.game_models import GameFormat
+from services.question_plan import compile_question_plan
+
+# Flags tracked per format: flag -> what its bit index points at
+BOARD_FLAGS = {
+    GameFormat.PERIL.value: {"revealed": "plan", "answered": "plan"},
+    GameFormat.PICK_OR_PASS.value: {"opened": "plan"},
+    GameFormat.SPIN_TO_WIN.value: {"solved": "plan"},
+    GameFormat.NO_WHAMMY.value: {"hit": "board"},
+}
+
+# Formats whose puzzles track guessed letters (one 26-bit mask per puzzle)
+LETTER_FORMATS = {GameFormat.SPIN_TO_WIN.value}
+LETTERS = string.ascii_uppercase
+
+
+class BoardState:
+    """Bitsets for one game's board"""
+
+    __slots__ = ("bits", "letters")
+
+    def __init__(self, flags=()):
+        self.bits: Dict[str, int] = {flag: 0 for flag in flags}
+        # puzzle index -> bitmask of guessed letters, bit 0 = "A"
+        self.letters: Dict[int, int] = {}
+
+    def is_set(self, flag: str, index: int) -> bool:
+        return bool(self.bits.get(flag, 0) >> index & 1)
+
+    def set(self, flag: str, index: int, value: bool = True) -> bool:
+        """Set or clear one flag; True if it changed"""
+        if flag not in self.bits or index < 0:
+            raise KeyError(f"Unknown board flag {flag}[{index}]")
+        before = self.bits[flag]
+        self.bits[flag] = before | (1 << index) if value else before & ~(1 << index)
+        return self.bits[flag] != before
+
+    def guess_letter(self, puzzle_index: int, letter: str) -> bool:
+        """Mark a letter guessed on a puzzle; True if it was new"""
+        letter = letter.strip().upper()
+        if len(letter) != 1 or letter not in LETTERS:
+            raise KeyError(f"Not a letter: {letter!r}")
+        before = self.letters.get(puzzle_index, 0)
+        self.letters[puzzle_index] = before | (1 << LETTERS.index(letter))
+        return self.letters[puzzle_index] != before
+
+    def guessed_letters(self, puzzle_index: int) -> str:
+        mask = self.letters.get(puzzle_index, 0)
+        return "".join(letter for i, letter in enumerate(LETTERS) if mask >> i & 1)
+
+    def encode(self) -> Dict[str, Any]:
+        """Wire/persisted form: bitsets as hex strings, letters as strings"""
+        encoded: Dict[str, Any] = {flag: format(bits, "x") for flag, bits in self.bits.items()}
+        if self.letters:
+            encoded["letters"] = {str(i): self.guessed_letters(i) for i in sorted(self.letters)}
+        return encoded
+
+    @classmethod
+    def decode(cls, encoded: Optional[Dict[str, Any]], flags=()) -> "BoardState":
+        board = cls(flags)
+        for flag, value in (encoded or {}).items():
+            if flag == "letters":
+                for puzzle_index, letters in value.items():
+                    for letter in letters:
+                        board.guess_letter(int(puzzle_index), letter)
+            elif flag in board.bits:
+                board.bits[flag] = int(value, 16)
+        return board
+
+
+def board_for_game(game_format: str, content: Optional[dict], persisted: Optional[dict] = None) -> Optional[BoardState]:
+    """Board for a game, seeded from persisted bits or, failing that, the content's own flags"""
+    if game_format not in BOARD_FLAGS:
+        return None
+    flags = BOARD_FLAGS[game_format]
+    if persisted:
+        return BoardState.decode(persisted, flags)
+
+    # First load: pick up flags already baked into the content JSON
+    board = BoardState(flags)
+    for index, item in enumerate(compile_question_plan(game_format, content)):
+        for flag, target in flags.items():
+            if target == "plan" and item.get(flag):
+                board.set(flag, index)
+        if game_format in LETTER_FORMATS:
+            for letter in item.get("revealed_letters") or []:
+                if str(letter).strip().upper() in LETTERS and len(str(letter).strip()) == 1:
+                    board.guess_letter(index, letter)
+    return board
+
+
+def board_diff(flag: str, index: int, value: Any) -> Dict[str, Any]:
+    """The broadcast for one change - a handful of bytes"""
+    return {"f": flag, "i": index, "v": value}
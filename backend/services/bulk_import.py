@@ -0,0 +1,231 @@
+"""
+Bulk Import - Many packs from one ZIP archive
+Each JSON file is parsed, detected and validated in a process pool sized to
+the machine, so CPU-bound validation runs on every core. Finished packs are
+written with insert_many in batches, and a report line is produced per file
+as soon as it is done. Content hashes are computed in the workers too; the
+content itself goes to the shared content store
+"""
+import asyncio
+import json
+import logging
+import os
+import zipfile
+import zlib
+from concurrent.futures import Executor, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import PurePosixPath
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from pymongo.errors import BulkWriteError
+
+from models.game_models import GamePack
+from services.content_store import content_hash, put_content, release
+from services.format_detect import classify_content
+from services.pack_search import pack_search
+from services.pack_validation import MAX_REPORTED_ERRORS, PackValidationError, validate_pack
+
+logger = logging.getLogger(__name__)
+
+BULK_IMPORT_WORKERS = int(os.environ.get("BULK_IMPORT_WORKERS", "0")) or os.cpu_count() or 1
+# Packs per insert_many
+BULK_INSERT_BATCH = 50
+# Larger files belong on the streaming /upload endpoint (a pack is stored as one document)
+BULK_MAX_FILE_BYTES = int(os.environ.get("BULK_IMPORT_MAX_FILE_BYTES", str(8 * 1024 * 1024)))
+BULK_MAX_FILES = 5000
+
+_pool: Optional[ProcessPoolExecutor] = None
+
+
+def get_pool() -> ProcessPoolExecutor:
+    """Shared worker pool, started on first use"""
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(max_workers=BULK_IMPORT_WORKERS)
+    return _pool
+
+
+def shutdown_pool():
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+def prepare_pack(file_name: str, raw: bytes, tags: List[str]) -> Dict[str, Any]:
+    """Parse, detect and validate one file; runs in a worker process"""
+    try:
+        content = json.loads(raw.decode("utf-8"))
+    except (UnicodeDecodeError, json.JSONDecodeError) as e:
+        return {"file": file_name, "status": "error", "error": f"Invalid JSON: {str(e)}"}
+
+    guess = classify_content(content)
+    if not guess.known:
+        return {"file": file_name, "status": "error",
+                "error": f"Could not detect game format from content ({'; '.join(guess.reasons)})"}
+    try:
+        content = validate_pack(guess.game_format, content)
+    except PackValidationError as e:
+        return {"file": file_name, "status": "error", "game_format": e.game_format, "error": str(e),
+                "errors": e.errors[:MAX_REPORTED_ERRORS]}
+
+    pack = GamePack(
+        name=PurePosixPath(file_name).stem,
+        game_format=guess.game_format,
+        content_hash=content_hash(content),
+        tags=tags
+    )
+    return {"file": file_name, "status": "valid", "pack": pack.model_dump(), "content": content}
+
+
+def pack_members(archive: zipfile.ZipFile) -> List[zipfile.ZipInfo]:
+    """JSON files in the archive, skipping folders and OS metadata"""
+    return [
+        info for info in archive.infolist()
+        if not info.is_dir()
+        and info.filename.lower().endswith(".json")
+        and not any(part.startswith((".", "__MACOSX")) for part in PurePosixPath(info.filename).parts)
+    ]
+
+
+def file_error(file_name: str, executor: Executor, error: Exception) -> Dict[str, Any]:
+    """Report line for a file the worker pool could not process"""
+    if isinstance(error, BrokenProcessPool):
+        logger.error(f"Bulk import worker pool broke on {file_name}")
+        if executor is _pool:
+            # The next import starts a fresh pool
+            shutdown_pool()
+        return {"file": file_name, "status": "error", "error": "Import worker crashed"}
+    logger.error(f"Bulk import of {file_name} failed: {error}")
+    return {"file": file_name, "status": "error", "error": f"Could not import file: {str(error)}"}
+
+
+async def insert_packs(db, packs: List[Dict[str, Any]]) -> Dict[int, Tuple[str, bool]]:
+    """insert_many the packs; failed index -> (reason, whether it may have been saved anyway)"""
+    try:
+        await db.game_packs.insert_many(packs, ordered=False)
+        return {}
+    except BulkWriteError as e:
+        logger.error(f"Bulk import batch: {len(e.details.get('writeErrors', []))} packs not saved")
+        return {error["index"]: (error.get("errmsg", "write error"), False) for error in e.details.get("writeErrors", [])}
+    except Exception as e:
+        logger.error(f"Bulk import batch failed: {e}")
+        error = str(e)
+    # Unordered inserts may have partly landed before the failure; ask which did
+    try:
+        saved = {doc["id"] async for doc in db.game_packs.find({"id": {"$in": [p["id"] for p in packs]}}, {"_id": 0, "id": 1})}
+    except Exception:
+        # Unknown - keep their content referenced rather than risk a pack without it
+        return {index: (error, True) for index in range(len(packs))}
+    return {index: (error, False) for index, pack in enumerate(packs) if pack["id"] not in saved}
+
+
+async def import_archive(db, archive_file, tags: Optional[List[str]] = None,
+                         executor: Optional[Executor] = None) -> AsyncIterator[Dict[str, Any]]:
+    """Import every pack in a ZIP, yielding one report dict per file and a final summary
+
+    At most two files per worker are read into memory at a time.
+    """
+    executor = executor or get_pool()
+    loop = asyncio.get_running_loop()
+    tags = tags or []
+    counts = {"files": 0, "imported": 0, "errors": 0}
+    batch: List[Dict[str, Any]] = []
+
+    async def flush():
+        results = list(batch)
+        batch.clear()
+        stored = []
+        try:
+            for r in results:
+                stored.append(await put_content(db, r["content"], r["pack"]["content_hash"]))
+        except Exception as e:
+            logger.error(f"Bulk import batch failed: {e}")
+            for digest in stored:
+                await release(db, digest)
+            counts["errors"] += len(results)
+            return [{"file": r["file"], "status": "error", "error": f"Could not save pack: {str(e)}"} for r in results]
+
+        failed = await insert_packs(db, [r["pack"] for r in results])
+        reports = []
+        for index, r in enumerate(results):
+            if index in failed:
+                error, saved = failed[index]
+                if not saved:
+                    await release(db, stored[index])
+                counts["errors"] += 1
+                reports.append({"file": r["file"], "status": "error", "error": f"Could not save pack: {error}"})
+                continue
+            counts["imported"] += 1
+            await pack_search.index_pack(db, r["pack"], r["content"])
+            reports.append({"file": r["file"], "status": "imported", "pack_id": r["pack"]["id"],
+                            "game_format": r["pack"]["game_format"]})
+        return reports
+
+    try:
+        archive = zipfile.ZipFile(archive_file)
+    except zipfile.BadZipFile as e:
+        yield {"status": "error", "error": f"Not a ZIP archive: {str(e)}"}
+        return
+
+    with archive:
+        members = pack_members(archive)
+        if len(members) > BULK_MAX_FILES:
+            yield {"status": "error", "error": f"Archive has {len(members)} packs; the limit is {BULK_MAX_FILES}"}
+            return
+
+        window = 2 * BULK_IMPORT_WORKERS
+        pending: Dict[asyncio.Future, str] = {}
+        for position in range(len(members) + 1):
+            if position < len(members):
+                info = members[position]
+                counts["files"] += 1
+                if info.file_size > BULK_MAX_FILE_BYTES:
+                    counts["errors"] += 1
+                    yield {"file": info.filename, "status": "error",
+                           "error": f"File is larger than {BULK_MAX_FILE_BYTES} bytes; use /game-packs/upload"}
+                    continue
+                try:
+                    # Decompressing is CPU work too; reads stay one at a time (ZipFile is not thread-safe)
+                    raw = await loop.run_in_executor(None, archive.read, info)
+                except (zipfile.BadZipFile, zlib.error, EOFError, NotImplementedError, RuntimeError) as e:
+                    # Corrupt or truncated data, bad CRC, unsupported compression, encrypted member
+                    counts["errors"] += 1
+                    yield {"file": info.filename, "status": "error", "error": f"Could not read file from archive: {str(e)}"}
+                    continue
+                try:
+                    future = loop.run_in_executor(executor, prepare_pack, info.filename, raw, tags)
+                except Exception as e:
+                    counts["errors"] += 1
+                    yield file_error(info.filename, executor, e)
+                    continue
+                pending[future] = info.filename
+                if len(pending) < window:
+                    continue
+
+            # Window full (or archive exhausted) - report what has finished
+            while pending:
+                done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for future in done:
+                    file_name = pending.pop(future)
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        result = file_error(file_name, executor, e)
+                    if result["status"] != "valid":
+                        counts["errors"] += 1
+                        yield result
+                        continue
+                    batch.append(result)
+                    if len(batch) >= BULK_INSERT_BATCH:
+                        for report in await flush():
+                            yield report
+                if position < len(members):
+                    break
+
+        if batch:
+            for report in await flush():
+                yield report
+
+    logger.info(f"Bulk import: {counts['imported']} of {counts['files']} packs imported")
+    yield {"status": "done", **counts}
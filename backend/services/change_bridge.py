@@ -0,0 +1,224 @@
+"""
+Change Stream Bridge - Pushes REST mutations to live WebSocket rooms
+Watches the game event stream for changes made outside a socket (REST and
+demo routes) and broadcasts the matching room events through ConnectionManager,
+so clients never have to poll
+"""
+from pymongo.errors import OperationFailure, PyMongoError
+from typing import Any, Dict, Optional
+from datetime import datetime, timezone
+import asyncio
+import logging
+import os
+import socket
+
+from services.event_log import EVENTS_COLLECTION, event_log
+from services.content_cache import load_shared_content
+from services.room_state import apply_question_patch, set_room_content
+from services.autopilot import autopilots
+from services.leaderboard import LeaderboardThrottle, publish_final, publish_leaderboard
+
+logger = logging.getLogger(__name__)
+
+TOKENS_COLLECTION = "change_stream_tokens"
+STREAM_NAME = EVENTS_COLLECTION
+# Every worker follows the whole stream for its own rooms, so each keeps its own
+# resume point. Set WORKER_ID to a stable name per worker slot to resume across
+# restarts; the default only resumes within one process. Tokens not updated for
+# a week are expired by a TTL index
+WORKER_ID = os.environ.get("WORKER_ID") or f"{socket.gethostname()}:{os.getpid()}"
+
+# Socket handlers broadcast their own changes; only these sources need bridging
+BRIDGED_SOURCES = ["rest", "demo"]
+
+WATCH_PIPELINE = [
+    {"$match": {"operationType": "insert", "fullDocument.source": {"$in": BRIDGED_SOURCES}}}
+]
+
+RETRY_SECONDS = 5.0
+
+# Server error codes: change streams need a replica set / resume point is gone
+NOT_A_REPLICA_SET = 40573
+HISTORY_LOST = 286
+
+# Status events and the status they leave the game in
+STATUS_EVENTS = {
+    "game:started": "active",
+    "game:paused": "paused",
+    "game:resumed": "active",
+    "game:finished": "finished",
+}
+
+
+async def _players(db, game_id: str) -> list:
+    game = await db.games.find_one({"id": game_id}, {"_id": 0, "players": 1})
+    return (game or {}).get("players", [])
+
+
+class ChangeStreamBridge:
+    """Relays database-side game changes to the rooms hosted by this worker"""
+
+    def __init__(self, manager, worker_id: str = WORKER_ID):
+        self.manager = manager
+        self.token_id = f"{STREAM_NAME}:{worker_id}"
+        # "change_stream" or "local" once running, "failed" if run() died
+        self.mode: Optional[str] = None
+        self._db = None
+        # Score changes often arrive in bursts (demo simulation, bulk scoring) -
+        # one leaderboard per burst is enough
+        self._score_updates = LeaderboardThrottle()
+        self._stopped = asyncio.Event()
+
+    async def _load_token(self, db) -> Optional[dict]:
+        saved = await db[TOKENS_COLLECTION].find_one({"_id": self.token_id})
+        return saved["token"] if saved else None
+
+    async def _save_token(self, db, token: dict):
+        # updated_at is a BSON date so the TTL index can expire tokens of workers that are gone
+        await db[TOKENS_COLLECTION].update_one(
+            {"_id": self.token_id},
+            {"$set": {"token": token, "updated_at": datetime.now(timezone.utc)}},
+            upsert=True
+        )
+
+    async def run(self, db):
+        """Watch the event stream until stopped, resuming from the stored token"""
+        self._db = db
+        self._stopped.clear()
+        try:
+            await self._watch(db)
+        except Exception:
+            # Readiness reports this worker as no longer bridging REST changes
+            logger.exception("Change stream bridge stopped unexpectedly")
+            self.mode = "failed"
+            raise
+
+    async def _watch(self, db):
+        while not self._stopped.is_set():
+            try:
+                token = await self._load_token(db)
+                async with db[EVENTS_COLLECTION].watch(WATCH_PIPELINE, resume_after=token) as stream:
+                    self.mode = "change_stream"
+                    logger.info(f"Change stream bridge watching {EVENTS_COLLECTION} "
+                                f"({'resumed' if token else 'from now'})")
+                    async for change in stream:
+                        await self._dispatch_safely(change["fullDocument"])
+                        await self._save_token(db, change["_id"])
+                        if self._stopped.is_set():
+                            break
+            except OperationFailure as e:
+                if e.code == NOT_A_REPLICA_SET:
+                    # Standalone Mongo (local dev): only this worker writes, so
+                    # listening in-process sees every change
+                    logger.warning("Change streams need a replica set - bridging in-process events only")
+                    self.mode = "local"
+                    event_log.add_listener(self._dispatch_local)
+                    await self._stopped.wait()
+                    event_log.remove_listener(self._dispatch_local)
+                    return
+                if e.code == HISTORY_LOST:
+                    logger.warning("Change stream resume point expired - restarting from now")
+                    await db[TOKENS_COLLECTION].delete_one({"_id": self.token_id})
+                    continue
+                logger.error(f"Change stream bridge failed: {e}")
+            except PyMongoError as e:
+                logger.error(f"Change stream bridge failed: {e}")
+
+            if not self._stopped.is_set():
+                try:
+                    await asyncio.wait_for(self._stopped.wait(), timeout=RETRY_SECONDS)
+                except asyncio.TimeoutError:
+                    pass
+
+    def stop(self):
+        """Ask run() to return after the current change"""
+        self._stopped.set()
+
+    async def _dispatch_local(self, event: Dict[str, Any]):
+        if event.get("source") in BRIDGED_SOURCES:
+            await self._dispatch_safely(event)
+
+    async def _dispatch_safely(self, event: Dict[str, Any]):
+        """dispatch(), logging a handler failure instead of ending the stream"""
+        try:
+            await self.dispatch(event)
+        except Exception:
+            logger.exception(f"Bridging {event.get('event')} for game {event.get('game_id')} failed")
+
+    async def dispatch(self, event: Dict[str, Any]):
+        """Broadcast one bridged event to its room, if this worker hosts it"""
+        hosted = self.manager.find_hosted_room(event["game_id"])
+        if hosted is None:
+            return
+        code, room = hosted
+        name = event["event"]
+        data = event.get("data") or {}
+        state = room["state"]
+
+        if name in STATUS_EVENTS:
+            state["status"] = STATUS_EVENTS[name]
+            if name == "game:finished":
+                state["timer"] = None
+                self._score_updates.cancel(code)
+                await publish_final(self.manager, code, await _players(self._db, event["game_id"]))
+            else:
+                message_data = {"game_code": code} if name == "game:started" else {}
+                await self.manager.broadcast_to_game(code, {"event": name, "data": message_data})
+            autopilots.poke(code)
+
+        elif name == "question:changed":
+            if state["question_index"] != data["question_index"]:
+                state.update(question_index=data["question_index"], timer=None, buzzer=None)
+            await self.manager.broadcast_to_game(code, {"event": name, "data": data})
+            autopilots.poke(code)
+
+        elif name == "content:updated":
+            set_room_content(room, state["game_format"] or "", await load_shared_content(self._db, data))
+            await self.manager.broadcast_to_game(code, {
+                "event": name,
+                "data": {"question_count": len(room["plan"])}
+            })
+
+        elif name == "content:patched":
+            apply_question_patch(room, data)
+            # Screens swap the one question in; the rescored answers only move the leaderboard
+            await self.manager.broadcast_to_game(code, {
+                "event": name,
+                "data": {
+                    "question_index": data["question_index"],
+                    "path": data["path"],
+                    "question": data["question"],
+                    "version": data["version"],
+                    "rescored": len(data.get("rescored", []))
+                }
+            })
+            if data.get("rescored"):
+                self._schedule_score_update(code, event["game_id"])
+
+        elif name == "player:joined":
+            player = data["player"]
+            room["survivors"].add(player["id"])
+            if room.get("mass") is not None:
+                room["mass"].add_player(player)
+            await self.manager.announce_join(code, {
+                "event": name,
+                "data": {
+                    "player_id": player["id"],
+                    "name": player["name"],
+                    "players_count": self.manager.get_player_count(code)
+                }
+            })
+
+        elif name == "player:scored":
+            self._schedule_score_update(code, event["game_id"])
+
+        elif name in ("player:eliminated", "players:removed"):
+            gone = data["player_ids"] if name == "players:removed" else [data["player_id"]]
+            room["survivors"].difference_update(gone)
+            await self.manager.broadcast_to_game(code, {"event": name, "data": data})
+
+    def _schedule_score_update(self, code: str, game_id: str):
+        async def publish():
+            players = await _players(self._db, game_id)
+            await publish_leaderboard(self.manager, code, players, event="scores:updated")
+        self._score_updates.schedule(code, publish)
@@ -0,0 +1,114 @@
+"""
+Content Cache - Pack content shared read-only by every game in the process
+Content is interned by its content-store hash: each distinct pack is held once,
+as frozen dicts and tuples, with its compiled question plans alongside, however
+many games run it. Per-game state (board flags, timers, tallies) stays in the
+rooms. An entry lives while any room holds it, plus a few recently used ones
+"""
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+import logging
+import os
+import sys
+import weakref
+
+from services.content_store import content_hash, get_content
+from services.question_plan import compile_question_plan
+
+logger = logging.getLogger(__name__)
+
+# Recently used contents kept alive with no room holding them (REST-only games)
+CONTENT_CACHE_RECENT = int(os.environ.get("CONTENT_CACHE_RECENT", "32"))
+
+
+class FrozenDict(dict):
+    """A dict that refuses changes - shared content is never edited in place
+
+    Still a dict, so JSON and BSON encoding and every read path work unchanged.
+    """
+
+    __slots__ = ()
+
+    def _read_only(self, *args, **kwargs):
+        raise TypeError("Shared pack content is read-only")
+
+    __setitem__ = __delitem__ = __ior__ = _read_only
+    clear = pop = popitem = setdefault = update = _read_only
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+    def __reduce__(self):
+        return FrozenDict, (dict(self),)
+
+
+def freeze(value: Any) -> Any:
+    """Deep read-only copy: dicts become FrozenDicts (with interned keys), lists become tuples"""
+    if isinstance(value, dict):
+        return FrozenDict({sys.intern(k) if isinstance(k, str) else k: freeze(v) for k, v in value.items()})
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(v) for v in value)
+    return value
+
+
+class SharedContent:
+    """One distinct pack content, frozen, with its compiled question plan per format"""
+
+    __slots__ = ("content_hash", "content", "_plans", "__weakref__")
+
+    def __init__(self, digest: str, content: Dict[str, Any]):
+        self.content_hash = digest
+        self.content = freeze(content)
+        self._plans: Dict[str, Tuple[Dict[str, Any], ...]] = {}
+
+    def plan(self, game_format: str) -> Tuple[Dict[str, Any], ...]:
+        plan = self._plans.get(game_format)
+        if plan is None:
+            plan = self._plans[game_format] = tuple(compile_question_plan(game_format, self.content))
+        return plan
+
+
+_shared: "weakref.WeakValueDictionary[str, SharedContent]" = weakref.WeakValueDictionary()
+_recent: "OrderedDict[str, SharedContent]" = OrderedDict()
+
+
+def _touch(shared: SharedContent) -> SharedContent:
+    _recent[shared.content_hash] = shared
+    _recent.move_to_end(shared.content_hash)
+    while len(_recent) > CONTENT_CACHE_RECENT:
+        _recent.popitem(last=False)
+    return shared
+
+
+def intern_content(content: Dict[str, Any], digest: Optional[str] = None) -> SharedContent:
+    """The process-wide shared copy of content (frozen on first sight)"""
+    digest = digest or content_hash(content)
+    shared = _shared.get(digest)
+    if shared is None:
+        shared = _shared[digest] = SharedContent(digest, content)
+    return _touch(shared)
+
+
+async def load_shared_content(db, doc: Dict[str, Any]) -> Optional[SharedContent]:
+    """Shared content for a game (or event) document - by content_hash, or its legacy inline content"""
+    digest = doc.get("content_hash")
+    if digest:
+        shared = _shared.get(digest)
+        if shared is not None:
+            return _touch(shared)
+        content = await get_content(db, digest)
+        if content is None:
+            logger.warning(f"Pack content {digest} is referenced but not stored")
+            return None
+        return intern_content(content, digest)
+    if doc.get("content"):
+        return intern_content(doc["content"])
+    return None
+
+
+def shared_content_count() -> int:
+    """Distinct contents held in this process"""
+    return len(_shared)
@@ -0,0 +1,176 @@
+"""
+Content Store - Content-addressed, reference-counted pack content
+Pack content is stored once per distinct sha256 in pack_contents; packs and
+games hold the hash. Each holder adds a reference, and content whose count
+reaches zero is garbage collected. Content too large for one document keeps its
+lists in pack_content_chunks
+"""
+from datetime import datetime, timezone
+from hashlib import sha256
+from typing import Any, Dict, Optional
+import json
+import logging
+
+from pymongo import ReplaceOne, ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+logger = logging.getLogger(__name__)
+
+CONTENTS_COLLECTION = "pack_contents"
+CHUNKS_COLLECTION = "pack_content_chunks"
+# Items per chunk document
+CONTENT_CHUNK_ITEMS = 500
+# Serialized content above this keeps its lists in chunks (MongoDB documents max out at 16MB)
+INLINE_CONTENT_MAX_BYTES = 8 * 1024 * 1024
+
+
+def canonical(value: Any) -> bytes:
+    """Key-order-independent JSON encoding"""
+    return json.dumps(value, sort_keys=True, separators=(",", ":"), ensure_ascii=False).encode()
+
+
+class ContentHasher:
+    """sha256 of pack content, fed field by field and list item by list item
+
+    Lists are digested on their own, so a streamed upload whose items arrive
+    one at a time gets the same hash as the same content held in memory.
+    """
+
+    def __init__(self):
+        self.fields: Dict[str, Any] = {}
+        self.lists: Dict[str, Any] = {}
+        self.size = 0
+
+    def field(self, key: str, value: Any):
+        if isinstance(value, list):
+            self.open_list(key)
+            for item in value:
+                self.item(key, item)
+        else:
+            self.fields[key] = value
+
+    def open_list(self, key: str):
+        self.lists.setdefault(key, sha256())
+
+    def item(self, key: str, value: Any):
+        encoded = canonical(value)
+        self.size += len(encoded)
+        self.lists.setdefault(key, sha256()).update(encoded + b"\n")
+
+    def hexdigest(self) -> str:
+        digest = sha256(canonical(self.fields))
+        for key in sorted(self.lists):
+            digest.update(key.encode() + b"\0" + self.lists[key].digest())
+        return digest.hexdigest()
+
+
+def content_hash(content: Dict[str, Any]) -> str:
+    hasher = ContentHasher()
+    for key, value in content.items():
+        hasher.field(key, value)
+    return hasher.hexdigest()
+
+
+async def _write_chunks(db, content_id: str, content: Dict[str, Any]) -> Dict[str, Any]:
+    """Store the lists as chunks (idempotently); returns the fields left for the content document"""
+    fields, requests, seq = {}, [], 0
+    for key, value in content.items():
+        if not isinstance(value, list):
+            fields[key] = value
+            continue
+        fields[key] = []
+        for start in range(0, len(value), CONTENT_CHUNK_ITEMS):
+            chunk = {"content_id": content_id, "seq": seq, "key": key, "items": value[start:start + CONTENT_CHUNK_ITEMS]}
+            requests.append(ReplaceOne({"content_id": content_id, "seq": seq}, chunk, upsert=True))
+            seq += 1
+    if requests:
+        await db[CHUNKS_COLLECTION].bulk_write(requests, ordered=False)
+    return fields
+
+
+async def _insert_or_retain(db, content_id: str, document: Dict[str, Any]):
+    try:
+        await db[CONTENTS_COLLECTION].insert_one({
+            "_id": content_id, **document, "refs": 1, "created_at": datetime.now(timezone.utc).isoformat()
+        })
+    except DuplicateKeyError:
+        # Someone stored the same content in the meantime
+        await retain(db, content_id)
+
+
+async def retain(db, content_id: str) -> bool:
+    """Add a reference; False if the content is not stored"""
+    result = await db[CONTENTS_COLLECTION].update_one({"_id": content_id}, {"$inc": {"refs": 1}})
+    return result.matched_count > 0
+
+
+async def put_content(db, content: Dict[str, Any], digest: Optional[str] = None) -> str:
+    """Store content (or add a reference to the stored copy); returns its hash"""
+    content_id = digest or content_hash(content)
+    if await retain(db, content_id):
+        return content_id
+
+    size = len(canonical(content))
+    if size > INLINE_CONTENT_MAX_BYTES:
+        document = {"content": await _write_chunks(db, content_id, content), "chunked": True, "size": size}
+    else:
+        document = {"content": content, "chunked": False, "size": size}
+    await _insert_or_retain(db, content_id, document)
+    return content_id
+
+
+async def adopt_chunks(db, staging_id: str, fields: Dict[str, Any], hasher: ContentHasher) -> str:
+    """Store content whose lists were already written as chunks under staging_id; returns its hash"""
+    content_id = hasher.hexdigest()
+    if await retain(db, content_id):
+        await db[CHUNKS_COLLECTION].delete_many({"content_id": staging_id})
+        return content_id
+    try:
+        await db[CHUNKS_COLLECTION].update_many({"content_id": staging_id}, {"$set": {"content_id": content_id}})
+    except DuplicateKeyError:
+        # An identical upload finished first; its chunks stand
+        await db[CHUNKS_COLLECTION].delete_many({"content_id": staging_id})
+    await _insert_or_retain(db, content_id, {"content": fields, "chunked": True, "size": hasher.size})
+    return content_id
+
+
+async def get_content(db, content_id: str) -> Optional[Dict[str, Any]]:
+    """Full content for a hash, with chunked lists put back together"""
+    doc = await db[CONTENTS_COLLECTION].find_one({"_id": content_id}, {"content": 1, "chunked": 1})
+    if not doc:
+        return None
+    content = doc["content"]
+    if doc.get("chunked"):
+        content = {key: (list(value) if isinstance(value, list) else value) for key, value in content.items()}
+        cursor = db[CHUNKS_COLLECTION].find({"content_id": content_id}, {"_id": 0}).sort("seq", 1)
+        async for chunk in cursor:
+            content.setdefault(chunk["key"], []).extend(chunk["items"])
+    return content
+
+
+async def release(db, content_id: Optional[str]):
+    """Drop a reference; content nobody references is deleted"""
+    if not content_id:
+        return
+    doc = await db[CONTENTS_COLLECTION].find_one_and_update(
+        {"_id": content_id}, {"$inc": {"refs": -1}},
+        projection={"refs": 1}, return_document=ReturnDocument.AFTER
+    )
+    if doc and doc["refs"] <= 0:
+        await _delete(db, content_id)
+
+
+async def _delete(db, content_id: str):
+    result = await db[CONTENTS_COLLECTION].delete_one({"_id": content_id, "refs": {"$lte": 0}})
+    if result.deleted_count:
+        await db[CHUNKS_COLLECTION].delete_many({"content_id": content_id})
+
+
+async def collect_garbage(db) -> int:
+    """Delete unreferenced content left behind by interrupted requests; returns how many"""
+    docs = await db[CONTENTS_COLLECTION].find({"refs": {"$lte": 0}}, {"_id": 1}).to_list(None)
+    for doc in docs:
+        await _delete(db, doc["_id"])
+    if docs:
+        logger.info(f"Collected {len(docs)} unreferenced pack contents")
+    return len(docs)
@@ -0,0 +1,251 @@
+"""
+Game Event Log - Append-only per-game event stream with periodic snapshots
+Any game can be rebuilt at any point in time by replaying events over the
+nearest earlier snapshot
+
+Replay from the command line (run from backend/):
+    python -m services.event_log GAME_ID [--seq N | --at 2026-01-01T20:15:00+00:00]
+"""
+from pymongo import ASCENDING, DESCENDING
+from pymongo.errors import DuplicateKeyError
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+from datetime import datetime, timezone
+import copy
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+EVENTS_COLLECTION = "game_events"
+SNAPSHOTS_COLLECTION = "game_snapshots"
+SNAPSHOT_INTERVAL = int(os.environ.get("EVENT_SNAPSHOT_INTERVAL", "50"))
+
+
+def apply_event(state: Dict[str, Any], event: Dict[str, Any]) -> Dict[str, Any]:
+    """Fold one event into a game state (mutates and returns state)"""
+    name = event["event"]
+    data = event.get("data") or {}
+
+    if name == "game:created":
+        state.clear()
+        state.update(copy.deepcopy(data))
+    elif name == "game:started":
+        state["status"] = "active"
+        state["started_at"] = event["ts"]
+    elif name == "game:paused":
+        state["status"] = "paused"
+    elif name == "game:resumed":
+        state["status"] = "active"
+    elif name == "game:finished":
+        state["status"] = "finished"
+        state["finished_at"] = event["ts"]
+    elif name == "question:changed":
+        state["current_question_index"] = data["question_index"]
+    elif name == "content:updated":
+        # Events carry the content-store hash; older ones carry the content itself
+        if "content_hash" in data:
+            state.pop("content", None)
+            state["content_hash"] = data["content_hash"]
+        else:
+            state["content"] = copy.deepcopy(data["content"])
+        # Question patches applied to the old content do not carry over
+        state.pop("question_overrides", None)
+    elif name == "content:patched":
+        overrides = state.setdefault("question_overrides", {})
+        overrides[str(data["question_index"])] = {"question": copy.deepcopy(data["question"]), "version": data["version"]}
+        changes = {c["player_id"]: c for c in data.get("rescored", [])}
+        for player in state.get("players", []):
+            change = changes.get(player["id"])
+            if change:
+                player["score"] += change["points_delta"]
+                player["correct_answers"] += change["correct_delta"]
+    elif name == "player:joined":
+        state.setdefault("players", []).append(copy.deepcopy(data["player"]))
+    elif name == "player:scored":
+        for player in state.get("players", []):
+            if player["id"] == data["player_id"]:
+                player["score"] += data["points"]
+                if data.get("correct"):
+                    player["correct_answers"] += 1
+                break
+    elif name == "players:scored":
+        scores = {s["player_id"]: s for s in data["scores"]}
+        for player in state.get("players", []):
+            scored = scores.get(player["id"])
+            if scored:
+                player["score"] += scored["points"]
+                if scored.get("correct"):
+                    player["correct_answers"] += 1
+    elif name == "players:removed":
+        removed = set(data["player_ids"])
+        state["players"] = [p for p in state.get("players", []) if p["id"] not in removed]
+    elif name == "player:eliminated":
+        for player in state.get("players", []):
+            if player["id"] == data["player_id"]:
+                player["eliminated"] = True
+                break
+    elif name == "players:eliminated":
+        out = set(data["player_ids"])
+        for player in state.get("players", []):
+            if player["id"] in out:
+                player["eliminated"] = True
+    elif name in ("timer:started", "timer:stopped", "display:state", "buzzer:pressed"):
+        room = state.setdefault("room_state", {})
+        if name == "timer:started":
+            room["timer"] = data
+        elif name == "timer:stopped":
+            room["timer"] = None
+        elif name == "display:state":
+            room["display"] = data
+        else:
+            room["buzzer"] = data
+    # Everything else (reveals, strikes, answers) is recorded for audit but
+    # does not change the game document
+
+    state["event_seq"] = event["seq"]
+    return state
+
+
+class GameEventLog:
+    """Assigns per-game sequence numbers and writes events and snapshots"""
+
+    def __init__(self):
+        # Last sequence number handed out per game id
+        self._seq: Dict[str, int] = {}
+        # In-process subscribers, called with each appended event
+        self._listeners: List[Callable[[Dict[str, Any]], Awaitable[Any]]] = []
+
+    async def _latest_seq(self, db, game_id: str) -> int:
+        latest = await db[EVENTS_COLLECTION].find_one(
+            {"game_id": game_id},
+            {"_id": 0, "seq": 1},
+            sort=[("seq", DESCENDING)]
+        )
+        return latest["seq"] if latest else 0
+
+    async def append(self, db, game_id: str, event: str, data: Optional[dict] = None,
+                     source: str = "server") -> int:
+        """Append an event to a game's stream and return its sequence number"""
+        if game_id not in self._seq:
+            self._seq[game_id] = await self._latest_seq(db, game_id)
+
+        while True:
+            seq = self._seq[game_id] + 1
+            doc = {
+                "game_id": game_id,
+                "seq": seq,
+                "event": event,
+                "data": data or {},
+                "source": source,
+                "ts": datetime.now(timezone.utc).isoformat()
+            }
+            try:
+                await db[EVENTS_COLLECTION].insert_one(doc)
+                break
+            except DuplicateKeyError:
+                # Another worker wrote this game's stream - catch up and retry
+                self._seq[game_id] = await self._latest_seq(db, game_id)
+
+        self._seq[game_id] = seq
+        if seq % SNAPSHOT_INTERVAL == 0:
+            await self.snapshot(db, game_id, seq)
+        for listener in self._listeners:
+            try:
+                await listener(doc)
+            except Exception as e:
+                logger.error(f"Event listener failed for {event} in game {game_id}: {e}")
+        return seq
+
+    def add_listener(self, listener: Callable[[Dict[str, Any]], Awaitable[Any]]):
+        """Call listener with every event appended by this process"""
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener: Callable[[Dict[str, Any]], Awaitable[Any]]):
+        """Stop calling a listener added with add_listener"""
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    async def snapshot(self, db, game_id: str, seq: int):
+        """Store the replayed state at seq so later rebuilds start from here"""
+        state = await rebuild_game(db, game_id, at_seq=seq)
+        await db[SNAPSHOTS_COLLECTION].update_one(
+            {"game_id": game_id, "seq": seq},
+            {"$set": {"state": state, "created_at": datetime.now(timezone.utc).isoformat()}},
+            upsert=True
+        )
+
+    def forget(self, game_id: str):
+        """Drop cached sequence state for a deleted game"""
+        self._seq.pop(game_id, None)
+
+
+async def seq_at_time(db, game_id: str, at_time: str) -> int:
+    """Sequence number of the last event at or before an ISO timestamp"""
+    event = await db[EVENTS_COLLECTION].find_one(
+        {"game_id": game_id, "ts": {"$lte": at_time}},
+        {"_id": 0, "seq": 1},
+        sort=[("seq", DESCENDING)]
+    )
+    return event["seq"] if event else 0
+
+
+async def rebuild_game(db, game_id: str, at_seq: Optional[int] = None,
+                       at_time: Optional[str] = None) -> Dict[str, Any]:
+    """Rebuild game state at a sequence number or time (latest by default)"""
+    if at_time is not None:
+        at_seq = await seq_at_time(db, game_id, at_time)
+
+    snapshot_query: Dict[str, Any] = {"game_id": game_id}
+    event_query: Dict[str, Any] = {"game_id": game_id}
+    if at_seq is not None:
+        snapshot_query["seq"] = {"$lte": at_seq}
+        event_query["seq"] = {"$lte": at_seq}
+
+    snapshot = await db[SNAPSHOTS_COLLECTION].find_one(
+        snapshot_query, {"_id": 0}, sort=[("seq", DESCENDING)]
+    )
+    state = snapshot["state"] if snapshot else {}
+    if snapshot:
+        event_query["seq"] = {**event_query.get("seq", {}), "$gt": snapshot["seq"]}
+
+    async for event in db[EVENTS_COLLECTION].find(event_query, {"_id": 0}).sort("seq", ASCENDING):
+        apply_event(state, event)
+    return state
+
+
+async def list_events(db, game_id: str, after_seq: int = 0, limit: int = 500) -> List[Dict[str, Any]]:
+    """Events for a game in order, for audit views"""
+    return await db[EVENTS_COLLECTION].find(
+        {"game_id": game_id, "seq": {"$gt": after_seq}},
+        {"_id": 0}
+    ).sort("seq", ASCENDING).to_list(limit)
+
+
+# Global event log instance
+event_log = GameEventLog()
+
+
+if __name__ == "__main__":
+    import argparse
+    import asyncio
+    import json
+    from dotenv import load_dotenv
+    from motor.motor_asyncio import AsyncIOMotorClient
+    from pathlib import Path
+
+    load_dotenv(Path(__file__).parent.parent / '.env')
+
+    parser = argparse.ArgumentParser(description="Rebuild a game from its event log")
+    parser.add_argument("game_id")
+    point = parser.add_mutually_exclusive_group()
+    point.add_argument("--seq", type=int, help="Rebuild up to and including this event")
+    point.add_argument("--at", help="Rebuild as of this ISO timestamp")
+    args = parser.parse_args()
+
+    async def main():
+        client = AsyncIOMotorClient(os.environ['MONGO_URL'])
+        state = await rebuild_game(client[os.environ['DB_NAME']], args.game_id, at_seq=args.seq, at_time=args.at)
+        print(json.dumps(state, indent=2, default=str))
+        client.close()
+
+    asyncio.run(main())
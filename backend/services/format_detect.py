@@ -0,0 +1,118 @@
+"""
+Format Detection - Structural game-format classifier for imported content
+Looks only at top-level keys and the first element of each list, so the cost
+is the same for a 10-question pack and a 5MB one
+"""
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from models.game_models import GameFormat
+
+UNKNOWN = "UNKNOWN"
+
+# game_name values accepted as-is
+GAME_NAMES = {f.value for f in GameFormat}
+
+# Top-level key -> (key expected in its first element, format); checked in order
+LIST_SIGNATURES = [
+    ("rounds", None, GameFormat.GAME_NIGHT_MIX.value),
+    ("survey_questions", "answers", GameFormat.SURVEY_SAYS.value),
+    ("puzzles", "full_answer", GameFormat.SPIN_TO_WIN.value),
+    ("chains", "words", GameFormat.CHAINED_UP.value),
+    ("cases", "case_value", GameFormat.PICK_OR_PASS.value),
+    ("numbers", "correct_number", GameFormat.CLOSEST_WINS.value),
+]
+
+# Category packs: key inside the first category -> format
+CATEGORY_SIGNATURES = {
+    "clues": GameFormat.PERIL.value,
+    "questions": GameFormat.QUIZ_CHASE.value,
+}
+
+# Flat question packs: key in the first question -> format
+QUESTION_SIGNATURES = [
+    ("subject", GameFormat.BACK_TO_SCHOOL.value),
+    ("chain_value", GameFormat.LINK_REACTION.value),
+    ("point_value", GameFormat.UR_FINAL_ANSWER.value),
+]
+
+# Difficulty-ranked questions are LAST CALL STANDING from this many questions up
+LAST_CALL_MIN_QUESTIONS = 12
+
+
+@dataclass
+class FormatGuess:
+    """A detected format, how sure we are (0-1) and why"""
+    game_format: str
+    confidence: float
+    reasons: List[str] = field(default_factory=list)
+
+    @property
+    def known(self) -> bool:
+        return self.game_format != UNKNOWN
+
+
+def _first(value: Any) -> Optional[Dict[str, Any]]:
+    """First element of a list if it is an object"""
+    if isinstance(value, list) and value and isinstance(value[0], dict):
+        return value[0]
+    return None
+
+
+def _structural(content: Dict[str, Any]) -> FormatGuess:
+    for key, item_key, game_format in LIST_SIGNATURES:
+        if key not in content:
+            continue
+        first = _first(content[key])
+        if item_key is None or (first is not None and item_key in first):
+            detail = f" with '{item_key}' in the first item" if item_key else ""
+            return FormatGuess(game_format, 0.9, [f"'{key}' list{detail}"])
+        return FormatGuess(game_format, 0.6, [f"'{key}' list, but its first item has no '{item_key}'"])
+
+    if "board" in content and "spin_questions" in content:
+        return FormatGuess(GameFormat.NO_WHAMMY.value, 0.9, ["'board' and 'spin_questions' lists"])
+
+    if "categories" in content:
+        category = _first(content["categories"])
+        for item_key, game_format in CATEGORY_SIGNATURES.items():
+            if category is not None and item_key in category:
+                return FormatGuess(game_format, 0.9, [f"'categories' whose first category has '{item_key}'"])
+        return FormatGuess(UNKNOWN, 0.0, ["'categories' without 'clues' or 'questions' in the first category"])
+
+    if "questions" in content:
+        questions = content["questions"]
+        question = _first(questions)
+        if question is None:
+            return FormatGuess(UNKNOWN, 0.0, ["'questions' is empty or not a list of objects"])
+        for item_key, game_format in QUESTION_SIGNATURES:
+            if item_key in question:
+                return FormatGuess(game_format, 0.9, [f"first question has '{item_key}'"])
+        if "difficulty" in question:
+            # Same question shape - only the length of the game tells them apart
+            if len(questions) >= LAST_CALL_MIN_QUESTIONS:
+                return FormatGuess(GameFormat.LAST_CALL_STANDING.value, 0.6,
+                                   [f"difficulty-ranked questions, {len(questions)} >= {LAST_CALL_MIN_QUESTIONS}"])
+            return FormatGuess(GameFormat.PKWY_LIVE.value, 0.6,
+                               [f"difficulty-ranked questions, fewer than {LAST_CALL_MIN_QUESTIONS}"])
+        return FormatGuess(UNKNOWN, 0.0, ["first question matches no known format"])
+
+    return FormatGuess(UNKNOWN, 0.0, ["no known top-level key"])
+
+
+def classify_content(content: Any) -> FormatGuess:
+    """Detect a pack's game format from game_name and its structure"""
+    if not isinstance(content, dict):
+        return FormatGuess(UNKNOWN, 0.0, ["content is not an object"])
+
+    guess = _structural(content)
+    game_name = content.get("game_name")
+    if game_name not in GAME_NAMES:
+        return guess
+
+    reasons = [f"game_name is '{game_name}'"]
+    if guess.game_format == game_name:
+        return FormatGuess(game_name, 1.0, reasons + guess.reasons)
+    if guess.known:
+        # The name wins, but say the structure looked like something else
+        return FormatGuess(game_name, 0.7, reasons + [f"structure looks like {guess.game_format}: {guess.reasons[0]}"])
+    return FormatGuess(game_name, 0.8, reasons)
@@ -0,0 +1,144 @@
+"""
+Game State Machine - Validated, atomic status and question transitions
+Every transition is a single find_one_and_update guarded by the allowed source
+states and, optionally, the version the caller last saw
+"""
+from pymongo import ReturnDocument
+from typing import Any, Dict, Optional
+from datetime import datetime, timezone
+
+from models.game_models import GameStatus
+
+WAITING = GameStatus.WAITING.value
+ACTIVE = GameStatus.ACTIVE.value
+PAUSED = GameStatus.PAUSED.value
+FINISHED = GameStatus.FINISHED.value
+
+# Director/REST actions -> (target status, statuses it may be applied from)
+STATUS_ACTIONS = {
+    "start": (ACTIVE, [WAITING]),
+    "pause": (PAUSED, [ACTIVE]),
+    "resume": (ACTIVE, [PAUSED]),
+    "finish": (FINISHED, [ACTIVE, PAUSED]),
+}
+
+# Allowed status changes: {current: {next, ...}}
+STATUS_TRANSITIONS = {status: set() for status in (WAITING, ACTIVE, PAUSED, FINISHED)}
+for _target, _sources in STATUS_ACTIONS.values():
+    for _source in _sources:
+        STATUS_TRANSITIONS[_source].add(_target)
+
+# Questions can be moved while setting up or playing, never after the game ends
+QUESTION_MOVABLE_STATUSES = [WAITING, ACTIVE, PAUSED]
+
+# A new question starts with no timer running and nobody buzzed in
+NEW_QUESTION_RESETS = {"room_state.timer": None, "room_state.buzzer": None}
+
+# Fields returned after a transition - enough to broadcast and sync rooms
+TRANSITION_PROJECTION = {
+    "_id": 0,
+    "id": 1,
+    "code": 1,
+    "status": 1,
+    "current_question_index": 1,
+    "version": 1,
+}
+
+
+class GameNotFound(Exception):
+    """No game matches the query"""
+
+
+class InvalidTransition(Exception):
+    """The requested transition is not allowed from the game's current state"""
+
+    def __init__(self, message: str, game: Optional[Dict[str, Any]] = None):
+        super().__init__(message)
+        self.game = game
+
+
+def _version_filter(expected_version: Optional[int]) -> Dict[str, Any]:
+    if expected_version is None:
+        return {}
+    if expected_version == 0:
+        # Games created before versioning have no version field
+        return {"version": {"$in": [0, None]}}
+    return {"version": expected_version}
+
+
+async def _raise_for_failed_transition(db, query: dict, reason: str):
+    """Distinguish a missing game from a rejected transition (failure path only)"""
+    game = await db.games.find_one(query, TRANSITION_PROJECTION)
+    if not game:
+        raise GameNotFound("Game not found")
+    raise InvalidTransition(reason.format(**{"version": 0, **game}), game)
+
+
+async def transition_status(db, query: dict, action: str,
+                            expected_version: Optional[int] = None) -> Dict[str, Any]:
+    """Apply a status action (start/pause/resume/finish) atomically"""
+    target, sources = STATUS_ACTIONS[action]
+    now = datetime.now(timezone.utc).isoformat()
+
+    set_fields: Dict[str, Any] = {"status": target}
+    if action == "start":
+        set_fields["started_at"] = now
+    elif action == "finish":
+        set_fields["finished_at"] = now
+
+    game = await db.games.find_one_and_update(
+        {**query, "status": {"$in": sources}, **_version_filter(expected_version)},
+        {"$set": set_fields, "$inc": {"version": 1}},
+        projection=TRANSITION_PROJECTION,
+        return_document=ReturnDocument.AFTER
+    )
+    if game is None:
+        await _raise_for_failed_transition(
+            db, query, f"Cannot {action} a {{status}} game (version {{version}})"
+        )
+    return game
+
+
+async def move_question(db, query: dict, *, delta: Optional[int] = None, index: Optional[int] = None,
+                        expected_index: Optional[int] = None, expected_version: Optional[int] = None,
+                        question_count: Optional[int] = None) -> Dict[str, Any]:
+    """Step (delta) or jump (index) the current question atomically
+
+    expected_index guards against double taps: the move only applies if the
+    game is still on the question the caller was looking at.
+    """
+    index_filter: Dict[str, Any] = {}
+    if delta is not None:
+        # Bounds: never before the first or past the last known question
+        if delta < 0:
+            index_filter["$gte"] = -delta
+        elif question_count is not None:
+            index_filter["$lt"] = question_count - delta
+        update = {"$set": {**NEW_QUESTION_RESETS}, "$inc": {"current_question_index": delta, "version": 1}}
+    else:
+        if index < 0 or (question_count is not None and index >= question_count):
+            raise InvalidTransition(f"Question {index} is out of range")
+        update = {"$set": {"current_question_index": index, **NEW_QUESTION_RESETS}, "$inc": {"version": 1}}
+
+    if expected_index is not None:
+        index_filter["$eq"] = expected_index
+
+    game_filter = {
+        **query,
+        "status": {"$in": QUESTION_MOVABLE_STATUSES},
+        **_version_filter(expected_version)
+    }
+    if index_filter:
+        game_filter["current_question_index"] = index_filter
+
+    game = await db.games.find_one_and_update(
+        game_filter,
+        update,
+        projection=TRANSITION_PROJECTION,
+        return_document=ReturnDocument.AFTER
+    )
+    if game is None:
+        await _raise_for_failed_transition(
+            db, query, "Question move rejected: game is {status} on question {current_question_index} (version {version})"
+        )
+    return game
@@ -0,0 +1,136 @@
+"""
+Leaderboard Publisher - Full boards for screens, compact boards for phones
+TVs and directors get every row; each player gets the top N plus their own
+rank, score and neighbours, so an update costs O(n) bytes across the room
+instead of O(n^2). Rapid score changes are throttled to one update per interval
+"""
+from typing import Any, Awaitable, Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+import asyncio
+import json
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+TOP_N = int(os.environ.get("LEADERBOARD_TOP_N", "10"))
+# Rows shown above and below a player's own row
+NEIGHBOURS = 1
+# At most one throttled update per room per interval
+LEADERBOARD_MIN_INTERVAL = float(os.environ.get("LEADERBOARD_MIN_INTERVAL", "0.5"))
+# Quiet time before the first throttled update, so a burst lands as one update
+# (BRIDGE_SCORE_COALESCE_SECONDS is its older name, still read if set)
+LEADERBOARD_COALESCE_SECONDS = float(os.environ.get(
+    "LEADERBOARD_COALESCE_SECONDS", os.environ.get("BRIDGE_SCORE_COALESCE_SECONDS", "0.05")
+))
+
+
+def rank_players(players: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Leaderboard rows, best first; tied scores share a rank"""
+    ordered = sorted(players, key=lambda p: p.get("score", 0), reverse=True)
+    rows, previous, rank = [], None, 0
+    for position, player in enumerate(ordered, start=1):
+        if player.get("score", 0) != previous:
+            rank, previous = position, player.get("score", 0)
+        rows.append({
+            "rank": rank,
+            "player_id": player["id"],
+            "name": player.get("name", ""),
+            "score": player.get("score", 0),
+            "correct_answers": player.get("correct_answers", 0)
+        })
+    return rows
+
+
+def personal_messages(rows: List[Dict[str, Any]], event: str, player_ids: Iterable[str],
+                      shared: Optional[Dict[str, Any]] = None) -> Iterator[Tuple[str, str]]:
+    """(player id, serialized message) per player
+
+    The top N and any shared fields are encoded once and spliced into each
+    player's message next to their own row.
+    """
+    positions = {row["player_id"]: i for i, row in enumerate(rows)}
+    shared_json = json.dumps({"players": len(rows), "top": rows[:TOP_N], **(shared or {})})[1:-1]
+    for player_id in player_ids:
+        position = positions.get(player_id)
+        if position is None:
+            continue
+        row = rows[position]
+        own = {
+            "rank": row["rank"],
+            "score": row["score"],
+            "correct_answers": row["correct_answers"],
+            "neighbours": rows[max(0, position - NEIGHBOURS):position] + rows[position + 1:position + 1 + NEIGHBOURS]
+        }
+        yield player_id, f'{{"event": "{event}", "data": {{{json.dumps(own)[1:-1]}, {shared_json}}}}}'
+
+
+async def publish_leaderboard(manager, game_code: str, players: List[Dict[str, Any]],
+                              event: str = "leaderboard:update", player_event: str = "leaderboard:personal",
+                              screen_limit: Optional[int] = None) -> List[Dict[str, Any]]:
+    """Full board to TVs and directors (capped at screen_limit rows), compact boards to players"""
+    rows = rank_players(players)
+    board = {"event": event, "data": rows[:screen_limit] if screen_limit else rows}
+    await manager.send_to_tvs(game_code, board)
+    await manager.send_to_directors(game_code, board)
+    room = manager.game_rooms.get(game_code)
+    if room:
+        await manager.send_personal(game_code, personal_messages(rows, player_event, list(room["players"])))
+    return rows
+
+
+async def publish_final(manager, game_code: str, players: List[Dict[str, Any]]):
+    """game:finished - winner and full standings to screens, winner and own placing to each player"""
+    ordered = sorted(players, key=lambda p: p.get("score", 0), reverse=True)
+    screens = {"event": "game:finished", "data": {"winner": ordered[0] if ordered else None, "final_leaderboard": ordered}}
+    await manager.send_to_tvs(game_code, screens)
+    await manager.send_to_directors(game_code, screens)
+
+    room = manager.game_rooms.get(game_code)
+    if not room:
+        return
+    rows = rank_players(players)
+    winner = rows[0] if rows else None
+    connected = list(room["players"])
+    ranked = {row["player_id"] for row in rows}
+    await manager.send_personal(game_code, personal_messages(rows, "game:finished", connected, {"winner": winner}))
+    # Phones without a row (removed mid-game) still need to know it is over
+    unranked = json.dumps({"event": "game:finished", "data": {"winner": winner}})
+    await manager.send_personal(game_code, [(pid, unranked) for pid in connected if pid not in ranked])
+
+
+class LeaderboardThrottle:
+    """Coalesces rapid score changes into at most one publish per room per interval"""
+
+    def __init__(self, interval: float = LEADERBOARD_MIN_INTERVAL,
+                 coalesce: float = LEADERBOARD_COALESCE_SECONDS):
+        self.interval = interval
+        self.coalesce = coalesce
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._last: Dict[str, float] = {}
+        self._dirty: Set[str] = set()
+
+    def schedule(self, game_code: str, publish: Callable[[], Awaitable[Any]]):
+        """Ask for a publish soon; calls while one is pending fold into it"""
+        self._dirty.add(game_code)
+        task = self._tasks.get(game_code)
+        if task is None or task.done():
+            self._tasks[game_code] = asyncio.create_task(self._run(game_code, publish))
+
+    async def _run(self, game_code: str, publish: Callable[[], Awaitable[Any]]):
+        loop = asyncio.get_running_loop()
+        while game_code in self._dirty:
+            wait = max(self.coalesce, self._last.get(game_code, float("-inf")) + self.interval - loop.time())
+            await asyncio.sleep(wait)
+            self._dirty.discard(game_code)
+            try:
+                await publish()
+            except Exception as e:
+                logger.error(f"Leaderboard update failed for {game_code}: {e}")
+            self._last[game_code] = loop.time()
+
+    def cancel(self, game_code: str):
+        task = self._tasks.pop(game_code, None)
+        self._dirty.discard(game_code)
+        self._last.pop(game_code, None)
+        if task and not task.done():
+            task.cancel()
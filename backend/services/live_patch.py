@@ -0,0 +1,185 @@
+"""
+Live Patch - Fixing one question of a game that is already running
+The shared pack content is never edited: a game's patched questions are kept
+as overrides (question_overrides, by plan index) laid over the shared compiled
+plan. Answers already stored for the question are rescored in two bulk writes,
+and rooms get a small content:patched delta instead of reloading the game
+"""
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Sequence
+import logging
+
+from pymongo import UpdateOne
+
+from services.answer_tally import ANALYTICS_COLLECTION
+from services.content_cache import load_shared_content
+from services.game_state import GameNotFound
+from services.pack_patch import apply_patch
+from services.pack_validation import validate_question
+from services.question_plan import CATEGORY_KEYS, QUESTION_LIST_KEYS, plan_question
+from services.scoring import ANSWERS_COLLECTION, calculate_points, check_answer
+
+logger = logging.getLogger(__name__)
+
+# Game field holding {str(plan index): {"question": ..., "version": n, "patched_at": ...}}
+OVERRIDES_FIELD = "question_overrides"
+
+PATCH_PROJECTION = {"_id": 0, "id": 1, "game_format": 1, "content_hash": 1, "content": 1, OVERRIDES_FIELD: 1}
+
+
+class QuestionNotFound(ValueError):
+    """The game has no question at that index"""
+
+
+class QuestionConflict(ValueError):
+    """The question (or the game's content) changed while the patch was being made"""
+
+
+def question_pointer(game_format: str, content: Optional[Dict[str, Any]], question_index: int) -> Optional[str]:
+    """JSON pointer to a plan entry inside the content, None when out of range"""
+    if not content or question_index < 0:
+        return None
+    if game_format in CATEGORY_KEYS:
+        category_key, item_key = CATEGORY_KEYS[game_format]
+        remaining = question_index
+        for number, category in enumerate(content.get(category_key, [])):
+            items = category.get(item_key, [])
+            if remaining < len(items):
+                return f"/{category_key}/{number}/{item_key}/{remaining}"
+            remaining -= len(items)
+        return None
+    key = QUESTION_LIST_KEYS.get(game_format)
+    if key and question_index < len(content.get(key, [])):
+        return f"/{key}/{question_index}"
+    return None
+
+
+def game_question(plan: Sequence[Dict[str, Any]], overrides: Optional[Dict[str, Any]],
+                  question_index: int) -> Optional[Dict[str, Any]]:
+    """A game's question at index - its override if patched, else the shared plan entry"""
+    override = (overrides or {}).get(str(question_index))
+    if override and 0 <= question_index < len(plan):
+        return override["question"]
+    return plan_question(plan, question_index)
+
+
+def plan_with_overrides(plan: Sequence[Dict[str, Any]], overrides: Optional[Dict[str, Any]]) -> Sequence[Dict[str, Any]]:
+    """The plan itself when nothing is patched, else a copy with the patched entries swapped in"""
+    if not overrides:
+        return plan
+    patched = list(plan)
+    for key, override in overrides.items():
+        index = int(key)
+        if 0 <= index < len(patched):
+            patched[index] = override["question"]
+    return patched
+
+
+def content_with_overrides(game_format: str, content: Optional[Dict[str, Any]],
+                           overrides: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """Content as the game plays it; only the containers on a patched path are copied"""
+    if not content or not overrides:
+        return content
+    ops = []
+    for key, override in sorted(overrides.items(), key=lambda item: int(item[0])):
+        pointer = question_pointer(game_format, content, int(key))
+        if pointer:
+            ops.append({"op": "replace", "path": pointer, "value": override["question"]})
+    return apply_patch(content, ops)[0] if ops else content
+
+
+def patch_question(game_format: str, question: Dict[str, Any], ops: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Normalized patched question or PatchError / PackValidationError; paths are relative to the question"""
+    patched, _ = apply_patch(question, ops)
+    return validate_question(game_format, patched)
+
+
+async def rescore_question(db, game_id: str, game_format: str, question_index: int,
+                           question: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Score the stored answers to a question again; one entry per answer whose result changed"""
+    answers = await db[ANSWERS_COLLECTION].find(
+        {"game_id": game_id, "question_index": question_index},
+        {"_id": 0, "player_id": 1, "answer": 1, "time_taken": 1, "correct": 1, "points": 1}
+    ).to_list(None)
+
+    changes = []
+    for stored in answers:
+        correct, _ = check_answer(game_format, question, stored["answer"])
+        points = calculate_points(game_format, question, stored["answer"], stored.get("time_taken", 0), correct)
+        if correct != stored["correct"] or points != stored["points"]:
+            changes.append({
+                "player_id": stored["player_id"],
+                "correct": correct,
+                "points": points,
+                # What the player's totals move by
+                "points_delta": points - stored["points"],
+                "correct_delta": int(correct) - int(stored["correct"]),
+            })
+    if not changes:
+        return changes
+
+    now = datetime.now(timezone.utc).isoformat()
+    await db[ANSWERS_COLLECTION].bulk_write([
+        UpdateOne(
+            {"game_id": game_id, "question_index": question_index, "player_id": c["player_id"]},
+            {"$set": {"correct": c["correct"], "points": c["points"], "rescored_at": now}}
+        )
+        for c in changes
+    ], ordered=False)
+    await db.games.bulk_write([
+        UpdateOne(
+            {"id": game_id, "players.id": c["player_id"]},
+            {"$inc": {"players.$.score": c["points_delta"], "players.$.correct_answers": c["correct_delta"]}}
+        )
+        for c in changes
+    ], ordered=False)
+
+    # A closed question's saved distribution keeps its counts per answer; only "correct" moves
+    correct_delta = sum(c["correct_delta"] for c in changes)
+    if correct_delta:
+        await db[ANALYTICS_COLLECTION].update_one(
+            {"game_id": game_id, "question_index": question_index}, {"$inc": {"correct": correct_delta}}
+        )
+    return changes
+
+
+async def patch_game_question(db, game_id: str, question_index: int, ops: List[Dict[str, Any]],
+                              expected_version: Optional[int] = None) -> Dict[str, Any]:
+    """Patch, store and rescore one question of a game; returns the content:patched event data"""
+    game = await db.games.find_one({"id": game_id}, PATCH_PROJECTION)
+    if not game:
+        raise GameNotFound(f"Game {game_id} not found")
+
+    game_format = game.get("game_format", "")
+    shared = await load_shared_content(db, game)
+    overrides = game.get(OVERRIDES_FIELD) or {}
+    question = game_question(shared.plan(game_format) if shared else (), overrides, question_index)
+    if question is None:
+        raise QuestionNotFound(f"Question {question_index} not found")
+
+    current = overrides.get(str(question_index), {}).get("version", 0)
+    if expected_version is not None and expected_version != current:
+        raise QuestionConflict(f"Question {question_index} is at version {current}, not {expected_version}")
+
+    patched = patch_question(game_format, question, ops)
+    key = f"{OVERRIDES_FIELD}.{question_index}"
+    stored = await db.games.update_one(
+        # Same content, same question version - otherwise another edit got there first
+        {"id": game_id, "content_hash": game.get("content_hash"),
+         f"{key}.version": current if current else {"$exists": False}},
+        {"$set": {key: {"question": patched, "version": current + 1,
+                        "patched_at": datetime.now(timezone.utc).isoformat()}}}
+    )
+    if not stored.matched_count:
+        raise QuestionConflict(f"Question {question_index} changed while it was being patched")
+
+    rescored = await rescore_question(db, game_id, game_format, question_index, patched)
+    if rescored:
+        logger.info(f"Patched question {question_index} of {game_id}: {len(rescored)} answers rescored")
+    return {
+        "question_index": question_index,
+        "path": question_pointer(game_format, shared.content, question_index),
+        "question": patched,
+        "version": current + 1,
+        "rescored": rescored,
+    }
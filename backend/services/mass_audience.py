@@ -0,0 +1,188 @@
+"""
+Mass Audience - PKWY LIVE! rooms with thousands of players
+Answers are queued and scored in batches (two bulk writes per batch instead of
+two writes per answer) and scores are kept in memory, so leaderboards never
+read the whole roster back from Mongo
+"""
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+from typing import Any, Dict, List, Optional, Set, Tuple
+from datetime import datetime, timezone
+import asyncio
+import logging
+import os
+
+from models.game_models import GameFormat
+from services.question_plan import plan_question
+from services.scoring import ANSWERS_COLLECTION, calculate_points, check_answer
+
+logger = logging.getLogger(__name__)
+
+MASS_FORMATS = {GameFormat.PKWY_LIVE.value}
+
+# A batch is flushed when it reaches this size or this age, whichever comes first
+MASS_BATCH_SIZE = int(os.environ.get("MASS_BATCH_SIZE", "1000"))
+MASS_BATCH_SECONDS = float(os.environ.get("MASS_BATCH_SECONDS", "0.05"))
+
+# Mongo's duplicate key error code (the unique answer index)
+DUPLICATE_KEY = 11000
+
+
+class MassAudience:
+    """In-memory scores and answer queue for one mass-audience game"""
+
+    def __init__(self, game_id: str, game_format: str, players: List[Dict[str, Any]]):
+        self.game_id = game_id
+        self.game_format = game_format
+        self.scores: Dict[str, int] = {}
+        self.names: Dict[str, str] = {}
+        self.correct_answers: Dict[str, int] = {}
+        for player in players:
+            self.add_player(player)
+        # question index -> players already queued or scored, so duplicates never reach Mongo
+        self.answered: Dict[int, Set[str]] = {}
+        self.queue: List[Tuple[str, int, Any, float]] = []
+        # (player id, question index) -> future for answers submitted over REST, resolved with the ack data
+        self.waiters: Dict[Tuple[str, int], asyncio.Future] = {}
+        self.flush_task: Optional[asyncio.Task] = None
+        # Held while a batch is written, so a reveal waits for answers already in flight
+        self.flush_lock = asyncio.Lock()
+
+    def add_player(self, player: Dict[str, Any]):
+        self.scores.setdefault(player["id"], player.get("score", 0))
+        self.names[player["id"]] = player.get("name", "")
+        self.correct_answers.setdefault(player["id"], player.get("correct_answers", 0))
+
+    def submit(self, player_id: str, question_index: int, answer: Any, time_taken: float) -> Optional[str]:
+        """Queue an answer; the rejection reason if it cannot be accepted"""
+        if player_id not in self.scores:
+            return "Player not found"
+        seen = self.answered.setdefault(question_index, set())
+        if player_id in seen:
+            return f"Question {question_index} already answered"
+        seen.add(player_id)
+        self.queue.append((player_id, question_index, answer, time_taken))
+        return None
+
+    def take_batch(self) -> List[Tuple[str, int, Any, float]]:
+        batch, self.queue = self.queue, []
+        return batch
+
+    async def load_answered(self, db):
+        """Seed the duplicate check with answers stored before mass mode (or over REST)"""
+        cursor = db[ANSWERS_COLLECTION].find({"game_id": self.game_id}, {"_id": 0, "question_index": 1, "player_id": 1})
+        async for doc in cursor:
+            self.answered.setdefault(doc["question_index"], set()).add(doc["player_id"])
+
+    def score_batch(self, plan: list, batch: List[Tuple[str, int, Any, float]]) -> List[Dict[str, Any]]:
+        """Check and score a batch; one result per queued answer. Standings change in apply_scores"""
+        results = []
+        for player_id, question_index, answer, time_taken in batch:
+            question_data = plan_question(plan, question_index)
+            if question_data is None:
+                results.append({"player_id": player_id, "question_index": question_index, "rejected": "Question not found"})
+                continue
+            correct, correct_answer = check_answer(self.game_format, question_data, answer)
+            results.append({
+                "player_id": player_id,
+                "question_index": question_index,
+                "answer": answer,
+                "time_taken": time_taken,
+                "correct": correct,
+                "correct_answer": correct_answer,
+                "points_earned": calculate_points(self.game_format, question_data, answer, time_taken, correct),
+            })
+        return results
+
+    def reject(self, result: Dict[str, Any], reason: str, retry: bool = False):
+        """Turn a result into a rejection; retry lets the player answer the question again"""
+        if retry:
+            self.answered.get(result["question_index"], set()).discard(result["player_id"])
+        for key in ("answer", "time_taken", "correct", "correct_answer", "points_earned"):
+            result.pop(key, None)
+        result["rejected"] = reason
+
+    async def persist(self, db, results: List[Dict[str, Any]]):
+        """Write a scored batch: one insert_many for the answers, one bulk_write for the scores
+
+        Answers that fail to insert are turned into rejections and not scored.
+        """
+        scored = [r for r in results if "rejected" not in r]
+        if not scored:
+            return
+        now = datetime.now(timezone.utc).isoformat()
+        try:
+            await db[ANSWERS_COLLECTION].insert_many([
+                {
+                    "game_id": self.game_id,
+                    "question_index": r["question_index"],
+                    "player_id": r["player_id"],
+                    "answer": r["answer"],
+                    "time_taken": r["time_taken"],
+                    "correct": r["correct"],
+                    "points": r["points_earned"],
+                    "submitted_at": now
+                }
+                for r in scored
+            ], ordered=False)
+        except BulkWriteError as e:
+            write_errors = e.details.get("writeErrors", [])
+            logger.warning(f"Mass answer batch for {self.game_id}: {len(write_errors)} answers not stored")
+            for error in write_errors:
+                r = scored[error["index"]]
+                if error.get("code") == DUPLICATE_KEY:
+                    # Stored by another path already; that answer is the one that counts
+                    self.reject(r, f"Question {r['question_index']} already answered")
+                else:
+                    self.reject(r, "Answer could not be saved", retry=True)
+            scored = [r for r in scored if "rejected" not in r]
+            if not scored:
+                return
+        try:
+            await db.games.bulk_write([
+                UpdateOne(
+                    {"id": self.game_id, "players.id": r["player_id"]},
+                    {"$inc": {"players.$.score": r["points_earned"], "players.$.correct_answers": 1 if r["correct"] else 0}}
+                )
+                for r in scored
+            ], ordered=False)
+        except BulkWriteError as e:
+            # The other increments landed; only the failed ones are taken back
+            failed = [scored[error["index"]] for error in e.details.get("writeErrors", [])]
+            logger.warning(f"Mass score batch for {self.game_id}: {len(failed)} scores not stored")
+            await self.unstore(db, failed)
+            for r in failed:
+                self.reject(r, "Answer could not be saved", retry=True)
+        except Exception:
+            # No score counted, so the stored answers must not block the retry either
+            await self.unstore(db, scored)
+            raise
+
+    async def unstore(self, db, results: List[Dict[str, Any]]):
+        """Delete stored answers whose scores were not written, so the player can answer again"""
+        if not results:
+            return
+        try:
+            await db[ANSWERS_COLLECTION].delete_many({"game_id": self.game_id, "$or": [
+                {"question_index": r["question_index"], "player_id": r["player_id"]} for r in results
+            ]})
+        except Exception as e:
+            logger.error(f"Mass answers for {self.game_id} stored without scores: {e}")
+
+    def apply_scores(self, results: List[Dict[str, Any]]):
+        """Add a persisted batch to the in-memory standings"""
+        for r in results:
+            if "rejected" in r:
+                continue
+            self.scores[r["player_id"]] += r["points_earned"]
+            if r["correct"]:
+                self.correct_answers[r["player_id"]] += 1
+            r["new_score"] = self.scores[r["player_id"]]
+
+    def players(self) -> List[Dict[str, Any]]:
+        """Current standings in the shape the leaderboard publisher ranks"""
+        return [
+            {"id": player_id, "name": self.names[player_id], "score": score,
+             "correct_answers": self.correct_answers[player_id]}
+            for player_id, score in self.scores.items()
+        ]
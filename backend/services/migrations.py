@@ -0,0 +1,265 @@
+"""
+Database Migrations - Versioned index and data migrations
+Declares the indexes each collection needs and applies them idempotently
+"""
+from pymongo import ASCENDING, IndexModel
+from typing import Any, Callable, Dict, List, Optional
+from datetime import datetime, timezone
+import logging
+
+from services.content_store import CHUNKS_COLLECTION, CONTENTS_COLLECTION
+from services.pack_versions import store_legacy_content
+
+logger = logging.getLogger(__name__)
+
+# Collection that records which migration versions have been applied
+MIGRATIONS_COLLECTION = "schema_migrations"
+
+
+async def move_pack_content_to_store(db):
+    """Version 7: replace each pack's own content (and chunks) with a content-store reference"""
+    moved = 0
+    async for pack in db.game_packs.find({"content_hash": {"$exists": False}}, {"_id": 0, "id": 1}):
+        await store_legacy_content(db, pack["id"])
+        moved += 1
+    if moved:
+        logger.info(f"Moved the content of {moved} game packs to the content store")
+
+
+async def drop_shared_stream_token(db):
+    """Version 9: resume tokens are kept per worker; the one all workers shared is dropped"""
+    await db["change_stream_tokens"].delete_one({"_id": "game_events"})
+
+
+# Ordered list of migrations. Never edit an applied entry - append a new
+# version instead. "indexes" maps collection name -> list of IndexModel.
+MIGRATIONS: List[Dict[str, Any]] = [
+    {
+        "version": 1,
+        "description": "Baseline lookup indexes",
+        "indexes": {
+            "games": [
+                IndexModel([("code", ASCENDING)], name="code_1", unique=True),
+                IndexModel([("status", ASCENDING)], name="status_1"),
+            ],
+            "game_packs": [
+                IndexModel([("game_format", ASCENDING)], name="game_format_1"),
+                IndexModel([("tags", ASCENDING)], name="tags_1"),
+            ],
+        },
+    },
+    {
+        "version": 2,
+        "description": "Primary id lookups for games and game packs",
+        "indexes": {
+            "games": [
+                IndexModel([("id", ASCENDING)], name="id_1", unique=True),
+            ],
+            "game_packs": [
+                IndexModel([("id", ASCENDING)], name="id_1", unique=True),
+            ],
+        },
+    },
+    {
+        "version": 3,
+        "description": "Per-game event streams and replay snapshots",
+        "indexes": {
+            "game_events": [
+                IndexModel([("game_id", ASCENDING), ("seq", ASCENDING)], name="game_id_1_seq_1", unique=True),
+            ],
+            "game_snapshots": [
+                IndexModel([("game_id", ASCENDING), ("seq", ASCENDING)], name="game_id_1_seq_1", unique=True),
+            ],
+        },
+    },
+    {
+        "version": 4,
+        "description": "One scored answer per player per question",
+        "indexes": {
+            "answers": [
+                IndexModel(
+                    [("game_id", ASCENDING), ("question_index", ASCENDING), ("player_id", ASCENDING)],
+                    name="game_id_1_question_index_1_player_id_1",
+                    unique=True
+                ),
+            ],
+        },
+    },
+    {
+        "version": 5,
+        "description": "Per-question answer distributions",
+        "indexes": {
+            "answer_analytics": [
+                IndexModel(
+                    [("game_id", ASCENDING), ("question_index", ASCENDING)],
+                    name="game_id_1_question_index_1",
+                    unique=True
+                ),
+            ],
+        },
+    },
+    {
+        "version": 6,
+        "description": "Chunked lists of streamed pack uploads",
+        "indexes": {
+            "game_pack_chunks": [
+                IndexModel([("pack_id", ASCENDING), ("seq", ASCENDING)], name="pack_id_1_seq_1", unique=True),
+            ],
+        },
+    },
+    {
+        "version": 7,
+        "description": "Content-addressed, reference-counted pack content",
+        "indexes": {
+            CONTENTS_COLLECTION: [
+                IndexModel([("refs", ASCENDING)], name="refs_1"),
+            ],
+            CHUNKS_COLLECTION: [
+                IndexModel([("content_id", ASCENDING), ("seq", ASCENDING)], name="content_id_1_seq_1", unique=True),
+            ],
+            "game_packs": [
+                IndexModel([("content_hash", ASCENDING)], name="content_hash_1"),
+            ],
+        },
+        "run": move_pack_content_to_store,
+    },
+    {
+        "version": 8,
+        "description": "Pack edit history",
+        "indexes": {
+            "pack_versions": [
+                IndexModel([("pack_id", ASCENDING), ("version", ASCENDING)], name="pack_id_1_version_1", unique=True),
+            ],
+        },
+    },
+    {
+        "version": 9,
+        "description": "Expire change stream resume tokens of workers that are gone",
+        "indexes": {
+            "change_stream_tokens": [
+                IndexModel([("updated_at", ASCENDING)], name="updated_at_1", expireAfterSeconds=7 * 24 * 3600),
+            ],
+        },
+        "run": drop_shared_stream_token,
+    },
+]
+
+
+# Queries issued on every request path. Each must be served by an index;
+# tests run explain() on these and fail on a COLLSCAN.
+HOT_PATH_QUERIES: List[Dict[str, Any]] = [
+    {"collection": "games", "filter": {"id": "hot-path-probe"}},
+    {"collection": "games", "filter": {"code": "PROBE1"}},
+    {"collection": "games", "filter": {"status": "active"}},
+    {"collection": "game_packs", "filter": {"id": "hot-path-probe"}},
+    {"collection": "game_packs", "filter": {"game_format": "PERIL!"}},
+    {"collection": "game_packs", "filter": {"tags": "probe"}},
+    {"collection": "game_events", "filter": {"game_id": "hot-path-probe", "seq": {"$gt": 0}}},
+    {"collection": "game_snapshots", "filter": {"game_id": "hot-path-probe", "seq": {"$lte": 100}}},
+    {"collection": "answers", "filter": {"game_id": "hot-path-probe", "question_index": 0}},
+    {"collection": "answer_analytics", "filter": {"game_id": "hot-path-probe", "question_index": 0}},
+    {"collection": "game_pack_chunks", "filter": {"pack_id": "hot-path-probe"}},
+    {"collection": CONTENTS_COLLECTION, "filter": {"refs": {"$lte": 0}}},
+    {"collection": CHUNKS_COLLECTION, "filter": {"content_id": "hot-path-probe"}},
+    {"collection": "pack_versions", "filter": {"pack_id": "hot-path-probe", "version": {"$gt": 0, "$lte": 50}}},
+]
+
+
+def required_indexes() -> Dict[str, List[IndexModel]]:
+    """Merge every migration's index declarations by collection"""
+    merged: Dict[str, List[IndexModel]] = {}
+    for migration in MIGRATIONS:
+        for collection, indexes in migration.get("indexes", {}).items():
+            merged.setdefault(collection, []).extend(indexes)
+    return merged
+
+
+def latest_version() -> int:
+    """Highest declared migration version"""
+    return max((m["version"] for m in MIGRATIONS), default=0)
+
+
+async def get_applied_versions(db) -> List[int]:
+    """Versions already recorded as applied"""
+    docs = await db[MIGRATIONS_COLLECTION].find({}, {"_id": 1}).to_list(None)
+    return sorted(d["_id"] for d in docs)
+
+
+async def apply_migration(db, migration: Dict[str, Any]):
+    """Apply a single migration. Safe to re-run: index creation is idempotent."""
+    for collection, indexes in migration.get("indexes", {}).items():
+        await db[collection].create_indexes(indexes)
+
+    run = migration.get("run")
+    if run:
+        await run(db)
+
+    await db[MIGRATIONS_COLLECTION].update_one(
+        {"_id": migration["version"]},
+        {
+            "$set": {
+                "description": migration["description"],
+                "applied_at": datetime.now(timezone.utc).isoformat()
+            }
+        },
+        upsert=True
+    )
+
+
+async def run_migrations(db, on_progress: Optional[Callable[..., None]] = None) -> List[int]:
+    """Apply every pending migration in version order, return applied versions"""
+    applied = set(await get_applied_versions(db))
+    pending = [m for m in sorted(MIGRATIONS, key=lambda m: m["version"]) if m["version"] not in applied]
+    newly_applied = []
+
+    def report(current=None):
+        if on_progress:
+            on_progress(
+                schema_version=max(applied | set(newly_applied), default=0),
+                target_version=latest_version(),
+                pending=len(pending) - len(newly_applied),
+                current=current
+            )
+
+    report()
+    for migration in pending:
+        logger.info(f"Applying migration {migration['version']}: {migration['description']}")
+        report(current=migration["version"])
+        await apply_migration(db, migration)
+        newly_applied.append(migration["version"])
+    report()
+
+    if newly_applied:
+        logger.info(f"Database at schema version {latest_version()}")
+    return newly_applied
+
+
+def plan_stages(explain: Dict[str, Any]) -> List[str]:
+    """Flatten every stage name out of an explain() winning plan"""
+    planner = explain.get("queryPlanner", explain)
+    plan = planner.get("winningPlan", {})
+    # Slot-based engine nests the classic plan under "queryPlan"
+    plan = plan.get("queryPlan", plan)
+
+    stages = []
+    pending = [plan]
+    while pending:
+        node = pending.pop()
+        if not isinstance(node, dict):
+            continue
+        if "stage" in node:
+            stages.append(node["stage"])
+        pending.extend(node.get("inputStages", []))
+        if "inputStage" in node:
+            pending.append(node["inputStage"])
+    return stages
+
+
+def explain_command(query: Dict[str, Any]) -> Dict[str, Any]:
+    """Build the explain command for one HOT_PATH_QUERIES entry"""
+    return {"find": query["collection"], "filter": query["filter"]}
+
+
+def uses_collection_scan(explain: Dict[str, Any]) -> bool:
+    """True if an explain() result falls back to scanning the whole collection"""
+    return "COLLSCAN" in plan_stages(explain)
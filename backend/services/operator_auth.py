@@ -0,0 +1,33 @@
+"""
+Operator Auth - Who may call worker control endpoints such as /api/drain
+A caller on this host (the deploy script) or one presenting ADMIN_TOKEN in the
+X-Admin-Token header. Requests relayed by a proxy on this host carry
+X-Forwarded-For and must present the token like any other remote caller
+"""
+from typing import Mapping, Optional
+import hmac
+import ipaddress
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+ADMIN_TOKEN = os.environ.get("ADMIN_TOKEN", "")
+if not ADMIN_TOKEN:
+    logger.info("ADMIN_TOKEN not set - worker control endpoints only answer local callers")
+
+
+def is_loopback(host: Optional[str]) -> bool:
+    try:
+        return ipaddress.ip_address(host or "").is_loopback
+    except ValueError:
+        return False
+
+
+def is_operator(client_host: Optional[str], headers: Mapping[str, str], admin_token: Optional[str] = None) -> bool:
+    """True if the caller may drain or undrain this worker"""
+    expected = ADMIN_TOKEN if admin_token is None else admin_token
+    presented = headers.get("x-admin-token", "")
+    if expected and presented and hmac.compare_digest(presented.encode(), expected.encode()):
+        return True
+    return is_loopback(client_host) and "x-forwarded-for" not in headers
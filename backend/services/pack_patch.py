@@ -0,0 +1,226 @@
+"""
+Pack Patch - JSON-patch (RFC 6902) edits to pack content
+Operations are applied copy-on-write: only the containers on a patched path
+are copied, everything else is shared with the previous version. Only the
+list items and top-level fields a patch touches are validated again
+"""
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from models.game_models import GameFormat
+from services.pack_validation import MAX_REPORTED_ERRORS, PackValidationError, validate_fields, validate_item, validate_pack
+
+PATCH_OPS = {"add", "remove", "replace", "move", "copy", "test"}
+# Keep single edits small; bigger rewrites belong on PUT
+MAX_PATCH_OPS = 1000
+
+# (top-level key, list index or None for the whole field)
+Touched = Set[Tuple[str, Optional[int]]]
+
+
+class PatchError(ValueError):
+    """The patch is malformed or does not apply to the content"""
+
+
+def parse_pointer(path: Any) -> List[str]:
+    """RFC 6901 JSON pointer -> reference tokens"""
+    if not isinstance(path, str) or (path and not path.startswith("/")):
+        raise PatchError(f"Invalid JSON pointer: {path!r}")
+    return [token.replace("~1", "/").replace("~0", "~") for token in path.split("/")[1:]]
+
+
+def _index(container: list, token: str, allow_end: bool = False) -> int:
+    if allow_end and token == "-":
+        return len(container)
+    if not token.isdigit() or (token != "0" and token.startswith("0")):
+        raise PatchError(f"Invalid list index: {token!r}")
+    index = int(token)
+    if index > len(container) or (index == len(container) and not allow_end):
+        raise PatchError(f"List index {index} is out of range")
+    return index
+
+
+def _child(container: Any, token: str) -> Any:
+    if isinstance(container, dict):
+        if token not in container:
+            raise PatchError(f"No member {token!r}")
+        return container[token]
+    if isinstance(container, (list, tuple)):
+        return container[_index(container, token)]
+    raise PatchError(f"Cannot descend into a {type(container).__name__} at {token!r}")
+
+
+def _resolve(doc: Any, tokens: List[str]) -> Any:
+    for token in tokens:
+        doc = _child(doc, token)
+    return doc
+
+
+def _rebuilt(container: Any, tokens: List[str], change) -> Any:
+    """Copy of container with change(parent copy, last token) applied at the end of tokens"""
+    if isinstance(container, dict):
+        copied: Any = dict(container)
+    elif isinstance(container, (list, tuple)):
+        copied = list(container)
+    else:
+        raise PatchError(f"Cannot descend into a {type(container).__name__} at {tokens[0]!r}")
+    if len(tokens) == 1:
+        change(copied, tokens[0])
+        return copied
+    token = tokens[0]
+    key = token if isinstance(copied, dict) else _index(copied, token)
+    copied[key] = _rebuilt(_child(container, token), tokens[1:], change)
+    return copied
+
+
+def _add(doc: Any, tokens: List[str], value: Any) -> Any:
+    if not tokens:
+        return value
+
+    def change(parent, token):
+        if isinstance(parent, dict):
+            parent[token] = value
+        else:
+            parent.insert(_index(parent, token, allow_end=True), value)
+    return _rebuilt(doc, tokens, change)
+
+
+def _remove(doc: Any, tokens: List[str]) -> Any:
+    if not tokens:
+        raise PatchError("Cannot remove the whole document")
+
+    def change(parent, token):
+        if isinstance(parent, dict):
+            if token not in parent:
+                raise PatchError(f"No member {token!r}")
+            del parent[token]
+        else:
+            del parent[_index(parent, token)]
+    return _rebuilt(doc, tokens, change)
+
+
+def _replace(doc: Any, tokens: List[str], value: Any) -> Any:
+    if not tokens:
+        return value
+
+    def change(parent, token):
+        if isinstance(parent, dict):
+            if token not in parent:
+                raise PatchError(f"No member {token!r}")
+            parent[token] = value
+        else:
+            parent[_index(parent, token)] = value
+    return _rebuilt(doc, tokens, change)
+
+
+def _touch(touched: Touched, content: Dict[str, Any], tokens: List[str]):
+    """Record what needs validating after a write at tokens"""
+    if not tokens:
+        touched.update((key, None) for key in content)
+    elif len(tokens) == 1 or not isinstance(content.get(tokens[0]), list):
+        touched.add((tokens[0], None))
+    elif tokens[1] == "-":
+        touched.add((tokens[0], len(content[tokens[0]]) - 1))
+    else:
+        touched.add((tokens[0], _index(content[tokens[0]], tokens[1], allow_end=True)))
+
+
+def _shift(touched: Touched, content: Dict[str, Any], tokens: List[str], delta: int):
+    """Renumber recorded list items before an insert (+1) or removal (-1) at tokens"""
+    if len(tokens) != 2 or not isinstance(content.get(tokens[0]), list) or tokens[1] == "-":
+        return
+    key, at = tokens[0], _index(content[tokens[0]], tokens[1], allow_end=delta > 0)
+    for recorded in [t for t in touched if t[0] == key and t[1] is not None and t[1] >= at]:
+        touched.discard(recorded)
+        if delta > 0 or recorded[1] > at:
+            touched.add((key, recorded[1] + delta))
+
+
+def apply_patch(content: Dict[str, Any], ops: List[Dict[str, Any]]) -> Tuple[Dict[str, Any], Touched]:
+    """(patched content, what the writes touched); content itself is left as it was"""
+    if not isinstance(ops, list) or not ops:
+        raise PatchError("A patch is a non-empty list of operations")
+    if len(ops) > MAX_PATCH_OPS:
+        raise PatchError(f"At most {MAX_PATCH_OPS} operations per patch")
+    touched: Touched = set()
+    for number, op in enumerate(ops):
+        if not isinstance(op, dict) or op.get("op") not in PATCH_OPS:
+            raise PatchError(f"Operation {number}: 'op' must be one of {', '.join(sorted(PATCH_OPS))}")
+        name = op["op"]
+        try:
+            tokens = parse_pointer(op.get("path"))
+            if name in ("add", "replace", "test") and "value" not in op:
+                raise PatchError("'value' is required")
+            if name == "add":
+                _shift(touched, content, tokens, 1)
+                content = _add(content, tokens, op["value"])
+            elif name == "remove":
+                _shift(touched, content, tokens, -1)
+                content = _remove(content, tokens)
+            elif name == "replace":
+                content = _replace(content, tokens, op["value"])
+            elif name in ("move", "copy"):
+                source = parse_pointer(op.get("from"))
+                if name == "move" and tokens[:len(source)] == source and tokens != source:
+                    raise PatchError("Cannot move a value into itself")
+                value = _resolve(content, source)
+                if name == "move":
+                    _shift(touched, content, source, -1)
+                    content = _remove(content, source)
+                    _touch(touched, content, source)
+                _shift(touched, content, tokens, 1)
+                content = _add(content, tokens, value)
+            elif _resolve(content, tokens) != op["value"]:
+                raise PatchError(f"Test failed at {op['path']}")
+            if not isinstance(content, dict):
+                raise PatchError("Content must stay an object")
+            if name != "test":
+                _touch(touched, content, tokens)
+        except PatchError as e:
+            raise PatchError(f"Operation {number} ({name}): {str(e)}")
+    return content, touched
+
+
+def _list_keys(content: Dict[str, Any]) -> Dict[str, int]:
+    return {key: len(value) for key, value in content.items() if isinstance(value, list)}
+
+
+def patch_pack(game_format: str, content: Dict[str, Any], ops: List[Dict[str, Any]]) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+    """(normalized patched content, delta to store) or PatchError / PackValidationError
+
+    The delta is the patch itself plus a replace for anything validation normalized,
+    so replaying it reproduces the stored content exactly.
+    """
+    patched, touched = apply_patch(content, ops)
+    if game_format == GameFormat.GAME_NIGHT_MIX.value:
+        # Rounds are whole games of their own; check the mix as a whole
+        normalized = validate_pack(game_format, patched)
+        fixups = [{"op": "add", "path": f"/{key}", "value": value}
+                  for key, value in normalized.items() if patched.get(key) != value]
+        return normalized, list(ops) + fixups
+
+    list_counts = _list_keys(patched)
+    errors: List[Dict[str, Any]] = []
+    fixups: List[Dict[str, Any]] = []
+    items: Dict[str, list] = {}
+    for key, index in sorted(touched, key=lambda t: (t[0], -1 if t[1] is None else t[1])):
+        if key not in list_counts:
+            continue
+        indexes = range(list_counts[key]) if index is None else [index] if index < list_counts[key] else []
+        for i in indexes:
+            item, item_errors = validate_item(game_format, key, i, patched[key][i])
+            errors.extend(item_errors)
+            if not item_errors and item != patched[key][i]:
+                items.setdefault(key, list(patched[key]))[i] = item
+                fixups.append({"op": "replace", "path": f"/{key}/{i}", "value": item})
+
+    fields = {key: value for key, value in patched.items() if key not in list_counts}
+    normalized_fields, field_errors = validate_fields(game_format, fields, list_counts)
+    errors.extend(field_errors)
+    if errors:
+        raise PackValidationError(game_format, errors[:MAX_REPORTED_ERRORS], len(errors))
+
+    for key, value in normalized_fields.items():
+        if fields.get(key, value) != value or key not in fields:
+            fixups.append({"op": "add", "path": f"/{key}", "value": value})
+    result = {**patched, **normalized_fields, **items}
+    return result, list(ops) + fixups
@@ -0,0 +1,478 @@
+"""
+Pack Search - Full-text and faceted search over game packs and their questions
+An in-memory inverted index with one document per pack (name, description,
+tags) and one per question (every string in it, in every format). Matches are
+ranked with BM25; facet counts come from one bitset per facet value ANDed with
+the match set, so counting never walks the matches. Pack routes update the
+index as packs change, and a periodic sync picks up other workers' changes
+"""
+from collections import Counter, OrderedDict
+from itertools import islice
+from typing import Any, Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+import asyncio
+import heapq
+import logging
+import math
+import os
+import re
+import sys
+import time
+import unicodedata
+
+from models.game_models import GameFormat
+from services.pack_versions import load_pack_content
+from services.question_plan import CATEGORY_KEYS, QUESTION_LIST_KEYS
+
+logger = logging.getLogger(__name__)
+
+# Seconds between syncs with game_packs (changes made by other workers)
+PACK_SEARCH_SYNC_SECONDS = float(os.environ.get("PACK_SEARCH_SYNC_SECONDS", "30"))
+# Terms whose match bitsets and ranked postings are kept between queries
+PACK_SEARCH_TERM_CACHE = int(os.environ.get("PACK_SEARCH_TERM_CACHE", "512"))
+MAX_SEARCH_RESULTS = 100
+
+# BM25 parameters
+K1 = 1.2
+B = 0.75
+# A pack's name counts this many times over its description and tags
+NAME_WEIGHT = 3
+# Removed documents leave holes in the id space; renumber once they outnumber live ones
+COMPACT_MIN_HOLES = 10_000
+
+FACETS = ("game_format", "tag", "difficulty")
+# Pack fields the index holds; a change to any of them means re-indexing
+SEARCH_PROJECTION = {"_id": 0, "id": 1, "name": 1, "description": 1, "tags": 1, "game_format": 1,
+                     "content_hash": 1, "version": 1, "base_version": 1}
+
+STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in is it its of on or that the this to was were what "
+    "when where which who why with".split()
+)
+TOKEN_RE = re.compile(r"[0-9a-z]+")
+# Fields that read as a question's headline, in order of preference
+TITLE_FIELDS = ("question_text", "question", "clue_text", "puzzle_with_blanks", "chain_title")
+
+
+def _fold(token: str) -> str:
+    # Plurals find singulars: "beers" matches "beer"
+    if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+        return token[:-1]
+    return token
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase, accent-free, stopword-free terms
+
+    Terms are interned: every question repeats the same few words, and the
+    index keeps each question's terms for as long as the pack is indexed.
+    """
+    if not text.isascii():
+        text = unicodedata.normalize("NFKD", text).encode("ascii", "ignore").decode("ascii")
+    return [sys.intern(_fold(t)) for t in TOKEN_RE.findall(text.lower()) if t not in STOPWORDS]
+
+
+def _strings(value: Any) -> Iterator[str]:
+    if isinstance(value, str):
+        yield value
+    elif isinstance(value, dict):
+        for item in value.values():
+            yield from _strings(item)
+    elif isinstance(value, (list, tuple)):
+        for item in value:
+            yield from _strings(item)
+
+
+class QuestionDoc(NamedTuple):
+    question_index: int
+    difficulty: Optional[int]
+    title: str
+    terms: Counter
+
+
+def _question_doc(index: int, question: Any, context: str = "") -> QuestionDoc:
+    question = question if isinstance(question, dict) else {"text": question}
+    title = next((question[f] for f in TITLE_FIELDS if isinstance(question.get(f), str)), None)
+    terms = Counter(tokenize(context))
+    for text in _strings(question):
+        terms.update(tokenize(text))
+        title = title or text
+    difficulty = question.get("difficulty")
+    return QuestionDoc(index, difficulty if isinstance(difficulty, int) else None, title or "", terms)
+
+
+def question_documents(game_format: str, content: Optional[Dict[str, Any]], start: int = 0) -> List[QuestionDoc]:
+    """One search document per playable question, numbered in question plan order"""
+    if not content:
+        return []
+    if game_format == GameFormat.GAME_NIGHT_MIX.value:
+        docs: List[QuestionDoc] = []
+        for round_content in content.get("rounds", []):
+            if isinstance(round_content, dict):
+                docs.extend(question_documents(round_content.get("format", ""), round_content, start + len(docs)))
+        return docs
+    if game_format in CATEGORY_KEYS:
+        # Category titles are searchable on every question under them
+        category_key, item_key = CATEGORY_KEYS[game_format]
+        docs = []
+        for category in content.get(category_key, []):
+            title = category.get("category_title", "")
+            for item in category.get(item_key, []):
+                docs.append(_question_doc(start + len(docs), item, title if isinstance(title, str) else ""))
+        return docs
+    if game_format in QUESTION_LIST_KEYS:
+        return [_question_doc(start + i, item) for i, item in enumerate(content.get(QUESTION_LIST_KEYS[game_format], []))]
+    return []
+
+
+def pack_terms(pack: Dict[str, Any]) -> Counter:
+    """Search terms of a pack's own document"""
+    terms = Counter()
+    for _ in range(NAME_WEIGHT):
+        terms.update(tokenize(pack.get("name", "")))
+    terms.update(tokenize(pack.get("description", "")))
+    for tag in pack.get("tags", []):
+        terms.update(tokenize(tag))
+    return terms
+
+
+def _bits(docs: Iterable[int], size: int) -> int:
+    """Bitset of doc ids, built in a bytearray rather than one big-int shift per id"""
+    buffer = bytearray((size + 7) // 8)
+    for doc in docs:
+        buffer[doc >> 3] |= 1 << (doc & 7)
+    return int.from_bytes(buffer, "little")
+
+
+def _iter_bits(bits: int) -> Iterator[int]:
+    """Set bit positions in ascending order, a byte at a time"""
+    data = bits.to_bytes((bits.bit_length() + 7) // 8, "little")
+    for byte_index, byte in enumerate(data):
+        while byte:
+            low = byte & -byte
+            yield byte_index * 8 + low.bit_length() - 1
+            byte ^= low
+
+
+def _span_mask(span: range) -> int:
+    return ((1 << len(span)) - 1) << span.start
+
+
+def _kind(question_index: Optional[int]) -> str:
+    return "pack" if question_index is None else "question"
+
+
+class PackEntry(NamedTuple):
+    span: range          # Doc ids: the pack's own document first, then its questions
+    name: str
+    game_format: str
+    tags: Tuple[str, ...]
+    version: int
+
+
+class InvertedIndex:
+    """Term -> {doc id: BM25 term weight}, with per-value facet bitsets over doc ids
+
+    Doc ids are handed out in one contiguous run per pack, so a pack's facet
+    bits are a single mask. Replacing a pack appends a new run; the old ids
+    become holes that compaction closes.
+    """
+
+    def __init__(self):
+        self.postings: Dict[str, Dict[int, float]] = {}
+        self.packs: Dict[str, PackEntry] = {}
+        self.facets: Dict[Tuple[str, Any], int] = {}
+        # Per doc id, None for holes: (pack id, question index or None, difficulty, title, terms, length)
+        self._docs: List[Optional[Tuple[str, Optional[int], Optional[int], str, Tuple[str, ...], int]]] = []
+        self._live = 0
+        self._total_length = 0
+        # term -> (match bitset, postings ranked by weight)
+        self._term_cache: "OrderedDict[str, Tuple[int, List[Tuple[float, int]]]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return self._live
+
+    @property
+    def question_count(self) -> int:
+        return self._live - len(self.packs)
+
+    def _weight(self, tf: int, length: int, average: float) -> float:
+        return tf * (K1 + 1) / (tf + K1 * (1 - B + B * length / average))
+
+    def add(self, pack: Dict[str, Any], questions: List[QuestionDoc]):
+        """Index a pack and its questions, replacing whatever was indexed for it"""
+        self.remove(pack["id"])
+        docs = [(None, None, pack.get("name", ""), pack_terms(pack))]
+        docs.extend((q.question_index, q.difficulty, q.title, q.terms) for q in questions)
+        lengths = [sum(terms.values()) for _, _, _, terms in docs]
+        self._total_length += sum(lengths)
+        self._live += len(docs)
+        # Weights use the average length as of indexing; close enough as the index grows
+        average = self._total_length / self._live or 1.0
+
+        start = len(self._docs)
+        for doc, (question_index, difficulty, title, terms), length in zip(range(start, start + len(docs)), docs, lengths):
+            self._docs.append((pack["id"], question_index, difficulty, title, tuple(terms), length))
+            for term, tf in terms.items():
+                self.postings.setdefault(term, {})[doc] = self._weight(tf, length, average)
+                self._term_cache.pop(term, None)
+
+        entry = PackEntry(range(start, len(self._docs)), pack.get("name", ""), pack.get("game_format", ""),
+                          tuple(pack.get("tags", [])), pack.get("version", 0))
+        self.packs[pack["id"]] = entry
+        self._set_facets(entry, questions)
+
+    def _set_facets(self, entry: PackEntry, questions: Iterable[QuestionDoc]):
+        mask = _span_mask(entry.span)
+        for key in [("game_format", entry.game_format)] + [("tag", tag) for tag in set(entry.tags)]:
+            self.facets[key] = self.facets.get(key, 0) | mask
+        self.facets[("kind", "pack")] = self.facets.get(("kind", "pack"), 0) | (1 << entry.span.start)
+        self.facets[("kind", "question")] = self.facets.get(("kind", "question"), 0) | (mask & ~(1 << entry.span.start))
+        by_difficulty: Dict[int, List[int]] = {}
+        for offset, question in enumerate(questions, 1):
+            if question.difficulty is not None:
+                by_difficulty.setdefault(question.difficulty, []).append(entry.span.start + offset)
+        for difficulty, docs in by_difficulty.items():
+            key = ("difficulty", difficulty)
+            self.facets[key] = self.facets.get(key, 0) | _bits(docs, entry.span.stop)
+
+    def remove(self, pack_id: str) -> bool:
+        """Drop a pack and its questions; False if it was not indexed"""
+        entry = self.packs.pop(pack_id, None)
+        if entry is None:
+            return False
+        for doc in entry.span:
+            terms, length = self._docs[doc][4:]
+            self._total_length -= length
+            for term in terms:
+                posting = self.postings[term]
+                del posting[doc]
+                if not posting:
+                    del self.postings[term]
+                self._term_cache.pop(term, None)
+            self._docs[doc] = None
+        self._live -= len(entry.span)
+
+        keep = ~_span_mask(entry.span)
+        for key in list(self.facets):
+            bits = self.facets[key] & keep
+            if bits:
+                self.facets[key] = bits
+            else:
+                del self.facets[key]
+
+        holes = len(self._docs) - self._live
+        if holes > max(self._live, COMPACT_MIN_HOLES):
+            self._compact()
+        return True
+
+    def _compact(self):
+        """Renumber live docs contiguously, pack by pack"""
+        remap: Dict[int, int] = {}
+        docs = []
+        for pack_id, entry in sorted(self.packs.items(), key=lambda item: item[1].span.start):
+            start = len(docs)
+            for doc in entry.span:
+                remap[doc] = len(docs)
+                docs.append(self._docs[doc])
+            self.packs[pack_id] = entry._replace(span=range(start, len(docs)))
+        self._docs = docs
+        self.postings = {term: {remap[doc]: w for doc, w in posting.items()} for term, posting in self.postings.items()}
+        self._term_cache.clear()
+        self.facets = {}
+        for entry in self.packs.values():
+            questions = [QuestionDoc(self._docs[doc][1], self._docs[doc][2], "", Counter())
+                         for doc in entry.span[1:]]
+            self._set_facets(entry, questions)
+
+    def _term(self, term: str) -> Tuple[int, List[Tuple[float, int]]]:
+        cached = self._term_cache.get(term)
+        if cached is not None:
+            self._term_cache.move_to_end(term)
+            return cached
+        posting = self.postings.get(term, {})
+        # Best weight first; equal weights in doc order, so ties keep index order
+        ranked = sorted(((w, doc) for doc, w in posting.items()), key=lambda item: (-item[0], item[1]))
+        cached = (_bits(posting, len(self._docs)), ranked)
+        self._term_cache[term] = cached
+        while len(self._term_cache) > PACK_SEARCH_TERM_CACHE:
+            self._term_cache.popitem(last=False)
+        return cached
+
+    def _idf(self, term: str) -> float:
+        df = len(self.postings.get(term, ()))
+        return math.log(1 + (self._live - df + 0.5) / (df + 0.5))
+
+    def _ranked(self, terms: List[str], accept: Callable[[int], bool], limit: int) -> List[Tuple[float, int]]:
+        """Top matches by BM25, walking the rarest term's postings best-first
+
+        Stops once no remaining doc can beat the current top `limit`.
+        """
+        idf = {term: self._idf(term) for term in terms}
+        driver, others = terms[0], terms[1:]
+        others_best = sum(idf[t] * self._term(t)[1][0][0] for t in others)
+        top: List[Tuple[float, int]] = []
+        for weight, doc in self._term(driver)[1]:
+            score = idf[driver] * weight
+            if len(top) >= limit and score + others_best <= top[0][0]:
+                break
+            for term in others:
+                other = self.postings[term].get(doc)
+                if other is None:
+                    break
+                score += idf[term] * other
+            else:
+                if not accept(doc):
+                    continue
+                # Ties go to the earlier doc (the pack before its questions)
+                item = (score, -doc)
+                if len(top) < limit:
+                    heapq.heappush(top, item)
+                elif item > top[0]:
+                    heapq.heapreplace(top, item)
+        return [(score, -negated) for score, negated in sorted(top, reverse=True)]
+
+    def search(self, query: str = "", filters: Optional[Dict[str, Any]] = None,
+               limit: int = 20, offset: int = 0) -> Dict[str, Any]:
+        """Ranked hits and facet counts for a query; all query terms must match"""
+        started = time.perf_counter()
+        filters = {key: value for key, value in (filters or {}).items() if value is not None}
+        terms = sorted(set(tokenize(query)), key=lambda t: len(self.postings.get(t, ())))
+
+        if terms and any(t not in self.postings for t in terms):
+            matched = 0
+        elif terms:
+            matched = self._term(terms[0])[0]
+            for term in terms[1:]:
+                matched &= self._term(term)[0]
+        else:
+            matched = self.facets.get(("kind", "pack"), 0) | self.facets.get(("kind", "question"), 0)
+        for key, value in filters.items():
+            matched &= self.facets.get((key, value), 0)
+
+        def accept(doc: int) -> bool:
+            pack_id, question_index, difficulty = self._docs[doc][:3]
+            entry = self.packs[pack_id]
+            return (
+                filters.get("game_format", entry.game_format) == entry.game_format
+                and ("tag" not in filters or filters["tag"] in entry.tags)
+                and filters.get("difficulty", difficulty) == difficulty
+                and filters.get("kind", _kind(question_index)) == _kind(question_index)
+            )
+
+        wanted = offset + limit
+        if terms and matched:
+            hits = self._ranked(terms, accept, wanted)[offset:]
+        elif matched:
+            # No text to rank by: browse in index order
+            hits = [(0.0, doc) for doc in islice(_iter_bits(matched), offset, wanted)]
+        else:
+            hits = []
+
+        facets: Dict[str, Dict[str, int]] = {name: {} for name in FACETS}
+        for (name, value), bits in self.facets.items():
+            if name in facets:
+                count = (matched & bits).bit_count()
+                if count:
+                    facets[name][str(value)] = count
+        return {
+            "query": query,
+            "total": matched.bit_count(),
+            "results": [self._hit(doc, score) for score, doc in hits],
+            "facets": {name: dict(sorted(counts.items(), key=lambda kv: (-kv[1], kv[0])))
+                       for name, counts in facets.items()},
+            "took_ms": round((time.perf_counter() - started) * 1000, 3),
+        }
+
+    def _hit(self, doc: int, score: float) -> Dict[str, Any]:
+        pack_id, question_index, difficulty, title = self._docs[doc][:4]
+        entry = self.packs[pack_id]
+        hit = {
+            "kind": _kind(question_index),
+            "pack_id": pack_id,
+            "pack_name": entry.name,
+            "game_format": entry.game_format,
+            "score": round(score, 4),
+        }
+        if question_index is not None:
+            hit.update(question_index=question_index, text=title, difficulty=difficulty)
+        return hit
+
+
+class PackSearch:
+    """The process's search index and how it is kept in step with game_packs"""
+
+    def __init__(self):
+        self.index = InvertedIndex()
+        self._fingerprints: Dict[str, tuple] = {}
+        self._stopped = asyncio.Event()
+
+    @staticmethod
+    def _fingerprint(pack: Dict[str, Any]) -> tuple:
+        return (pack.get("version", 0), pack.get("content_hash"), pack.get("name"), pack.get("description"),
+                tuple(pack.get("tags", [])), pack.get("game_format"))
+
+    async def index_pack(self, db, pack: Dict[str, Any], content: Optional[Dict[str, Any]] = None,
+                         questions: Optional[List[QuestionDoc]] = None):
+        """(Re-)index one pack; content is loaded from the store when neither it nor its documents are given"""
+        if questions is None:
+            if content is None:
+                content = await load_pack_content(db, pack)
+            questions = await asyncio.to_thread(question_documents, pack.get("game_format", ""), content)
+        indexed = self.index.packs.get(pack["id"])
+        if indexed is not None and indexed.version > pack.get("version", 0):
+            # A newer edit was indexed while this one was being read
+            return
+        self.index.add(pack, questions)
+        self._fingerprints[pack["id"]] = self._fingerprint(pack)
+
+    async def refresh_pack(self, db, pack_id: str, content: Optional[Dict[str, Any]] = None):
+        """Re-index a pack from its stored fields after an edit (content as edited, if at hand)"""
+        pack = await db.game_packs.find_one({"id": pack_id}, SEARCH_PROJECTION)
+        if pack:
+            await self.index_pack(db, pack, content)
+        else:
+            self.remove_pack(pack_id)
+
+    def remove_pack(self, pack_id: str):
+        self.index.remove(pack_id)
+        self._fingerprints.pop(pack_id, None)
+
+    async def sync(self, db) -> int:
+        """Bring the index in line with game_packs; returns how many packs changed"""
+        started = time.perf_counter()
+        seen = set()
+        changed = 0
+        async for pack in db.game_packs.find({}, SEARCH_PROJECTION):
+            seen.add(pack["id"])
+            if self._fingerprints.get(pack["id"]) != self._fingerprint(pack):
+                await self.index_pack(db, pack)
+                changed += 1
+        for pack_id in [p for p in self._fingerprints if p not in seen]:
+            self.remove_pack(pack_id)
+            changed += 1
+        if changed:
+            elapsed_ms = round((time.perf_counter() - started) * 1000, 1)
+            logger.info(f"Search index synced {changed} packs in {elapsed_ms}ms "
+                        f"({len(self.index.packs)} packs, {self.index.question_count} questions)")
+        return changed
+
+    async def run(self, db):
+        """Sync every PACK_SEARCH_SYNC_SECONDS until stopped"""
+        self._stopped.clear()
+        while not self._stopped.is_set():
+            try:
+                await asyncio.wait_for(self._stopped.wait(), timeout=PACK_SEARCH_SYNC_SECONDS)
+            except asyncio.TimeoutError:
+                try:
+                    await self.sync(db)
+                except Exception as e:
+                    logger.error(f"Search index sync failed: {e}")
+
+    def stop(self):
+        self._stopped.set()
+
+    def search(self, query: str = "", limit: int = 20, offset: int = 0, **filters) -> Dict[str, Any]:
+        return self.index.search(query, filters, limit=min(limit, MAX_SEARCH_RESULTS), offset=offset)
+
+
+pack_search = PackSearch()
@@ -0,0 +1,315 @@
+"""
+Pack Streaming - Incremental JSON parsing for large pack uploads
+Uploads are read in fixed-size pieces and split at the elements of each
+top-level list, so memory is bounded by one read plus one question rather than
+the whole file. Items are validated as they arrive and written as content
+chunks in batches, hashed on the way, so the finished upload joins the content store.
+Search documents are built from each item too, so indexing never reads the pack back
+"""
+import codecs
+import json
+import os
+import uuid
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from services.content_store import CHUNKS_COLLECTION, CONTENT_CHUNK_ITEMS, ContentHasher, adopt_chunks
+from services.format_detect import classify_content
+from services.pack_search import QuestionDoc, question_documents
+from services.pack_validation import MAX_REPORTED_ERRORS, PackValidationError, validate_fields, validate_item
+
+# Uploads larger than this are rejected part-way through
+MAX_UPLOAD_BYTES = int(os.environ.get("PACK_UPLOAD_MAX_BYTES", str(64 * 1024 * 1024)))
+# Bytes pulled from the upload per read
+UPLOAD_READ_BYTES = 64 * 1024
+# Items per chunk document
+PACK_CHUNK_ITEMS = CONTENT_CHUNK_ITEMS
+
+_WHITESPACE = " \t\n\r"
+_decoder = json.JSONDecoder()
+
+Event = Tuple[str, str, Any]
+
+
+class PackTooLarge(ValueError):
+    """Upload went past the size limit"""
+
+
+class PackStreamError(ValueError):
+    """Upload is not a JSON object of fields and lists"""
+
+
+class PackStreamParser:
+    """Incremental parser for a top-level JSON object
+
+    feed() takes raw bytes and returns the events completed so far:
+    ("field", key, value) for a non-list value, ("list", key, None) when a list
+    opens and ("item", key, value) for each of its elements.
+    """
+
+    def __init__(self, max_bytes: int = MAX_UPLOAD_BYTES):
+        self.max_bytes = max_bytes
+        self.received = 0
+        self._text = codecs.getincrementaldecoder("utf-8")()
+        self._buf = ""
+        self._pos = 0
+        self._state = "start"
+        self._key: Optional[str] = None
+        # After a cut-off value, wait until this much is buffered before parsing it again
+        self._wait_for = 0
+
+    def feed(self, data: bytes) -> List[Event]:
+        self.received += len(data)
+        if self.received > self.max_bytes:
+            raise PackTooLarge(f"Upload is larger than {self.max_bytes} bytes")
+        return self._parse(self._text.decode(data), final=False)
+
+    def close(self) -> List[Event]:
+        events = self._parse(self._text.decode(b"", final=True), final=True)
+        self._skip_whitespace()
+        if self._state != "done":
+            raise PackStreamError("Upload ended before the pack was complete")
+        if self._pos < len(self._buf):
+            raise PackStreamError(f"Unexpected data after the pack at offset {self._offset()}")
+        return events
+
+    def _offset(self) -> int:
+        return self.received - len(self._buf.encode()) + len(self._buf[:self._pos].encode())
+
+    def _skip_whitespace(self):
+        while self._pos < len(self._buf) and self._buf[self._pos] in _WHITESPACE:
+            self._pos += 1
+
+    def _expect(self, allowed: str) -> Optional[str]:
+        """Next significant character (consumed), or None if more data is needed"""
+        self._skip_whitespace()
+        if self._pos >= len(self._buf):
+            return None
+        char = self._buf[self._pos]
+        if char not in allowed:
+            raise PackStreamError(f"Expected one of {allowed!r} at offset {self._offset()}, found {char!r}")
+        self._pos += 1
+        return char
+
+    def _value(self, final: bool):
+        """(decoded, True) for the complete value at the cursor, or (None, False) if it is cut off"""
+        self._skip_whitespace()
+        if self._pos >= len(self._buf) or (not final and len(self._buf) - self._pos < self._wait_for):
+            return None, False
+        try:
+            value, end = _decoder.raw_decode(self._buf, self._pos)
+        except json.JSONDecodeError as e:
+            cut_off = e.msg.startswith("Unterminated string") or e.pos >= len(self._buf) - 6
+            if cut_off and not final:
+                # Doubling keeps re-parsing one huge value linear overall
+                self._wait_for = 2 * (len(self._buf) - self._pos)
+                return None, False
+            raise PackStreamError(f"{e.msg} at offset {self._offset() + len(self._buf[self._pos:e.pos].encode())}")
+        if end == len(self._buf) and not final and not isinstance(value, (dict, list, str)):
+            # A number or literal at the very end may continue in the next read
+            return None, False
+        self._pos = end
+        self._wait_for = 0
+        return value, True
+
+    def _parse(self, text: str, final: bool) -> List[Event]:
+        self._buf = self._buf[self._pos:] + text
+        self._pos = 0
+        events: List[Event] = []
+        while True:
+            state = self._state
+            if state == "start":
+                if self._expect("{") is None:
+                    break
+                self._state = "first_key"
+            elif state in ("key", "first_key"):
+                char = self._expect('"}' if state == "first_key" else '"')
+                if char is None:
+                    break
+                if char == "}":
+                    self._state = "done"
+                    continue
+                self._pos -= 1
+                key, complete = self._value(final)
+                if not complete:
+                    break
+                self._key = key
+                self._state = "colon"
+            elif state == "colon":
+                if self._expect(":") is None:
+                    break
+                self._state = "value"
+            elif state == "value":
+                self._skip_whitespace()
+                if self._pos >= len(self._buf):
+                    break
+                if self._buf[self._pos] == "[":
+                    self._pos += 1
+                    events.append(("list", self._key, None))
+                    self._state = "first_item"
+                    continue
+                value, complete = self._value(final)
+                if not complete:
+                    break
+                events.append(("field", self._key, value))
+                self._state = "after_value"
+            elif state in ("item", "first_item"):
+                self._skip_whitespace()
+                if self._pos >= len(self._buf):
+                    break
+                if state == "first_item" and self._buf[self._pos] == "]":
+                    self._pos += 1
+                    self._state = "after_value"
+                    continue
+                value, complete = self._value(final)
+                if not complete:
+                    break
+                events.append(("item", self._key, value))
+                self._state = "after_item"
+            elif state == "after_item":
+                char = self._expect(",]")
+                if char is None:
+                    break
+                self._state = "item" if char == "," else "after_value"
+            elif state == "after_value":
+                char = self._expect(",}")
+                if char is None:
+                    break
+                self._state = "key" if char == "," else "done"
+            else:
+                break
+        return events
+
+
+class StreamedPack:
+    """Assembles a pack from parser events
+
+    The format is settled from the fields and the first items seen (buffering
+    at most one chunk of items until it is). After that each item is validated
+    on arrival and flushed in chunks; every error across the pack is collected.
+    """
+
+    def __init__(self, db, staging_id: str):
+        self.db = db
+        self.staging_id = staging_id
+        self.hasher = ContentHasher()
+        self.game_format: Optional[str] = None
+        self.fields: Dict[str, Any] = {}
+        self.list_counts: Dict[str, int] = {}
+        self.errors: List[Dict[str, Any]] = []
+        self.error_count = 0
+        self.questions: List[QuestionDoc] = []
+        self._pending: List[Tuple[str, Any]] = []
+        self._batch: List[Any] = []
+        self._batch_key: Optional[str] = None
+        self._seq = 0
+
+    async def add(self, event: Event):
+        kind, key, value = event
+        if kind == "field":
+            if key == "game_name" and self.game_format and value != self.game_format:
+                self._error([key], f"game_name '{value}' comes after content already read as {self.game_format}; "
+                                   "put game_name first", "format")
+            self.fields[key] = value
+        elif kind == "list":
+            self.list_counts.setdefault(key, 0)
+            self.hasher.open_list(key)
+        elif self.game_format is None:
+            self._pending.append((key, value))
+            self._settle_format(final=False)
+            if self.game_format is not None:
+                await self._drain_pending()
+        else:
+            await self._add_item(key, value)
+
+    async def finish(self) -> Tuple[str, Dict[str, Any]]:
+        """(format, normalized fields), or PackValidationError listing every problem
+
+        The fields are fed to the hasher here, since normalizing can change them.
+        """
+        if self.game_format is None:
+            self._settle_format(final=True)
+            await self._drain_pending()
+        await self._flush()
+        fields, errors = validate_fields(self.game_format, self.fields, self.list_counts)
+        for error in errors:
+            self._error(error["loc"], error["msg"], error["type"])
+        if self.error_count:
+            raise PackValidationError(self.game_format, self.errors, self.error_count)
+        for key, value in fields.items():
+            self.hasher.field(key, value)
+        return self.game_format, {**fields, **{key: [] for key in self.list_counts}}
+
+    async def discard(self):
+        await self.db[CHUNKS_COLLECTION].delete_many({"content_id": self.staging_id})
+
+    def _settle_format(self, final: bool):
+        skeleton = dict(self.fields)
+        for key, value in self._pending:
+            skeleton.setdefault(key, []).append(value)
+        guess = classify_content(skeleton)
+        if guess.known and (final or guess.confidence >= 0.9 or len(self._pending) >= PACK_CHUNK_ITEMS):
+            self.game_format = guess.game_format
+        elif final or len(self._pending) >= PACK_CHUNK_ITEMS:
+            raise PackStreamError(f"Could not detect game format from content ({'; '.join(guess.reasons)}). "
+                                  "Make sure 'game_name' field is present.")
+
+    async def _drain_pending(self):
+        pending, self._pending = self._pending, []
+        for key, value in pending:
+            await self._add_item(key, value)
+
+    async def _add_item(self, key: str, value: Any):
+        index = self.list_counts.get(key, 0)
+        self.list_counts[key] = index + 1
+        item, errors = validate_item(self.game_format, key, index, value)
+        for error in errors:
+            self._error(error["loc"], error["msg"], error["type"])
+        if self.error_count:
+            # The pack will be rejected - keep checking but stop writing
+            self._batch = []
+            return
+        if key != self._batch_key or len(self._batch) >= PACK_CHUNK_ITEMS:
+            await self._flush()
+            self._batch_key = key
+        self._batch.append(item)
+        self.hasher.item(key, item)
+        self.questions.extend(question_documents(self.game_format, {key: [item]}, len(self.questions)))
+
+    async def _flush(self):
+        if not self._batch or self.error_count:
+            return
+        await self.db[CHUNKS_COLLECTION].insert_one({
+            "content_id": self.staging_id, "seq": self._seq, "key": self._batch_key, "items": self._batch
+        })
+        self._seq += 1
+        self._batch = []
+
+    def _error(self, loc: list, msg: str, error_type: str):
+        self.error_count += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"loc": loc, "msg": msg, "type": error_type})
+
+
+async def stream_pack(db, read: Callable[[int], Awaitable[bytes]],
+                      max_bytes: int = MAX_UPLOAD_BYTES) -> Tuple[str, str, List[QuestionDoc]]:
+    """Parse, validate and store an upload piece by piece; (format, content hash, search documents) on success
+
+    Chunks are written under a staging id and handed to the content store at the
+    end. On any failure the chunks written so far are removed before the error propagates.
+    """
+    parser = PackStreamParser(max_bytes)
+    pack = StreamedPack(db, f"staging:{uuid.uuid4()}")
+    try:
+        while True:
+            data = await read(UPLOAD_READ_BYTES)
+            if not data:
+                break
+            for event in parser.feed(data):
+                await pack.add(event)
+        for event in parser.close():
+            await pack.add(event)
+        game_format, fields = await pack.finish()
+    except Exception:
+        await pack.discard()
+        raise
+    return game_format, await adopt_chunks(db, pack.staging_id, fields, pack.hasher), pack.questions
@@ -0,0 +1,168 @@
+"""
+Pack Validation - Checks imported content against its format's model
+One TypeAdapter per format, built on first use and reused for every pack after.
+All errors are collected, not just the first, and the stored content is the
+normalized result (numbers coerced, defaults filled, unknown keys kept)
+"""
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, get_args, get_origin
+
+from pydantic import TypeAdapter, ValidationError
+
+from models.game_models import (
+    GameFormat, PerilGame, SurveySaysGame, UrFinalAnswerGame, LastCallStandingGame,
+    PickOrPassGame, LinkReactionGame, SpinToWinGame, ClosestWinsGame, ChainedUpGame,
+    NoWhammyGame, BackToSchoolGame, QuizChaseGame, PKWYLiveGame
+)
+from services.question_plan import CATEGORY_KEYS, QUESTION_LIST_KEYS
+
+FORMAT_MODELS = {
+    GameFormat.PERIL.value: PerilGame,
+    GameFormat.SURVEY_SAYS.value: SurveySaysGame,
+    GameFormat.UR_FINAL_ANSWER.value: UrFinalAnswerGame,
+    GameFormat.LAST_CALL_STANDING.value: LastCallStandingGame,
+    GameFormat.PICK_OR_PASS.value: PickOrPassGame,
+    GameFormat.LINK_REACTION.value: LinkReactionGame,
+    GameFormat.SPIN_TO_WIN.value: SpinToWinGame,
+    GameFormat.CLOSEST_WINS.value: ClosestWinsGame,
+    GameFormat.CHAINED_UP.value: ChainedUpGame,
+    GameFormat.NO_WHAMMY.value: NoWhammyGame,
+    GameFormat.BACK_TO_SCHOOL.value: BackToSchoolGame,
+    GameFormat.QUIZ_CHASE.value: QuizChaseGame,
+    GameFormat.PKWY_LIVE.value: PKWYLiveGame,
+}
+
+# Keep error responses readable for badly broken packs
+MAX_REPORTED_ERRORS = 100
+
+
+class PackValidationError(ValueError):
+    """Content does not match its format; errors holds every problem found"""
+
+    def __init__(self, game_format: str, errors: List[Dict[str, Any]], count: Optional[int] = None):
+        self.game_format = game_format
+        self.errors = errors
+        self.count = count if count is not None else len(errors)
+        super().__init__(f"{self.count} problem(s) in {game_format} content")
+
+
+@lru_cache(maxsize=None)
+def adapter_for(game_format: str) -> TypeAdapter:
+    """Cached TypeAdapter for a format's content model"""
+    return TypeAdapter(FORMAT_MODELS[game_format])
+
+
+def _errors(error: ValidationError, prefix: tuple = ()) -> List[Dict[str, Any]]:
+    return [
+        {"loc": list(prefix + e["loc"]), "msg": e["msg"], "type": e["type"]}
+        for e in error.errors(include_url=False, include_input=False)
+    ]
+
+
+def _validate(game_format: str, content: Any, prefix: tuple = ()):
+    """(normalized content, errors) for a single-format pack"""
+    if game_format not in FORMAT_MODELS:
+        return content, [{"loc": list(prefix), "msg": f"Unknown game format '{game_format}'", "type": "format"}]
+    adapter = adapter_for(game_format)
+    try:
+        return adapter.dump_python(adapter.validate_python(content), mode="json"), []
+    except ValidationError as e:
+        return content, _errors(e, prefix)
+
+
+def _validate_mix(content: Dict[str, Any]):
+    """GAME NIGHT MIX - each round is checked against its own format"""
+    rounds = content.get("rounds")
+    if not isinstance(rounds, list) or not rounds:
+        return content, [{"loc": ["rounds"], "msg": "Must be a non-empty list of rounds", "type": "list_type"}]
+
+    normalized, errors = [], []
+    for i, round_content in enumerate(rounds):
+        if not isinstance(round_content, dict):
+            errors.append({"loc": ["rounds", i], "msg": "Round must be an object", "type": "dict_type"})
+            continue
+        result, round_errors = _validate(round_content.get("format"), round_content, ("rounds", i))
+        normalized.append(result)
+        errors.extend(round_errors)
+    return {**content, "rounds": normalized}, errors
+
+
+def validate_pack(game_format: str, content: Dict[str, Any]) -> Dict[str, Any]:
+    """Normalized content, or PackValidationError listing every problem"""
+    if game_format == GameFormat.GAME_NIGHT_MIX.value:
+        normalized, errors = _validate_mix(content)
+    else:
+        normalized, errors = _validate(game_format, content)
+    if errors:
+        raise PackValidationError(game_format, errors)
+    return normalized
+
+
+def _list_item_type(model, key: str):
+    field = model.model_fields.get(key)
+    if field is None or get_origin(field.annotation) is not list:
+        return None
+    return get_args(field.annotation)[0]
+
+
+@lru_cache(maxsize=None)
+def item_adapter(game_format: str, key: str) -> Optional[TypeAdapter]:
+    """Cached TypeAdapter for one element of a format's list field, if it has one"""
+    item_type = _list_item_type(FORMAT_MODELS[game_format], key)
+    return TypeAdapter(item_type) if item_type is not None else None
+
+
+@lru_cache(maxsize=None)
+def question_adapter(game_format: str) -> Optional[TypeAdapter]:
+    """Cached TypeAdapter for one playable question (an entry of the compiled plan)"""
+    if game_format in CATEGORY_KEYS:
+        category_key, item_key = CATEGORY_KEYS[game_format]
+        category = _list_item_type(FORMAT_MODELS[game_format], category_key)
+        item_type = _list_item_type(category, item_key) if category is not None else None
+        return TypeAdapter(item_type) if item_type is not None else None
+    if game_format in QUESTION_LIST_KEYS:
+        return item_adapter(game_format, QUESTION_LIST_KEYS[game_format])
+    return None
+
+
+def validate_item(game_format: str, key: str, index: int, item: Any):
+    """(normalized item, errors) for one element of a streamed list"""
+    prefix = (key, index)
+    if game_format == GameFormat.GAME_NIGHT_MIX.value and key == "rounds":
+        if not isinstance(item, dict):
+            return item, [{"loc": list(prefix), "msg": "Round must be an object", "type": "dict_type"}]
+        return _validate(item.get("format"), item, prefix)
+    adapter = item_adapter(game_format, key) if game_format in FORMAT_MODELS else None
+    if adapter is None:
+        return item, []
+    try:
+        return adapter.dump_python(adapter.validate_python(item), mode="json"), []
+    except ValidationError as e:
+        return item, _errors(e, prefix)
+
+
+def validate_question(game_format: str, question: Any) -> Dict[str, Any]:
+    """Normalized question or PackValidationError - one question, not the whole pack"""
+    adapter = question_adapter(game_format)
+    if adapter is None:
+        raise PackValidationError(game_format, [{"loc": [], "msg": "Format has no questions", "type": "value_error"}])
+    try:
+        return adapter.dump_python(adapter.validate_python(question), mode="json")
+    except ValidationError as e:
+        raise PackValidationError(game_format, _errors(e)[:MAX_REPORTED_ERRORS], e.error_count())
+
+
+def validate_fields(game_format: str, fields: Dict[str, Any], list_counts: Dict[str, int]):
+    """(normalized fields, errors) for a streamed pack whose list items were checked one by one"""
+    if game_format == GameFormat.GAME_NIGHT_MIX.value:
+        if not list_counts.get("rounds"):
+            return fields, [{"loc": ["rounds"], "msg": "Must be a non-empty list of rounds", "type": "list_type"}]
+        return fields, []
+    adapter = adapter_for(game_format)
+    try:
+        normalized = adapter.dump_python(
+            adapter.validate_python({**fields, **{key: [] for key in list_counts}}), mode="json"
+        )
+    except ValidationError as e:
+        return fields, _errors(e)
+    return {key: value for key, value in normalized.items() if key not in list_counts}, []
@@ -0,0 +1,191 @@
+"""
+Pack Versions - Edit history of game packs as compact JSON-patch deltas
+Each edit appends its operations to pack_versions and bumps the pack's
+version; the content store is only written every PACK_SNAPSHOT_INTERVAL
+versions (or on a full replace). Any version is rebuilt from the nearest
+earlier snapshot plus the deltas after it, the same way games replay events
+"""
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+import json
+import logging
+import os
+
+from pymongo import ASCENDING, DESCENDING
+from pymongo.errors import DuplicateKeyError
+
+from services.content_store import get_content, put_content, release, retain
+from services.pack_patch import apply_patch
+
+logger = logging.getLogger(__name__)
+
+VERSIONS_COLLECTION = "pack_versions"
+# Deltas replayed at most before the content is written in full again
+PACK_SNAPSHOT_INTERVAL = int(os.environ.get("PACK_SNAPSHOT_INTERVAL", "50"))
+
+# Pack fields needed to commit or rebuild a version
+VERSION_PROJECTION = {"_id": 0, "id": 1, "game_format": 1, "content_hash": 1, "version": 1, "base_version": 1,
+                      "created_at": 1}
+
+
+class VersionConflict(ValueError):
+    """The pack changed (or went away) while the edit was being made"""
+
+
+async def _replay(db, pack_id: str, content: Dict[str, Any], after: int, upto: int) -> Dict[str, Any]:
+    cursor = db[VERSIONS_COLLECTION].find(
+        {"pack_id": pack_id, "version": {"$gt": after, "$lte": upto}}, {"_id": 0, "ops": 1}
+    ).sort("version", ASCENDING)
+    async for delta in cursor:
+        content, _ = apply_patch(content, delta["ops"])
+    return content
+
+
+async def legacy_content(db, pack_id: str) -> Optional[Dict[str, Any]]:
+    """Inline content (and chunks) of a pack saved before the content store, None if there is none"""
+    pack = await db.game_packs.find_one({"id": pack_id}, {"_id": 0, "content": 1, "chunked": 1})
+    if not pack or "content" not in pack:
+        return None
+    content = pack["content"] or {}
+    if pack.get("chunked"):
+        content = {key: (list(value) if isinstance(value, list) else value) for key, value in content.items()}
+        async for chunk in db.game_pack_chunks.find({"pack_id": pack_id}).sort("seq", ASCENDING):
+            content.setdefault(chunk["key"], []).extend(chunk["items"])
+    return content
+
+
+async def store_legacy_content(db, pack_id: str) -> Optional[str]:
+    """Move a pre-content-store pack's content into the store; its content_hash either way"""
+    content = await legacy_content(db, pack_id)
+    if content is None:
+        pack = await db.game_packs.find_one({"id": pack_id}, {"_id": 0, "content_hash": 1})
+        return (pack or {}).get("content_hash")
+    content_hash = await put_content(db, content)
+    result = await db.game_packs.update_one(
+        {"id": pack_id, "content_hash": {"$exists": False}},
+        {"$set": {"content_hash": content_hash}, "$unset": {"content": "", "chunked": ""}}
+    )
+    if not result.matched_count:
+        # Moved by someone else (another request, or the migration) in the meantime
+        await release(db, content_hash)
+        return await store_legacy_content(db, pack_id)
+    await db.game_pack_chunks.delete_many({"pack_id": pack_id})
+    return content_hash
+
+
+async def load_pack_content(db, pack: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Current content: the pack's snapshot plus any deltas since"""
+    if not pack.get("content_hash"):
+        # Not moved to the content store yet (migration 7)
+        return await legacy_content(db, pack["id"])
+    content = await get_content(db, pack["content_hash"])
+    base, version = pack.get("base_version", 0), pack.get("version", 0)
+    if content is None or version <= base:
+        return content
+    return await _replay(db, pack["id"], content, base, version)
+
+
+async def content_at(db, pack_id: str, version: int) -> Optional[Dict[str, Any]]:
+    """Content as of an earlier version, None if the history does not reach it"""
+    snapshot = await db[VERSIONS_COLLECTION].find_one(
+        {"pack_id": pack_id, "version": {"$lte": version}, "content_hash": {"$exists": True}},
+        {"_id": 0, "version": 1, "content_hash": 1},
+        sort=[("version", DESCENDING)]
+    )
+    if not snapshot:
+        return None
+    content = await get_content(db, snapshot["content_hash"])
+    if content is None:
+        return None
+    return await _replay(db, pack_id, content, snapshot["version"], version)
+
+
+async def _record_origin(db, pack: Dict[str, Any]):
+    """Version 0 - the content the pack had before its first edit"""
+    try:
+        await db[VERSIONS_COLLECTION].insert_one({
+            "pack_id": pack["id"], "version": 0, "ops": None, "content_hash": pack["content_hash"],
+            "created_at": pack.get("created_at") or datetime.now(timezone.utc).isoformat()
+        })
+    except DuplicateKeyError:
+        return
+    await retain(db, pack["content_hash"])
+
+
+async def commit_version(db, pack: Dict[str, Any], ops: Optional[List[Dict[str, Any]]] = None,
+                         content: Optional[Dict[str, Any]] = None, content_hash: Optional[str] = None,
+                         fields: Optional[Dict[str, Any]] = None) -> int:
+    """Append the pack's next version; returns its number or raises VersionConflict
+
+    Either ops (a delta, with the content it produces) or content_hash (a full
+    replacement whose reference passes to the pack) is given. fields are other
+    pack fields to set alongside.
+    """
+    if not pack.get("content_hash"):
+        pack = {**pack, "content_hash": await store_legacy_content(db, pack["id"])}
+    current = pack.get("version", 0)
+    version = current + 1
+    if current == 0:
+        await _record_origin(db, pack)
+
+    snapshot = content_hash
+    if snapshot is None and version - pack.get("base_version", 0) >= PACK_SNAPSHOT_INTERVAL:
+        snapshot = await put_content(db, content)
+
+    now = datetime.now(timezone.utc).isoformat()
+    entry: Dict[str, Any] = {"pack_id": pack["id"], "version": version, "ops": ops, "created_at": now}
+    if ops is not None:
+        entry["size"] = len(json.dumps(ops))
+    if snapshot:
+        entry["content_hash"] = snapshot
+    try:
+        await db[VERSIONS_COLLECTION].insert_one(entry)
+    except DuplicateKeyError:
+        await release(db, snapshot)
+        raise VersionConflict(f"Pack {pack['id']} is no longer at version {current}")
+
+    update = {"version": version, "updated_at": now, **(fields or {})}
+    if snapshot:
+        update.update(content_hash=snapshot, base_version=version)
+    # Packs saved before versioning have no version field
+    expected = current if current else {"$in": [0, None]}
+    previous = await db.game_packs.find_one_and_update(
+        {"id": pack["id"], "version": expected}, {"$set": update}, projection={"content_hash": 1}
+    )
+    if not previous:
+        await db[VERSIONS_COLLECTION].delete_one({"pack_id": pack["id"], "version": version})
+        await release(db, snapshot)
+        raise VersionConflict(f"Pack {pack['id']} is no longer at version {current}")
+
+    if snapshot:
+        # One reference for the pack (handed over above), one for the history entry
+        await retain(db, snapshot)
+        await release(db, previous.get("content_hash"))
+    return version
+
+
+async def list_versions(db, pack_id: str, limit: int = 500) -> List[Dict[str, Any]]:
+    """History entries oldest first, without their operations"""
+    entries = await db[VERSIONS_COLLECTION].find(
+        {"pack_id": pack_id}, {"_id": 0, "version": 1, "ops": 1, "size": 1, "content_hash": 1, "created_at": 1}
+    ).sort("version", ASCENDING).to_list(limit)
+    return [
+        {
+            "version": e["version"],
+            "operations": len(e["ops"]) if e.get("ops") is not None else None,
+            "delta_bytes": e.get("size"),
+            "snapshot": "content_hash" in e,
+            "created_at": e["created_at"]
+        }
+        for e in entries
+    ]
+
+
+async def drop_history(db, pack_id: str):
+    """Delete a pack's history and the snapshots only it referenced"""
+    cursor = db[VERSIONS_COLLECTION].find(
+        {"pack_id": pack_id, "content_hash": {"$exists": True}}, {"_id": 0, "content_hash": 1}
+    )
+    async for entry in cursor:
+        await release(db, entry["content_hash"])
+    await db[VERSIONS_COLLECTION].delete_many({"pack_id": pack_id})
@@ -0,0 +1,53 @@
+"""
+Question Plan - Flattened, indexable view of a game's content
+Compiled once per game so question lookups are O(1) instead of re-walking content
+"""
+from typing import Any, Dict, List, Optional
+
+from models.game_models import GameFormat
+
+# Content key holding the question list for formats with a flat list
+QUESTION_LIST_KEYS = {
+    GameFormat.SURVEY_SAYS.value: "survey_questions",
+    GameFormat.UR_FINAL_ANSWER.value: "questions",
+    GameFormat.LAST_CALL_STANDING.value: "questions",
+    GameFormat.BACK_TO_SCHOOL.value: "questions",
+    GameFormat.PKWY_LIVE.value: "questions",
+    GameFormat.LINK_REACTION.value: "questions",
+    GameFormat.PICK_OR_PASS.value: "cases",
+    GameFormat.SPIN_TO_WIN.value: "puzzles",
+    GameFormat.CLOSEST_WINS.value: "numbers",
+    GameFormat.CHAINED_UP.value: "chains",
+    GameFormat.NO_WHAMMY.value: "spin_questions",
+}
+
+# Formats whose questions are nested under categories: (category list key, item key)
+CATEGORY_KEYS = {
+    GameFormat.PERIL.value: ("categories", "clues"),
+    GameFormat.QUIZ_CHASE.value: ("categories", "questions"),
+}
+
+
+def compile_question_plan(game_format: str, content: Optional[dict]) -> List[Dict[str, Any]]:
+    """Flatten game content into the ordered list of playable questions"""
+    if not content:
+        return []
+
+    if game_format in CATEGORY_KEYS:
+        category_key, item_key = CATEGORY_KEYS[game_format]
+        plan = []
+        for cat in content.get(category_key, []):
+            plan.extend(cat.get(item_key, []))
+        return plan
+
+    if game_format in QUESTION_LIST_KEYS:
+        return list(content.get(QUESTION_LIST_KEYS[game_format], []))
+
+    return []
+
+
+def plan_question(plan: List[Dict[str, Any]], question_index: int) -> Optional[Dict[str, Any]]:
+    """Question at index, or None when out of range"""
+    if 0 <= question_index < len(plan):
+        return plan[question_index]
+    return None
@@ -0,0 +1,110 @@
+"""
+Readiness Tracking - Background startup work and readiness reporting
+Tracks index builds, cache warm-ups and time to first served request
+"""
+from typing import Any, Awaitable, Callable, Dict, Optional
+from datetime import datetime, timezone
+import asyncio
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+PING_TIMEOUT_SECONDS = 2.0
+
+
+class StartupTracker:
+    """Records progress of background startup tasks for the readiness probe"""
+
+    def __init__(self, process_started: Optional[float] = None):
+        # perf_counter() timestamp taken as early as possible in the process
+        self.process_started = process_started if process_started is not None else time.perf_counter()
+        self.startup_hook_ms: Optional[float] = None
+        self.first_request_ms: Optional[float] = None
+        # Structure: {name: {"state": "pending"|"running"|"done"|"failed", "progress": {...}, ...}}
+        self.tasks: Dict[str, Dict[str, Any]] = {}
+        self._warmups: Dict[str, Callable[[Any], Awaitable[Any]]] = {}
+        self._running: Dict[str, asyncio.Task] = {}
+
+    def _elapsed_ms(self) -> float:
+        return round((time.perf_counter() - self.process_started) * 1000, 1)
+
+    def register_warmup(self, name: str, warmup: Callable[[Any], Awaitable[Any]]):
+        """Register a cache warm-up coroutine function taking the database"""
+        self._warmups[name] = warmup
+        self.tasks.setdefault(name, {"state": "pending", "progress": {}})
+
+    def set_progress(self, name: str, **progress):
+        """Update progress details reported for a task"""
+        self.tasks.setdefault(name, {"state": "running", "progress": {}})
+        self.tasks[name]["progress"].update(progress)
+
+    async def _run(self, name: str, coro: Awaitable[Any]):
+        task = self.tasks.setdefault(name, {"state": "pending", "progress": {}})
+        task["state"] = "running"
+        task["started_at"] = datetime.now(timezone.utc).isoformat()
+        started = time.perf_counter()
+        try:
+            result = await coro
+            task["state"] = "done"
+            return result
+        except Exception as e:
+            task["state"] = "failed"
+            task["error"] = str(e)
+            logger.error(f"Startup task {name} failed: {e}")
+        finally:
+            task["duration_ms"] = round((time.perf_counter() - started) * 1000, 1)
+
+    def start(self, name: str, coro: Awaitable[Any], required: bool = False) -> asyncio.Task:
+        """Run a coroutine in the background, tracked under name; a required task that fails blocks readiness"""
+        self.tasks.setdefault(name, {"state": "pending", "progress": {}})["required"] = required
+        self._running[name] = asyncio.create_task(self._run(name, coro))
+        return self._running[name]
+
+    def start_warmups(self, db, after: Optional[asyncio.Task] = None):
+        """Run every registered warm-up in the background, optionally after another task"""
+        async def run_all():
+            if after is not None:
+                await asyncio.shield(after)
+            await asyncio.gather(*(
+                self._run(name, warmup(db)) for name, warmup in self._warmups.items()
+            ))
+
+        self._running["warmups"] = asyncio.create_task(run_all())
+
+    def mark_startup_complete(self):
+        """Called when the startup hook returns and the app can accept traffic"""
+        self.startup_hook_ms = self._elapsed_ms()
+        logger.info(f"Startup hook finished {self.startup_hook_ms}ms after process start")
+
+    def mark_request_served(self):
+        """Record the first served request; later calls are no-ops"""
+        if self.first_request_ms is None:
+            self.first_request_ms = self._elapsed_ms()
+            logger.info(f"First request served {self.first_request_ms}ms after process start")
+
+    def is_ready(self) -> bool:
+        """True once every tracked task finished (failed warm-ups do not block, failed required tasks do)"""
+        return all(
+            t["state"] == "done" or (t["state"] == "failed" and not t.get("required"))
+            for t in self.tasks.values()
+        )
+
+    def report(self) -> Dict[str, Any]:
+        """Startup timings and per-task state"""
+        return {
+            "startup_hook_ms": self.startup_hook_ms,
+            "first_request_ms": self.first_request_ms,
+            "tasks": self.tasks
+        }
+
+
+async def ping_database(db) -> Dict[str, Any]:
+    """Ping MongoDB and measure round-trip latency"""
+    started = time.perf_counter()
+    try:
+        await asyncio.wait_for(db.command("ping"), timeout=PING_TIMEOUT_SECONDS)
+    except Exception as e:
+        return {"ok": False, "error": str(e) or type(e).__name__}
+    return {"ok": True, "ping_ms": round((time.perf_counter() - started) * 1000, 2)}
+
@@ -0,0 +1,60 @@
+"""
+Resume Tokens - Signed hints that let a client rejoin its room on another worker
+"""
+from typing import Any, Dict, Optional
+import base64
+import hashlib
+import hmac
+import json
+import logging
+import os
+import secrets
+import time
+
+logger = logging.getLogger(__name__)
+
+RESUME_TOKEN_TTL_SECONDS = int(os.environ.get("RESUME_TOKEN_TTL_SECONDS", "300"))
+
+_secret = os.environ.get("RESUME_TOKEN_SECRET", "")
+if not _secret:
+    # Tokens still work within this process, but other workers cannot verify them
+    logger.warning("RESUME_TOKEN_SECRET not set - resume tokens are only valid on this worker")
+    _secret = secrets.token_hex(32)
+SECRET = _secret.encode()
+
+
+def _b64(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode()
+
+
+def _unb64(data: str) -> bytes:
+    return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4))
+
+
+def issue_resume_token(game_code: str, role: str, player_id: Optional[str] = None) -> str:
+    """Sign the identity of a connection so it can resume after a restart"""
+    claims = {
+        "game_code": game_code,
+        "role": role,
+        "player_id": player_id,
+        "exp": int(time.time()) + RESUME_TOKEN_TTL_SECONDS
+    }
+    body = _b64(json.dumps(claims, separators=(",", ":")).encode())
+    signature = _b64(hmac.new(SECRET, body.encode(), hashlib.sha256).digest())
+    return f"{body}.{signature}"
+
+
+def verify_resume_token(token: str) -> Optional[Dict[str, Any]]:
+    """Return the token's claims, or None if it is malformed, forged or expired"""
+    try:
+        body, signature = token.split(".", 1)
+        expected = _b64(hmac.new(SECRET, body.encode(), hashlib.sha256).digest())
+        if not hmac.compare_digest(signature, expected):
+            return None
+        claims = json.loads(_unb64(body))
+    except (ValueError, json.JSONDecodeError):
+        return None
+
+    if claims.get("exp", 0) < time.time():
+        return None
+    return claims
@@ -0,0 +1,152 @@
+"""
+Room State - Authoritative in-memory state for live game rooms
+Timer, buzzer and display state are mirrored to the game document so rooms
+can be rebuilt after a restart
+"""
+from typing import Any, Dict, Optional
+import logging
+import os
+import time
+
+from models.game_models import GameStatus
+from services.content_cache import SharedContent, load_shared_content
+from services.live_patch import OVERRIDES_FIELD, plan_with_overrides
+from services.survivors import survivors_from_players
+from services.board_state import board_for_game
+from services.spin_engine import wheel_for_game
+
+logger = logging.getLogger(__name__)
+
+WARM_START_STATUSES = [GameStatus.ACTIVE.value, GameStatus.PAUSED.value]
+WARM_START_BATCH_SIZE = int(os.environ.get("WARM_START_BATCH_SIZE", "25"))
+WARM_START_LIMIT = int(os.environ.get("WARM_START_LIMIT", "500"))
+
+# Only the fields needed to rebuild a room - player details and history stay in Mongo
+ROOM_PROJECTION = {
+    "_id": 0,
+    "id": 1,
+    "code": 1,
+    "game_format": 1,
+    "status": 1,
+    "current_question_index": 1,
+    "content_hash": 1,
+    "content": 1,  # Only games saved before content was stored by hash
+    OVERRIDES_FIELD: 1,
+    "room_state": 1,
+    "players.id": 1,
+    "players.eliminated": 1,
+}
+
+
+def new_room_state() -> Dict[str, Any]:
+    """Empty state for a room that has not been loaded from the database"""
+    return {
+        "loaded": False,
+        "game_id": None,
+        "game_format": None,
+        "status": GameStatus.WAITING.value,
+        "question_index": 0,
+        "display": None,   # Last display:state payload
+        "timer": None,     # {"duration": seconds, "started_at": epoch seconds}
+        "buzzer": None,    # {"player_id": ..., "timestamp": ...}
+        "spin": None,      # {"seed": ..., "count": spins so far} - NO WHAMMY! only
+    }
+
+
+def apply_game_to_room(room: Dict[str, Any], game: Dict[str, Any], content: Optional[SharedContent]):
+    """Populate a room's state from a game document, sharing the process-wide copy of its content"""
+    persisted = game.get("room_state") or {}
+    state = room["state"]
+    state.update({
+        "loaded": True,
+        "game_id": game.get("id"),
+        "game_format": game.get("game_format"),
+        "status": game.get("status", GameStatus.WAITING.value),
+        "question_index": game.get("current_question_index", 0),
+        "display": persisted.get("display"),
+        "timer": persisted.get("timer"),
+        "buzzer": persisted.get("buzzer"),
+        "spin": persisted.get("spin"),
+    })
+    set_room_content(room, game.get("game_format", ""), content, persisted.get("board"), game.get(OVERRIDES_FIELD))
+    room["survivors"] = survivors_from_players(game.get("players", []))
+
+
+def set_room_content(room: Dict[str, Any], game_format: str, content: Optional[SharedContent],
+                     persisted_board: Optional[dict] = None, overrides: Optional[dict] = None):
+    """Point a room at shared content; only the board flags, wheel and patched questions are the room's own"""
+    room["content"] = content
+    room["plan"] = plan_with_overrides(content.plan(game_format), overrides) if content else []
+    room["board"] = board_for_game(game_format, content.content if content else None, persisted_board)
+    room["wheel"] = wheel_for_game(game_format, content.content if content else None)
+
+
+def apply_question_patch(room: Dict[str, Any], patch: Dict[str, Any]):
+    """Swap one patched question into a room and move its live counts and scores to the new result
+
+    The room stops sharing the compiled plan at the first patch (one list copy);
+    later patches replace entries in place.
+    """
+    index = patch["question_index"]
+    if not 0 <= index < len(room["plan"]):
+        return
+    if isinstance(room["plan"], tuple):
+        room["plan"] = list(room["plan"])
+    room["plan"][index] = patch["question"]
+
+    tally = room["tallies"].get(index)
+    mass = room.get("mass")
+    for change in patch.get("rescored", []):
+        if tally is not None and change["correct_delta"]:
+            tally.regrade(change["player_id"], change["correct"])
+        if mass is not None and change["player_id"] in mass.scores:
+            mass.scores[change["player_id"]] += change["points_delta"]
+            mass.correct_answers[change["player_id"]] += change["correct_delta"]
+
+
+def timer_remaining(timer: Optional[Dict[str, Any]], now: Optional[float] = None) -> Optional[float]:
+    """Seconds left on a running timer, None when no timer is running"""
+    if not timer:
+        return None
+    now = time.time() if now is None else now
+    return max(0.0, round(timer["started_at"] + timer["duration"] - now, 2))
+
+
+def room_snapshot(room: Dict[str, Any]) -> Dict[str, Any]:
+    """Client-facing view of a room, sent on (re)connect"""
+    state = room["state"]
+    return {
+        "status": state["status"],
+        "question_index": state["question_index"],
+        "question_count": len(room["plan"]),
+        "display": state["display"],
+        "timer": {
+            "duration": state["timer"]["duration"],
+            "remaining": timer_remaining(state["timer"])
+        } if state["timer"] else None,
+        "buzzer": state["buzzer"],
+        "board": room["board"].encode() if room.get("board") else None,
+        "mass": room.get("mass") is not None,
+    }
+
+
+async def warm_start_rooms(db, manager) -> int:
+    """Rebuild rooms for every active or paused game, in bounded batches"""
+    started = time.perf_counter()
+    cursor = db.games.find(
+        {"status": {"$in": WARM_START_STATUSES}},
+        ROOM_PROJECTION
+    ).limit(WARM_START_LIMIT).batch_size(WARM_START_BATCH_SIZE)
+
+    rebuilt = 0
+    while True:
+        batch = await cursor.to_list(WARM_START_BATCH_SIZE)
+        if not batch:
+            break
+        for game in batch:
+            apply_game_to_room(manager.ensure_room(game["code"]), game, await load_shared_content(db, game))
+        rebuilt += len(batch)
+
+    elapsed_ms = round((time.perf_counter() - started) * 1000, 1)
+    logger.info(f"Warm-started {rebuilt} live game rooms in {elapsed_ms}ms")
+    return rebuilt
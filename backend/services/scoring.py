@@ -0,0 +1,201 @@
+"""
+Scoring - Answer checking, points and persisted answer results
+Shared by the REST answer route and the player WebSocket
+"""
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+from typing import Any, Dict, Optional
+from datetime import datetime, timezone
+
+from models.game_models import GameFormat
+
+ANSWERS_COLLECTION = "answers"
+
+
+class AlreadyAnswered(Exception):
+    """The player already answered this question"""
+
+
+def calculate_points(game_format: str, question_data: dict, answer: Any, time_taken: float, is_correct: bool) -> int:
+    """Calculate points based on game format and answer"""
+    if not is_correct:
+        return 0
+    
+    base_points = 0
+    
+    if game_format == GameFormat.PERIL.value:
+        # Jeopardy-style: points based on clue value
+        base_points = question_data.get("value", 100)
+    
+    elif game_format == GameFormat.UR_FINAL_ANSWER.value:
+        # Millionaire: points based on question level
+        base_points = question_data.get("point_value", 100)
+    
+    elif game_format == GameFormat.SURVEY_SAYS.value:
+        # Family Feud: points based on answer ranking
+        base_points = question_data.get("percent", 0)
+    
+    elif game_format == GameFormat.LAST_CALL_STANDING.value:
+        # Survival bonus
+        base_points = 100 * question_data.get("difficulty", 1)
+    
+    elif game_format == GameFormat.PICK_OR_PASS.value:
+        # Case value
+        base_points = question_data.get("case_value", 100)
+    
+    elif game_format == GameFormat.LINK_REACTION.value:
+        # Chain multiplier
+        base_points = question_data.get("chain_value", 1) * 100
+    
+    elif game_format == GameFormat.CLOSEST_WINS.value:
+        # Estimation accuracy bonus
+        base_points = 500  # Full points for exact match
+    
+    elif game_format == GameFormat.NO_WHAMMY.value:
+        # Spin value
+        base_points = 200
+    
+    elif game_format == GameFormat.BACK_TO_SCHOOL.value:
+        # Grade level bonus
+        base_points = question_data.get("grade_level", 1) * 50
+    
+    elif game_format == GameFormat.QUIZ_CHASE.value:
+        # Difficulty multiplier
+        base_points = question_data.get("difficulty", 1) * 100
+    
+    elif game_format == GameFormat.PKWY_LIVE.value:
+        # Speed bonus
+        base_points = 100
+    
+    else:
+        base_points = 100
+    
+    # Speed bonus (up to 50% extra for fast answers)
+    time_limit = question_data.get("time_limit", 30)
+    if time_taken < time_limit:
+        speed_bonus = int(base_points * 0.5 * (1 - time_taken / time_limit))
+        base_points += speed_bonus
+    
+    return base_points
+
+
+def check_answer(game_format: str, question_data: dict, submitted_answer: Any) -> tuple[bool, Any]:
+    """Check if answer is correct, return (is_correct, correct_answer)"""
+    
+    if game_format in [
+        GameFormat.PERIL.value,
+        GameFormat.UR_FINAL_ANSWER.value,
+        GameFormat.LAST_CALL_STANDING.value,
+        GameFormat.PICK_OR_PASS.value,
+        GameFormat.NO_WHAMMY.value,
+        GameFormat.BACK_TO_SCHOOL.value,
+        GameFormat.QUIZ_CHASE.value,
+        GameFormat.PKWY_LIVE.value
+    ]:
+        # Multiple choice - compare letter answers
+        correct = question_data.get("correct_answer", "")
+        return str(submitted_answer).upper() == str(correct).upper(), correct
+    
+    elif game_format == GameFormat.SURVEY_SAYS.value:
+        # Survey - check if answer matches any in the list
+        answers = question_data.get("answers", [])
+        submitted_lower = str(submitted_answer).lower().strip()
+        
+        for ans in answers:
+            if ans["answer"].lower().strip() == submitted_lower:
+                return True, answers[0]["answer"]  # Return top answer
+        
+        return False, answers[0]["answer"] if answers else ""
+    
+    elif game_format == GameFormat.LINK_REACTION.value:
+        # Chain - direct answer match
+        correct = question_data.get("correct_answer", "")
+        return str(submitted_answer).lower().strip() == correct.lower().strip(), correct
+    
+    elif game_format == GameFormat.SPIN_TO_WIN.value:
+        # Puzzle - check letter guess or full answer
+        full_answer = question_data.get("full_answer", "")
+        submitted_lower = str(submitted_answer).lower().strip()
+        
+        # Check if it's a full answer attempt
+        if len(submitted_lower) > 1:
+            return submitted_lower == full_answer.lower().strip(), full_answer
+        
+        # It's a letter guess - check if in puzzle
+        return submitted_lower in full_answer.lower(), full_answer
+    
+    elif game_format == GameFormat.CLOSEST_WINS.value:
+        # Estimation - check if within range
+        correct_num = question_data.get("correct_number", 0)
+        acceptable_range = question_data.get("acceptable_range", 5)
+        over_rule = question_data.get("over_rule", False)
+        
+        try:
+            submitted_num = float(submitted_answer)
+        except (ValueError, TypeError):
+            return False, correct_num
+        
+        # Check over rule
+        if over_rule and submitted_num > correct_num:
+            return False, correct_num
+        
+        # Check if within range
+        is_correct = abs(submitted_num - correct_num) <= acceptable_range
+        return is_correct, correct_num
+    
+    elif game_format == GameFormat.CHAINED_UP.value:
+        # Word chain - check if guessed word is in chain
+        words = question_data.get("words", [])
+        submitted_lower = str(submitted_answer).lower().strip()
+        
+        for word in words:
+            if word.lower().strip() == submitted_lower:
+                return True, words
+        
+        return False, words
+    
+    return False, None
+
+
+async def score_answer(db, game_id: str, game_format: str, question_data: dict, player_id: str,
+                       answer: Any, time_taken: float, question_index: int) -> Optional[Dict[str, Any]]:
+    """Check, score and persist one answer; None if the player is not in the game
+
+    The answers collection holds one document per player and question (unique
+    index), so a repeated submission raises AlreadyAnswered instead of scoring twice.
+    """
+    is_correct, correct_answer = check_answer(game_format, question_data, answer)
+    points = calculate_points(game_format, question_data, answer, time_taken, is_correct)
+
+    claim = {"game_id": game_id, "question_index": question_index, "player_id": player_id}
+    try:
+        await db[ANSWERS_COLLECTION].insert_one({
+            **claim,
+            "answer": answer,
+            "time_taken": time_taken,
+            "correct": is_correct,
+            "points": points,
+            "submitted_at": datetime.now(timezone.utc).isoformat()
+        })
+    except DuplicateKeyError:
+        raise AlreadyAnswered(f"Question {question_index} already answered")
+
+    # Only the matched player comes back, not the whole roster
+    game = await db.games.find_one_and_update(
+        {"id": game_id, "players.id": player_id},
+        {"$inc": {"players.$.score": points, "players.$.correct_answers": 1 if is_correct else 0}},
+        projection={"_id": 0, "players.$": 1},
+        return_document=ReturnDocument.AFTER
+    )
+    if not game:
+        await db[ANSWERS_COLLECTION].delete_one(claim)
+        return None
+
+    player = game["players"][0]
+    return {
+        "correct": is_correct,
+        "points_earned": points,
+        "new_score": player["score"],
+        "correct_answer": correct_answer,
+        "player_name": player["name"]
+    }
@@ -0,0 +1,244 @@
+"""
+Sheet Import - Question banks from CSV/XLSX spreadsheets
+Columns are mapped to each format's fields with whole-column pandas operations:
+numbers are coerced, choices and list cells are assembled, and every check is
+a boolean mask. Only rows that fail a check are visited one by one, to report them
+"""
+import io
+import re
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from models.game_models import GameFormat
+from services.pack_validation import MAX_REPORTED_ERRORS, validate_pack
+
+# Cells holding several values (wrong answers, chain words) are split on this
+LIST_SEPARATOR = r"\s*\|\s*"
+# Optional column that splits one sheet into several packs
+PACK_COLUMN = "pack"
+TRUE_VALUES = {"true", "yes", "y", "1", "x"}
+FALSE_VALUES = {"false", "no", "n", "0", ""}
+
+
+class SheetError(ValueError):
+    """The sheet cannot be read or is missing columns the format needs"""
+
+
+@dataclass(frozen=True)
+class SheetSpec:
+    """How a format's items map to sheet columns"""
+    list_key: str
+    strings: Tuple[str, ...] = ()
+    ints: Tuple[str, ...] = ()
+    floats: Tuple[str, ...] = ()
+    bools: Tuple[str, ...] = ()
+    optional: Tuple[str, ...] = ()
+    lists: Tuple[str, ...] = ()
+    choices: bool = False
+    # Rows sharing this column become one group (category) holding the items
+    group: Optional[str] = None
+    group_items: Optional[str] = None
+    # SURVEY SAYS! answer_1/percent_1 ... column pairs
+    survey_answers: bool = False
+
+
+CHOICE_QUESTION = dict(strings=("question_text",), ints=("difficulty",), choices=True)
+
+SHEET_SPECS: Dict[str, SheetSpec] = {
+    GameFormat.PKWY_LIVE.value: SheetSpec("questions", **CHOICE_QUESTION),
+    GameFormat.LAST_CALL_STANDING.value: SheetSpec("questions", **CHOICE_QUESTION),
+    GameFormat.UR_FINAL_ANSWER.value: SheetSpec("questions", strings=("question_text",),
+                                                ints=("point_value", "difficulty"), choices=True),
+    GameFormat.BACK_TO_SCHOOL.value: SheetSpec("questions", strings=("subject", "question_text"),
+                                               ints=("grade_level",), choices=True),
+    GameFormat.QUIZ_CHASE.value: SheetSpec("categories", **CHOICE_QUESTION,
+                                           group="category_title", group_items="questions"),
+    GameFormat.LINK_REACTION.value: SheetSpec("questions", strings=("question_text", "correct_answer"),
+                                              ints=("chain_value", "penalty_value"), lists=("wrong_answers",)),
+    GameFormat.PERIL.value: SheetSpec("categories", strings=("clue_text", "correct_answer"),
+                                      ints=("value", "difficulty"), lists=("wrong_answers",),
+                                      group="category_title", group_items="clues"),
+    GameFormat.PICK_OR_PASS.value: SheetSpec("cases", strings=("question_text",),
+                                             ints=("case_number", "case_value", "tension_meter"),
+                                             lists=("wrong_answers",), choices=True),
+    GameFormat.CLOSEST_WINS.value: SheetSpec("numbers", strings=("question_text",),
+                                             floats=("correct_number", "acceptable_range"), bools=("over_rule",)),
+    GameFormat.SPIN_TO_WIN.value: SheetSpec("puzzles", strings=("category", "puzzle_with_blanks", "full_answer"),
+                                            optional=("bonus_letter",)),
+    GameFormat.CHAINED_UP.value: SheetSpec("chains", strings=("chain_title", "explanation"), lists=("words",)),
+    GameFormat.SURVEY_SAYS.value: SheetSpec("survey_questions", strings=("question",), survey_answers=True),
+}
+
+
+@dataclass
+class SheetResult:
+    """Packs built from the good rows, and what was wrong with the rest"""
+    packs: List[Tuple[Optional[str], Dict[str, Any]]]
+    rows: int
+    imported_rows: int
+    errors: List[Dict[str, Any]] = field(default_factory=list)
+    bad_rows: int = 0
+
+
+def read_sheet(raw: bytes, file_name: str) -> pd.DataFrame:
+    """Every cell as a stripped string, headers in snake_case"""
+    try:
+        if file_name.lower().endswith((".xlsx", ".xls")):
+            frame = pd.read_excel(io.BytesIO(raw), dtype=str)
+        else:
+            frame = pd.read_csv(io.BytesIO(raw), dtype=str, keep_default_na=False, skipinitialspace=True)
+    except ImportError as e:
+        raise SheetError(f"Spreadsheet support is not installed on this server: {str(e)}")
+    except (ValueError, pd.errors.ParserError, UnicodeDecodeError) as e:
+        raise SheetError(f"Could not read sheet: {str(e)}")
+
+    frame.columns = (
+        frame.columns.astype(str).str.strip().str.lower().str.replace(r"[^a-z0-9]+", "_", regex=True).str.strip("_")
+    )
+    frame = frame.fillna("").astype(str).apply(lambda column: column.str.strip())
+    frame.index = frame.index + 2  # spreadsheet row numbers, after the header
+    return frame[(frame != "").any(axis=1)]
+
+
+def _numbered(frame: pd.DataFrame, name: str) -> List[str]:
+    """name_1, name_2 ... columns (singular names too), in order"""
+    singular = name[:-1] if name.endswith("s") else name
+    pattern = re.compile(rf"(?:{re.escape(name)}|{re.escape(singular)})_(\d+)")
+    found = [(int(m.group(1)), c) for c in frame.columns if (m := pattern.fullmatch(c))]
+    return [c for _, c in sorted(found)]
+
+
+def _list_column(frame: pd.DataFrame, name: str) -> pd.Series:
+    """Lists from a '|'-separated column, or from numbered columns"""
+    if name in frame:
+        return frame[name].str.split(LIST_SEPARATOR).map(lambda values: [v for v in values if v])
+    columns = _numbered(frame, name)
+    stacked = frame[columns].replace("", np.nan).stack().dropna()
+    lists = stacked.groupby(level=0).agg(list)
+    return lists.reindex(frame.index).map(lambda values: values if isinstance(values, list) else [])
+
+
+def _choices(frame: pd.DataFrame, problems: List[Tuple[pd.Series, str]]) -> Tuple[pd.Series, pd.Series]:
+    """({"A": ..., "B": ...} per row with only filled letters, normalized answer letters)
+
+    Rows are grouped by which letters they fill, so each group is one to_dict call.
+    """
+    letters = {c: m.group(1).upper() for c in frame.columns if (m := re.fullmatch(r"(?:choice_)?([a-f])", c))}
+    columns = sorted(letters, key=letters.get)
+    filled = frame[columns] != ""
+    pattern = filled.to_numpy().dot(1 << np.arange(len(columns))) if columns else np.zeros(len(frame), dtype=int)
+
+    choices = pd.Series([None] * len(frame), index=frame.index, dtype=object)
+    for code in np.unique(pattern):
+        rows = pattern == code
+        used = [c for i, c in enumerate(columns) if code >> i & 1]
+        block = frame.loc[rows, used].rename(columns=letters).astype(object)
+        choices[rows] = block.to_dict("records") if used else [{}] * int(rows.sum())
+
+    answer = frame["correct_answer"].str.upper().str.replace(r"^CHOICE[ _]?", "", regex=True)
+    matches = pd.Series(False, index=frame.index)
+    for column in columns:
+        matches |= (answer == letters[column]) & filled[column]
+    problems.append((filled.sum(axis=1) < 2, "needs at least two choices (columns A, B, ...)"))
+    problems.append((~matches, "correct_answer must be the letter of a filled choice"))
+    return choices, answer
+
+
+def _survey_answers(frame: pd.DataFrame, problems: List[Tuple[pd.Series, str]]) -> pd.Series:
+    answers = _numbered(frame, "answer")
+    percents = {c.rsplit("_", 1)[1]: c for c in _numbered(frame, "percent")}
+    long = []
+    for column in answers:
+        number = column.rsplit("_", 1)[1]
+        percent = pd.to_numeric(frame[percents[number]], errors="coerce") if number in percents else np.nan
+        part = pd.DataFrame({"answer": frame[column], "percent": percent, "order": int(number)}, index=frame.index)
+        long.append(part[part["answer"] != ""])
+    stacked = pd.concat(long) if long else pd.DataFrame({"answer": [], "percent": [], "order": []})
+    bad_percent = ~np.isfinite(stacked["percent"].astype(float)) | (stacked["percent"].mod(1).fillna(0) != 0)
+    problems.append((bad_percent.groupby(level=0).any().reindex(frame.index, fill_value=False),
+                     "every answer needs a whole-number percent"))
+    problems.append((stacked.groupby(level=0).size().reindex(frame.index, fill_value=0) == 0,
+                     "needs at least one answer (answer_1, percent_1, ...)"))
+    stacked = stacked[~bad_percent].sort_values("order", kind="stable")
+    records = pd.Series(
+        stacked[["answer", "percent"]].astype({"percent": "int64"}).to_dict("records"), index=stacked.index, dtype=object
+    )
+    lists = records.groupby(level=0).agg(list)
+    return lists.reindex(frame.index).map(lambda values: values if isinstance(values, list) else [])
+
+
+def convert_sheet(frame: pd.DataFrame, game_format: str, pack_name: Optional[str] = None) -> SheetResult:
+    """Good rows as ready-to-store pack content (one per 'pack' column value), bad rows as errors"""
+    spec = SHEET_SPECS.get(game_format)
+    if spec is None:
+        raise SheetError(f"{game_format} packs cannot be imported from a sheet")
+
+    required = list(spec.strings + spec.ints + spec.floats + spec.bools + ((spec.group,) if spec.group else ()))
+    if spec.choices:
+        required.append("correct_answer")
+    required += [name for name in spec.lists if name not in frame and not _numbered(frame, name)]
+    missing = [name for name in required if name not in frame]
+    if missing:
+        raise SheetError(f"Sheet is missing column(s) for {game_format}: {', '.join(missing)}")
+
+    problems: List[Tuple[pd.Series, str]] = []
+    items = pd.DataFrame(index=frame.index)
+    for name in spec.strings + ((spec.group,) if spec.group else ()):
+        items[name] = frame[name]
+        problems.append((frame[name] == "", f"{name} is empty"))
+    for name in spec.optional:
+        if name in frame:
+            items[name] = frame[name]
+    for name in spec.ints + spec.floats:
+        number = pd.to_numeric(frame[name], errors="coerce")
+        bad = ~np.isfinite(number)
+        if name in spec.ints:
+            bad |= number.mod(1).fillna(0) != 0
+        number = number.where(~bad, 0)
+        problems.append((bad, f"{name} must be a {'whole ' if name in spec.ints else ''}number"))
+        items[name] = number.astype("int64") if name in spec.ints else number
+    for name in spec.bools:
+        lowered = frame[name].str.lower()
+        problems.append((~lowered.isin(TRUE_VALUES | FALSE_VALUES), f"{name} must be yes or no"))
+        items[name] = lowered.isin(TRUE_VALUES)
+    for name in spec.lists:
+        items[name] = _list_column(frame, name)
+        problems.append((items[name].map(len) == 0, f"{name} is empty"))
+    if spec.choices:
+        items["choices"], items["correct_answer"] = _choices(frame, problems)
+    if spec.survey_answers:
+        items["answers"] = _survey_answers(frame, problems)
+
+    bad = np.zeros(len(frame), dtype=bool)
+    for mask, _ in problems:
+        bad |= mask.to_numpy()
+    row_errors: Dict[int, List[str]] = {}
+    for mask, message in problems:
+        for row in frame.index[mask.to_numpy()]:
+            row_errors.setdefault(int(row), []).append(message)
+
+    good = items[~bad]
+    groups = frame.loc[~bad, PACK_COLUMN] if PACK_COLUMN in frame else pd.Series(pack_name, index=good.index)
+    packs = []
+    for name, rows in good.groupby(groups.fillna(""), sort=False):
+        if spec.group:
+            entries = [
+                {spec.group: title, spec.group_items: block.drop(columns=[spec.group]).to_dict("records")}
+                for title, block in rows.groupby(spec.group, sort=False)
+            ]
+        else:
+            entries = rows.to_dict("records")
+        content = validate_pack(game_format, {"game_name": game_format, spec.list_key: entries})
+        packs.append((name or pack_name, content))
+
+    errors = [{"row": row, "errors": messages} for row, messages in sorted(row_errors.items())]
+    return SheetResult(
+        packs=packs,
+        rows=len(frame),
+        imported_rows=len(good),
+        errors=errors[:MAX_REPORTED_ERRORS],
+        bad_rows=len(errors)
+    )
@@ -0,0 +1,83 @@
+"""
+Spin Engine - Server-side NO WHAMMY! board spins
+Each board is precomputed into an alias table so a spin is O(1), and every
+outcome comes from a per-game seed so any spin can be replayed exactly
+"""
+from functools import lru_cache
+from typing import Optional, Sequence, Tuple
+import random
+import secrets
+
+from models.game_models import GameFormat
+
+SPIN_FORMATS = {GameFormat.NO_WHAMMY.value}
+
+# Panels without a weight are equally likely
+DEFAULT_PANEL_WEIGHT = 1.0
+
+
+class AliasTable:
+    """Walker/Vose alias table: O(n) to build, O(1) per draw"""
+
+    __slots__ = ("prob", "alias")
+
+    def __init__(self, weights: Sequence[float]):
+        n = len(weights)
+        total = float(sum(weights))
+        if n == 0 or total <= 0 or any(w < 0 for w in weights):
+            raise ValueError("Spin board needs at least one panel with a positive weight")
+
+        scaled = [w * n / total for w in weights]
+        self.prob = [1.0] * n
+        self.alias = list(range(n))
+        small = [i for i, p in enumerate(scaled) if p < 1.0]
+        large = [i for i, p in enumerate(scaled) if p >= 1.0]
+        while small and large:
+            low, high = small.pop(), large.pop()
+            self.prob[low] = scaled[low]
+            self.alias[low] = high
+            scaled[high] -= 1.0 - scaled[low]
+            (small if scaled[high] < 1.0 else large).append(high)
+        # Leftovers are 1.0 up to float error
+
+    def __len__(self) -> int:
+        return len(self.prob)
+
+    def sample(self, rng: random.Random) -> int:
+        """Draw one panel index"""
+        column = rng.randrange(len(self.prob))
+        return column if rng.random() < self.prob[column] else self.alias[column]
+
+
+@lru_cache(maxsize=1024)
+def alias_table(weights: Tuple[float, ...]) -> AliasTable:
+    """Shared table per distinct board - identical boards across games cost nothing extra"""
+    return AliasTable(weights)
+
+
+def board_weights(board: Optional[list]) -> Tuple[float, ...]:
+    return tuple(float(panel.get("weight", DEFAULT_PANEL_WEIGHT)) for panel in board or [])
+
+
+def wheel_for_game(game_format: str, content: Optional[dict]) -> Optional[AliasTable]:
+    """Spin table for a game's board, None for formats without spins or an unusable board"""
+    if game_format not in SPIN_FORMATS:
+        return None
+    try:
+        return alias_table(board_weights((content or {}).get("board")))
+    except (TypeError, ValueError):
+        return None
+
+
+def new_spin_seed() -> str:
+    return secrets.token_hex(8)
+
+
+def spin_rng(seed: str, spin: int) -> random.Random:
+    """Random source for one spin - string seeds hash the same in every process"""
+    return random.Random(f"{seed}:{spin}")
+
+
+def draw_panel(table: AliasTable, seed: str, spin: int) -> int:
+    """Panel landed on by spin number `spin` of a game seeded with `seed`"""
+    return table.sample(spin_rng(seed, spin))
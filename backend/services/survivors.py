@@ -0,0 +1,35 @@
+"""
+Survivors - Who is still in an elimination game
+The room keeps the survivor set in memory; eliminations are written as one
+array-filtered update however many players go out
+"""
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+
+def survivors_from_players(players: Iterable[Dict[str, Any]]) -> Set[str]:
+    """Ids of players not yet eliminated"""
+    return {p["id"] for p in players if not p.get("eliminated")}
+
+
+def players_to_eliminate(survivors: Set[str], correct_players: Optional[Set[str]]) -> List[str]:
+    """Survivors who answered wrong or not at all
+
+    If that would knock out everyone still standing, nobody goes out - the
+    round is replayed rather than ending the game with no winner.
+    """
+    out = survivors - (correct_players or set())
+    if out == survivors:
+        return []
+    return sorted(out)
+
+
+async def eliminate_players(db, query: dict, player_ids: List[str]) -> int:
+    """Flag many players as eliminated in a single atomic update"""
+    if not player_ids:
+        return 0
+    result = await db.games.update_one(
+        query,
+        {"$set": {"players.$[out].eliminated": True}},
+        array_filters=[{"out.id": {"$in": player_ids}}]
+    )
+    return result.modified_count
@@ -3,60 +3,158 @@ WebSocket Manager for Real-time Game Communication
 Handles Director <-> TV Display <-> Players sync
 """
 from fastapi import WebSocket, WebSocketDisconnect
-from typing import Dict, List, Set, Optional
+from typing import Dict, List, Set, Optional, Tuple
+from dataclasses import asdict
+import asyncio
 import json
 import logging
+import os
+import random
+import time
 from datetime import datetime, timezone
 
+from services.room_state import (
+    ROOM_PROJECTION, apply_game_to_room, new_room_state, room_snapshot
+)
+from services.content_cache import load_shared_content
+from services.resume_tokens import issue_resume_token
+from services.event_log import event_log
+from services.game_state import GameNotFound, InvalidTransition, move_question, transition_status
+from services.question_plan import plan_question
+from services.scoring import AlreadyAnswered, score_answer
+from services.answer_tally import AnswerTally, question_choices, save_tally
+from services.survivors import eliminate_players, players_to_eliminate
+from services.board_state import BOARD_FLAGS, board_diff
+from services.spin_engine import draw_panel, new_spin_seed
+from services.autopilot import AUTOPILOT_FORMATS, AutopilotTiming, autopilots
+from services.mass_audience import MASS_BATCH_SECONDS, MASS_BATCH_SIZE, MASS_FORMATS, MassAudience
+from services.leaderboard import TOP_N, LeaderboardThrottle, publish_final, publish_leaderboard
+from models.game_models import GameFormat
+
 logger = logging.getLogger(__name__)
 
+# Player sends are split into shards that go out concurrently, so one slow
+# phone only delays its own shard
+FANOUT_SHARD_SIZE = int(os.environ.get("FANOUT_SHARD_SIZE", "250"))
+
 
 class ConnectionManager:
     """Manages WebSocket connections for real-time game communication"""
     
     def __init__(self):
         # Store connections by game code
-        # Structure: {game_code: {"directors": set(), "tv_displays": set(), "players": {player_id: websocket}}}
+        # Structure: {game_code: {"directors": set(), "tv_displays": set(), "players": {player_id: websocket},
+        #                         "state": {...room state...}, "content": SharedContent or None,
+        #                         "plan": [compiled questions, shared with other rooms on the same content],
+        #                         "tallies": {question_index: AnswerTally},
+        #                         "survivors": {player ids not eliminated},
+        #                         "board": BoardState or None,
+        #                         "wheel": AliasTable for NO WHAMMY! spins or None,
+        #                         "mass": MassAudience when mass-audience mode is on}}
         self.game_rooms: Dict[str, Dict] = {}
+        # When draining, new joins are redirected and live sockets told to reconnect elsewhere
+        self.draining = False
+        # Handler calls still writing to the database
+        self._inflight: Set[asyncio.Task] = set()
     
-    def _ensure_room(self, game_code: str):
-        """Ensure game room exists"""
+    def ensure_room(self, game_code: str) -> Dict:
+        """Ensure game room exists and return it"""
         if game_code not in self.game_rooms:
             self.game_rooms[game_code] = {
                 "directors": set(),
                 "tv_displays": set(),
-                "players": {}
+                "players": {},
+                "state": new_room_state(),
+                "content": None,
+                "plan": [],
+                "tallies": {},
+                "survivors": set(),
+                "board": None,
+                "wheel": None,
+                "mass": None
             }
+        return self.game_rooms[game_code]
+    
+    def find_room(self, game_id: str) -> Optional[Dict]:
+        """Loaded room for a game id, if this worker is hosting it"""
+        hosted = self.find_hosted_room(game_id)
+        return hosted[1] if hosted else None
+    
+    def find_hosted_room(self, game_id: str) -> Optional[Tuple[str, Dict]]:
+        """(game code, room) for a game id, if this worker is hosting it"""
+        for game_code, room in self.game_rooms.items():
+            if room["state"]["game_id"] == game_id:
+                return game_code, room
+        return None
+    
+    async def _send_room_state(self, websocket: WebSocket, game_code: str):
+        """Send the current room snapshot to a newly connected socket"""
+        room = self.game_rooms[game_code]
+        if room["state"]["loaded"]:
+            await websocket.send_text(json.dumps({
+                "event": "room:state",
+                "data": room_snapshot(room)
+            }))
     
-    async def connect_director(self, websocket: WebSocket, game_code: str):
+    async def connect_director(self, websocket: WebSocket, game_code: str) -> bool:
         """Connect a director to a game room"""
         await websocket.accept()
-        self._ensure_room(game_code)
+        if self.draining:
+            await self._redirect(websocket, game_code, "director")
+            return False
+        self.ensure_room(game_code)
         self.game_rooms[game_code]["directors"].add(websocket)
         logger.info(f"Director connected to game {game_code}")
+        await self._send_room_state(websocket, game_code)
+        return True
     
-    async def connect_tv(self, websocket: WebSocket, game_code: str):
+    async def connect_tv(self, websocket: WebSocket, game_code: str) -> bool:
         """Connect a TV display to a game room"""
         await websocket.accept()
-        self._ensure_room(game_code)
+        if self.draining:
+            await self._redirect(websocket, game_code, "tv")
+            return False
+        self.ensure_room(game_code)
         self.game_rooms[game_code]["tv_displays"].add(websocket)
         logger.info(f"TV display connected to game {game_code}")
+        await self._send_room_state(websocket, game_code)
+        return True
     
-    async def connect_player(self, websocket: WebSocket, game_code: str, player_id: str):
+    async def connect_player(self, websocket: WebSocket, game_code: str, player_id: str,
+                             resumed: bool = False) -> bool:
         """Connect a player to a game room"""
         await websocket.accept()
-        self._ensure_room(game_code)
+        if self.draining:
+            await self._redirect(websocket, game_code, "player", player_id)
+            return False
+        self.ensure_room(game_code)
         self.game_rooms[game_code]["players"][player_id] = websocket
-        logger.info(f"Player {player_id} connected to game {game_code}")
+        logger.info(f"Player {player_id} {'resumed' if resumed else 'connected'} in game {game_code}")
+        await self._send_room_state(websocket, game_code)
+        
+        if resumed:
+            # Already counted in the room before the restart
+            return True
         
         # Notify others of new player
-        await self.broadcast_to_game(game_code, {
+        notice = {
             "event": "player:joined",
             "data": {
                 "player_id": player_id,
                 "players_count": len(self.game_rooms[game_code]["players"])
             }
-        })
+        }
+        await self.announce_join(game_code, notice)
+        return True
+    
+    async def announce_join(self, game_code: str, notice: dict):
+        """Send a player:joined notice - to the screens only in mass-audience rooms"""
+        if self.game_rooms[game_code]["mass"] is not None:
+            # Thousands of phones don't need to hear about every join
+            await self.send_to_tvs(game_code, notice)
+            await self.send_to_directors(game_code, notice)
+        else:
+            await self.broadcast_to_game(game_code, notice)
     
     def disconnect_director(self, websocket: WebSocket, game_code: str):
         """Disconnect a director"""
@@ -101,12 +199,27 @@ class ConnectionManager:
                     logger.error(f"Error sending to TV: {e}")
         
         # Send to players
-        for player_id, ws in room["players"].items():
-            if ws != exclude_websocket:
-                try:
-                    await ws.send_text(message_json)
-                except Exception as e:
-                    logger.error(f"Error sending to player {player_id}: {e}")
+        await self._fan_out([
+            (player_id, ws, message_json)
+            for player_id, ws in room["players"].items() if ws != exclude_websocket
+        ])
+    
+    async def _send_shard(self, sends: list):
+        for player_id, ws, text in sends:
+            try:
+                await ws.send_text(text)
+            except Exception as e:
+                logger.error(f"Error sending to player {player_id}: {e}")
+    
+    async def _fan_out(self, sends: list):
+        """Send (player_id, websocket, text) triples, sharded across concurrent tasks for big rooms"""
+        if len(sends) <= FANOUT_SHARD_SIZE:
+            await self._send_shard(sends)
+            return
+        await asyncio.gather(*(
+            self._send_shard(sends[i:i + FANOUT_SHARD_SIZE])
+            for i in range(0, len(sends), FANOUT_SHARD_SIZE)
+        ))
     
     async def send_to_directors(self, game_code: str, message: dict):
         """Send message only to directors"""
@@ -138,11 +251,19 @@ class ConnectionManager:
             return
         
         message_json = json.dumps(message)
-        for player_id, ws in self.game_rooms[game_code]["players"].items():
-            try:
-                await ws.send_text(message_json)
-            except Exception as e:
-                logger.error(f"Error sending to player {player_id}: {e}")
+        await self._fan_out([
+            (player_id, ws, message_json) for player_id, ws in self.game_rooms[game_code]["players"].items()
+        ])
+    
+    async def send_personal(self, game_code: str, messages):
+        """Send each player their own pre-serialized message: (player_id, text) pairs"""
+        if game_code not in self.game_rooms:
+            return
+        
+        players = self.game_rooms[game_code]["players"]
+        await self._fan_out([
+            (player_id, players[player_id], text) for player_id, text in messages if player_id in players
+        ])
     
     async def send_to_player(self, game_code: str, player_id: str, message: dict):
         """Send message to a specific player"""
@@ -167,141 +288,591 @@ class ConnectionManager:
         if game_code in self.game_rooms:
             return list(self.game_rooms[game_code]["players"].keys())
         return []
+    
+    async def track(self, coro):
+        """Run a handler so drain() can wait for its database writes to land"""
+        task = asyncio.ensure_future(coro)
+        self._inflight.add(task)
+        task.add_done_callback(self._inflight.discard)
+        # Shielded: a socket dropping mid-handler must not abandon a half-done write
+        return await asyncio.shield(task)
+    
+    async def _send_reconnect_hint(self, websocket: WebSocket, game_code: str, role: str,
+                                   player_id: Optional[str] = None, retry_after_ms: int = 500):
+        """Tell a client to reconnect (to another worker) and how to resume"""
+        try:
+            await websocket.send_text(json.dumps({
+                "event": "server:reconnect",
+                "data": {
+                    "resume_token": issue_resume_token(game_code, role, player_id),
+                    # Jitter so a whole bar doesn't reconnect in the same millisecond
+                    "retry_after_ms": retry_after_ms + random.randint(0, retry_after_ms)
+                }
+            }))
+        except Exception as e:
+            logger.error(f"Error sending reconnect hint to {role}: {e}")
+    
+    async def _redirect(self, websocket: WebSocket, game_code: str, role: str, player_id: Optional[str] = None):
+        """Turn away a new connection while draining"""
+        await self._send_reconnect_hint(websocket, game_code, role, player_id)
+        # 1013 Try Again Later - the load balancer should pick a fresh worker
+        await websocket.close(code=1013)
+    
+    def _all_connections(self):
+        """Yield (game_code, role, player_id, websocket) for every live socket"""
+        for game_code, room in list(self.game_rooms.items()):
+            for ws in list(room["directors"]):
+                yield game_code, "director", None, ws
+            for ws in list(room["tv_displays"]):
+                yield game_code, "tv", None, ws
+            for player_id, ws in list(room["players"].items()):
+                yield game_code, "player", player_id, ws
+    
+    async def drain(self, grace_seconds: float = 5.0) -> Dict[str, int]:
+        """Stop taking joins, hand every client a resume token, flush writes, then close"""
+        self.draining = True
+        connections = list(self._all_connections())
+        logger.info(f"Draining {len(connections)} connections across {len(self.game_rooms)} rooms")
+        
+        await asyncio.gather(*(
+            self._send_reconnect_hint(ws, game_code, role, player_id)
+            for game_code, role, player_id, ws in connections
+        ))
+        
+        pending = len(self._inflight)
+        if self._inflight:
+            await asyncio.wait(set(self._inflight), timeout=grace_seconds)
+        
+        for *_, ws in connections:
+            try:
+                # 1012 Service Restart
+                await ws.close(code=1012)
+            except Exception:
+                pass
+        
+        return {"connections": len(connections), "flushed_writes": pending - len(self._inflight)}
+    
+    def undrain(self):
+        """Accept joins again (a drain that was called off)"""
+        if self.draining:
+            logger.info("Drain cancelled - accepting connections again")
+        self.draining = False
 
 
 # Global connection manager instance
 manager = ConnectionManager()
 
 
+async def load_room(game_code: str, db):
+    """Load a room's state and question plan from the database if not already loaded"""
+    room = manager.ensure_room(game_code)
+    if room["state"]["loaded"]:
+        return room
+    
+    game = await db.games.find_one({"code": game_code}, ROOM_PROJECTION)
+    if game:
+        apply_game_to_room(room, game, await load_shared_content(db, game))
+    return room
+
+
+def sync_room(game: dict):
+    """Mirror a committed status/question transition into a live room"""
+    room = manager.game_rooms.get(game["code"])
+    if room and room["state"]["loaded"]:
+        room["state"]["status"] = game["status"]
+        if room["state"]["question_index"] != game["current_question_index"]:
+            room["state"].update(question_index=game["current_question_index"], timer=None, buzzer=None)
+
+
+async def update_room_state(game_code: str, db, extra_set: Optional[dict] = None, **fields):
+    """Update in-memory room state and mirror it to the game document in one write"""
+    room = manager.ensure_room(game_code)
+    room["state"].update(fields)
+    
+    persisted = {f"room_state.{k}": v for k, v in fields.items() if k in ("display", "timer", "buzzer", "spin")}
+    persisted.update(extra_set or {})
+    if persisted:
+        await db.games.update_one({"code": game_code}, {"$set": persisted})
+
+
+async def record_event(game_code: str, db, event: str, data: Optional[dict] = None, source: str = "director"):
+    """Append an event to the game's event stream"""
+    room = await load_room(game_code, db)
+    game_id = room["state"]["game_id"]
+    if game_id:
+        await event_log.append(db, game_id, event, data, source)
+
+
+async def send_director_error(game_code: str, event: str, message: str):
+    """Tell directors a command was rejected"""
+    await manager.send_to_directors(game_code, {
+        "event": "error",
+        "data": {"event": event, "message": message}
+    })
+
+
+async def send_answer_rejected(game_code: str, player_id: str, question_index: int, reason: str):
+    """Tell a player their answer was not scored"""
+    await manager.send_to_player(game_code, player_id, {
+        "event": "answer:ack",
+        "data": {"accepted": False, "question_index": question_index, "reason": reason}
+    })
+
+
+def count_answer(room: dict, question_index: int, answer, correct: bool,
+                 player_id: Optional[str] = None) -> AnswerTally:
+    """Add a scored answer to the room's live distribution - O(1) per answer"""
+    tally = room["tallies"].get(question_index)
+    if tally is None:
+        tally = room["tallies"][question_index] = AnswerTally(question_index)
+    tally.add(answer, correct, player_id)
+    return tally
+
+
+def current_distribution(room: dict, question_index: int) -> dict:
+    """Live answer distribution for a question, zeros if nobody answered yet"""
+    tally = room["tallies"].get(question_index) or AnswerTally(question_index)
+    return tally.distribution(question_choices(plan_question(room["plan"], question_index)))
+
+
+async def close_question(game_code: str, db, question_index: int) -> Optional[AnswerTally]:
+    """Stop counting a question and write its distribution to the analytics"""
+    room = await load_room(game_code, db)
+    tally = room["tallies"].pop(question_index, None)
+    if tally is None or not room["state"]["game_id"]:
+        return None
+    choices = question_choices(plan_question(room["plan"], question_index))
+    await save_tally(db, room["state"]["game_id"], tally, choices)
+    return tally
+
+
+async def eliminate_at_close(game_code: str, db, question_index: int, tally: Optional[AnswerTally]):
+    """Knock out every survivor without a correct answer in one write and one broadcast"""
+    room = manager.ensure_room(game_code)
+    out = players_to_eliminate(room["survivors"], tally.correct_players if tally else None)
+    if not out:
+        return
+    
+    await eliminate_players(db, {"code": game_code}, out)
+    room["survivors"].difference_update(out)
+    await record_event(game_code, db, "players:eliminated", {"player_ids": out, "question_index": question_index})
+    await manager.broadcast_to_game(game_code, {
+        "event": "players:eliminated",
+        "data": {
+            "player_ids": out,
+            "question_index": question_index,
+            "survivors_count": len(room["survivors"])
+        }
+    })
+
+
+async def enable_mass_audience(game_code: str, db, room: dict) -> MassAudience:
+    """Switch a room to batched answers and personal leaderboards"""
+    if room["mass"] is None:
+        game = await db.games.find_one(
+            {"code": game_code},
+            {"_id": 0, "players.id": 1, "players.name": 1, "players.score": 1, "players.correct_answers": 1}
+        )
+        mass = MassAudience(room["state"]["game_id"], room["state"]["game_format"], (game or {}).get("players", []))
+        await mass.load_answered(db)
+        room["mass"] = mass
+    return room["mass"]
+
+
+async def disable_mass_audience(game_code: str, db, room: dict):
+    """Score whatever is queued, then go back to per-answer handling"""
+    if room["mass"] is not None:
+        await flush_mass_answers(game_code, db)
+        room["mass"] = None
+
+
+async def submit_mass_answer(game_code: str, db, mass: MassAudience, player_id: str, question_index: int,
+                             answer, time_taken: float) -> dict:
+    """Queue an answer that arrived outside the player's socket and wait for its batch; the ack data"""
+    rejected = mass.submit(player_id, question_index, answer, time_taken)
+    if rejected:
+        return {"accepted": False, "question_index": question_index, "reason": rejected}
+    future = asyncio.get_running_loop().create_future()
+    mass.waiters[(player_id, question_index)] = future
+    queue_mass_answer(game_code, db, mass)
+    return await future
+
+
+def apply_mass_scores(game_code: str, results: List[dict]):
+    """Mirror scores written outside the answer batches into a mass room's in-memory standings"""
+    room = manager.game_rooms.get(game_code)
+    if room is None or room["mass"] is None:
+        return
+    room["mass"].apply_scores([r for r in results if r["player_id"] in room["mass"].scores])
+
+
+def queue_mass_answer(game_code: str, db, mass: MassAudience):
+    """Make sure a flush is coming: straight away for a full batch, else after MASS_BATCH_SECONDS"""
+    if mass.flush_task is None or mass.flush_task.done():
+        mass.flush_task = asyncio.create_task(_mass_flush_loop(game_code, db, mass))
+
+
+async def _mass_flush_loop(game_code: str, db, mass: MassAudience):
+    while mass.queue:
+        if len(mass.queue) < MASS_BATCH_SIZE:
+            await asyncio.sleep(MASS_BATCH_SECONDS)
+        try:
+            await flush_mass_answers(game_code, db)
+        except Exception as e:
+            # Keep going: answers queued behind this batch still need their acks
+            logger.error(f"Mass answer flush failed for {game_code}: {e}")
+
+
+async def flush_mass_answers(game_code: str, db):
+    """Score, persist and acknowledge every queued mass-audience answer"""
+    room = manager.ensure_room(game_code)
+    mass = room["mass"]
+    if mass is None:
+        return
+    
+    async with mass.flush_lock:
+        batch = mass.take_batch()
+        if not batch:
+            return
+        results = mass.score_batch(room["plan"], batch)
+        try:
+            await mass.persist(db, results)
+        except Exception as e:
+            # Nothing from this batch counts; players are told and may answer again
+            logger.error(f"Mass answer batch for {game_code} not saved: {e}")
+            for r in results:
+                if "rejected" not in r:
+                    mass.reject(r, "Answer could not be saved", retry=True)
+        mass.apply_scores(results)
+    
+    acks, questions = [], {}
+    for r in results:
+        if "rejected" in r:
+            data = {"accepted": False, "question_index": r["question_index"], "reason": r["rejected"]}
+        else:
+            count_answer(room, r["question_index"], r["answer"], r["correct"], r["player_id"])
+            questions[r["question_index"]] = questions.get(r["question_index"], 0) + 1
+            data = {key: r[key] for key in ("question_index", "correct", "points_earned", "new_score", "correct_answer")}
+            data["accepted"] = True
+        acks.append((r["player_id"], json.dumps({"event": "answer:ack", "data": data})))
+        waiter = mass.waiters.pop((r["player_id"], r["question_index"]), None)
+        if waiter is not None and not waiter.done():
+            waiter.set_result(data)
+    await manager.send_personal(game_code, acks)
+    
+    # Directors get one summary per batch rather than a message per answer
+    for question_index, count in questions.items():
+        await manager.send_to_directors(game_code, {
+            "event": "answers:batch",
+            "data": {"question_index": question_index, "count": count,
+                     "tally": current_distribution(room, question_index)}
+        })
+    
+    scores = [
+        {"player_id": r["player_id"], "points": r["points_earned"], "correct": r["correct"],
+         "question_index": r["question_index"]}
+        for r in results if "rejected" not in r
+    ]
+    if scores:
+        await record_event(game_code, db, "players:scored", {"scores": scores}, source="player")
+
+
+# Live score updates while answers stream in, at most one per room per interval
+score_updates = LeaderboardThrottle()
+
+
+async def current_players(game_code: str, db) -> list:
+    """Standings for leaderboards - in memory for mass-audience rooms, else just the player rows from Mongo"""
+    room = manager.ensure_room(game_code)
+    if room["mass"] is not None:
+        return room["mass"].players()
+    game = await db.games.find_one({"code": game_code}, {"_id": 0, "players": 1})
+    return (game or {}).get("players", [])
+
+
+def schedule_score_update(game_code: str, db):
+    """Throttled scores:updated - full board to screens, compact boards to phones"""
+    async def publish():
+        await publish_leaderboard(manager, game_code, await current_players(game_code, db),
+                                  event="scores:updated")
+    score_updates.schedule(game_code, publish)
+
+
+async def flip_board(game_code: str, db, room: dict, flag: str, index: int, value: bool = True):
+    """Set one board flag; persist and broadcast only the bit that changed"""
+    board = room["board"]
+    target = BOARD_FLAGS.get(room["state"]["game_format"], {}).get(flag)
+    if board is None or target is None:
+        raise KeyError(f"No board flag {flag} in this game")
+    # Plan flags cover the questions, board flags the NO WHAMMY! panels
+    size = len(room["plan"]) if target == "plan" else len(room["wheel"] or ())
+    if index < 0 or index >= size:
+        raise KeyError(f"Board index {index} is out of range")
+    if not board.set(flag, index, value):
+        return
+    
+    await update_room_state(game_code, db, extra_set={f"room_state.board.{flag}": board.encode()[flag]})
+    await record_event(game_code, db, "board:changed", {"flag": flag, "index": index, "value": value})
+    await manager.broadcast_to_game(game_code, {"event": "board:diff", "data": board_diff(flag, index, value)})
+
+
+async def guess_board_letter(game_code: str, db, room: dict, puzzle_index: int, letter: str):
+    """Mark a letter guessed on a puzzle; persist and broadcast just that letter"""
+    board = room["board"]
+    if board is not None and not 0 <= puzzle_index < len(room["plan"]):
+        raise KeyError(f"Puzzle index {puzzle_index} is out of range")
+    if board is None or not board.guess_letter(puzzle_index, letter):
+        return
+    
+    letter = letter.strip().upper()
+    await update_room_state(game_code, db, extra_set={
+        f"room_state.board.letters.{puzzle_index}": board.guessed_letters(puzzle_index)
+    })
+    await record_event(game_code, db, "board:changed", {"flag": "letters", "index": puzzle_index, "value": letter})
+    await manager.broadcast_to_game(game_code, {"event": "board:diff", "data": board_diff("letters", puzzle_index, letter)})
+
+
+async def spin_board(game_code: str, db, room: dict) -> int:
+    """Draw the next NO WHAMMY! spin server-side and broadcast only the panel index"""
+    table = room["wheel"]
+    if table is None:
+        raise KeyError("This game has no spin board")
+    
+    spin = room["state"]["spin"] or {"seed": new_spin_seed(), "count": 0}
+    number = spin["count"]
+    panel = draw_panel(table, spin["seed"], number)
+    await update_room_state(game_code, db, spin={"seed": spin["seed"], "count": number + 1})
+    await record_event(game_code, db, "board:spun", {"spin": number, "panel": panel})
+    await manager.broadcast_to_game(game_code, {"event": "board:spun", "data": {"spin": number, "panel": panel}})
+    await flip_board(game_code, db, room, "hit", panel)
+    return panel
+
+
+# Board flags set automatically: jumping to a clue reveals it (PERIL!) or
+# opens the case (PICK OR PASS!); revealing the answer marks a PERIL! clue done
+GOTO_BOARD_FLAGS = {GameFormat.PERIL.value: "revealed", GameFormat.PICK_OR_PASS.value: "opened"}
+REVEAL_BOARD_FLAGS = {GameFormat.PERIL.value: "answered", GameFormat.SPIN_TO_WIN.value: "solved"}
+
+
+# Formats where a question close knocks out everyone who missed it
+ELIMINATION_FORMATS = {GameFormat.LAST_CALL_STANDING.value}
+
+
+# Director status commands -> state machine actions, and what gets broadcast
+DIRECTOR_STATUS_ACTIONS = {
+    "game:start": "start",
+    "game:pause": "pause",
+    "game:resume": "resume",
+    "game:finish": "finish",
+}
+STATUS_BROADCAST_EVENTS = {
+    "start": "game:started",
+    "pause": "game:paused",
+    "resume": "game:resumed",
+    "finish": "game:finished",
+}
+
+
 # WebSocket Event Handlers
 async def handle_director_message(game_code: str, data: dict, db):
     """Handle messages from director panel"""
     event = data.get("event", "")
     payload = data.get("data", {})
     
-    if event == "game:start":
-        # Start the game
-        await db.games.update_one(
-            {"code": game_code},
-            {"$set": {"status": "active", "started_at": datetime.now(timezone.utc).isoformat()}}
-        )
-        await manager.broadcast_to_game(game_code, {
-            "event": "game:started",
-            "data": {"game_code": game_code}
-        })
-    
-    elif event == "game:pause":
-        await db.games.update_one(
-            {"code": game_code},
-            {"$set": {"status": "paused"}}
-        )
-        await manager.broadcast_to_game(game_code, {
-            "event": "game:paused",
-            "data": {}
-        })
-    
-    elif event == "game:resume":
-        await db.games.update_one(
-            {"code": game_code},
-            {"$set": {"status": "active"}}
-        )
-        await manager.broadcast_to_game(game_code, {
-            "event": "game:resumed",
-            "data": {}
-        })
-    
-    elif event == "game:finish":
-        await db.games.update_one(
-            {"code": game_code},
-            {"$set": {"status": "finished", "finished_at": datetime.now(timezone.utc).isoformat()}}
-        )
+    if event in DIRECTOR_STATUS_ACTIONS:
+        action = DIRECTOR_STATUS_ACTIONS[event]
+        try:
+            game = await transition_status(db, {"code": game_code}, action, payload.get("expected_version"))
+        except (GameNotFound, InvalidTransition) as e:
+            await send_director_error(game_code, event, str(e))
+            return
         
-        # Get final leaderboard
-        game = await db.games.find_one({"code": game_code}, {"_id": 0})
-        players = sorted(game.get("players", []), key=lambda p: p["score"], reverse=True)
+        if action == "finish":
+            await update_room_state(game_code, db, status=game["status"], timer=None)
+        else:
+            await update_room_state(game_code, db, status=game["status"])
+        broadcast_event = STATUS_BROADCAST_EVENTS[action]
+        await record_event(game_code, db, broadcast_event)
         
-        await manager.broadcast_to_game(game_code, {
-            "event": "game:finished",
-            "data": {
-                "winner": players[0] if players else None,
-                "final_leaderboard": players
-            }
-        })
-    
-    elif event == "question:next":
-        game = await db.games.find_one({"code": game_code}, {"_id": 0})
-        new_index = game["current_question_index"] + 1
+        if action == "finish":
+            await flush_mass_answers(game_code, db)
+            score_updates.cancel(game_code)
+            await publish_final(manager, game_code, await current_players(game_code, db))
+        else:
+            await manager.broadcast_to_game(game_code, {
+                "event": broadcast_event,
+                "data": {"game_code": game_code} if action == "start" else {}
+            })
+        # A running autopilot holds its timeline while paused and stops at the finish
+        autopilots.poke(game_code)
+    
+    elif event in ("question:next", "question:previous", "question:goto"):
+        room = await load_room(game_code, db)
+        if event == "question:goto":
+            move = {"index": payload.get("index", 0)}
+        else:
+            move = {"delta": 1 if event == "question:next" else -1}
         
-        await db.games.update_one(
-            {"code": game_code},
-            {"$set": {"current_question_index": new_index}}
-        )
+        try:
+            game = await move_question(
+                db, {"code": game_code},
+                # from_index: the question the director was looking at - rejects double taps
+                expected_index=payload.get("from_index"),
+                expected_version=payload.get("expected_version"),
+                question_count=len(room["plan"]) or None,
+                **move
+            )
+        except (GameNotFound, InvalidTransition) as e:
+            await send_director_error(game_code, event, str(e))
+            return
+        
+        new_index = game["current_question_index"]
+        room["state"].update(question_index=new_index, timer=None, buzzer=None)
+        await record_event(game_code, db, "question:changed", {"question_index": new_index})
+        
+        # Questions left without an explicit close still reach the analytics
+        for open_index in [i for i in room["tallies"] if i != new_index]:
+            await close_question(game_code, db, open_index)
         
         await manager.broadcast_to_game(game_code, {
             "event": "question:changed",
-            "data": {"question_index": new_index}
+            "data": {"question_index": new_index, "version": game["version"]}
         })
+        autopilots.poke(game_code)
+        
+        goto_flag = GOTO_BOARD_FLAGS.get(room["state"]["game_format"])
+        if event == "question:goto" and goto_flag:
+            await flip_board(game_code, db, room, goto_flag, new_index)
     
-    elif event == "question:previous":
-        game = await db.games.find_one({"code": game_code}, {"_id": 0})
-        new_index = max(0, game["current_question_index"] - 1)
+    elif event == "answer:reveal":
+        room = await load_room(game_code, db)
+        # Everything answered before the reveal counts in the distribution
+        await flush_mass_answers(game_code, db)
+        await record_event(game_code, db, "answer:revealed", payload)
+        await manager.broadcast_to_game(game_code, {
+            "event": "answer:revealed",
+            "data": {**payload, "distribution": current_distribution(room, room["state"]["question_index"])}
+        })
         
-        await db.games.update_one(
-            {"code": game_code},
-            {"$set": {"current_question_index": new_index}}
-        )
+        reveal_flag = REVEAL_BOARD_FLAGS.get(room["state"]["game_format"])
+        if reveal_flag and payload.get("revealed", True):
+            await flip_board(game_code, db, room, reveal_flag, room["state"]["question_index"])
+    
+    elif event in ("board:set", "board:letter"):
+        room = await load_room(game_code, db)
+        try:
+            if event == "board:set":
+                await flip_board(game_code, db, room, payload.get("flag", ""), int(payload.get("index", -1)),
+                                 bool(payload.get("value", True)))
+            else:
+                await guess_board_letter(game_code, db, room,
+                                         int(payload.get("puzzle_index", room["state"]["question_index"])),
+                                         str(payload.get("letter", "")))
+        except (KeyError, ValueError) as e:
+            await send_director_error(game_code, event, str(e).strip("'\""))
+    
+    elif event == "board:spin":
+        room = await load_room(game_code, db)
+        try:
+            await spin_board(game_code, db, room)
+        except KeyError as e:
+            await send_director_error(game_code, event, str(e).strip("'\""))
+    
+    elif event == "autopilot:start":
+        room = await load_room(game_code, db)
+        if room["state"]["game_format"] not in AUTOPILOT_FORMATS:
+            await send_director_error(game_code, event, "Autopilot is only available for PKWY LIVE!")
+            return
+        try:
+            timing = AutopilotTiming.from_payload(payload)
+        except (TypeError, ValueError) as e:
+            await send_director_error(game_code, event, str(e))
+            return
         
-        await manager.broadcast_to_game(game_code, {
-            "event": "question:changed",
-            "data": {"question_index": new_index}
+        autopilots.start(game_code, room, db, handle_director_message, timing)
+        await record_event(game_code, db, "autopilot:started", asdict(timing))
+        await manager.send_to_directors(game_code, {
+            "event": "autopilot:state",
+            "data": {"running": True, **asdict(timing)}
         })
     
-    elif event == "question:goto":
-        index = payload.get("index", 0)
-        await db.games.update_one(
-            {"code": game_code},
-            {"$set": {"current_question_index": index}}
-        )
+    elif event == "audience:mass":
+        room = await load_room(game_code, db)
+        if room["state"]["game_format"] not in MASS_FORMATS:
+            await send_director_error(game_code, event, "Mass-audience mode is only available for PKWY LIVE!")
+            return
         
+        if payload.get("enabled", True):
+            await enable_mass_audience(game_code, db, room)
+        else:
+            await disable_mass_audience(game_code, db, room)
         await manager.broadcast_to_game(game_code, {
-            "event": "question:changed",
-            "data": {"question_index": index}
+            "event": "audience:mass",
+            "data": {"enabled": room["mass"] is not None}
         })
     
-    elif event == "answer:reveal":
+    elif event == "autopilot:stop":
+        if autopilots.stop(game_code):
+            await record_event(game_code, db, "autopilot:stopped")
+        await manager.send_to_directors(game_code, {"event": "autopilot:state", "data": {"running": False}})
+    
+    elif event == "question:close":
+        room = await load_room(game_code, db)
+        await flush_mass_answers(game_code, db)
+        question_index = payload.get("question_index", room["state"]["question_index"])
+        tally = await close_question(game_code, db, question_index)
+        choices = question_choices(plan_question(room["plan"], question_index))
+        await record_event(game_code, db, "question:closed", {"question_index": question_index})
         await manager.broadcast_to_game(game_code, {
-            "event": "answer:revealed",
-            "data": payload
+            "event": "question:closed",
+            "data": {
+                "question_index": question_index,
+                "distribution": tally.distribution(choices) if tally else None
+            }
         })
-    
-    elif event == "leaderboard:show":
-        game = await db.games.find_one({"code": game_code}, {"_id": 0})
-        players = sorted(game.get("players", []), key=lambda p: p["score"], reverse=True)
-        
-        leaderboard = [
-            {"rank": i + 1, "name": p["name"], "score": p["score"], "correct_answers": p["correct_answers"]}
-            for i, p in enumerate(players)
-        ]
         
+        if room["state"]["game_format"] in ELIMINATION_FORMATS:
+            await eliminate_at_close(game_code, db, question_index, tally)
+    
+    elif event == "lifeline:ask_audience":
+        # UR FINAL ANSWER! lifeline - the room's live answers are the audience
+        room = await load_room(game_code, db)
+        distribution = current_distribution(room, room["state"]["question_index"])
+        await record_event(game_code, db, "lifeline:used", {"lifeline": "Ask the Audience", "distribution": distribution})
         await manager.broadcast_to_game(game_code, {
-            "event": "leaderboard:update",
-            "data": leaderboard
+            "event": "lifeline:ask_audience",
+            "data": distribution
         })
     
+    elif event == "leaderboard:show":
+        await flush_mass_answers(game_code, db)
+        mass = manager.ensure_room(game_code)["mass"]
+        await record_event(game_code, db, "leaderboard:shown")
+        # Mass-audience screens show the top rows only - the room can be thousands deep
+        await publish_leaderboard(manager, game_code, await current_players(game_code, db),
+                                  screen_limit=TOP_N if mass is not None else None)
+    
     elif event == "display:state":
         # Change display state (lobby, question, leaderboard, final)
+        await update_room_state(game_code, db, display=payload)
+        await record_event(game_code, db, "display:state", payload)
         await manager.send_to_tvs(game_code, {
             "event": "display:state",
             "data": payload
         })
     
     elif event == "timer:start":
+        timer = {"duration": payload.get("duration", 30), "started_at": time.time()}
+        await update_room_state(game_code, db, timer=timer)
+        await record_event(game_code, db, "timer:started", timer)
         await manager.broadcast_to_game(game_code, {
             "event": "timer:started",
             "data": payload
         })
     
     elif event == "timer:stop":
+        await update_room_state(game_code, db, timer=None)
+        await record_event(game_code, db, "timer:stopped")
         await manager.broadcast_to_game(game_code, {
             "event": "timer:stopped",
             "data": {}
@@ -310,26 +881,19 @@ async def handle_director_message(game_code: str, data: dict, db):
     elif event == "player:eliminate":
         player_id = payload.get("player_id")
         if player_id:
-            game = await db.games.find_one({"code": game_code}, {"_id": 0})
-            players = game.get("players", [])
-            
-            for p in players:
-                if p["id"] == player_id:
-                    p["eliminated"] = True
-                    break
-            
-            await db.games.update_one(
-                {"code": game_code},
-                {"$set": {"players": players}}
-            )
+            room = await load_room(game_code, db)
+            await eliminate_players(db, {"code": game_code}, [player_id])
+            room["survivors"].discard(player_id)
+            await record_event(game_code, db, "player:eliminated", {"player_id": player_id})
             
             await manager.broadcast_to_game(game_code, {
                 "event": "player:eliminated",
-                "data": {"player_id": player_id}
+                "data": {"player_id": player_id, "survivors_count": len(room["survivors"])}
             })
     
     elif event == "survey:reveal":
         # For Survey Says - reveal an answer
+        await record_event(game_code, db, "survey:answer_revealed", payload)
         await manager.broadcast_to_game(game_code, {
             "event": "survey:answer_revealed",
             "data": payload
@@ -337,6 +901,7 @@ async def handle_director_message(game_code: str, data: dict, db):
     
     elif event == "survey:strike":
         # Add a strike
+        await record_event(game_code, db, "survey:strike", payload)
         await manager.broadcast_to_game(game_code, {
             "event": "survey:strike",
             "data": payload
@@ -349,53 +914,102 @@ async def handle_player_message(game_code: str, player_id: str, data: dict, db):
     payload = data.get("data", {})
     
     if event == "answer:submit":
-        # Process answer
-        game = await db.games.find_one({"code": game_code}, {"_id": 0})
+        # Score against the room's compiled plan and ack on this socket -
+        # no second HTTP round trip from the phone
+        room = await load_room(game_code, db)
+        state = room["state"]
+        answer = payload.get("answer")
+        time_taken = payload.get("time_taken", 0)
+        question_index = payload.get("question_index", state["question_index"])
+        question_data = plan_question(room["plan"], question_index)
         
-        if not game:
+        if not state["game_id"] or not question_data:
+            await send_answer_rejected(game_code, player_id, question_index, "Question not found")
             return
         
-        players = game.get("players", [])
-        player = None
-        player_index = -1
+        if room["mass"] is not None:
+            # Queued and scored with the rest of the batch; the ack follows the flush
+            rejected = room["mass"].submit(player_id, question_index, answer, time_taken)
+            if rejected:
+                await send_answer_rejected(game_code, player_id, question_index, rejected)
+            else:
+                queue_mass_answer(game_code, db, room["mass"])
+            return
         
-        for i, p in enumerate(players):
-            if p["id"] == player_id:
-                player = p
-                player_index = i
-                break
+        try:
+            result = await score_answer(
+                db, state["game_id"], state["game_format"], question_data,
+                player_id, answer, time_taken, question_index
+            )
+        except AlreadyAnswered as e:
+            await send_answer_rejected(game_code, player_id, question_index, str(e))
+            return
         
-        if not player:
+        if not result:
+            await send_answer_rejected(game_code, player_id, question_index, "Player not found")
             return
         
-        # Get answer details
-        answer = payload.get("answer")
-        time_taken = payload.get("time_taken", 0)
-        question_index = payload.get("question_index", game["current_question_index"])
+        await manager.send_to_player(game_code, player_id, {
+            "event": "answer:ack",
+            "data": {
+                "accepted": True,
+                "question_index": question_index,
+                "correct": result["correct"],
+                "points_earned": result["points_earned"],
+                "new_score": result["new_score"],
+                "correct_answer": result["correct_answer"]
+            }
+        })
+        
+        tally = count_answer(room, question_index, answer, result["correct"], player_id)
         
-        # Notify directors that player answered
         await manager.send_to_directors(game_code, {
             "event": "player:answered",
             "data": {
                 "player_id": player_id,
-                "player_name": player["name"],
+                "player_name": result["player_name"],
                 "answer": answer,
                 "time_taken": time_taken,
-                "question_index": question_index
+                "question_index": question_index,
+                "correct": result["correct"],
+                "points_earned": result["points_earned"],
+                "new_score": result["new_score"],
+                "tally": tally.distribution(question_choices(question_data))
             }
         })
+        
+        await record_event(game_code, db, "player:scored", {
+            "player_id": player_id,
+            "points": result["points_earned"],
+            "correct": result["correct"],
+            "question_index": question_index,
+            "answer": answer,
+            "time_taken": time_taken
+        }, source="player")
+        schedule_score_update(game_code, db)
     
     elif event == "buzzer:press":
-        # Fastest finger / buzzer press
+        # Fastest finger / buzzer press - the first press of a question holds the buzzer
+        state = manager.ensure_room(game_code)["state"]
+        buzzer = {"player_id": player_id, "timestamp": datetime.now(timezone.utc).isoformat()}
+        first = state["buzzer"] is None
+        if first:
+            # Claimed in memory before any await, so a later press cannot overtake it
+            state["buzzer"] = buzzer
         await manager.send_to_directors(game_code, {
             "event": "buzzer:pressed",
-            "data": {
-                "player_id": player_id,
-                "timestamp": datetime.now(timezone.utc).isoformat()
-            }
+            "data": {**buzzer, "first": first}
         })
+        if not first:
+            return
         
         await manager.broadcast_to_game(game_code, {
             "event": "buzzer:winner",
             "data": {"player_id": player_id}
         })
+        # Persisted after the broadcast, and only onto an empty buzzer for this question
+        await db.games.update_one(
+            {"code": game_code, "current_question_index": state["question_index"], "room_state.buzzer": None},
+            {"$set": {"room_state.buzzer": buzzer}}
+        )
+        await record_event(game_code, db, "buzzer:pressed", buzzer, source="player")
@@ -0,0 +1,129 @@
+"""
+PKWY Tavern Game Suite - Answer Latency Benchmark
+Compares submit-to-result latency of POST /api/answers and answer:submit over /ws/player
+
+Usage (from repo root, against a running backend):
+    python benchmarks/bench_answers.py --base-url http://127.0.0.1:8001 --players 20 --questions 20
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+
+import requests
+import websockets
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return round(ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))], 2)
+
+
+def summarize(samples):
+    return {
+        "count": len(samples),
+        "p50_ms": percentile(samples, 50),
+        "p95_ms": percentile(samples, 95),
+        "mean_ms": round(statistics.mean(samples), 2)
+    }
+
+
+def setup_game(base_url: str, players: int, questions: int) -> dict:
+    """Create a PERIL! game with enough clues for both paths and join players"""
+    api = f"{base_url}/api"
+    game = requests.post(f"{api}/games", json={
+        "name": "Answer latency benchmark", "host": "bench", "game_format": "PERIL!"
+    }).json()
+    clues = [
+        {"question": f"Clue {i}", "correct_answer": "A", "value": 100, "time_limit": 30}
+        for i in range(questions * 2)
+    ]
+    requests.patch(f"{api}/games/{game['id']}/content", json={
+        "categories": [{"name": "Bench", "clues": clues}]
+    }).raise_for_status()
+    game["player_ids"] = [
+        requests.post(f"{api}/games/{game['code']}/join", json={"name": f"bench-{i}"}).json()["id"]
+        for i in range(players)
+    ]
+    requests.patch(f"{api}/games/{game['id']}/start").raise_for_status()
+    return game
+
+
+def bench_rest(base_url: str, game: dict, questions: range) -> list:
+    """One POST per player per question, timed to the response"""
+    samples = []
+    with requests.Session() as session:
+        for question_index in questions:
+            for player_id in game["player_ids"]:
+                started = time.perf_counter()
+                session.post(f"{base_url}/api/answers", json={
+                    "player_id": player_id,
+                    "game_id": game["id"],
+                    "question_index": question_index,
+                    "answer": "A",
+                    "time_taken": 1.0
+                }).raise_for_status()
+                samples.append((time.perf_counter() - started) * 1000)
+    return samples
+
+
+async def bench_ws(ws_url: str, game: dict, questions: range) -> list:
+    """One answer:submit per player per question, timed to its answer:ack"""
+    sockets = [
+        await websockets.connect(f"{ws_url}/ws/player/{game['code']}/{player_id}")
+        for player_id in game["player_ids"]
+    ]
+    samples = []
+    try:
+        for question_index in questions:
+            for ws in sockets:
+                started = time.perf_counter()
+                await ws.send(json.dumps({
+                    "event": "answer:submit",
+                    "data": {"answer": "A", "time_taken": 1.0, "question_index": question_index}
+                }))
+                while True:
+                    message = json.loads(await ws.recv())
+                    if message["event"] == "answer:ack":
+                        break
+                samples.append((time.perf_counter() - started) * 1000)
+    finally:
+        for ws in sockets:
+            await ws.close()
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[1])
+    parser.add_argument("--base-url", default="http://127.0.0.1:8001")
+    parser.add_argument("--players", type=int, default=20)
+    parser.add_argument("--questions", type=int, default=20)
+    parser.add_argument("--output", help="Append a JSON summary line to this file")
+    args = parser.parse_args()
+
+    game = setup_game(args.base_url, args.players, args.questions)
+    ws_url = args.base_url.replace("http", "ws", 1)
+
+    # Each path answers its own questions - one scored answer per player per question
+    rest = bench_rest(args.base_url, game, range(0, args.questions))
+    ws = asyncio.run(bench_ws(ws_url, game, range(args.questions, args.questions * 2)))
+    requests.delete(f"{args.base_url}/api/games/{game['id']}")
+
+    summary = {
+        "benchmark": "answers",
+        "timestamp": time.time(),
+        "players": args.players,
+        "questions": args.questions,
+        "rest": summarize(rest),
+        "websocket": summarize(ws)
+    }
+    print(json.dumps(summary, indent=2))
+
+    if args.output:
+        with open(args.output, "a") as f:
+            f.write(json.dumps(summary) + "\n")
+
+
+if __name__ == "__main__":
+    main()
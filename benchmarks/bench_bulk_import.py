@@ -0,0 +1,125 @@
+"""
+PKWY Tavern Game Suite - Bulk Import Throughput
+Packs per second: one /game-packs/upload call per file vs one ZIP through /game-packs/import
+
+Both paths run in-process against a database stub that drops writes, so the
+numbers are parse + detect + validate cost. The bulk path uses the process pool.
+
+Usage (from repo root):
+    python benchmarks/bench_bulk_import.py --packs 300 --questions 200 --output bench_bulk_import.jsonl
+"""
+import argparse
+import asyncio
+import io
+import json
+import os
+import sys
+import time
+import zipfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+from starlette.datastructures import UploadFile  # noqa: E402
+
+from routes import game_packs  # noqa: E402
+from services import bulk_import  # noqa: E402
+
+
+class NothingMatched:
+    matched_count = 0
+
+
+class Dropped:
+    async def find_one(self, query, projection=None):
+        return None
+
+    async def insert_one(self, doc):
+        pass
+
+    async def update_one(self, query, update):
+        return NothingMatched()
+
+    async def update_many(self, query, update):
+        return NothingMatched()
+
+    async def insert_many(self, docs, ordered=True):
+        pass
+
+    async def delete_many(self, query):
+        pass
+
+
+class DropDB:
+    def __init__(self):
+        self.game_packs = Dropped()
+
+    def __getitem__(self, name):
+        return Dropped()
+
+
+def make_pack(index: int, questions: int) -> bytes:
+    return json.dumps({"game_name": "UR FINAL ANSWER!", "questions": [
+        {"point_value": 100 * (i + 1), "difficulty": i % 5 + 1, "question_text": f"Pack {index} question {i}?",
+         "choices": {"A": "Stout", "B": "Pale ale", "C": "Lager", "D": "Porter"}, "correct_answer": "ABCD"[i % 4]}
+        for i in range(questions)
+    ]}).encode()
+
+
+async def serial(files) -> float:
+    started = time.perf_counter()
+    for name, raw in files:
+        await game_packs.upload_game_pack(file=UploadFile(io.BytesIO(raw), filename=name), name=None, description="", tags="")
+    return time.perf_counter() - started
+
+
+async def bulk(files) -> float:
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as zf:
+        for name, raw in files:
+            zf.writestr(name, raw)
+    buffer.seek(0)
+    # Start the workers outside the timed section, as a running server would have
+    pool = bulk_import.get_pool()
+    await asyncio.gather(*(asyncio.get_running_loop().run_in_executor(pool, abs, 0) for _ in range(bulk_import.BULK_IMPORT_WORKERS)))
+
+    started = time.perf_counter()
+    async for line in bulk_import.import_archive(game_packs.db, buffer):
+        if line["status"] == "error":
+            raise RuntimeError(line)
+    return time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[1])
+    parser.add_argument("--packs", type=int, default=300)
+    parser.add_argument("--questions", type=int, default=200)
+    parser.add_argument("--output", help="Append a JSON summary line to this file")
+    args = parser.parse_args()
+
+    game_packs.set_db(DropDB())
+    files = [(f"pack_{i:04d}.json", make_pack(i, args.questions)) for i in range(args.packs)]
+    serial_s = asyncio.run(serial(files))
+    bulk_s = asyncio.run(bulk(files))
+    bulk_import.shutdown_pool()
+
+    summary = {
+        "benchmark": "bulk_import",
+        "timestamp": time.time(),
+        "packs": args.packs,
+        "questions_per_pack": args.questions,
+        "workers": bulk_import.BULK_IMPORT_WORKERS,
+        "cpu_count": os.cpu_count(),
+        "serial_packs_per_s": round(args.packs / serial_s, 1),
+        "bulk_packs_per_s": round(args.packs / bulk_s, 1),
+        "speedup": round(serial_s / bulk_s, 2)
+    }
+    print(json.dumps(summary, indent=2))
+
+    if args.output:
+        with open(args.output, "a") as f:
+            f.write(json.dumps(summary) + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+PKWY Tavern Game Suite - Format Detection Benchmark
+Time to detect a pack's format as it grows: str(content) scan vs the structural classifier
+
+The legacy detector is reproduced inline (its PERIL! check serialized the whole
+pack); the structural one should take the same time at 50KB and at 5MB.
+
+Usage (from repo root):
+    python benchmarks/bench_format_detect.py --sizes-kb 50 500 5000 --output bench_format_detect.jsonl
+"""
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+from services.format_detect import classify_content  # noqa: E402
+
+
+def legacy_detect(content: dict) -> str:
+    """The substring check the old detector fell back on for untitled PERIL! packs"""
+    if "categories" in content and "clues" in str(content):
+        return "PERIL!"
+    return "UNKNOWN"
+
+
+def peril_pack(target_bytes: int) -> dict:
+    """Untitled PERIL! pack, grown with categories until it is about target_bytes of JSON"""
+    category = {
+        "category_title": "Tavern History",
+        "clues": [
+            {"value": v, "clue": "This local brewery opened its doors in 1894 " * 3,
+             "correct_response": "What is the Parkway Tavern?"}
+            for v in (200, 400, 600, 800, 1000)
+        ]
+    }
+    per_category = len(json.dumps(category))
+    return {"categories": [category] * max(1, target_bytes // per_category)}
+
+
+def timed(fn, content, repeat: int) -> float:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        fn(content)
+    return (time.perf_counter() - started) * 1_000_000 / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[1])
+    parser.add_argument("--sizes-kb", type=int, nargs="+", default=[50, 500, 5000])
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--output", help="Append a JSON summary line to this file")
+    args = parser.parse_args()
+
+    results = []
+    for size_kb in args.sizes_kb:
+        content = peril_pack(size_kb * 1024)
+        assert classify_content(content).game_format == legacy_detect(content) == "PERIL!"
+        results.append({
+            "pack_kb": round(len(json.dumps(content)) / 1024),
+            "legacy_us": round(timed(legacy_detect, content, args.repeat), 1),
+            "structural_us": round(timed(classify_content, content, args.repeat * 100), 2)
+        })
+
+    summary = {"benchmark": "format_detect", "timestamp": time.time(), "results": results}
+    print(json.dumps(summary, indent=2))
+
+    if args.output:
+        with open(args.output, "a") as f:
+            f.write(json.dumps(summary) + "\n")
+
+
+if __name__ == "__main__":
+    main()
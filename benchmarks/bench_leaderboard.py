@@ -0,0 +1,87 @@
+"""
+PKWY Tavern Game Suite - Leaderboard Bytes Benchmark
+Bytes sent per leaderboard update: full board to every socket vs the publisher
+
+Runs in-process with in-memory sockets: one TV, one director and one phone per player.
+
+Usage (from repo root):
+    python benchmarks/bench_leaderboard.py --players 50 200 1000 --output bench_leaderboard.jsonl
+"""
+import argparse
+import asyncio
+import json
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+from services.leaderboard import publish_leaderboard, rank_players  # noqa: E402
+from services.websocket_manager import ConnectionManager  # noqa: E402
+
+GAME_CODE = "BYTES1"
+
+
+class CountingSocket:
+    def __init__(self):
+        self.bytes = 0
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, text):
+        self.bytes += len(text.encode())
+
+
+async def measure(players: int) -> dict:
+    roster = [
+        {"id": f"player-{i:05d}", "name": f"Bar Patron {i}", "score": (i * 7919) % 5000, "correct_answers": i % 20}
+        for i in range(players)
+    ]
+    manager = ConnectionManager()
+    screens = [CountingSocket(), CountingSocket()]
+    await manager.connect_tv(screens[0], GAME_CODE)
+    await manager.connect_director(screens[1], GAME_CODE)
+    phones = {p["id"]: CountingSocket() for p in roster}
+    manager.game_rooms[GAME_CODE]["players"].update(phones)
+
+    # Before: every socket got the whole board
+    full_board = json.dumps({"event": "leaderboard:update", "data": rank_players(roster)})
+    broadcast_bytes = len(full_board.encode()) * (players + len(screens))
+
+    started = time.perf_counter()
+    await publish_leaderboard(manager, GAME_CODE, roster)
+    elapsed_ms = (time.perf_counter() - started) * 1000
+
+    phone_bytes = sum(ws.bytes for ws in phones.values())
+    published_bytes = phone_bytes + sum(ws.bytes for ws in screens)
+    return {
+        "players": players,
+        "broadcast_bytes": broadcast_bytes,
+        "published_bytes": published_bytes,
+        "bytes_per_phone": round(phone_bytes / players),
+        "reduction": round(broadcast_bytes / published_bytes, 1),
+        "publish_ms": round(elapsed_ms, 2)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[1])
+    parser.add_argument("--players", type=int, nargs="+", default=[50, 200, 1000])
+    parser.add_argument("--output", help="Append a JSON summary line to this file")
+    args = parser.parse_args()
+
+    summary = {
+        "benchmark": "leaderboard_bytes",
+        "timestamp": time.time(),
+        "results": [asyncio.run(measure(n)) for n in args.players]
+    }
+    print(json.dumps(summary, indent=2))
+
+    if args.output:
+        with open(args.output, "a") as f:
+            f.write(json.dumps(summary) + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+PKWY Tavern Game Suite - Live Question Fix Cost
+Bytes sent to every screen and room time to fix one answer key mid-game
+
+Replacing the content re-interns and recompiles the whole pack, and every
+connected screen then refetches the full game. A question patch validates the
+one question, swaps it into the room's plan and sends a content:patched delta.
+
+Usage (from repo root):
+    python benchmarks/bench_live_patch.py --questions 2000 --output bench_live_patch.jsonl
+"""
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+from services import content_cache  # noqa: E402
+from services.content_cache import intern_content  # noqa: E402
+from services.content_store import content_hash  # noqa: E402
+from services.live_patch import patch_question, question_pointer  # noqa: E402
+from services.room_state import apply_question_patch, set_room_content  # noqa: E402
+from services.websocket_manager import ConnectionManager  # noqa: E402
+
+FORMAT = "UR FINAL ANSWER!"
+
+
+def make_pack(questions: int) -> dict:
+    return {"game_name": FORMAT, "questions": [
+        {"point_value": 100 * (i % 15 + 1), "difficulty": i % 5 + 1,
+         "question_text": f"Which of these was first poured at the Parkway Tavern? ({i})",
+         "choices": {"A": "Stout", "B": "Pale ale", "C": "Lager", "D": "Porter"}, "correct_answer": "ABCD"[i % 4]}
+        for i in range(questions)
+    ]}
+
+
+def timed(run, repeat: int) -> float:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        run()
+    return (time.perf_counter() - started) / repeat * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[1])
+    parser.add_argument("--questions", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--output", help="Append a JSON summary line to this file")
+    args = parser.parse_args()
+
+    pack = make_pack(args.questions)
+    index = args.questions // 2
+    ops = [{"op": "replace", "path": "/correct_answer", "value": "D"}]
+    fixed = json.loads(json.dumps(pack))
+    fixed["questions"][index]["correct_answer"] = "D"
+
+    room = ConnectionManager().ensure_room("BENCH")
+    set_room_content(room, FORMAT, intern_content(pack))
+
+    def replace_content():
+        # Every replace is new content to the cache
+        content_cache._shared.clear()
+        content_cache._recent.clear()
+        set_room_content(room, FORMAT, intern_content(fixed, content_hash(fixed)))
+
+    def patch():
+        question = patch_question(FORMAT, room["plan"][index], ops)
+        apply_question_patch(room, {"question_index": index, "question": question, "rescored": []})
+
+    question = patch_question(FORMAT, pack["questions"][index], ops)
+    delta = {"event": "content:patched", "data": {
+        "question_index": index, "path": question_pointer(FORMAT, pack, index),
+        "question": question, "version": 1, "rescored": 0
+    }}
+
+    summary = {
+        "benchmark": "live_patch",
+        "timestamp": time.time(),
+        "questions": args.questions,
+        # content:updated makes each screen refetch the game with its full content
+        "replace_bytes_per_screen": len(json.dumps({"event": "content:updated", "data": {}})) + len(json.dumps(fixed)),
+        "patch_bytes_per_screen": len(json.dumps(delta)),
+        "replace_ms": round(timed(replace_content, args.repeat), 3),
+        "patch_ms": round(timed(patch, args.repeat), 3),
+    }
+    summary["bytes_reduction"] = round(summary["replace_bytes_per_screen"] / summary["patch_bytes_per_screen"])
+    print(json.dumps(summary, indent=2))
+
+    if args.output:
+        with open(args.output, "a") as f:
+            f.write(json.dumps(summary) + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,187 @@
+"""
+PKWY Tavern Game Suite - Mass Audience Load Test
+Simulates thousands of PKWY LIVE! players on one node and measures reveal latency
+
+Runs in-process against the real socket handlers with in-memory sockets and an
+in-memory database, so it isolates the server's own ingest and fan-out cost.
+
+Usage (from repo root):
+    python benchmarks/bench_mass_audience.py --players 10000 --questions 3 --output bench_mass.jsonl
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+from services import websocket_manager  # noqa: E402
+from services.event_log import event_log  # noqa: E402
+from services.websocket_manager import ConnectionManager, handle_director_message, handle_player_message  # noqa: E402
+
+GAME_CODE = "LOAD01"
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return round(ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))], 2)
+
+
+class Phone:
+    """In-memory socket that timestamps the events we measure"""
+
+    def __init__(self, send_delay: float):
+        self.send_delay = send_delay
+        self.received = {}
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, text):
+        if self.send_delay:
+            await asyncio.sleep(self.send_delay)
+        event = text[11:text.index('"', 11)]  # '{"event": "<name>"' - skip parsing the whole message
+        self.received[event] = time.perf_counter()
+
+
+class Cursor:
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        raise StopAsyncIteration
+
+
+class Collection:
+    async def find_one(self, *args, **kwargs):
+        return None
+
+    def find(self, *args, **kwargs):
+        return Cursor()
+
+    async def insert_one(self, doc):
+        pass
+
+    async def insert_many(self, docs, ordered=True):
+        pass
+
+    async def update_one(self, *args, **kwargs):
+        pass
+
+    async def delete_many(self, *args, **kwargs):
+        pass
+
+
+class Games:
+    def __init__(self, game):
+        self.game = game
+
+    async def find_one(self, query, projection=None):
+        return self.game
+
+    async def update_one(self, *args, **kwargs):
+        pass
+
+    async def bulk_write(self, requests, ordered=True):
+        pass
+
+    async def find_one_and_update(self, query, update, projection=None, return_document=None):
+        self.game.update(update["$set"])
+        self.game["version"] = self.game.get("version", 0) + 1
+        return self.game
+
+
+class MemoryDB:
+    def __init__(self, game):
+        self.games = Games(game)
+        self.collection = Collection()
+
+    def __getitem__(self, name):
+        return self.collection
+
+
+async def run(players: int, questions: int, send_delay: float) -> dict:
+    game = {
+        "id": "load-game", "code": GAME_CODE, "game_format": "PKWY LIVE!", "status": "active",
+        "current_question_index": 0,
+        "content": {"questions": [
+            {"difficulty": 1, "question_text": f"Q{i}", "choices": {"A": "a", "B": "b", "C": "c"}, "correct_answer": "A"}
+            for i in range(questions)
+        ]},
+        "players": [{"id": f"p{i}", "name": f"Player {i}", "score": 0, "correct_answers": 0} for i in range(players)]
+    }
+    db = MemoryDB(game)
+    manager = ConnectionManager()
+    websocket_manager.manager = manager
+
+    director = Phone(0)
+    await manager.connect_director(director, GAME_CODE)
+    await handle_director_message(GAME_CODE, {"event": "audience:mass", "data": {"enabled": True}}, db)
+    phones = {}
+    for player in game["players"]:
+        phones[player["id"]] = Phone(send_delay)
+        await manager.connect_player(phones[player["id"]], GAME_CODE, player["id"])
+
+    reveal_ms, leaderboard_ms, ingest_ms = [], [], []
+    for question_index in range(questions):
+        started = time.perf_counter()
+        await asyncio.gather(*(
+            handle_player_message(GAME_CODE, player_id, {
+                "event": "answer:submit",
+                "data": {"answer": "ABC"[i % 3], "time_taken": i % 10, "question_index": question_index}
+            }, db)
+            for i, player_id in enumerate(phones)
+        ))
+        ingest_ms.append((time.perf_counter() - started) * 1000)
+
+        sent = time.perf_counter()
+        await handle_director_message(GAME_CODE, {"event": "answer:reveal", "data": {"revealed": True}}, db)
+        reveal_ms.extend((phone.received["answer:revealed"] - sent) * 1000 for phone in phones.values())
+
+        sent = time.perf_counter()
+        await handle_director_message(GAME_CODE, {"event": "leaderboard:show", "data": {}}, db)
+        leaderboard_ms.extend((phone.received["leaderboard:personal"] - sent) * 1000 for phone in phones.values())
+
+        await handle_director_message(GAME_CODE, {
+            "event": "question:goto", "data": {"index": min(question_index + 1, questions - 1)}
+        }, db)
+
+    event_log.forget(game["id"])
+    return {
+        "ingest_ms_per_question": round(statistics.mean(ingest_ms), 2),
+        "reveal": {"p50_ms": percentile(reveal_ms, 50), "p99_ms": percentile(reveal_ms, 99)},
+        "personal_leaderboard": {"p50_ms": percentile(leaderboard_ms, 50), "p99_ms": percentile(leaderboard_ms, 99)},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[1])
+    parser.add_argument("--players", type=int, default=10000)
+    parser.add_argument("--questions", type=int, default=3)
+    parser.add_argument("--send-delay-ms", type=float, default=0.0,
+                        help="Simulated per-socket write time")
+    parser.add_argument("--target-p99-ms", type=float, default=250.0)
+    parser.add_argument("--output", help="Append a JSON summary line to this file")
+    args = parser.parse_args()
+
+    result = asyncio.run(run(args.players, args.questions, args.send_delay_ms / 1000))
+    summary = {
+        "benchmark": "mass_audience",
+        "timestamp": time.time(),
+        "players": args.players,
+        "questions": args.questions,
+        **result,
+        "meets_target": result["reveal"]["p99_ms"] < args.target_p99_ms
+    }
+    print(json.dumps(summary, indent=2))
+
+    if args.output:
+        with open(args.output, "a") as f:
+            f.write(json.dumps(summary) + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""
+PKWY Tavern Game Suite - Pack Duplicate Cost
+Bytes written and seconds taken to duplicate packs of growing size
+
+Packs are created through the routes against an in-memory database that
+counts the JSON-encoded bytes of every document written. With content
+stored by hash, a duplicate writes one metadata document whatever the pack size.
+
+Usage (from repo root):
+    python benchmarks/bench_pack_duplicate.py --questions 100 10000 --output bench_pack_duplicate.jsonl
+"""
+import argparse
+import asyncio
+import json
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+from models.game_models import GamePackCreate  # noqa: E402
+from routes import game_packs  # noqa: E402
+
+
+class Result:
+    def __init__(self, matched=0):
+        self.matched_count = matched
+
+
+class Counted:
+    """Keyed by _id or id; counts bytes of inserted documents"""
+
+    def __init__(self, meter):
+        self.docs = {}
+        self.meter = meter
+
+    def _key(self, query):
+        return query.get("_id", query.get("id"))
+
+    async def insert_one(self, doc):
+        self.meter["bytes"] += len(json.dumps(doc, default=str))
+        self.docs[doc.get("_id", doc.get("id"))] = dict(doc)
+
+    async def find_one(self, query, projection=None):
+        doc = self.docs.get(self._key(query))
+        return dict(doc) if doc else None
+
+    async def update_one(self, query, update):
+        doc = self.docs.get(self._key(query))
+        if doc:
+            for key, step in update.get("$inc", {}).items():
+                doc[key] += step
+        return Result(1 if doc else 0)
+
+
+class CountingDB:
+    def __init__(self):
+        self.meter = {"bytes": 0}
+        self.collections = {}
+
+    def __getitem__(self, name):
+        return self.collections.setdefault(name, Counted(self.meter))
+
+    def __getattr__(self, name):
+        return self[name]
+
+
+def make_pack(questions: int) -> dict:
+    return {"game_name": "PKWY LIVE!", "questions": [
+        {"difficulty": i % 5 + 1, "question_text": f"Which of these was first poured at the tavern? ({i})",
+         "choices": {"A": "Stout", "B": "Pale ale", "C": "Lager", "D": "Porter"}, "correct_answer": "ABCD"[i % 4]}
+        for i in range(questions)
+    ]}
+
+
+async def measure(questions: int, copies: int) -> dict:
+    db = CountingDB()
+    game_packs.set_db(db)
+    created = await game_packs.create_game_pack(GamePackCreate(name="Bank", content=make_pack(questions)))
+    created_bytes = db.meter["bytes"]
+
+    db.meter["bytes"] = 0
+    started = time.perf_counter()
+    for _ in range(copies):
+        await game_packs.duplicate_game_pack(created.id)
+    seconds = time.perf_counter() - started
+    return {
+        "questions": questions,
+        "create_bytes": created_bytes,
+        "duplicate_bytes": db.meter["bytes"] // copies,
+        "duplicate_ms": round(seconds / copies * 1000, 3),
+        "stored_contents": len(db["pack_contents"].docs),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[1])
+    parser.add_argument("--questions", type=int, nargs="+", default=[100, 10_000])
+    parser.add_argument("--copies", type=int, default=200)
+    parser.add_argument("--output", help="Append a JSON summary line to this file")
+    args = parser.parse_args()
+
+    results = [asyncio.run(measure(n, args.copies)) for n in args.questions]
+    summary = {
+        "benchmark": "pack_duplicate",
+        "timestamp": time.time(),
+        "copies": args.copies,
+        "results": results,
+        "constant_size": len({r["duplicate_bytes"] for r in results}) == 1
+    }
+    print(json.dumps(summary, indent=2))
+
+    if args.output:
+        with open(args.output, "a") as f:
+            f.write(json.dumps(summary) + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+PKWY Tavern Game Suite - Pack Edit Cost
+Payload, bytes written and server time to fix one typo: full PUT vs JSON-patch
+
+PUT resends, re-detects, re-validates and re-stores the whole pack. PATCH sends
+one operation, validates the one question it touches and stores a delta, with
+the full content written again only every PACK_SNAPSHOT_INTERVAL edits (counted
+here, amortized over the interval).
+
+Usage (from repo root):
+    python benchmarks/bench_pack_patch.py --questions 10000 --output bench_pack_patch.jsonl
+"""
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+from services.content_store import canonical, content_hash  # noqa: E402
+from services.format_detect import classify_content  # noqa: E402
+from services.pack_patch import patch_pack  # noqa: E402
+from services.pack_validation import validate_pack  # noqa: E402
+from services.pack_versions import PACK_SNAPSHOT_INTERVAL  # noqa: E402
+
+
+def make_pack(questions: int) -> dict:
+    return {"game_name": "UR FINAL ANSWER!", "questions": [
+        {"point_value": 100 * (i % 15 + 1), "difficulty": i % 5 + 1,
+         "question_text": f"Which of these was first poured at the Parkway Tavern? ({i})",
+         "choices": {"A": "Stout", "B": "Pale ale", "C": "Lager", "D": "Porter"}, "correct_answer": "ABCD"[i % 4]}
+        for i in range(questions)
+    ]}
+
+
+def timed(run, repeat: int) -> float:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        run()
+    return (time.perf_counter() - started) / repeat * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[1])
+    parser.add_argument("--questions", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", help="Append a JSON summary line to this file")
+    args = parser.parse_args()
+
+    content = validate_pack("UR FINAL ANSWER!", make_pack(args.questions))
+    index = args.questions // 2
+    ops = [{"op": "replace", "path": f"/questions/{index}/question_text", "value": "Which stout was poured first?"}]
+    edited = json.loads(json.dumps(content))
+    edited["questions"][index]["question_text"] = ops[0]["value"]
+
+    def put():
+        game_format = classify_content(edited).game_format
+        content_hash(validate_pack(game_format, edited))
+
+    _, delta = patch_pack("UR FINAL ANSWER!", content, ops)
+    full_bytes = len(canonical(edited))
+    put_body = len(json.dumps({"name": "Bank", "content": edited}))
+    patch_body = len(json.dumps(ops))
+    delta_bytes = len(json.dumps(delta))
+
+    summary = {
+        "benchmark": "pack_patch",
+        "timestamp": time.time(),
+        "questions": args.questions,
+        "put_request_bytes": put_body,
+        "patch_request_bytes": patch_body,
+        "put_written_bytes": full_bytes,
+        "patch_written_bytes": delta_bytes + full_bytes // PACK_SNAPSHOT_INTERVAL,
+        "put_ms": round(timed(put, args.repeat), 2),
+        "patch_ms": round(timed(lambda: patch_pack("UR FINAL ANSWER!", content, ops), args.repeat), 2),
+    }
+    summary["request_reduction"] = round(put_body / patch_body)
+    summary["write_reduction"] = round(full_bytes / summary["patch_written_bytes"], 1)
+    print(json.dumps(summary, indent=2))
+
+    if args.output:
+        with open(args.output, "a") as f:
+            f.write(json.dumps(summary) + "\n")
+
+
+if __name__ == "__main__":
+    main()
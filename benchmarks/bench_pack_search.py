@@ -0,0 +1,133 @@
+"""
+PKWY Tavern Game Suite - Pack Search Latency
+Query latency over a large question bank, against scanning every pack
+
+The scan baseline is what a regex query over game_packs does: tokenize and
+test every question of every pack on each request. The index answers from
+postings and facet bitsets, so rare terms, common terms and facet-only
+queries all stay in the low milliseconds.
+
+Usage (from repo root):
+    python benchmarks/bench_pack_search.py --packs 1000 --questions 100 --output bench_pack_search.jsonl
+"""
+import argparse
+import gc
+import json
+import math
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+from services.pack_search import InvertedIndex, question_documents, tokenize  # noqa: E402
+
+FORMAT = "PKWY LIVE!"
+WORDS = ("stout lager porter cider ale hops malt barrel cask tap pint keg brewery yeast wheat rye bourbon "
+         "whiskey gin vodka tequila rum wine merlot cabernet pinot riesling vineyard cellar cork bottle "
+         "pretzel wings nachos jukebox darts karaoke trivia tavern parkway bartender coaster").split()
+TAGS = ("pub", "sports", "music", "history", "movies", "holiday")
+
+
+def make_pack(rng: random.Random, index: int, questions: int):
+    pack = {"id": f"pack-{index}", "name": f"{rng.choice(WORDS).title()} Night {index}",
+            "description": " ".join(rng.choices(WORDS, k=8)), "tags": rng.sample(TAGS, 2),
+            "game_format": FORMAT, "version": 0}
+    content = {"game_name": FORMAT, "questions": [
+        {"difficulty": rng.randint(1, 5), "question_text": " ".join(rng.choices(WORDS, k=10)) + f" {index}x{i}?",
+         "choices": {key: rng.choice(WORDS) for key in "ABCD"}, "correct_answer": "A"}
+        for i in range(questions)
+    ]}
+    return pack, content
+
+
+def percentiles(samples):
+    samples = sorted(samples)
+    return {"p50_ms": round(statistics.median(samples), 3),
+            "p95_ms": round(samples[max(0, math.ceil(len(samples) * 0.95) - 1)], 3)}
+
+
+def timed(run, repeat: int):
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        run()
+        samples.append((time.perf_counter() - started) * 1000)
+    return percentiles(samples)
+
+
+def scan(packs, query: str, limit: int = 20):
+    terms = set(tokenize(query))
+    hits = []
+    for pack, content in packs:
+        for doc in question_documents(FORMAT, content):
+            if terms <= doc.terms.keys():
+                hits.append((pack["id"], doc.question_index))
+    return hits[:limit]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[1])
+    parser.add_argument("--packs", type=int, default=1000)
+    parser.add_argument("--questions", type=int, default=100, help="Questions per pack")
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--output", help="Append a JSON summary line to this file")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    packs = [make_pack(rng, i, args.questions) for i in range(args.packs)]
+
+    def build():
+        index = InvertedIndex()
+        for pack, content in packs:
+            index.add(pack, question_documents(FORMAT, content))
+        return index
+
+    # Tracing slows the build, so memory is measured on a second one
+    started = time.perf_counter()
+    index = build()
+    build_s = time.perf_counter() - started
+    tracemalloc.start()
+    traced = build()
+    index_mb = tracemalloc.get_traced_memory()[0] / 2**20
+    tracemalloc.stop()
+    del traced
+    gc.collect()
+
+    middle = args.packs // 2
+    queries = {
+        "rare": (f"{middle}x3", None),
+        "common": ("stout", None),
+        "two_terms": ("bourbon darts", None),
+        "filtered": ("cider", {"difficulty": 3, "tag": "pub"}),
+        "facets_only": ("", {"tag": "music"}),
+    }
+    summary = {
+        "benchmark": "pack_search",
+        "timestamp": time.time(),
+        "packs": args.packs,
+        "questions": index.question_count,
+        "build_s": round(build_s, 2),
+        "index_mb": round(index_mb, 1),
+    }
+    for name, (query, filters) in queries.items():
+        # The first call fills the term cache; a cold query is reported separately
+        started = time.perf_counter()
+        total = index.search(query, filters)["total"]
+        summary[name] = {"query": query, "total": total, "cold_ms": round((time.perf_counter() - started) * 1000, 3),
+                         **timed(lambda: index.search(query, filters), args.repeat)}
+    summary["scan_two_terms"] = timed(lambda: scan(packs, "bourbon darts"), max(1, args.repeat // 10))
+    summary["speedup"] = round(summary["scan_two_terms"]["p50_ms"] / max(summary["two_terms"]["p50_ms"], 0.001))
+    print(json.dumps(summary, indent=2))
+
+    if args.output:
+        with open(args.output, "a") as f:
+            f.write(json.dumps(summary) + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""
+PKWY Tavern Game Suite - Pack Upload Memory Benchmark
+Peak memory while importing a large question bank: read-all + json.loads vs streaming
+
+Writes a PKWY LIVE! question bank of each size to a temp file, then imports it
+both ways under tracemalloc. The streamed import writes its chunks to a database
+stub that drops them, so only the parser and validation are measured. It also
+keeps each question's search documents for the index; those are reported apart
+from the upload buffer, which should stay flat whatever the size.
+
+Usage (from repo root):
+    python benchmarks/bench_pack_upload.py --sizes-mb 5 20 50 --output bench_pack_upload.jsonl
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+from services.pack_stream import stream_pack  # noqa: E402
+from services.pack_validation import validate_pack  # noqa: E402
+
+
+class NothingMatched:
+    matched_count = 0
+
+
+class Dropped:
+    async def insert_one(self, doc):
+        pass
+
+    async def update_one(self, query, update):
+        return NothingMatched()
+
+    async def update_many(self, query, update):
+        return NothingMatched()
+
+    async def delete_many(self, query):
+        pass
+
+
+class DropDB:
+    def __getitem__(self, name):
+        return Dropped()
+
+
+def write_bank(path: str, target_bytes: int):
+    """Question bank written one question at a time so generating it stays small too"""
+    with open(path, "w") as f:
+        f.write('{"game_name": "PKWY LIVE!", "questions": [')
+        written, i = 0, 0
+        while written < target_bytes:
+            question = json.dumps({
+                "difficulty": i % 5 + 1,
+                "question_text": f"Question {i}: which of these was first poured at the Parkway Tavern?",
+                "choices": {"A": "Stout", "B": "Pale ale", "C": "Lager", "D": "Porter"},
+                "correct_answer": "ABCD"[i % 4]
+            })
+            written += f.write(("," if i else "") + question)
+            i += 1
+        f.write("]}")
+
+
+def peak_mb(run) -> tuple:
+    tracemalloc.start()
+    started = time.perf_counter()
+    retained = run() or 0
+    seconds = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return round(peak / (1024 * 1024), 1), round(seconds, 2), round(retained / (1024 * 1024), 1)
+
+
+def legacy_import(path: str):
+    with open(path, "rb") as f:
+        content = json.loads(f.read().decode("utf-8"))
+    validate_pack("PKWY LIVE!", content)
+
+
+def streamed_import(path: str):
+    async def run():
+        with open(path, "rb") as f:
+            async def read(size):
+                return f.read(size)
+            # Bytes still held once the upload is stored: the search documents
+            _, _, questions = await stream_pack(DropDB(), read, max_bytes=1 << 40)
+            return tracemalloc.get_traced_memory()[0]
+    return asyncio.run(run())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[1])
+    parser.add_argument("--sizes-mb", type=float, nargs="+", default=[5, 20, 50])
+    parser.add_argument("--skip-legacy", action="store_true", help="Only measure the streamed import")
+    parser.add_argument("--output", help="Append a JSON summary line to this file")
+    args = parser.parse_args()
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for size_mb in args.sizes_mb:
+            path = os.path.join(tmp, f"bank_{size_mb}.json")
+            write_bank(path, int(size_mb * 1024 * 1024))
+            result = {"upload_mb": round(os.path.getsize(path) / (1024 * 1024), 1)}
+            if not args.skip_legacy:
+                result["legacy_peak_mb"], result["legacy_s"], _ = peak_mb(lambda: legacy_import(path))
+            peak, result["streamed_s"], documents = peak_mb(lambda: streamed_import(path))
+            result["streamed_peak_mb"] = peak
+            result["streamed_search_docs_mb"] = documents
+            result["streamed_buffer_mb"] = round(peak - documents, 1)
+            results.append(result)
+
+    summary = {"benchmark": "pack_upload_memory", "timestamp": time.time(), "results": results}
+    print(json.dumps(summary, indent=2))
+
+    if args.output:
+        with open(args.output, "a") as f:
+            f.write(json.dumps(summary) + "\n")
+
+
+if __name__ == "__main__":
+    main()
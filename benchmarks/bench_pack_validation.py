@@ -0,0 +1,89 @@
+"""
+PKWY Tavern Game Suite - Pack Validation Throughput
+MB of pack content validated per second, per format, with cached TypeAdapters
+
+The first call per format pays for building its adapter; that cost is reported
+separately from the steady-state throughput every later import sees.
+
+Usage (from repo root):
+    python benchmarks/bench_pack_validation.py --size-mb 5 --output bench_pack_validation.jsonl
+"""
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+from services.pack_validation import adapter_for, validate_pack  # noqa: E402
+
+CHOICES = {"A": "Guinness", "B": "Harp", "C": "Smithwick's", "D": "Kilkenny"}
+
+# One item of each pack and the key that holds the list
+SAMPLES = {
+    "PKWY LIVE!": ("questions", {"difficulty": 2, "question_text": "Which stout is brewed at St. James's Gate?",
+                                 "choices": CHOICES, "correct_answer": "A"}),
+    "UR FINAL ANSWER!": ("questions", {"point_value": 1000, "difficulty": 3, "question_text": "Which lager is Irish?",
+                                       "choices": CHOICES, "correct_answer": "B"}),
+    "PERIL!": ("categories", {"category_title": "Pints", "clues": [
+        {"value": v, "difficulty": v // 200, "clue_text": "This stout is poured in two parts",
+         "correct_response": "What is Guinness?", "correct_answer": "Guinness", "wrong_answers": ["Harp", "Bass"]}
+        for v in (200, 400, 600, 800, 1000)
+    ]}),
+    "SURVEY SAYS!": ("survey_questions", {"question": "Name a bar snack", "answers": [
+        {"answer": a, "percent": p} for a, p in (("Peanuts", 40), ("Pretzels", 30), ("Wings", 20), ("Chips", 10))
+    ]}),
+}
+
+
+def build_pack(game_format: str, target_bytes: int) -> dict:
+    key, item = SAMPLES[game_format]
+    count = max(1, target_bytes // len(json.dumps(item)))
+    return {"game_name": game_format, key: [dict(item) for _ in range(count)]}
+
+
+def measure(game_format: str, size_mb: float, repeat: int) -> dict:
+    content = build_pack(game_format, int(size_mb * 1024 * 1024))
+    megabytes = len(json.dumps(content)) / (1024 * 1024)
+
+    adapter_for.cache_clear()
+    started = time.perf_counter()
+    adapter_for(game_format)
+    build_ms = (time.perf_counter() - started) * 1000
+
+    started = time.perf_counter()
+    for _ in range(repeat):
+        validate_pack(game_format, content)
+    seconds = (time.perf_counter() - started) / repeat
+    return {
+        "game_format": game_format,
+        "pack_mb": round(megabytes, 2),
+        "adapter_build_ms": round(build_ms, 2),
+        "validate_ms": round(seconds * 1000, 1),
+        "mb_per_s": round(megabytes / seconds, 1)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[1])
+    parser.add_argument("--size-mb", type=float, default=5.0)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--formats", nargs="+", default=list(SAMPLES))
+    parser.add_argument("--output", help="Append a JSON summary line to this file")
+    args = parser.parse_args()
+
+    summary = {
+        "benchmark": "pack_validation",
+        "timestamp": time.time(),
+        "results": [measure(f, args.size_mb, args.repeat) for f in args.formats]
+    }
+    print(json.dumps(summary, indent=2))
+
+    if args.output:
+        with open(args.output, "a") as f:
+            f.write(json.dumps(summary) + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+"""
+PKWY Tavern Game Suite - Shared Content Memory
+Memory each extra live game adds when many games run the same pack
+
+First every room compiles its plan from its own game document's content, as
+rooms did before content was interned. Then rooms are warm-started from game
+documents holding only the content hash, sharing the interned copy. Memory is
+what stays allocated once the rooms are up.
+
+Usage (from repo root):
+    python benchmarks/bench_shared_content.py --games 200 --questions 500 --output bench_shared_content.jsonl
+"""
+import argparse
+import asyncio
+import gc
+import json
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+from services import content_cache  # noqa: E402
+from services.content_store import content_hash  # noqa: E402
+from services.question_plan import compile_question_plan  # noqa: E402
+from services.room_state import warm_start_rooms  # noqa: E402
+from services.websocket_manager import ConnectionManager  # noqa: E402
+
+
+class Cursor:
+    def __init__(self, make_docs):
+        self.make_docs = make_docs
+
+    def limit(self, n):
+        return self
+
+    def batch_size(self, n):
+        return self
+
+    async def to_list(self, n):
+        # Each batch is decoded fresh, like documents coming off the wire
+        docs, self.make_docs = (self.make_docs() if self.make_docs else []), None
+        return docs
+
+
+class Games:
+    def __init__(self, make_docs):
+        self.make_docs = make_docs
+
+    def find(self, query, projection=None):
+        return Cursor(self.make_docs)
+
+
+class Contents:
+    def __init__(self, content):
+        self.content = content
+
+    async def find_one(self, query, projection=None):
+        return {"content": json.loads(json.dumps(self.content)), "chunked": False}
+
+
+class BenchDB:
+    def __init__(self, make_docs, content):
+        self.games = Games(make_docs)
+        self.contents = Contents(content)
+
+    def __getitem__(self, name):
+        return self.contents
+
+
+def make_pack(questions: int) -> dict:
+    return {"game_name": "UR FINAL ANSWER!", "questions": [
+        {"point_value": 100 * (i % 15 + 1), "difficulty": i % 5 + 1,
+         "question_text": f"Which of these was first poured at the Parkway Tavern? ({i})",
+         "choices": {"A": "Stout", "B": "Pale ale", "C": "Lager", "D": "Porter"}, "correct_answer": "ABCD"[i % 4]}
+        for i in range(questions)
+    ]}
+
+
+def game_doc(i: int, **content_fields) -> dict:
+    return {"id": f"game-{i}", "code": f"G{i:05d}", "game_format": "UR FINAL ANSWER!", "status": "active",
+            "current_question_index": 0, **content_fields}
+
+
+def retained_mb(games: int, pack: dict, shared: bool) -> float:
+    encoded = json.dumps(pack)
+    digest = content_hash(pack)
+
+    def make_docs():
+        return [game_doc(i, content_hash=digest) for i in range(games)]
+
+    content_cache._recent.clear()
+    gc.collect()
+    tracemalloc.start()
+    manager = ConnectionManager()
+    if shared:
+        asyncio.run(warm_start_rooms(BenchDB(make_docs, pack), manager))
+    else:
+        for i in range(games):
+            doc = game_doc(i, content=json.loads(encoded))
+            manager.ensure_room(doc["code"])["plan"] = compile_question_plan(doc["game_format"], doc["content"])
+    gc.collect()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return current / (1024 * 1024)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[1])
+    parser.add_argument("--games", type=int, default=200)
+    parser.add_argument("--questions", type=int, default=500)
+    parser.add_argument("--output", help="Append a JSON summary line to this file")
+    args = parser.parse_args()
+
+    pack = make_pack(args.questions)
+    results = {}
+    for shared in (False, True):
+        one = retained_mb(1, pack, shared)
+        many = retained_mb(args.games, pack, shared)
+        results["shared" if shared else "per_game"] = {
+            "first_game_mb": round(one, 2),
+            "extra_game_kb": round((many - one) / (args.games - 1) * 1024, 1),
+        }
+
+    summary = {
+        "benchmark": "shared_content",
+        "timestamp": time.time(),
+        "games": args.games,
+        "questions": args.questions,
+        **results
+    }
+    print(json.dumps(summary, indent=2))
+
+    if args.output:
+        with open(args.output, "a") as f:
+            f.write(json.dumps(summary) + "\n")
+
+
+if __name__ == "__main__":
+    main()
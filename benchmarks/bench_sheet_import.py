@@ -0,0 +1,68 @@
+"""
+PKWY Tavern Game Suite - Sheet Import Benchmark
+Seconds to turn a large CSV question bank into validated packs
+
+Generates a UR FINAL ANSWER! sheet (one bad row in every hundred), then times
+reading, column conversion and final model validation separately.
+
+Usage (from repo root):
+    python benchmarks/bench_sheet_import.py --rows 100000 --output bench_sheet_import.jsonl
+"""
+import argparse
+import io
+import json
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+from services.sheet_import import convert_sheet, read_sheet  # noqa: E402
+
+
+def make_csv(rows: int) -> bytes:
+    out = io.StringIO()
+    out.write("pack,point_value,difficulty,question_text,A,B,C,D,correct_answer\n")
+    for i in range(rows):
+        difficulty = "hard" if i % 100 == 99 else str(i % 5 + 1)
+        out.write(f"Bank {i // 1000},{100 * (i % 15 + 1)},{difficulty},"
+                  f"Which of these was first poured at the tavern? ({i}),Stout,Pale ale,Lager,Porter,{'ABCD'[i % 4]}\n")
+    return out.getvalue().encode()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[1])
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--target-seconds", type=float, default=5.0)
+    parser.add_argument("--output", help="Append a JSON summary line to this file")
+    args = parser.parse_args()
+
+    raw = make_csv(args.rows)
+    started = time.perf_counter()
+    frame = read_sheet(raw, "bank.csv")
+    read_s = time.perf_counter() - started
+    result = convert_sheet(frame, "UR FINAL ANSWER!", "Bank")
+    total_s = time.perf_counter() - started
+
+    summary = {
+        "benchmark": "sheet_import",
+        "timestamp": time.time(),
+        "rows": args.rows,
+        "sheet_mb": round(len(raw) / (1024 * 1024), 1),
+        "packs": len(result.packs),
+        "imported_rows": result.imported_rows,
+        "bad_rows": result.bad_rows,
+        "read_s": round(read_s, 2),
+        "convert_s": round(total_s - read_s, 2),
+        "total_s": round(total_s, 2),
+        "meets_target": total_s < args.target_seconds
+    }
+    print(json.dumps(summary, indent=2))
+
+    if args.output:
+        with open(args.output, "a") as f:
+            f.write(json.dumps(summary) + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+PKWY Tavern Game Suite - Startup Benchmark
+Measures time from process start to first served request
+
+Usage (from repo root, with MONGO_URL and DB_NAME set):
+    python benchmarks/bench_startup.py --runs 5 --output bench_startup.jsonl
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import requests
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent / "backend"
+
+
+def measure_once(port: int, timeout: float) -> dict:
+    """Boot one server process and time its first successful response"""
+    launched = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "server:app", "--port", str(port), "--log-level", "warning"],
+        cwd=BACKEND_DIR,
+        env=os.environ.copy()
+    )
+    url = f"http://127.0.0.1:{port}/api/health"
+    try:
+        while time.perf_counter() - launched < timeout:
+            try:
+                if requests.get(url, timeout=0.5).status_code == 200:
+                    break
+            except requests.ConnectionError:
+                time.sleep(0.01)
+        else:
+            raise RuntimeError(f"Server did not answer within {timeout}s")
+        
+        first_response_ms = (time.perf_counter() - launched) * 1000
+        
+        # Wait for readiness so the run also reports index/warm-up durations
+        while time.perf_counter() - launched < timeout:
+            ready = requests.get(f"http://127.0.0.1:{port}/api/ready", timeout=2)
+            if ready.status_code == 200:
+                break
+            time.sleep(0.05)
+        ready_ms = (time.perf_counter() - launched) * 1000
+        report = ready.json()["startup"]
+        
+        return {
+            "first_response_ms": round(first_response_ms, 1),
+            "ready_ms": round(ready_ms, 1),
+            "server_first_request_ms": report["first_request_ms"],
+            "server_startup_hook_ms": report["startup_hook_ms"]
+        }
+    finally:
+        proc.terminate()
+        proc.wait(timeout=10)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[1])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--output", help="Append a JSON summary line to this file")
+    args = parser.parse_args()
+    
+    runs = [measure_once(args.port, args.timeout) for _ in range(args.runs)]
+    summary = {
+        "benchmark": "startup",
+        "timestamp": time.time(),
+        "runs": len(runs),
+        "first_response_ms_median": statistics.median(r["first_response_ms"] for r in runs),
+        "ready_ms_median": statistics.median(r["ready_ms"] for r in runs),
+        "samples": runs
+    }
+    print(json.dumps(summary, indent=2))
+    
+    if args.output:
+        with open(args.output, "a") as f:
+            f.write(json.dumps(summary) + "\n")
+
+
+if __name__ == "__main__":
+    main()
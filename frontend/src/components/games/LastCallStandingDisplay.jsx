@@ -11,7 +11,8 @@ const LastCallStandingDisplay = ({ content, currentIndex, showAnswer, players =
   const question = content.questions[currentIndex];
   if (!question) return null;
 
-  const activePlayers = players.filter(p => !eliminatedPlayers.includes(p.id));
+  const eliminated = new Set([...eliminatedPlayers, ...players.filter(p => p.eliminated).map(p => p.id)]);
+  const activePlayers = players.filter(p => !eliminated.has(p.id));
 
   return (
     <div className="min-h-screen bg-gradient-to-b from-red-900 via-black to-red-900 p-8">
@@ -30,7 +31,7 @@ const LastCallStandingDisplay = ({ content, currentIndex, showAnswer, players =
           </div>
           <div className="flex items-center gap-2 bg-red-900 px-6 py-3 rounded-full">
             <Skull className="w-6 h-6 text-red-400" />
-            <span className="text-xl font-bold text-red-400">{eliminatedPlayers.length} Eliminated</span>
+            <span className="text-xl font-bold text-red-400">{eliminated.size} Eliminated</span>
           </div>
         </div>
 
@@ -5,7 +5,7 @@ import React from 'react';
 import { Card, CardContent } from '../ui/card';
 import { Phone, Users, Split } from 'lucide-react';
 
-const UrFinalAnswerDisplay = ({ content, currentIndex, showAnswer, selectedAnswer, lifelinesUsed = [] }) => {
+const UrFinalAnswerDisplay = ({ content, currentIndex, showAnswer, selectedAnswer, lifelinesUsed = [], answerDistribution }) => {
   if (!content?.questions) return null;
   
   const question = content.questions[currentIndex];
@@ -85,7 +85,20 @@ const UrFinalAnswerDisplay = ({ content, currentIndex, showAnswer, selectedAnswe
                         {letter}
                       </div>
                       <p className="text-xl font-semibold text-white">{text}</p>
+                      {answerDistribution && (
+                        <span className="ml-auto text-2xl font-black text-yellow-400">
+                          {answerDistribution.percentages?.[letter] || 0}%
+                        </span>
+                      )}
                     </div>
+                    {answerDistribution && (
+                      <div className="mt-3 h-2 rounded-full bg-black/30">
+                        <div
+                          className="h-2 rounded-full bg-yellow-400 transition-all duration-700"
+                          style={{ width: `${answerDistribution.percentages?.[letter] || 0}%` }}
+                        />
+                      </div>
+                    )}
                   </div>
                 );
               })}
@@ -0,0 +1,71 @@
+/**
+ * Board state helpers - the server keeps board flags as hex bitsets indexed
+ * by question order and sends one-bit 'board:diff' messages
+ */
+
+const hasBit = (hex, index) => {
+  if (!hex) return false;
+  return ((BigInt(`0x${hex}`) >> BigInt(index)) & 1n) === 1n;
+};
+
+const setBit = (hex, index, value) => {
+  const bits = BigInt(`0x${hex || '0'}`);
+  const mask = 1n << BigInt(index);
+  return (value ? bits | mask : bits & ~mask).toString(16);
+};
+
+// Apply one { f, i, v } diff to an encoded board
+export const applyBoardDiff = (board, { f, i, v }) => {
+  const next = { ...(board || {}) };
+  if (f === 'letters') {
+    const letters = { ...(next.letters || {}) };
+    const guessed = letters[i] || '';
+    letters[i] = guessed.includes(v) ? guessed : [...guessed, v].sort().join('');
+    next.letters = letters;
+  } else {
+    next[f] = setBit(next[f], i, v);
+  }
+  return next;
+};
+
+// Content with the board's flags written onto each item, in question order
+export const applyBoard = (format, content, board) => {
+  if (!content || !board) return content;
+
+  const flag = (name, index) => hasBit(board[name], index);
+
+  if (format === 'PERIL!') {
+    let index = 0;
+    return {
+      ...content,
+      categories: (content.categories || []).map(cat => ({
+        ...cat,
+        clues: (cat.clues || []).map(clue => {
+          const i = index++;
+          return { ...clue, revealed: flag('revealed', i), answered: flag('answered', i) };
+        }),
+      })),
+    };
+  }
+
+  if (format === 'PICK OR PASS!') {
+    return { ...content, cases: (content.cases || []).map((c, i) => ({ ...c, opened: flag('opened', i) })) };
+  }
+
+  if (format === 'SPIN TO WIN!') {
+    return {
+      ...content,
+      puzzles: (content.puzzles || []).map((p, i) => ({
+        ...p,
+        solved: flag('solved', i),
+        revealed_letters: (board.letters?.[i] || '').split(''),
+      })),
+    };
+  }
+
+  return content;
+};
+
+// Indexes of set bits, for displays that take index lists
+export const boardIndexes = (board, name, count) =>
+  [...Array(count).keys()].filter(i => hasBit(board?.[name], i));
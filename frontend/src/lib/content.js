@@ -0,0 +1,17 @@
+/**
+ * Content helpers - live 'content:patched' messages carry one fixed question
+ * and its JSON pointer into the game's content, so screens swap it in place
+ */
+
+// Copy of the game with the question at pointer `path` replaced
+export const applyContentPatch = (game, { path, question }) => {
+  if (!game?.content || !path) return game;
+
+  const tokens = path.split('/').slice(1);
+  const replace = (node, [token, ...rest]) => {
+    const copy = Array.isArray(node) ? [...node] : { ...node };
+    copy[token] = rest.length ? replace(node[token], rest) : question;
+    return copy;
+  };
+  return { ...game, content: replace(game.content, tokens) };
+};
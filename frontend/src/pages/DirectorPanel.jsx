@@ -11,11 +11,12 @@ import {
   Play, Pause, SkipForward, SkipBack, Trophy, Users, 
   Eye, EyeOff, Home, Tv, CheckCircle2, Clock, Loader2,
   RefreshCw, StopCircle, BarChart3, Wifi, WifiOff, Bot, 
-  Smartphone, Copy, QrCode, Trash2
+  Smartphone, Copy, QrCode, Trash2, Lock, RotateCw
 } from 'lucide-react';
 import { getBranding } from '../config/branding';
 import { toast } from '../hooks/use-toast';
-import { gamesApi, createWebSocket } from '../services/api';
+import { gamesApi, createWebSocket, rememberResumeToken } from '../services/api';
+import { applyContentPatch } from '../lib/content';
 
 const API_URL = process.env.REACT_APP_BACKEND_URL;
 
@@ -32,6 +33,9 @@ const DirectorPanel = () => {
   const [showAnswer, setShowAnswer] = useState(false);
   const [leaderboard, setLeaderboard] = useState([]);
   const [playerAnswers, setPlayerAnswers] = useState([]);
+  const [answerTally, setAnswerTally] = useState(null);
+  const [autopilot, setAutopilot] = useState(false);
+  const [massAudience, setMassAudience] = useState(false);
   const [addingBots, setAddingBots] = useState(false);
 
   // Demo bot functions
@@ -169,8 +173,43 @@ const DirectorPanel = () => {
     const { event, data } = message;
     
     switch (event) {
+      case 'server:reconnect':
+        // Server is restarting - the socket closes next and reconnects with this token
+        rememberResumeToken('director', gameCode, data.resume_token);
+        break;
+        
+      case 'answers:batch':
+        // Mass-audience rooms report answers per batch, not per player
+        setAnswerTally(data.tally);
+        break;
+        
+      case 'audience:mass':
+        setMassAudience(data.enabled);
+        toast({ title: data.enabled ? 'Mass Audience On' : 'Mass Audience Off' });
+        break;
+        
+      case 'autopilot:state':
+        setAutopilot(data.running);
+        toast({ title: data.running ? 'Autopilot On' : 'Autopilot Off' });
+        break;
+        
+      case 'error':
+        toast({ title: 'Not applied', description: data.message, variant: 'destructive' });
+        fetchGame(); // Resync with the server's view
+        break;
+        
+      case 'question:closed':
+        if (data.distribution) {
+          setAnswerTally(data.distribution);
+          toast({ title: 'Question Closed', description: `${data.distribution.answered} answers recorded` });
+        }
+        break;
+        
       case 'player:answered':
         setPlayerAnswers(prev => [...prev, data]);
+        if (data.tally) {
+          setAnswerTally(data.tally);
+        }
         break;
         
       case 'player:joined':
@@ -185,6 +224,29 @@ const DirectorPanel = () => {
         setLeaderboard(data);
         break;
         
+      case 'scores:updated':
+        setLeaderboard(data);
+        break;
+        
+      case 'players:eliminated':
+        toast({
+          title: `${data.player_ids.length} Eliminated`,
+          description: `${data.survivors_count} players still standing`,
+        });
+        fetchGame();
+        break;
+        
+      case 'content:updated':
+      case 'player:eliminated':
+      case 'players:removed':
+        fetchGame();
+        break;
+        
+      case 'content:patched':
+        // One question fixed mid-game - no reload
+        setGame(prev => applyContentPatch(prev, data));
+        break;
+        
       default:
         console.log('Director received:', event, data);
     }
@@ -208,10 +270,10 @@ const DirectorPanel = () => {
     fetchGame();
   }, [fetchGame]);
 
-  // Game control handlers
+  // Game control handlers - status changes go over the socket only; the
+  // server applies them atomically and replies with an 'error' event if rejected
   const handleStart = async () => {
     try {
-      await gamesApi.start(game.id);
       sendMessage('game:start');
       setGame({ ...game, status: 'active' });
       toast({ title: 'Game Started!' });
@@ -222,7 +284,6 @@ const DirectorPanel = () => {
 
   const handlePause = async () => {
     try {
-      await gamesApi.pause(game.id);
       sendMessage('game:pause');
       setGame({ ...game, status: 'paused' });
       toast({ title: 'Game Paused' });
@@ -233,7 +294,6 @@ const DirectorPanel = () => {
 
   const handleResume = async () => {
     try {
-      await gamesApi.resume(game.id);
       sendMessage('game:resume');
       setGame({ ...game, status: 'active' });
       toast({ title: 'Game Resumed' });
@@ -244,7 +304,6 @@ const DirectorPanel = () => {
 
   const handleFinish = async () => {
     try {
-      await gamesApi.finish(game.id);
       sendMessage('game:finish');
       setGame({ ...game, status: 'finished' });
       toast({ title: 'Game Finished!' });
@@ -254,7 +313,7 @@ const DirectorPanel = () => {
   };
 
   const handleNextQuestion = () => {
-    sendMessage('question:next');
+    sendMessage('question:next', { from_index: game.current_question_index || 0 });
     setShowAnswer(false);
     setPlayerAnswers([]);
     setGame({ ...game, current_question_index: (game.current_question_index || 0) + 1 });
@@ -262,7 +321,7 @@ const DirectorPanel = () => {
   };
 
   const handlePreviousQuestion = () => {
-    sendMessage('question:previous');
+    sendMessage('question:previous', { from_index: game.current_question_index || 0 });
     setShowAnswer(false);
     setPlayerAnswers([]);
     setGame({ ...game, current_question_index: Math.max(0, (game.current_question_index || 0) - 1) });
@@ -274,6 +333,29 @@ const DirectorPanel = () => {
     toast({ title: showAnswer ? 'Answer Hidden' : 'Answer Revealed' });
   };
 
+  const handleCloseQuestion = () => {
+    sendMessage('question:close', { question_index: game.current_question_index || 0 });
+  };
+
+  const handleAskTheAudience = () => {
+    sendMessage('lifeline:ask_audience');
+    toast({ title: 'Ask the Audience', description: 'Showing the room\'s answers on the TV' });
+  };
+
+  const handleSpinBoard = () => {
+    // The server draws the panel so every screen lands on the same one
+    sendMessage('board:spin');
+  };
+
+  const handleToggleMassAudience = () => {
+    sendMessage('audience:mass', { enabled: !massAudience });
+  };
+
+  const handleToggleAutopilot = () => {
+    // The server runs the question/reveal/leaderboard timeline; pause and question buttons still work
+    sendMessage(autopilot ? 'autopilot:stop' : 'autopilot:start');
+  };
+
   const handleShowLeaderboard = () => {
     sendMessage('leaderboard:show');
     toast({ title: 'Showing Leaderboard' });
@@ -626,6 +708,54 @@ const DirectorPanel = () => {
                   <BarChart3 className="w-4 h-4 mr-2" />
                   Show Lobby
                 </Button>
+                <Button 
+                  onClick={handleCloseQuestion} 
+                  variant="outline"
+                  disabled={game.status !== 'active'}
+                >
+                  <Lock className="w-4 h-4 mr-2" />
+                  Close Question
+                </Button>
+                {game.game_format === 'UR FINAL ANSWER!' && (
+                  <Button 
+                    onClick={handleAskTheAudience} 
+                    variant="outline"
+                    disabled={game.status !== 'active'}
+                  >
+                    <Users className="w-4 h-4 mr-2" />
+                    Ask the Audience
+                  </Button>
+                )}
+                {game.game_format === 'PKWY LIVE!' && (
+                  <Button 
+                    onClick={handleToggleAutopilot} 
+                    variant={autopilot ? 'default' : 'outline'}
+                    disabled={game.status === 'finished'}
+                  >
+                    <Bot className="w-4 h-4 mr-2" />
+                    {autopilot ? 'Stop Autopilot' : 'Autopilot'}
+                  </Button>
+                )}
+                {game.game_format === 'PKWY LIVE!' && (
+                  <Button 
+                    onClick={handleToggleMassAudience} 
+                    variant={massAudience ? 'default' : 'outline'}
+                    disabled={game.status === 'finished'}
+                  >
+                    <Users className="w-4 h-4 mr-2" />
+                    {massAudience ? 'Mass Audience On' : 'Mass Audience'}
+                  </Button>
+                )}
+                {game.game_format === 'NO WHAMMY!' && (
+                  <Button 
+                    onClick={handleSpinBoard} 
+                    variant="outline"
+                    disabled={game.status !== 'active'}
+                  >
+                    <RotateCw className="w-4 h-4 mr-2" />
+                    Spin Board
+                  </Button>
+                )}
               </div>
             </div>
           </CardContent>
@@ -877,6 +1007,11 @@ const DirectorPanel = () => {
                 <CardTitle className="flex items-center gap-2">
                   <Clock className="w-5 h-5" />
                   Recent Answers
+                  {answerTally && answerTally.question_index === (game.current_question_index || 0) && (
+                    <span className="ml-auto text-sm font-normal text-gray-500">
+                      {answerTally.correct}/{answerTally.answered} correct
+                    </span>
+                  )}
                 </CardTitle>
               </CardHeader>
               <CardContent>
@@ -887,7 +1022,9 @@ const DirectorPanel = () => {
                     playerAnswers.slice(-5).reverse().map((ans, idx) => (
                       <div key={idx} className="flex items-center justify-between p-2 bg-gray-50 rounded text-sm">
                         <span>{ans.player_name}</span>
-                        <span className="font-mono">{ans.answer}</span>
+                        <span className={`font-mono ${ans.correct === true ? 'text-green-600' : ans.correct === false ? 'text-red-600' : ''}`}>
+                          {ans.answer}
+                        </span>
                       </div>
                     ))
                   )}
@@ -2,7 +2,7 @@
  * Player Game Page - Real-time game interface for players
  * Connected to backend API and WebSocket
  */
-import React, { useState, useEffect, useCallback } from 'react';
+import React, { useState, useEffect, useCallback, useRef } from 'react';
 import { useParams, useNavigate } from 'react-router-dom';
 import { Button } from '../components/ui/button';
 import { Card, CardContent } from '../components/ui/card';
@@ -11,7 +11,8 @@ import { Input } from '../components/ui/input';
 import { Trophy, Clock, Users, Loader2, Wifi, WifiOff } from 'lucide-react';
 import { getBranding } from '../config/branding';
 import { toast } from '../hooks/use-toast';
-import { gamesApi, answersApi, createWebSocket } from '../services/api';
+import { gamesApi, answersApi, createWebSocket, rememberResumeToken } from '../services/api';
+import { applyContentPatch } from '../lib/content';
 
 const PlayerGame = () => {
   const { gameCode } = useParams();
@@ -34,6 +35,10 @@ const PlayerGame = () => {
   const [showAnswer, setShowAnswer] = useState(false);
   const [textAnswer, setTextAnswer] = useState('');
   const [answerStartTime, setAnswerStartTime] = useState(null);
+  // Mass-audience rooms send each phone its own rank instead of the whole board
+  // (a ref: the socket handler is bound once, on connect)
+  const massAudience = useRef(false);
+  const [rank, setRank] = useState(null);
 
   // Fetch game data
   const fetchGame = useCallback(async () => {
@@ -187,6 +192,23 @@ const PlayerGame = () => {
     const { event, data } = message;
 
     switch (event) {
+      case 'server:reconnect':
+        // Server is restarting - the socket closes next and reconnects with this token
+        rememberResumeToken('player', gameCode, data.resume_token);
+        break;
+        
+      case 'room:state':
+        // Snapshot sent on (re)connect - resume exactly where the room is
+        setCurrentIndex(data.question_index);
+        massAudience.current = Boolean(data.mass);
+        if (data.status === 'active') {
+          setGameState('playing');
+        }
+        if (data.timer) {
+          setTimeLeft(Math.ceil(data.timer.remaining));
+        }
+        break;
+        
       case 'game:started':
         setGameState('playing');
         fetchGame();
@@ -202,6 +224,11 @@ const PlayerGame = () => {
         break;
         
       case 'game:finished':
+        // Each phone gets its own placing, not the whole board
+        if (data.rank) {
+          setScore(data.score);
+          setRank({ rank: data.rank, players: data.players });
+        }
         setGameState('results');
         toast({ title: 'Game Over!', description: 'Check the TV for final standings!' });
         break;
@@ -212,13 +239,40 @@ const PlayerGame = () => {
         setShowAnswer(false);
         setTextAnswer('');
         setGameState('playing');
-        fetchGame();
+        // Content is already loaded; thousands of phones refetching at once would swamp the API
+        if (!massAudience.current) fetchGame();
+        break;
+        
+      case 'audience:mass':
+        massAudience.current = data.enabled;
+        break;
+        
+      case 'leaderboard:personal':
+        setScore(data.score);
+        setRank({ rank: data.rank, players: data.players });
         break;
         
       case 'answer:revealed':
         setShowAnswer(true);
         break;
         
+      case 'content:updated':
+        fetchGame();
+        break;
+        
+      case 'content:patched':
+        // One question fixed mid-game - no reload
+        setGame(prev => applyContentPatch(prev, data));
+        break;
+        
+      case 'answer:ack':
+        if (data.accepted) {
+          showAnswerResult(data);
+        } else {
+          toast({ title: 'Answer not scored', description: data.reason, variant: 'destructive' });
+        }
+        break;
+        
       case 'timer:started':
         setTimeLeft(data.duration || 30);
         break;
@@ -243,6 +297,22 @@ const PlayerGame = () => {
     }
   }, [gameState, timeLeft]);
 
+  const showAnswerResult = (result) => {
+    if (result.correct) {
+      setScore(result.new_score);
+      toast({
+        title: '✓ Correct!',
+        description: `+${result.points_earned} points`,
+      });
+    } else {
+      toast({
+        title: '✗ Wrong',
+        description: 'Better luck next time!',
+        variant: 'destructive',
+      });
+    }
+  };
+
   // Submit answer
   const handleAnswerSelect = async (answer) => {
     if (gameState !== 'playing' || selectedAnswer !== null) return;
@@ -250,43 +320,19 @@ const PlayerGame = () => {
     setSelectedAnswer(answer);
     const timeTaken = (Date.now() - answerStartTime) / 1000;
 
-    // Send answer via WebSocket
-    if (ws && ws.readyState === WebSocket.OPEN) {
-      ws.send(JSON.stringify({
-        event: 'answer:submit',
-        data: {
-          answer,
-          time_taken: timeTaken,
-          question_index: currentIndex,
-        }
-      }));
-    }
-
-    // Also submit via API for scoring
-    try {
-      const result = await answersApi.submit({
-        player_id: playerId,
-        game_id: game.id,
-        question_index: currentIndex,
-        answer,
-        time_taken: timeTaken,
-      });
+    const submission = { answer, time_taken: timeTaken, question_index: currentIndex };
 
-      if (result.correct) {
-        setScore(result.new_score);
-        toast({
-          title: '✓ Correct!',
-          description: `+${result.points_earned} points`,
-        });
-      } else {
-        toast({
-          title: '✗ Wrong',
-          description: 'Better luck next time!',
-          variant: 'destructive',
-        });
+    // Scored on the server and acked on this socket ('answer:ack')
+    if (ws && ws.readyState === WebSocket.OPEN) {
+      ws.send(JSON.stringify({ event: 'answer:submit', data: submission }));
+    } else {
+      // No live socket - fall back to the REST endpoint
+      try {
+        const result = await answersApi.submit({ ...submission, player_id: playerId, game_id: game.id });
+        showAnswerResult(result);
+      } catch (err) {
+        console.error('Error submitting answer:', err);
       }
-    } catch (err) {
-      console.error('Error submitting answer:', err);
     }
 
     setGameState('answered');
@@ -386,6 +432,9 @@ const PlayerGame = () => {
             <div className="bg-muted rounded-lg p-6 space-y-2">
               <p className="text-sm text-muted-foreground">Your Final Score</p>
               <p className="text-5xl font-bold" style={{ color: branding.colors.primary }}>{score}</p>
+              {rank && (
+                <p className="text-lg font-semibold">#{rank.rank} of {rank.players}</p>
+              )}
               <p className="text-sm text-muted-foreground">Check the TV for final standings!</p>
             </div>
             <Button
@@ -428,6 +477,9 @@ const PlayerGame = () => {
           <div className="flex items-center gap-2">
             <Trophy className="w-5 h-5 text-yellow-400" />
             <span className="text-white font-bold text-xl">{score}</span>
+            {rank && (
+              <span className="text-white/70 text-sm">#{rank.rank} of {rank.players}</span>
+            )}
           </div>
           <div className="text-white font-mono">
             Q {currentIndex + 1}
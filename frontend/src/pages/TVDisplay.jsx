@@ -7,7 +7,9 @@ import { useParams } from 'react-router-dom';
 import { Card, CardContent } from '../components/ui/card';
 import { Trophy, Users, Loader2 } from 'lucide-react';
 import { getBranding } from '../config/branding';
-import { gamesApi, createWebSocket } from '../services/api';
+import { gamesApi, createWebSocket, rememberResumeToken } from '../services/api';
+import { applyContentPatch } from '../lib/content';
+import { applyBoard, applyBoardDiff, boardIndexes } from '../lib/board';
 
 // Import all game displays
 import {
@@ -44,6 +46,8 @@ const TVDisplay = () => {
   
   // Game-specific state
   const [gameSpecificState, setGameSpecificState] = useState({});
+  // Server-side board bitsets (PERIL!, PICK OR PASS!, SPIN TO WIN!, NO WHAMMY!)
+  const [board, setBoard] = useState(null);
 
   // Fetch game data
   const fetchGame = useCallback(async () => {
@@ -110,6 +114,22 @@ const TVDisplay = () => {
     const { event, data } = message;
 
     switch (event) {
+      case 'server:reconnect':
+        // Server is restarting - the socket closes next and reconnects with this token
+        rememberResumeToken('tv', gameCode, data.resume_token);
+        break;
+        
+      case 'room:state':
+        // Snapshot sent on (re)connect - resume exactly where the room is
+        setCurrentIndex(data.question_index);
+        setBoard(data.board);
+        if (data.display?.state) {
+          setDisplayState(data.display.state);
+        } else if (data.status === 'active' || data.status === 'paused') {
+          setDisplayState('question');
+        }
+        break;
+        
       case 'game:started':
         setDisplayState('question');
         fetchGame();
@@ -131,11 +151,29 @@ const TVDisplay = () => {
       case 'question:changed':
         setCurrentIndex(data.question_index);
         setShowAnswer(false);
+        setGameSpecificState(prev => ({ ...prev, answerDistribution: null }));
         setDisplayState('question');
         break;
         
       case 'answer:revealed':
         setShowAnswer(true);
+        if (data.distribution) {
+          setGameSpecificState(prev => ({ ...prev, answerDistribution: data.distribution }));
+        }
+        break;
+        
+      case 'question:closed':
+        if (data.distribution) {
+          setGameSpecificState(prev => ({ ...prev, answerDistribution: data.distribution }));
+        }
+        break;
+        
+      case 'lifeline:ask_audience':
+        setGameSpecificState(prev => ({
+          ...prev,
+          answerDistribution: data,
+          lifelinesUsed: [...(prev.lifelinesUsed || []), 'Ask the Audience']
+        }));
         break;
         
       case 'leaderboard:update':
@@ -151,6 +189,42 @@ const TVDisplay = () => {
         fetchGame(); // Refresh to get updated player count
         break;
         
+      case 'board:spun':
+        // Animate, then land on the panel the server drew
+        setGameSpecificState(prev => ({ ...prev, isSpinning: true, spinResult: null }));
+        setTimeout(() => {
+          setGameSpecificState(prev => ({ ...prev, isSpinning: false, spinResult: data.panel }));
+        }, 2000);
+        break;
+        
+      case 'board:diff':
+        setBoard(prev => applyBoardDiff(prev, data));
+        break;
+        
+      case 'scores:updated':
+        // Scores changed outside the director panel - keep the current screen
+        setLeaderboard(data);
+        break;
+        
+      case 'player:eliminated':
+      case 'players:eliminated':
+        // One batch per question close in elimination rounds - no refetch needed
+        setGameSpecificState(prev => ({
+          ...prev,
+          eliminatedPlayers: [...(prev.eliminatedPlayers || []), ...(data.player_ids || [data.player_id])]
+        }));
+        break;
+        
+      case 'content:updated':
+      case 'players:removed':
+        fetchGame();
+        break;
+        
+      case 'content:patched':
+        // One question fixed mid-game - no reload
+        setGame(prev => applyContentPatch(prev, data));
+        break;
+        
       case 'survey:answer_revealed':
         setGameSpecificState(prev => ({
           ...prev,
@@ -342,8 +416,8 @@ const TVDisplay = () => {
   }
 
   // Game-specific displays
-  const content = game?.content;
   const format = game?.game_format;
+  const content = applyBoard(format, game?.content, board);
   const players = game?.players || [];
 
   const commonProps = {
@@ -353,6 +427,12 @@ const TVDisplay = () => {
     players,
     ...gameSpecificState,
   };
+  if (board && format === 'PICK OR PASS!') {
+    commonProps.openedCases = boardIndexes(board, 'opened', content?.cases?.length || 0);
+  }
+  if (board && format === 'SPIN TO WIN!') {
+    commonProps.revealedLetters = content?.puzzles?.[currentIndex]?.revealed_letters || [];
+  }
 
   switch (format) {
     case 'PERIL!':
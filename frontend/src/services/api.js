@@ -99,6 +99,17 @@ export const gamesApi = {
     return handleResponse(response);
   },
 
+  // Fix one question of a running game (JSON-patch ops relative to the question)
+  patchQuestion: async (gameId, questionIndex, ops, expectedVersion) => {
+    const query = expectedVersion === undefined ? '' : `?expected_version=${expectedVersion}`;
+    const response = await fetch(`${API_URL}/api/games/${gameId}/questions/${questionIndex}${query}`, {
+      method: 'PATCH',
+      headers: { 'Content-Type': 'application/json' },
+      body: JSON.stringify(ops),
+    });
+    return handleResponse(response);
+  },
+
   // Delete game
   delete: async (gameId) => {
     const response = await fetch(`${API_URL}/api/games/${gameId}`, {
@@ -183,6 +194,17 @@ export const gamePacksApi = {
     return handleResponse(response);
   },
 
+  // Ranked search over packs and questions; filters: game_format, tag, difficulty, kind
+  search: async (q, filters = {}, limit = 20, offset = 0) => {
+    const params = new URLSearchParams({ q, limit, offset });
+    Object.entries(filters).forEach(([key, value]) => {
+      if (value !== null && value !== undefined && value !== '') params.append(key, value);
+    });
+
+    const response = await fetch(`${API_URL}/api/game-packs/search?${params}`);
+    return handleResponse(response);
+  },
+
   // Get available formats
   getFormats: async () => {
     const response = await fetch(`${API_URL}/api/game-packs/formats`);
@@ -243,20 +265,33 @@ export const answersApi = {
 // WebSocket Connection Helper
 // ============================================================
 
+// Resume tokens arrive in a server:reconnect hint during a deploy and are
+// presented on the next connect so the new worker restores the seat
+const resumeKey = (role, gameCode) => `pkwy:resume:${role}:${gameCode}`;
+
+export const rememberResumeToken = (role, gameCode, token) => {
+  sessionStorage.setItem(resumeKey(role, gameCode), token);
+};
+
+const socketUrl = (role, gameCode, path) => {
+  const wsUrl = API_URL.replace('https://', 'wss://').replace('http://', 'ws://');
+  const token = sessionStorage.getItem(resumeKey(role, gameCode));
+  return token
+    ? `${wsUrl}${path}?resume=${encodeURIComponent(token)}`
+    : `${wsUrl}${path}`;
+};
+
 export const createWebSocket = {
   director: (gameCode) => {
-    const wsUrl = API_URL.replace('https://', 'wss://').replace('http://', 'ws://');
-    return new WebSocket(`${wsUrl}/ws/director/${gameCode}`);
+    return new WebSocket(socketUrl('director', gameCode, `/ws/director/${gameCode}`));
   },
 
   tv: (gameCode) => {
-    const wsUrl = API_URL.replace('https://', 'wss://').replace('http://', 'ws://');
-    return new WebSocket(`${wsUrl}/ws/tv/${gameCode}`);
+    return new WebSocket(socketUrl('tv', gameCode, `/ws/tv/${gameCode}`));
   },
 
   player: (gameCode, playerId) => {
-    const wsUrl = API_URL.replace('https://', 'wss://').replace('http://', 'ws://');
-    return new WebSocket(`${wsUrl}/ws/player/${gameCode}/${playerId}`);
+    return new WebSocket(socketUrl('player', gameCode, `/ws/player/${gameCode}/${playerId}`));
   },
 };
 
@@ -265,4 +300,5 @@ export default {
   gamePacks: gamePacksApi,
   answers: answersApi,
   createWebSocket,
+  rememberResumeToken,
 };
@@ -0,0 +1,41 @@
+"""
+PKWY Tavern Game Suite - Answer Tally Tests
+Per-question counters behind reveal histograms and Ask the Audience
+"""
+from services.answer_tally import AnswerTally, answer_key, question_choices
+
+
+class TestAnswerTally:
+    """AnswerTally counters"""
+    
+    def test_counts_and_percentages(self):
+        tally = AnswerTally(3)
+        for answer, correct in [("A", False), ("b", True), ("B ", True), ("C", False)]:
+            tally.add(answer, correct)
+        
+        distribution = tally.distribution()
+        assert distribution["question_index"] == 3
+        assert (distribution["answered"], distribution["correct"]) == (4, 2)
+        assert distribution["counts"] == {"A": 1, "B": 2, "C": 1}
+        assert distribution["percentages"] == {"A": 25, "B": 50, "C": 25}
+    
+    def test_audience_poll_lists_every_choice(self):
+        """Ask the Audience shows unpicked choices at zero, even before any answers"""
+        question = {"choices": {"A": "Paris", "B": "Rome", "C": "Oslo", "D": "Bern"}}
+        empty = AnswerTally(0).distribution(question_choices(question))
+        assert empty["counts"] == {"A": 0, "B": 0, "C": 0, "D": 0}
+        assert empty["percentages"]["A"] == 0
+    
+    def test_free_text_formats_have_no_choices(self):
+        assert question_choices({"question": "Name a beer"}) == []
+        assert answer_key(None) == ""
+    
+    def test_add_is_constant_time(self):
+        """Counting 100k answers stays fast - no per-answer scans"""
+        import time
+        tally = AnswerTally(0)
+        started = time.perf_counter()
+        for i in range(100_000):
+            tally.add("ABCD"[i % 4], i % 4 == 1)
+        assert time.perf_counter() - started < 1.0
+        assert tally.distribution()["percentages"] == {"A": 25, "B": 25, "C": 25, "D": 25}
@@ -0,0 +1,146 @@
+"""
+PKWY Tavern Game Suite - Autopilot Tests
+Unattended PKWY LIVE! rooms step themselves on the server timeline
+"""
+import asyncio
+import json
+
+from services import websocket_manager
+from services.autopilot import AutopilotRegistry, AutopilotTiming
+from services.room_state import new_room_state
+from services.websocket_manager import ConnectionManager, handle_director_message
+
+FAST = AutopilotTiming(question_seconds=0.03, reveal_seconds=0.01, leaderboard_seconds=0.01)
+
+
+def make_room(questions=2, status="active"):
+    state = new_room_state()
+    state.update(loaded=True, game_format="PKWY LIVE!", status=status)
+    return {"state": state, "plan": [{"question_text": f"q{i}"} for i in range(questions)]}
+
+
+class FakeDirector:
+    """Stands in for the director handler: records commands and applies the ones that move the room"""
+
+    def __init__(self, room):
+        self.room = room
+        self.sent = []
+
+    async def __call__(self, game_code, message, db):
+        event, data = message["event"], message["data"]
+        self.sent.append((event, data))
+        state = self.room["state"]
+        if event == "game:start":
+            state["status"] = "active"
+        elif event == "game:finish":
+            state["status"] = "finished"
+        elif event == "question:next" and data["from_index"] == state["question_index"]:
+            state["question_index"] += 1
+
+
+async def fly(room, during=None, timing=FAST):
+    """Run an autopilot to completion, calling `during(room, pilot)` part-way through"""
+    registry = AutopilotRegistry()
+    director = FakeDirector(room)
+    pilot = registry.start("LIVE01", room, None, director, timing)
+    if during:
+        await during(room, pilot)
+    await asyncio.wait_for(registry.tasks["LIVE01"], timeout=5)
+    return director.sent, pilot
+
+
+class TestAutopilotTimeline:
+    """One room's cycle"""
+
+    def test_full_cycle_then_finish(self):
+        sent, _ = asyncio.run(fly(make_room(status="waiting")))
+        events = [event for event, _ in sent]
+        cycle = ["timer:start", "question:close", "answer:reveal", "leaderboard:show"]
+        assert events == ["game:start"] + cycle + ["question:next"] + cycle + ["game:finish"]
+        assert sent[2][1] == {"question_index": 0}
+
+    def test_pause_holds_the_timeline(self):
+        held = {}
+
+        async def pause_briefly(room, pilot):
+            await asyncio.sleep(0)
+            room["state"]["status"] = "paused"
+            pilot.poke()
+            await asyncio.sleep(0.1)
+            held["sent"] = len(pilot.dispatch.sent)
+            room["state"]["status"] = "active"
+            pilot.poke()
+
+        sent, _ = asyncio.run(fly(make_room(questions=1), pause_briefly))
+        # Only the timer went out before the pause; the rest waited for the resume
+        assert held["sent"] == 1
+        assert sent[-1][0] == "game:finish"
+
+    def test_director_jump_restarts_cycle(self):
+        async def jump(room, pilot):
+            await asyncio.sleep(0.01)
+            room["state"]["question_index"] = 2
+            pilot.poke()
+
+        sent, _ = asyncio.run(fly(make_room(questions=3), jump))
+        closed = [data["question_index"] for event, data in sent if event == "question:close"]
+        assert closed == [2]
+
+
+class TestManyRooms:
+    """Hundreds of rooms on one loop"""
+
+    def test_little_drift(self):
+        async def run_all():
+            registry = AutopilotRegistry()
+            pilots = []
+            for i in range(300):
+                room = make_room(questions=3)
+                pilots.append(registry.start(f"ROOM{i}", room, None, FakeDirector(room), FAST))
+            await asyncio.wait_for(asyncio.gather(*registry.tasks.values()), timeout=10)
+            return pilots
+
+        pilots = asyncio.run(run_all())
+        # Deadlines are absolute, so lateness is one scheduling hiccup, never a sum
+        assert max(pilot.max_lateness for pilot in pilots) < 0.15
+
+
+class FakeGames:
+    async def find_one(self, query, projection=None):
+        return {"id": "game-1", "code": "PERIL1", "game_format": "PERIL!", "status": "active",
+                "current_question_index": 0, "content": {}, "players": []}
+
+
+class FakeDB:
+    games = FakeGames()
+
+
+class FakeWebSocket:
+    def __init__(self):
+        self.sent = []
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, text):
+        self.sent.append(json.loads(text))
+
+
+class TestAutopilotCommand:
+    """autopilot:start from the director"""
+
+    def test_only_for_pkwy_live(self):
+        async def start():
+            manager = ConnectionManager()
+            websocket_manager.manager, previous = manager, websocket_manager.manager
+            try:
+                director = FakeWebSocket()
+                await manager.connect_director(director, "PERIL1")
+                await handle_director_message("PERIL1", {"event": "autopilot:start", "data": {}}, FakeDB())
+                return director.sent
+            finally:
+                websocket_manager.manager = previous
+
+        sent = asyncio.run(start())
+        assert sent[-1]["event"] == "error"
+        assert sent[-1]["data"]["event"] == "autopilot:start"
@@ -0,0 +1,137 @@
+"""
+PKWY Tavern Game Suite - Board State Tests
+Board flags live server-side as bitsets and travel as tiny diffs
+"""
+import asyncio
+import json
+
+from services import websocket_manager
+from services.board_state import BoardState, board_for_game
+from services.event_log import event_log
+from services.room_state import room_snapshot
+from services.websocket_manager import ConnectionManager, handle_director_message
+
+CONTENT = {"categories": [
+    {"category_title": "Beer", "clues": [{"value": 100, "clue_text": "c0"}, {"value": 200, "clue_text": "c1", "answered": True}]},
+    {"category_title": "Bars", "clues": [{"value": 100, "clue_text": "c2"}, {"value": 200, "clue_text": "c3"}]},
+]}
+GAME = {"id": "game-1", "code": "BOARD1", "game_format": "PERIL!", "status": "active",
+        "current_question_index": 0, "content": CONTENT, "players": []}
+
+
+class FakeWebSocket:
+    def __init__(self):
+        self.sent = []
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, text):
+        self.sent.append(text)
+
+
+class FakeGames:
+    def __init__(self):
+        self.updates = []
+
+    async def find_one(self, query, projection=None):
+        return GAME
+
+    async def update_one(self, query, update):
+        self.updates.append(update)
+
+    async def find_one_and_update(self, query, update, projection=None, return_document=None):
+        index = update["$set"]["current_question_index"]
+        return {**GAME, "current_question_index": index, "version": 1}
+
+
+class FakeEvents:
+    async def find_one(self, *args, **kwargs):
+        return None
+
+    async def insert_one(self, doc):
+        pass
+
+
+class FakeDB:
+    def __init__(self):
+        self.games = FakeGames()
+        self.events = FakeEvents()
+
+    def __getitem__(self, name):
+        return self.events
+
+
+async def director_session(events):
+    """Send director events to a PERIL! room with one TV attached"""
+    manager = ConnectionManager()
+    websocket_manager.manager, previous = manager, websocket_manager.manager
+    try:
+        db = FakeDB()
+        tv = FakeWebSocket()
+        await manager.connect_tv(tv, GAME["code"])
+        await websocket_manager.load_room(GAME["code"], db)
+        tv.sent.clear()
+        for event, data in events:
+            await handle_director_message(GAME["code"], {"event": event, "data": data}, db)
+        event_log.forget(GAME["id"])
+        return db, manager.game_rooms[GAME["code"]], tv
+    finally:
+        websocket_manager.manager = previous
+
+
+class TestBoardState:
+    """BoardState bitsets"""
+
+    def test_set_is_idempotent(self):
+        board = BoardState(["answered"])
+        assert board.set("answered", 70) is True
+        assert board.set("answered", 70) is False
+        assert board.is_set("answered", 70) and not board.is_set("answered", 69)
+        assert board.set("answered", 70, False) is True
+
+    def test_encode_round_trip(self):
+        board = BoardState(["opened"])
+        board.set("opened", 0)
+        board.set("opened", 5)
+        board.guess_letter(2, "e")
+        board.guess_letter(2, "R")
+        encoded = board.encode()
+        assert encoded == {"opened": "21", "letters": {"2": "ER"}}
+        decoded = BoardState.decode(encoded, ["opened"])
+        assert decoded.is_set("opened", 5) and decoded.guessed_letters(2) == "ER"
+
+    def test_seeded_from_content_flags(self):
+        """A fresh game picks up flags already in the content JSON"""
+        board = board_for_game("PERIL!", CONTENT)
+        assert board.encode() == {"revealed": "0", "answered": "2"}
+        assert board_for_game("SURVEY SAYS!", CONTENT) is None
+
+
+class TestBoardDiffs:
+    """Director board commands"""
+
+    def test_flip_sends_tiny_diff_and_persists_one_field(self):
+        db, room, tv = asyncio.run(director_session([
+            ("board:set", {"flag": "answered", "index": 3}),
+            ("board:set", {"flag": "answered", "index": 3}),
+        ]))
+
+        assert len(tv.sent) == 1
+        assert json.loads(tv.sent[0]) == {"event": "board:diff", "data": {"f": "answered", "i": 3, "v": True}}
+        assert len(tv.sent[0]) < 80
+        assert db.games.updates == [{"$set": {"room_state.board.answered": "a"}}]
+        assert room_snapshot(room)["board"]["answered"] == "a"
+
+    def test_goto_reveals_clue(self):
+        """Jumping to a PERIL! clue marks it revealed on the board"""
+        _, room, tv = asyncio.run(director_session([("question:goto", {"index": 2})]))
+        assert room["board"].is_set("revealed", 2)
+
+    def test_out_of_range_rejected(self):
+        _, room, _ = asyncio.run(director_session([("board:set", {"flag": "answered", "index": 99})]))
+        assert not room["board"].is_set("answered", 99)
+
+    def test_letter_outside_the_plan_is_rejected(self):
+        _, room, _ = asyncio.run(director_session([("board:letter", {"puzzle_index": 10**9, "letter": "E"})]))
+        assert room["board"].letters == {}
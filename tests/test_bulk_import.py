@@ -0,0 +1,152 @@
+"""
+PKWY Tavern Game Suite - Bulk Import Tests
+ZIP archives are imported through a worker pool with a report line per file
+"""
+import asyncio
+import io
+import json
+import zipfile
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from pymongo.errors import BulkWriteError
+
+from services import bulk_import
+from services.bulk_import import import_archive
+from tests.test_content_store import FakeDB as ContentDB
+
+
+def live_pack(question_count=3):
+    return {"game_name": "PKWY LIVE!", "questions": [
+        {"difficulty": 1, "question_text": f"Q{i}", "choices": {"A": "a", "B": "b"}, "correct_answer": "A"}
+        for i in range(question_count)
+    ]}
+
+
+def archive(files):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as zf:
+        for name, data in files.items():
+            zf.writestr(name, data if isinstance(data, (str, bytes)) else json.dumps(data))
+    buffer.seek(0)
+    return buffer
+
+
+class GamePacks:
+    def __init__(self, rejected=()):
+        self.batches = []
+        self.rejected = set(rejected)
+
+    async def insert_many(self, docs, ordered=True):
+        errors = [{"index": i, "code": 11000, "errmsg": "duplicate key"}
+                  for i, doc in enumerate(docs) if doc["name"] in self.rejected]
+        self.batches.append([doc for doc in docs if doc["name"] not in self.rejected])
+        if errors:
+            raise BulkWriteError({"writeErrors": errors})
+
+
+class CrashingExecutor(ThreadPoolExecutor):
+    """A pool whose worker dies on crash.json"""
+
+    def submit(self, fn, *args, **kwargs):
+        if args and args[0] == "crash.json":
+            future = Future()
+            future.set_exception(BrokenProcessPool("A child process terminated abruptly"))
+            return future
+        return super().submit(fn, *args, **kwargs)
+
+
+class FakeDB(ContentDB):
+    def __init__(self, rejected=()):
+        super().__init__()
+        self.game_packs = GamePacks(rejected)
+
+
+def run_import(db, zip_file, executor, tags=None):
+    async def collect():
+        return [line async for line in import_archive(db, zip_file, tags, executor=executor)]
+    return asyncio.run(collect())
+
+
+class TestImportArchive:
+    """Every file gets a report line; valid packs are written in batches"""
+
+    def test_reports_each_file_and_batches_inserts(self, monkeypatch):
+        monkeypatch.setattr(bulk_import, "BULK_INSERT_BATCH", 2)
+        db = FakeDB()
+        files = {f"packs/live_{i}.json": live_pack() for i in range(5)}
+        files["packs/broken.json"] = "{not json"
+        files["packs/mystery.json"] = {"title": "no format"}
+        files["packs/bad.json"] = {"game_name": "PKWY LIVE!", "questions": [{"difficulty": "hard"}]}
+        files["__MACOSX/packs/._live_0.json"] = "junk"
+        files["notes.txt"] = "ignored"
+
+        with ThreadPoolExecutor(2) as executor:
+            lines = run_import(db, archive(files), executor, tags=["bulk"])
+
+        summary = lines[-1]
+        assert summary == {"status": "done", "files": 8, "imported": 5, "errors": 3}
+        by_file = {line["file"]: line for line in lines[:-1]}
+        assert len(by_file) == 8
+        assert by_file["packs/broken.json"]["error"].startswith("Invalid JSON")
+        assert "Could not detect" in by_file["packs/mystery.json"]["error"]
+        assert by_file["packs/bad.json"]["errors"][0]["loc"] == ["questions", 0, "difficulty"]
+        assert by_file["packs/live_3.json"]["status"] == "imported"
+
+        docs = [doc for batch in db.game_packs.batches for doc in batch]
+        assert len(docs) == 5 and all(len(batch) <= 2 for batch in db.game_packs.batches)
+        assert {doc["name"] for doc in docs} == {f"live_{i}" for i in range(5)}
+        assert all(doc["tags"] == ["bulk"] and doc["game_format"] == "PKWY LIVE!" for doc in docs)
+        # Five identical packs share one stored copy of their content
+        assert len({doc["content_hash"] for doc in docs}) == 1
+        assert [d["refs"] for d in db.contents.docs] == [5]
+
+    def test_oversized_files_are_refused(self, monkeypatch):
+        monkeypatch.setattr(bulk_import, "BULK_MAX_FILE_BYTES", 500)
+        with ThreadPoolExecutor(1) as executor:
+            lines = run_import(FakeDB(), archive({"big.json": live_pack(50), "small.json": live_pack(1)}), executor)
+        assert [line["status"] for line in lines] == ["error", "imported", "done"]
+
+    def test_not_a_zip(self):
+        lines = run_import(FakeDB(), io.BytesIO(b"plain text"), ThreadPoolExecutor(1))
+        assert lines[0]["status"] == "error" and "ZIP" in lines[0]["error"]
+
+    def test_runs_in_worker_processes(self):
+        db = FakeDB()
+        with ProcessPoolExecutor(2) as executor:
+            lines = run_import(db, archive({f"p{i}.json": live_pack() for i in range(4)}), executor)
+        assert lines[-1]["imported"] == 4
+
+
+class TestImportFailures:
+    """A bad file, a crashed worker or a refused insert fails only its own packs"""
+
+    def test_corrupt_member_and_crashed_worker_are_reported(self):
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, "w", zipfile.ZIP_STORED) as zf:
+            zf.writestr("good.json", json.dumps(live_pack()))
+            zf.writestr("corrupt.json", json.dumps({**live_pack(), "note": "intact"}))
+            zf.writestr("crash.json", json.dumps(live_pack()))
+        data = buffer.getvalue()
+        marker = data.index(b"intact")  # inside corrupt.json's stored bytes
+        corrupted = io.BytesIO(data[:marker] + b"broken" + data[marker + 6:])
+
+        with CrashingExecutor(1) as executor:
+            lines = run_import(FakeDB(), corrupted, executor)
+        by_file = {line.get("file"): line for line in lines}
+        assert by_file["good.json"]["status"] == "imported"
+        assert by_file["corrupt.json"]["error"].startswith("Could not read file from archive")
+        assert by_file["crash.json"]["error"] == "Import worker crashed"
+        assert lines[-1] == {"status": "done", "files": 3, "imported": 1, "errors": 2}
+
+    def test_partly_failed_insert_keeps_inserted_packs(self):
+        db = FakeDB(rejected={"dupe"})
+        files = {"kept.json": live_pack(), "dupe.json": live_pack(2)}
+        with ThreadPoolExecutor(1) as executor:
+            lines = run_import(db, archive(files), executor)
+        by_file = {line.get("file"): line for line in lines}
+        assert by_file["kept.json"]["status"] == "imported"
+        assert by_file["dupe.json"]["error"] == "Could not save pack: duplicate key"
+        # The refused pack's content is released (and deleted); the kept pack's stays
+        kept = db.game_packs.batches[0][0]["content_hash"]
+        assert {d["_id"]: d["refs"] for d in db.contents.docs} == {kept: 1}
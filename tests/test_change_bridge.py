@@ -0,0 +1,285 @@
+"""
+PKWY Tavern Game Suite - Change Stream Bridge Tests
+REST-side changes reach connected sockets without polling
+"""
+import asyncio
+import json
+
+from pymongo.errors import OperationFailure
+
+from services import change_bridge
+from services.change_bridge import ChangeStreamBridge, TOKENS_COLLECTION
+from services.event_log import event_log
+from services.mass_audience import MassAudience
+from services.websocket_manager import ConnectionManager
+
+GAME_ID = "game-1"
+CODE = "ABC123"
+PLAYERS = [
+    {"id": "p1", "name": "Ann", "score": 100, "correct_answers": 1},
+    {"id": "p2", "name": "Bo", "score": 300, "correct_answers": 2},
+]
+
+
+class FakeWebSocket:
+    """Records what the server sends"""
+
+    def __init__(self):
+        self.sent = []
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, text):
+        self.sent.append(json.loads(text))
+
+
+class FakeChangeStream:
+    """Async context manager yielding scripted changes, then stopping the bridge"""
+
+    def __init__(self, changes, on_exhausted):
+        self.changes = changes
+        self.on_exhausted = on_exhausted
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        for change in self.changes:
+            yield change
+        self.on_exhausted()
+
+
+class FakeEvents:
+    """game_events: scripted watch() plus the writes GameEventLog needs"""
+
+    def __init__(self, changes=None, watch_error=None):
+        self.changes = changes or []
+        self.watch_error = watch_error
+        self.resumed_after = []
+        self.on_exhausted = lambda: None
+        self.inserted = []
+
+    def watch(self, pipeline, resume_after=None):
+        self.resumed_after.append(resume_after)
+        if self.watch_error:
+            raise self.watch_error
+        return FakeChangeStream(self.changes, self.on_exhausted)
+
+    async def find_one(self, *args, **kwargs):
+        return None
+
+    async def insert_one(self, doc):
+        self.inserted.append(doc)
+
+
+class FakeTokens:
+    def __init__(self):
+        self.docs = {}
+
+    async def find_one(self, query):
+        return self.docs.get(query["_id"])
+
+    async def update_one(self, query, update, upsert=False):
+        self.docs[query["_id"]] = {"_id": query["_id"], **update["$set"]}
+
+    async def delete_one(self, query):
+        self.docs.pop(query["_id"], None)
+
+
+class FakeGames:
+    async def find_one(self, query, projection=None):
+        return {"players": [dict(p) for p in PLAYERS]}
+
+
+class FakeDB:
+    def __init__(self, events):
+        self.games = FakeGames()
+        self.collections = {"game_events": events, TOKENS_COLLECTION: FakeTokens()}
+
+    def __getitem__(self, name):
+        return self.collections[name]
+
+
+def change(seq, event, data=None):
+    """A change stream insert for a REST-sourced event"""
+    return {
+        "_id": {"_data": f"token-{seq}"},
+        "fullDocument": {"game_id": GAME_ID, "seq": seq, "event": event, "data": data or {}, "source": "rest"}
+    }
+
+
+async def hosted_room():
+    """A manager hosting a loaded room with one connected TV"""
+    manager = ConnectionManager()
+    room = manager.ensure_room(CODE)
+    room["state"].update(loaded=True, game_id=GAME_ID, game_format="PERIL!")
+    tv = FakeWebSocket()
+    await manager.connect_tv(tv, CODE)
+    tv.sent.clear()
+    return manager, room, tv
+
+
+async def run_bridge(changes):
+    manager, room, tv = await hosted_room()
+    events = FakeEvents(changes)
+    db = FakeDB(events)
+    bridge = ChangeStreamBridge(manager)
+    events.on_exhausted = bridge.stop
+    await bridge.run(db)
+    await asyncio.sleep(0.1)  # let coalesced score flushes land
+    return bridge, db, room, tv
+
+
+class TestBridgeDispatch:
+    """Change stream events become room broadcasts"""
+
+    def test_rest_changes_reach_sockets(self):
+        """Status and question changes are broadcast and mirrored into the room"""
+        bridge, db, room, tv = asyncio.run(run_bridge([
+            change(1, "game:started"),
+            change(2, "question:changed", {"question_index": 3}),
+        ]))
+
+        assert [m["event"] for m in tv.sent] == ["game:started", "question:changed"]
+        assert tv.sent[1]["data"] == {"question_index": 3}
+        assert room["state"]["status"] == "active"
+        assert room["state"]["question_index"] == 3
+        assert bridge.mode == "change_stream"
+
+    def test_content_update_recompiles_plan(self):
+        """New content replaces the room's question plan"""
+        content = {"categories": [{"name": "A", "clues": [{"question": "q1"}, {"question": "q2"}]}]}
+        _, _, room, tv = asyncio.run(run_bridge([change(1, "content:updated", {"content": content})]))
+
+        assert len(room["plan"]) == 2
+        assert tv.sent == [{"event": "content:updated", "data": {"question_count": 2}}]
+
+    def test_score_bursts_coalesce(self):
+        """Many score changes send one sorted leaderboard"""
+        _, _, _, tv = asyncio.run(run_bridge([
+            change(seq, "player:scored", {"player_id": "p1", "points": 10}) for seq in range(1, 6)
+        ]))
+
+        assert [m["event"] for m in tv.sent] == ["scores:updated"]
+        assert [row["player_id"] for row in tv.sent[0]["data"]] == ["p2", "p1"]
+
+    def test_mass_room_joins_reach_screens_only(self):
+        """Bridged joins skip the phones in mass-audience rooms, as local joins do"""
+        async def scenario():
+            manager, room, tv = await hosted_room()
+            phone = FakeWebSocket()
+            await manager.connect_player(phone, CODE, "p1")
+            room["mass"] = MassAudience(GAME_ID, "PKWY LIVE!", PLAYERS)
+            phone.sent.clear()
+            tv.sent.clear()
+            bridge = ChangeStreamBridge(manager)
+            await bridge.dispatch(change(1, "player:joined", {"player": {"id": "p3", "name": "Cy"}})["fullDocument"])
+            return room, tv, phone
+
+        room, tv, phone = asyncio.run(scenario())
+        assert [m["event"] for m in tv.sent] == ["player:joined"]
+        assert phone.sent == []
+        assert "p3" in room["mass"].scores
+
+    def test_unhosted_games_ignored(self):
+        """Events for games without a room on this worker are skipped"""
+        other = change(1, "game:started")
+        other["fullDocument"]["game_id"] = "game-2"
+        _, _, _, tv = asyncio.run(run_bridge([other]))
+        assert tv.sent == []
+
+
+class TestBridgeFailures:
+    """A failing handler costs one event, not the bridge"""
+
+    def test_handler_error_skips_only_that_event(self, monkeypatch):
+        def broken(room, patch):
+            raise KeyError("plan")
+        monkeypatch.setattr(change_bridge, "apply_question_patch", broken)
+        bridge, db, _, tv = asyncio.run(run_bridge([
+            change(1, "content:patched", {"question_index": 0, "question": {}, "rescored": []}),
+            change(2, "game:paused"),
+        ]))
+
+        assert [m["event"] for m in tv.sent] == ["game:paused"]
+        assert db[TOKENS_COLLECTION].docs[bridge.token_id]["token"] == {"_data": "token-2"}
+        assert bridge.mode == "change_stream"
+
+    def test_dead_bridge_is_reported(self):
+        async def scenario():
+            manager, _, _ = await hosted_room()
+            events = FakeEvents(watch_error=TypeError("bad pipeline"))
+            bridge = ChangeStreamBridge(manager)
+            try:
+                await bridge.run(FakeDB(events))
+            except TypeError:
+                pass
+            return bridge
+
+        assert asyncio.run(scenario()).mode == "failed"
+
+
+class TestBridgeResume:
+    """Resume tokens survive restarts"""
+
+    def test_resumes_from_stored_token(self):
+        """A restarted bridge resumes after the last relayed change"""
+        async def scenario():
+            bridge, db, _, _ = await run_bridge([change(1, "game:started"), change(2, "game:paused")])
+            events = FakeEvents([change(3, "game:resumed")])
+            db.collections["game_events"] = events
+            restarted = ChangeStreamBridge(bridge.manager)
+            events.on_exhausted = restarted.stop
+            await restarted.run(db)
+            return db, events, restarted
+
+        db, events, restarted = asyncio.run(scenario())
+        assert events.resumed_after == [{"_data": "token-2"}]
+        assert db[TOKENS_COLLECTION].docs[restarted.token_id]["token"] == {"_data": "token-3"}
+
+    def test_workers_keep_their_own_tokens(self):
+        """Another worker's progress does not move this worker's resume point"""
+        async def scenario():
+            manager, _, _ = await hosted_room()
+            db = FakeDB(FakeEvents())
+            for worker_id, changes in (("w1", [change(1, "game:started")]),
+                                       ("w2", [change(1, "game:started"), change(2, "game:paused")])):
+                events = FakeEvents(changes)
+                db.collections["game_events"] = events
+                bridge = ChangeStreamBridge(manager, worker_id=worker_id)
+                events.on_exhausted = bridge.stop
+                await bridge.run(db)
+            return db
+
+        docs = asyncio.run(scenario())[TOKENS_COLLECTION].docs
+        assert {key: doc["token"]["_data"] for key, doc in docs.items()} == {
+            "game_events:w1": "token-1", "game_events:w2": "token-2"
+        }
+
+    def test_standalone_falls_back_to_local_events(self):
+        """Without a replica set, events appended in-process are bridged"""
+        async def scenario():
+            manager, room, tv = await hosted_room()
+            events = FakeEvents(watch_error=OperationFailure("not a replica set", code=40573))
+            db = FakeDB(events)
+            bridge = ChangeStreamBridge(manager)
+            task = asyncio.create_task(bridge.run(db))
+            await asyncio.sleep(0)
+
+            await event_log.append(db, GAME_ID, "game:paused", source="rest")
+            await event_log.append(db, GAME_ID, "timer:stopped", source="director")
+            bridge.stop()
+            await task
+            event_log.forget(GAME_ID)
+            return bridge, tv
+
+        bridge, tv = asyncio.run(scenario())
+        assert bridge.mode == "local"
+        assert [m["event"] for m in tv.sent] == ["game:paused"]
@@ -0,0 +1,75 @@
+"""
+PKWY Tavern Game Suite - Shared Content Tests
+Games on the same pack share one frozen copy of its content and question plan
+"""
+import asyncio
+import copy
+import gc
+import json
+
+import pytest
+
+from services import content_cache
+from services.content_cache import FrozenDict, freeze, intern_content, load_shared_content, shared_content_count
+from services.content_store import put_content
+from services.room_state import apply_game_to_room
+from services.websocket_manager import ConnectionManager
+from tests.test_content_store import FakeDB
+
+
+def live_pack(count):
+    return {"game_name": "PKWY LIVE!", "questions": [
+        {"difficulty": 1, "question_text": f"Q{i}", "choices": {"A": "a", "B": "b"}, "correct_answer": "A"}
+        for i in range(count)
+    ]}
+
+
+@pytest.fixture(autouse=True)
+def no_recent(monkeypatch):
+    monkeypatch.setattr(content_cache, "CONTENT_CACHE_RECENT", 0)
+    content_cache._recent.clear()
+
+
+class TestFreeze:
+    """Frozen content reads and encodes like the original but cannot change"""
+
+    def test_read_only_but_still_json(self):
+        frozen = freeze(live_pack(2))
+        assert isinstance(frozen, FrozenDict) and isinstance(frozen["questions"], tuple)
+        assert json.loads(json.dumps(frozen)) == live_pack(2)
+        with pytest.raises(TypeError):
+            frozen["questions"][0]["correct_answer"] = "B"
+        with pytest.raises(TypeError):
+            frozen.update(game_name="x")
+        assert copy.deepcopy(frozen) is frozen
+
+
+class TestSharing:
+    """One copy per distinct content, dropped with the last room holding it"""
+
+    def test_rooms_on_the_same_pack_share_content_and_plan(self):
+        db = FakeDB()
+        digest = asyncio.run(put_content(db, live_pack(5)))
+        manager = ConnectionManager()
+
+        async def load(code):
+            game = {"id": code, "code": code, "game_format": "PKWY LIVE!", "content_hash": digest}
+            apply_game_to_room(manager.ensure_room(code), game, await load_shared_content(db, game))
+
+        for code in ("AAAA", "BBBB", "CCCC"):
+            asyncio.run(load(code))
+        rooms = list(manager.game_rooms.values())
+        assert rooms[0]["content"] is rooms[1]["content"] is rooms[2]["content"]
+        assert rooms[0]["plan"] is rooms[2]["plan"] and len(rooms[0]["plan"]) == 5
+        assert shared_content_count() >= 1
+
+        manager.game_rooms.clear()
+        rooms.clear()
+        gc.collect()
+        assert content_cache._shared.get(digest) is None
+
+    def test_inline_content_is_interned_by_hash(self):
+        first = intern_content(live_pack(3))
+        second = asyncio.run(load_shared_content(FakeDB(), {"content": live_pack(3)}))
+        assert first is second
+        assert asyncio.run(load_shared_content(FakeDB(), {"content_hash": "missing"})) is None
@@ -0,0 +1,209 @@
+"""
+PKWY Tavern Game Suite - Content Store Tests
+Identical pack content is stored once and deleted with its last reference
+"""
+import asyncio
+import json
+
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+from services import content_store
+from services.content_store import (
+    ContentHasher, collect_garbage, content_hash, get_content, put_content, release, retain
+)
+
+
+def matches(doc, query):
+    for key, expected in query.items():
+        value = doc.get(key)
+        if isinstance(expected, dict):
+            if "$lte" in expected and not (value is not None and value <= expected["$lte"]):
+                return False
+            if "$gt" in expected and not (value is not None and value > expected["$gt"]):
+                return False
+            if "$in" in expected and value not in expected["$in"]:
+                return False
+            if "$exists" in expected and (key in doc) != expected["$exists"]:
+                return False
+        elif value != expected:
+            return False
+    return True
+
+
+class Result:
+    def __init__(self, matched=0, deleted=0):
+        self.matched_count = matched
+        self.deleted_count = deleted
+
+
+class Cursor:
+    def __init__(self, docs):
+        self.docs = docs
+
+    def sort(self, key, direction):
+        self.docs.sort(key=lambda d: d[key], reverse=direction < 0)
+        return self
+
+    async def to_list(self, length):
+        return self.docs
+
+    def __aiter__(self):
+        self._iter = iter(self.docs)
+        return self
+
+    async def __anext__(self):
+        try:
+            return next(self._iter)
+        except StopIteration:
+            raise StopAsyncIteration
+
+
+class Collection:
+    """Just enough of a Motor collection for the content store"""
+
+    def __init__(self, unique=("_id",)):
+        self.docs = []
+        self.unique = unique
+
+    def _clash(self, doc):
+        key = tuple(doc.get(k) for k in self.unique)
+        return any(tuple(d.get(k) for k in self.unique) == key for d in self.docs if d is not doc)
+
+    async def insert_one(self, doc):
+        if self._clash(doc):
+            raise DuplicateKeyError("duplicate key")
+        self.docs.append(json.loads(json.dumps(doc)))
+
+    async def find_one(self, query, projection=None, sort=None):
+        docs = [d for d in self.docs if matches(d, query)]
+        for key, direction in sort or []:
+            docs.sort(key=lambda d: d[key], reverse=direction < 0)
+        return dict(docs[0]) if docs else None
+
+    def find(self, query, projection=None):
+        return Cursor([dict(d) for d in self.docs if matches(d, query)])
+
+    async def update_one(self, query, update):
+        doc = next((d for d in self.docs if matches(d, query)), None)
+        if doc:
+            for key, step in update.get("$inc", {}).items():
+                doc[key] = doc.get(key, 0) + step
+            doc.update(update.get("$set", {}))
+            for key in update.get("$unset", {}):
+                doc.pop(key, None)
+        return Result(matched=1 if doc else 0)
+
+    async def update_many(self, query, update):
+        hits = [d for d in self.docs if matches(d, query)]
+        for doc in hits:
+            previous = dict(doc)
+            doc.update(update["$set"])
+            if self._clash(doc):
+                doc.clear()
+                doc.update(previous)
+                raise DuplicateKeyError("duplicate key")
+        return Result(matched=len(hits))
+
+    async def find_one_and_update(self, query, update, projection=None, return_document=ReturnDocument.BEFORE):
+        doc = next((d for d in self.docs if matches(d, query)), None)
+        before = dict(doc) if doc else None
+        await self.update_one(query, update)
+        return dict(doc) if doc and return_document == ReturnDocument.AFTER else before
+
+    async def bulk_write(self, requests, ordered=True):
+        for request in requests:
+            self.docs = [d for d in self.docs if not matches(d, request._filter)]
+            self.docs.append(dict(request._doc))
+
+    async def delete_one(self, query):
+        doc = next((d for d in self.docs if matches(d, query)), None)
+        if doc:
+            self.docs.remove(doc)
+        return Result(deleted=1 if doc else 0)
+
+    async def delete_many(self, query):
+        before = len(self.docs)
+        self.docs = [d for d in self.docs if not matches(d, query)]
+        return Result(deleted=before - len(self.docs))
+
+
+class FakeDB:
+    def __init__(self):
+        self.contents = Collection()
+        self.chunks = Collection(unique=("content_id", "seq"))
+
+    def __getitem__(self, name):
+        return {content_store.CONTENTS_COLLECTION: self.contents, content_store.CHUNKS_COLLECTION: self.chunks}[name]
+
+
+def live_pack(count, **fields):
+    return {"game_name": "PKWY LIVE!", **fields, "questions": [
+        {"difficulty": 1, "question_text": f"Q{i}", "choices": {"A": "a", "B": "b"}, "correct_answer": "A"}
+        for i in range(count)
+    ]}
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+class TestContentHash:
+    """The hash depends on content, not on key order or how it was fed"""
+
+    def test_key_order_does_not_matter(self):
+        content = live_pack(3, version=1)
+        reordered = {"questions": [dict(reversed(list(q.items()))) for q in content["questions"]],
+                     "version": 1, "game_name": "PKWY LIVE!"}
+        assert content_hash(content) == content_hash(reordered)
+        assert content_hash(content) != content_hash(live_pack(4, version=1))
+
+    def test_streamed_items_hash_like_whole_content(self):
+        content = live_pack(5, version=2, extra=[])
+        hasher = ContentHasher()
+        hasher.open_list("extra")
+        for item in content["questions"]:
+            hasher.item("questions", item)
+        hasher.field("version", 2)
+        hasher.field("game_name", "PKWY LIVE!")
+        assert hasher.hexdigest() == content_hash(content)
+
+
+class TestReferenceCounting:
+    """Identical content is held once; the last release deletes it"""
+
+    def test_identical_content_is_stored_once(self):
+        db = FakeDB()
+        first = run(put_content(db, live_pack(3)))
+        second = run(put_content(db, live_pack(3)))
+        assert first == second
+        assert len(db.contents.docs) == 1 and db.contents.docs[0]["refs"] == 2
+
+        assert run(retain(db, first)) is True
+        assert run(retain(db, "missing")) is False
+        for _ in range(2):
+            run(release(db, first))
+        assert run(get_content(db, first)) == live_pack(3)
+        run(release(db, first))
+        assert db.contents.docs == []
+
+    def test_large_content_round_trips_through_chunks(self, monkeypatch):
+        monkeypatch.setattr(content_store, "INLINE_CONTENT_MAX_BYTES", 500)
+        monkeypatch.setattr(content_store, "CONTENT_CHUNK_ITEMS", 4)
+        db = FakeDB()
+        content = live_pack(10)
+        digest = run(put_content(db, content))
+        assert db.contents.docs[0]["chunked"] is True
+        assert [len(c["items"]) for c in db.chunks.docs] == [4, 4, 2]
+        assert run(get_content(db, digest)) == content
+
+        run(release(db, digest))
+        assert db.contents.docs == [] and db.chunks.docs == []
+
+    def test_garbage_collection_sweeps_unreferenced_content(self):
+        db = FakeDB()
+        kept = run(put_content(db, live_pack(1)))
+        orphan = run(put_content(db, live_pack(2)))
+        next(d for d in db.contents.docs if d["_id"] == orphan)["refs"] = 0
+        assert run(collect_garbage(db)) == 1
+        assert [d["_id"] for d in db.contents.docs] == [kept]
@@ -0,0 +1,122 @@
+"""
+PKWY Tavern Game Suite - Graceful Drain Tests
+Reconnect hints, write flushing and resume tokens during a restart
+"""
+import asyncio
+import json
+
+from services.operator_auth import is_operator
+from services.resume_tokens import issue_resume_token, verify_resume_token
+from services.websocket_manager import ConnectionManager
+
+
+class FakeWebSocket:
+    """Records what the server sends and how it closes"""
+    
+    def __init__(self):
+        self.sent = []
+        self.close_code = None
+    
+    async def accept(self):
+        pass
+    
+    async def send_text(self, text):
+        self.sent.append(json.loads(text))
+    
+    async def close(self, code=1000):
+        self.close_code = code
+
+
+class TestResumeTokens:
+    """Signed resume tokens"""
+    
+    def test_round_trip(self):
+        """A fresh token verifies and carries the seat identity"""
+        claims = verify_resume_token(issue_resume_token("ABC123", "player", "p1"))
+        assert claims["game_code"] == "ABC123"
+        assert claims["role"] == "player"
+        assert claims["player_id"] == "p1"
+    
+    def test_tampered_token_rejected(self):
+        """Changing the body invalidates the signature"""
+        body, signature = issue_resume_token("ABC123", "player", "p1").split(".")
+        forged = issue_resume_token("ABC123", "player", "p2").split(".")[0]
+        assert verify_resume_token(f"{forged}.{signature}") is None
+        assert verify_resume_token("garbage") is None
+
+
+class TestDrain:
+    """ConnectionManager.drain()"""
+    
+    def test_drain_hints_flushes_and_closes(self):
+        """Every socket gets a resume token, in-flight writes finish, then sockets close"""
+        async def scenario():
+            manager = ConnectionManager()
+            director, tv, player = FakeWebSocket(), FakeWebSocket(), FakeWebSocket()
+            await manager.connect_director(director, "ABC123")
+            await manager.connect_tv(tv, "ABC123")
+            await manager.connect_player(player, "ABC123", "p1")
+            
+            written = []
+            
+            async def slow_write():
+                await asyncio.sleep(0.05)
+                written.append(True)
+            
+            pending = asyncio.ensure_future(manager.track(slow_write()))
+            await asyncio.sleep(0)
+            result = await manager.drain(grace_seconds=1.0)
+            await pending
+            return manager, (director, tv, player), written, result
+        
+        manager, sockets, written, result = asyncio.run(scenario())
+        
+        assert written == [True]
+        assert result == {"connections": 3, "flushed_writes": 1}
+        for ws in sockets:
+            hint = ws.sent[-1]
+            assert hint["event"] == "server:reconnect"
+            assert verify_resume_token(hint["data"]["resume_token"])["game_code"] == "ABC123"
+            assert ws.close_code == 1012
+    
+    def test_new_joins_redirected_while_draining(self):
+        """A socket arriving mid-drain is told to reconnect and closed with 1013"""
+        async def scenario():
+            manager = ConnectionManager()
+            manager.draining = True
+            ws = FakeWebSocket()
+            connected = await manager.connect_player(ws, "ABC123", "p9")
+            return manager, ws, connected
+        
+        manager, ws, connected = asyncio.run(scenario())
+        assert connected is False
+        assert ws.close_code == 1013
+        assert ws.sent[0]["event"] == "server:reconnect"
+        assert "ABC123" not in manager.game_rooms
+    
+    def test_undrain_takes_joins_again(self):
+        """A called-off drain lets new sockets in"""
+        async def scenario():
+            manager = ConnectionManager()
+            await manager.drain(grace_seconds=0)
+            manager.undrain()
+            return manager, await manager.connect_player(FakeWebSocket(), "ABC123", "p9")
+        
+        manager, connected = asyncio.run(scenario())
+        assert connected is True and manager.draining is False
+
+
+class TestOperatorAuth:
+    """Who may drain a worker"""
+    
+    def test_local_callers_and_token_holders_only(self):
+        assert is_operator("127.0.0.1", {}, admin_token="")
+        assert is_operator("::1", {}, admin_token="")
+        assert not is_operator("10.0.0.7", {}, admin_token="")
+        assert not is_operator("10.0.0.7", {"x-admin-token": ""}, admin_token="")
+        assert not is_operator("10.0.0.7", {"x-admin-token": "guess"}, admin_token="s3cret")
+        assert is_operator("10.0.0.7", {"x-admin-token": "s3cret"}, admin_token="s3cret")
+    
+    def test_proxied_requests_are_not_local(self):
+        """A reverse proxy on the same host does not make its clients local"""
+        assert not is_operator("127.0.0.1", {"x-forwarded-for": "203.0.113.9"}, admin_token="")
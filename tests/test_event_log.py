@@ -0,0 +1,73 @@
+"""
+PKWY Tavern Game Suite - Event Log Replay Tests
+Folding recorded events rebuilds a game at any point in time
+"""
+from services.event_log import apply_event
+
+GAME = {
+    "id": "game-1",
+    "code": "ABC123",
+    "name": "Replay Night",
+    "status": "waiting",
+    "current_question_index": 0,
+    "players": []
+}
+
+EVENTS = [
+    ("game:created", GAME),
+    ("player:joined", {"player": {"id": "p1", "name": "Ann", "score": 0, "correct_answers": 0, "eliminated": False}}),
+    ("player:joined", {"player": {"id": "p2", "name": "Bo", "score": 0, "correct_answers": 0, "eliminated": False}}),
+    ("game:started", {}),
+    ("timer:started", {"duration": 30, "started_at": 1000.0}),
+    ("player:scored", {"player_id": "p1", "points": 150, "correct": True}),
+    ("question:changed", {"question_index": 1}),
+    ("player:scored", {"player_id": "p2", "points": 0, "correct": False}),
+    ("player:eliminated", {"player_id": "p2"}),
+    ("game:finished", {}),
+]
+
+
+def replay(until_seq=None):
+    """Fold EVENTS up to and including until_seq"""
+    state = {}
+    for seq, (name, data) in enumerate(EVENTS, start=1):
+        if until_seq is not None and seq > until_seq:
+            break
+        apply_event(state, {"seq": seq, "event": name, "data": data, "ts": f"2026-01-01T20:00:{seq:02d}+00:00"})
+    return state
+
+
+class TestReplay:
+    """apply_event folding"""
+    
+    def test_full_replay(self):
+        """Replaying every event reaches the final game state"""
+        state = replay()
+        assert state["status"] == "finished"
+        assert state["current_question_index"] == 1
+        assert state["event_seq"] == len(EVENTS)
+        players = {p["id"]: p for p in state["players"]}
+        assert players["p1"]["score"] == 150
+        assert players["p1"]["correct_answers"] == 1
+        assert players["p2"]["eliminated"] is True
+    
+    def test_point_in_time(self):
+        """Stopping early shows the game as it was then"""
+        state = replay(until_seq=5)
+        assert state["status"] == "active"
+        assert state["current_question_index"] == 0
+        assert state["room_state"]["timer"]["duration"] == 30
+        assert all(p["score"] == 0 for p in state["players"])
+    
+    def test_created_event_not_aliased(self):
+        """Replays never mutate the recorded event payloads"""
+        replay()
+        assert GAME["players"] == []
+        assert GAME["status"] == "waiting"
+    
+    def test_snapshot_then_tail_matches_full_replay(self):
+        """A snapshot plus the remaining events equals a full replay"""
+        snapshot = replay(until_seq=4)
+        for seq, (name, data) in enumerate(EVENTS[4:], start=5):
+            apply_event(snapshot, {"seq": seq, "event": name, "data": data, "ts": f"2026-01-01T20:00:{seq:02d}+00:00"})
+        assert snapshot == replay()
@@ -0,0 +1,57 @@
+"""
+PKWY Tavern Game Suite - Format Detection Tests
+Packs are classified from their keys and first elements, with a confidence and reasons
+"""
+import pytest
+from fastapi import HTTPException
+
+from routes.game_packs import detect_game_format
+from services.format_detect import UNKNOWN, classify_content
+
+
+def difficulty_questions(count):
+    return [{"difficulty": 1, "question_text": f"Q{i}", "choices": {}, "correct_answer": "A"} for i in range(count)]
+
+
+class TestClassifyContent:
+    """Structure alone, and structure checked against game_name"""
+
+    def test_categories_split_on_the_first_category(self):
+        peril = classify_content({"categories": [{"category_title": "Beer", "clues": []}]})
+        chase = classify_content({"categories": [{"name": "Beer", "questions": []}]})
+        assert (peril.game_format, peril.confidence) == ("PERIL!", 0.9)
+        assert chase.game_format == "QUIZ CHASE"
+
+    def test_clue_text_elsewhere_is_not_peril(self):
+        # The old str(content) scan matched the word "clues" anywhere in the pack
+        guess = classify_content({"categories": [{"name": "clues", "questions": [{"question": "clues?"}]}]})
+        assert guess.game_format == "QUIZ CHASE"
+
+    def test_matching_game_name_is_certain(self):
+        guess = classify_content({"game_name": "SPIN TO WIN!", "puzzles": [{"full_answer": "CHEERS"}]})
+        assert guess.game_format == "SPIN TO WIN!"
+        assert guess.confidence == 1.0
+        assert len(guess.reasons) == 2
+
+    def test_game_name_wins_a_mismatch_but_says_so(self):
+        guess = classify_content({"game_name": "PERIL!", "survey_questions": [{"answers": []}]})
+        assert guess.game_format == "PERIL!"
+        assert guess.confidence == 0.7
+        assert "SURVEY SAYS!" in guess.reasons[-1]
+
+    def test_difficulty_questions_split_on_length(self):
+        assert classify_content({"questions": difficulty_questions(15)}).game_format == "LAST CALL STANDING"
+        assert classify_content({"questions": difficulty_questions(5)}).game_format == "PKWY LIVE!"
+
+    @pytest.mark.parametrize("content", [[], {"questions": []}, {"categories": [{}]}, {"title": "x"}])
+    def test_unknown_content_gives_a_reason(self, content):
+        guess = classify_content(content)
+        assert guess.game_format == UNKNOWN
+        assert guess.confidence == 0.0
+        assert guess.reasons
+
+    def test_route_helper_reports_reasons(self):
+        with pytest.raises(HTTPException) as raised:
+            detect_game_format({"questions": [{"prompt": "?"}]})
+        assert raised.value.status_code == 400
+        assert "first question matches no known format" in raised.value.detail
@@ -0,0 +1,96 @@
+"""
+PKWY Tavern Game Suite - Game State Machine Tests
+Transitions are single guarded find_one_and_update calls
+"""
+import asyncio
+import pytest
+
+from services.game_state import (
+    FINISHED, GameNotFound, InvalidTransition, STATUS_TRANSITIONS,
+    move_question, transition_status
+)
+
+
+class RecordingGames:
+    """Records the filter/update of each call and returns a canned result"""
+    
+    def __init__(self, result=None, existing=None):
+        self.result = result
+        self.existing = existing
+        self.calls = []
+    
+    async def find_one_and_update(self, query, update, projection=None, return_document=None):
+        self.calls.append((query, update))
+        return self.result
+    
+    async def find_one(self, query, projection=None):
+        return self.existing
+
+
+class FakeDB:
+    def __init__(self, games):
+        self.games = games
+
+
+GAME = {"id": "g1", "code": "ABC123", "status": "active", "current_question_index": 3, "version": 7}
+
+
+class TestTransitions:
+    """Status transitions"""
+    
+    def test_finished_is_terminal(self):
+        """Nothing leaves the finished state, so a finished game cannot restart"""
+        assert STATUS_TRANSITIONS[FINISHED] == set()
+        assert STATUS_TRANSITIONS["waiting"] == {"active"}
+    
+    def test_start_guards_on_source_status_and_version(self):
+        """Start only matches waiting games at the expected version"""
+        games = RecordingGames(result=GAME)
+        asyncio.run(transition_status(FakeDB(games), {"id": "g1"}, "start", expected_version=6))
+        
+        query, update = games.calls[0]
+        assert query["status"] == {"$in": ["waiting"]}
+        assert query["version"] == 6
+        assert update["$inc"] == {"version": 1}
+        assert "started_at" in update["$set"]
+    
+    def test_rejected_transition_reports_current_state(self):
+        """A guard miss on an existing game raises InvalidTransition, not 404"""
+        games = RecordingGames(result=None, existing={**GAME, "status": "finished"})
+        with pytest.raises(InvalidTransition, match="finished"):
+            asyncio.run(transition_status(FakeDB(games), {"id": "g1"}, "start"))
+    
+    def test_missing_game(self):
+        """A guard miss on a missing game raises GameNotFound"""
+        games = RecordingGames(result=None, existing=None)
+        with pytest.raises(GameNotFound):
+            asyncio.run(transition_status(FakeDB(games), {"id": "nope"}, "pause"))
+
+
+class TestQuestionMoves:
+    """Question progression"""
+    
+    def test_next_is_atomic_increment_with_double_tap_guard(self):
+        """Next increments in the database, bounded and pinned to from_index"""
+        games = RecordingGames(result=GAME)
+        asyncio.run(move_question(FakeDB(games), {"code": "ABC123"}, delta=1, expected_index=3, question_count=10))
+        
+        query, update = games.calls[0]
+        assert query["current_question_index"] == {"$lt": 9, "$eq": 3}
+        assert update["$inc"] == {"current_question_index": 1, "version": 1}
+        assert update["$set"]["room_state.timer"] is None
+    
+    def test_previous_never_goes_below_zero(self):
+        """Previous only matches games past the first question"""
+        games = RecordingGames(result=GAME)
+        asyncio.run(move_question(FakeDB(games), {"code": "ABC123"}, delta=-1))
+        
+        query, _ = games.calls[0]
+        assert query["current_question_index"] == {"$gte": 1}
+    
+    def test_goto_out_of_range_rejected_without_write(self):
+        """Jumping past the plan fails before touching the database"""
+        games = RecordingGames(result=GAME)
+        with pytest.raises(InvalidTransition):
+            asyncio.run(move_question(FakeDB(games), {"code": "ABC123"}, index=12, question_count=10))
+        assert games.calls == []
@@ -0,0 +1,74 @@
+"""
+PKWY Tavern Game Suite - Index Coverage Tests
+Runs explain() on every hot-path query and fails on a collection scan
+"""
+import pytest
+import os
+
+from services.migrations import (
+    HOT_PATH_QUERIES, explain_command, plan_stages,
+    required_indexes, uses_collection_scan
+)
+
+MONGO_URL = os.environ.get('MONGO_URL', '')
+DB_NAME = os.environ.get('DB_NAME', 'test_database')
+
+
+class TestPlanInspection:
+    """explain() output parsing"""
+    
+    def test_detects_collscan(self):
+        """A bare COLLSCAN winning plan is flagged"""
+        explain = {"queryPlanner": {"winningPlan": {"stage": "COLLSCAN"}}}
+        assert uses_collection_scan(explain)
+    
+    def test_index_scan_passes(self):
+        """FETCH over IXSCAN is not flagged"""
+        explain = {"queryPlanner": {"winningPlan": {
+            "stage": "FETCH", "inputStage": {"stage": "IXSCAN", "indexName": "id_1"}
+        }}}
+        assert plan_stages(explain) == ["FETCH", "IXSCAN"]
+        assert not uses_collection_scan(explain)
+    
+    def test_slot_based_plan(self):
+        """SBE plans nest the classic plan under queryPlan"""
+        explain = {"queryPlanner": {"winningPlan": {
+            "queryPlan": {"stage": "FETCH", "inputStage": {"stage": "COLLSCAN"}},
+            "slotBasedPlan": {}
+        }}}
+        assert uses_collection_scan(explain)
+    
+    def test_every_hot_path_has_declared_index(self):
+        """Each hot-path filter's fields form the prefix of a declared index"""
+        declared = {
+            collection: [list(index.document["key"]) for index in indexes]
+            for collection, indexes in required_indexes().items()
+        }
+        for query in HOT_PATH_QUERIES:
+            fields = set(query["filter"])
+            assert any(
+                set(keys[:len(fields)]) == fields
+                for keys in declared.get(query["collection"], [])
+            ), f"No index for {query['collection']} on {sorted(fields)}"
+
+
+@pytest.mark.skipif(not MONGO_URL, reason="MONGO_URL not set")
+class TestHotPathExplain:
+    """Live explain() against MongoDB"""
+    
+    @pytest.fixture(autouse=True)
+    def setup(self):
+        """Apply declared indexes to the target database"""
+        from pymongo import MongoClient
+        self.client = MongoClient(MONGO_URL)
+        self.db = self.client[DB_NAME]
+        for collection, indexes in required_indexes().items():
+            self.db[collection].create_indexes(indexes)
+        yield
+        self.client.close()
+    
+    @pytest.mark.parametrize("query", HOT_PATH_QUERIES, ids=lambda q: f"{q['collection']}.{next(iter(q['filter']))}")
+    def test_no_collscan(self, query):
+        """Hot-path query is served by an index"""
+        explain = self.db.command("explain", explain_command(query), verbosity="queryPlanner")
+        assert not uses_collection_scan(explain), f"COLLSCAN: {query}"
@@ -0,0 +1,102 @@
+"""
+PKWY Tavern Game Suite - Leaderboard Publisher Tests
+Screens get the whole board, phones get the top N plus their own neighbourhood
+"""
+import asyncio
+import json
+
+from services.leaderboard import LeaderboardThrottle, personal_messages, publish_final, publish_leaderboard, rank_players
+from services.websocket_manager import ConnectionManager
+
+PLAYERS = [{"id": f"p{i}", "name": f"Player {i}", "score": 10 * i, "correct_answers": i} for i in range(1000)]
+
+
+class FakeWebSocket:
+    def __init__(self):
+        self.sent = []
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, text):
+        self.sent.append(text)
+
+
+async def connected_room(players):
+    manager = ConnectionManager()
+    tv = FakeWebSocket()
+    phones = {p["id"]: FakeWebSocket() for p in players}
+    manager.ensure_room("LB0001")
+    await manager.connect_tv(tv, "LB0001")
+    manager.game_rooms["LB0001"]["players"].update(phones)
+    return manager, tv, phones
+
+
+class TestRanking:
+    """Rows and personal boards"""
+
+    def test_ties_share_a_rank(self):
+        rows = rank_players([
+            {"id": "a", "name": "A", "score": 300}, {"id": "b", "name": "B", "score": 300},
+            {"id": "c", "name": "C", "score": 100},
+        ])
+        assert [(r["player_id"], r["rank"]) for r in rows] == [("a", 1), ("b", 1), ("c", 3)]
+
+    def test_personal_board_has_top_and_neighbours(self):
+        rows = rank_players(PLAYERS)
+        (player_id, text), = personal_messages(rows, "leaderboard:personal", ["p500"])
+        data = json.loads(text)["data"]
+
+        assert player_id == "p500"
+        assert data["rank"] == 500 and data["score"] == 5000 and data["players"] == 1000
+        assert [r["player_id"] for r in data["top"]][:2] == ["p999", "p998"]
+        assert len(data["top"]) == 10
+        assert [r["player_id"] for r in data["neighbours"]] == ["p501", "p499"]
+
+
+class TestPublish:
+    """Who gets what"""
+
+    def test_bytes_grow_linearly(self):
+        """1,000 players: the room gets O(n) bytes rather than n full boards"""
+        manager, tv, phones = asyncio.run(connected_room(PLAYERS))
+        asyncio.run(publish_leaderboard(manager, "LB0001", PLAYERS))
+
+        full = len(tv.sent[0])
+        assert len(json.loads(tv.sent[0])["data"]) == 1000
+        per_phone = max(len(ws.sent[0]) for ws in phones.values())
+        assert per_phone * 50 < full
+
+    def test_final_reaches_every_phone(self):
+        manager, tv, phones = asyncio.run(connected_room(PLAYERS[:3]))
+        manager.game_rooms["LB0001"]["players"]["removed"] = FakeWebSocket()
+        asyncio.run(publish_final(manager, "LB0001", PLAYERS[:3]))
+
+        assert json.loads(tv.sent[0])["data"]["winner"]["id"] == "p2"
+        assert json.loads(phones["p0"].sent[0])["data"]["rank"] == 3
+        removed = manager.game_rooms["LB0001"]["players"]["removed"]
+        assert json.loads(removed.sent[0])["data"]["winner"]["player_id"] == "p2"
+
+
+class TestThrottle:
+    """Rapid score changes"""
+
+    def test_burst_publishes_once_then_at_interval(self):
+        async def burst():
+            published = []
+
+            async def publish():
+                published.append(asyncio.get_running_loop().time())
+
+            throttle = LeaderboardThrottle(interval=0.05, coalesce=0.01)
+            for _ in range(20):
+                throttle.schedule("LB0001", publish)
+            await asyncio.sleep(0.03)
+            for _ in range(20):
+                throttle.schedule("LB0001", publish)
+            await asyncio.sleep(0.1)
+            return published
+
+        published = asyncio.run(burst())
+        assert len(published) == 2
+        assert published[1] - published[0] >= 0.045
@@ -0,0 +1,200 @@
+"""
+PKWY Tavern Game Suite - Live Patch Tests
+A question fixed mid-game is swapped in per game, rescored and sent as a delta
+"""
+import asyncio
+
+import pytest
+
+from services.answer_tally import AnswerTally
+from services.content_cache import intern_content
+from services.content_store import put_content
+from services.event_log import apply_event
+from services.live_patch import (
+    QuestionConflict, QuestionNotFound, content_with_overrides, game_question, patch_game_question, question_pointer
+)
+from services.mass_audience import MassAudience
+from services.pack_validation import PackValidationError
+from services.room_state import apply_question_patch, set_room_content
+from services.scoring import ANSWERS_COLLECTION
+from services.websocket_manager import ConnectionManager
+from tests.test_content_store import Collection, FakeDB as ContentDB, Result, matches
+
+
+def live_pack(count):
+    return {"game_name": "PKWY LIVE!", "questions": [
+        {"difficulty": 1, "question_text": f"Q{i}", "choices": {"A": "a", "B": "b"}, "correct_answer": "A"}
+        for i in range(count)
+    ]}
+
+
+def peril_pack():
+    return {"game_name": "PERIL!", "categories": [
+        {"category_title": title, "clues": [{"value": 100 * (i + 1), "clue": f"{title} {i}", "answer": "x"}
+                                            for i in range(2)]}
+        for title in ("Beer", "Wine")
+    ]}
+
+
+def dotted(doc, path):
+    for key in path.split("."):
+        if not isinstance(doc, dict) or key not in doc:
+            return None, False
+        doc = doc[key]
+    return doc, True
+
+
+class Games:
+    """games: dotted $set, and the positional player $inc the rescore sends"""
+
+    def __init__(self, game):
+        self.game = game
+
+    async def find_one(self, query, projection=None):
+        return self.game if self.game["id"] == query["id"] else None
+
+    async def update_one(self, query, update):
+        for key, expected in query.items():
+            value, present = dotted(self.game, key)
+            if isinstance(expected, dict) and "$exists" in expected:
+                if present != expected["$exists"]:
+                    return Result()
+            elif value != expected:
+                return Result()
+        for key, value in update["$set"].items():
+            parent, _, last = key.rpartition(".")
+            target = self.game
+            for part in filter(None, parent.split(".")):
+                target = target.setdefault(part, {})
+            target[last] = value
+        return Result(matched=1)
+
+    async def bulk_write(self, requests, ordered=True):
+        for request in requests:
+            player = next(p for p in self.game["players"] if p["id"] == request._filter["players.id"])
+            player["score"] += request._doc["$inc"]["players.$.score"]
+            player["correct_answers"] += request._doc["$inc"]["players.$.correct_answers"]
+
+
+class Answers(Collection):
+    async def bulk_write(self, requests, ordered=True):
+        for request in requests:
+            doc = next(d for d in self.docs if matches(d, request._filter))
+            doc.update(request._doc["$set"])
+
+
+class FakeDB(ContentDB):
+    def __init__(self, content, answers=()):
+        super().__init__()
+        self.answers = Answers()
+        self.analytics = Collection()
+        self.content_hash = asyncio.run(put_content(self, content))
+        self.games = Games({
+            "id": "game-1", "game_format": content["game_name"], "content_hash": self.content_hash,
+            "players": [{"id": pid, "score": 0, "correct_answers": 0} for pid in ("p1", "p2")]
+        })
+        for player_id, answer in answers:
+            correct = answer == "A"
+            self.answers.docs.append({"game_id": "game-1", "question_index": 1, "player_id": player_id,
+                                      "answer": answer, "time_taken": 30, "correct": correct,
+                                      "points": 100 if correct else 0})
+            player = next(p for p in self.games.game["players"] if p["id"] == player_id)
+            player["score"] += 100 if correct else 0
+            player["correct_answers"] += int(correct)
+
+    def __getitem__(self, name):
+        if name == ANSWERS_COLLECTION:
+            return self.answers
+        if name == "answer_analytics":
+            return self.analytics
+        return super().__getitem__(name)
+
+
+def patch(db, ops, index=1, expected_version=None):
+    return asyncio.run(patch_game_question(db, "game-1", index, ops, expected_version))
+
+
+class TestOverrides:
+    """Patched questions are laid over the shared content without copying it"""
+
+    def test_pointers_walk_categories(self):
+        assert question_pointer("PERIL!", peril_pack(), 3) == "/categories/1/clues/1"
+        assert question_pointer("PKWY LIVE!", live_pack(3), 2) == "/questions/2"
+        assert question_pointer("PKWY LIVE!", live_pack(3), 3) is None
+
+    def test_content_with_overrides_copies_one_path(self):
+        shared = intern_content(live_pack(3))
+        fixed = {"question_text": "Fixed", "correct_answer": "B"}
+        overrides = {"1": {"question": fixed, "version": 1}}
+        content = content_with_overrides("PKWY LIVE!", shared.content, overrides)
+        assert content["questions"][1] == fixed and content["questions"][0] is shared.content["questions"][0]
+        assert shared.content["questions"][1]["question_text"] == "Q1"
+        assert game_question(shared.plan("PKWY LIVE!"), overrides, 1) is fixed
+        assert game_question(shared.plan("PKWY LIVE!"), overrides, 0)["question_text"] == "Q0"
+
+
+class TestPatchGameQuestion:
+    """The fix is stored per game and answers already in are scored again"""
+
+    def test_fixing_the_answer_rescores(self):
+        db = FakeDB(live_pack(3), answers=[("p1", "A"), ("p2", "B")])
+        result = patch(db, [{"op": "replace", "path": "/correct_answer", "value": "B"}])
+
+        assert result["path"] == "/questions/1" and result["version"] == 1
+        assert result["question"]["correct_answer"] == "B"
+        assert sorted((c["player_id"], c["points_delta"], c["correct_delta"]) for c in result["rescored"]) == [
+            ("p1", -100, -1), ("p2", 100, 1)
+        ]
+        assert [(a["player_id"], a["correct"], a["points"]) for a in db.answers.docs] == [("p1", False, 0), ("p2", True, 100)]
+        assert [(p["score"], p["correct_answers"]) for p in db.games.game["players"]] == [(0, 0), (100, 1)]
+        assert db.games.game["question_overrides"]["1"]["question"]["correct_answer"] == "B"
+
+        # A text fix changes nobody's result
+        assert patch(db, [{"op": "replace", "path": "/question_text", "value": "Q1?"}])["rescored"] == []
+
+    def test_rejected_patches(self):
+        db = FakeDB(live_pack(2))
+        with pytest.raises(QuestionNotFound):
+            patch(db, [{"op": "replace", "path": "/question_text", "value": "x"}], index=5)
+        with pytest.raises(PackValidationError):
+            patch(db, [{"op": "remove", "path": "/correct_answer"}])
+        patch(db, [{"op": "replace", "path": "/question_text", "value": "x"}])
+        with pytest.raises(QuestionConflict):
+            patch(db, [{"op": "replace", "path": "/question_text", "value": "y"}], expected_version=0)
+
+
+class TestRoomPatch:
+    """A room swaps in the question; other rooms on the same pack keep sharing"""
+
+    def test_room_plan_tally_and_scores(self):
+        shared = intern_content(live_pack(3))
+        manager = ConnectionManager()
+        patched_room, other_room = manager.ensure_room("AAA"), manager.ensure_room("BBB")
+        for room in (patched_room, other_room):
+            set_room_content(room, "PKWY LIVE!", shared)
+        tally = patched_room["tallies"][1] = AnswerTally(1)
+        tally.add("A", True, "p1")
+        tally.add("B", False, "p2")
+        patched_room["mass"] = MassAudience("game-1", "PKWY LIVE!", [{"id": "p1", "score": 100, "correct_answers": 1}])
+
+        fixed = {**live_pack(3)["questions"][1], "correct_answer": "B"}
+        apply_question_patch(patched_room, {"question_index": 1, "question": fixed, "rescored": [
+            {"player_id": "p1", "correct": False, "points": 0, "points_delta": -100, "correct_delta": -1},
+            {"player_id": "p2", "correct": True, "points": 100, "points_delta": 100, "correct_delta": 1},
+        ]})
+
+        assert patched_room["plan"][1] is fixed and patched_room["plan"][0] is shared.plan("PKWY LIVE!")[0]
+        assert other_room["plan"] is shared.plan("PKWY LIVE!")
+        assert (tally.correct, tally.correct_players) == (1, {"p2"})
+        assert patched_room["mass"].scores["p1"] == 0
+
+    def test_replay_keeps_the_patch(self):
+        state = {"players": [{"id": "p1", "score": 100, "correct_answers": 1}]}
+        apply_event(state, {"event": "content:patched", "seq": 5, "data": {
+            "question_index": 1, "question": {"correct_answer": "B"}, "version": 1,
+            "rescored": [{"player_id": "p1", "correct": False, "points": 0, "points_delta": -100, "correct_delta": -1}]
+        }})
+        assert state["question_overrides"]["1"]["question"] == {"correct_answer": "B"}
+        assert state["players"][0]["score"] == 0
+        apply_event(state, {"event": "content:updated", "seq": 6, "data": {"content_hash": "h"}})
+        assert "question_overrides" not in state
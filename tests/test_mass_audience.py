@@ -0,0 +1,332 @@
+"""
+PKWY Tavern Game Suite - Mass Audience Tests
+Batched answers, sharded fan-out and personal leaderboards for big PKWY LIVE! rooms
+"""
+import asyncio
+import json
+
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+
+from routes import games as games_routes
+
+from services import websocket_manager
+from services.event_log import apply_event, event_log
+from services.mass_audience import DUPLICATE_KEY, MassAudience
+from services.websocket_manager import (
+    ConnectionManager, flush_mass_answers, handle_director_message, handle_player_message, submit_mass_answer
+)
+from tests.test_content_store import Cursor
+
+PLAYERS = [{"id": f"p{i}", "name": f"Player {i}", "score": 0, "correct_answers": 0} for i in range(600)]
+QUESTIONS = [
+    {"difficulty": 1, "question_text": f"q{i}", "choices": {"A": "a", "B": "b"}, "correct_answer": "A"}
+    for i in range(3)
+]
+GAME = {"id": "game-1", "code": "MASS01", "game_format": "PKWY LIVE!", "status": "active",
+        "current_question_index": 0, "content": {"questions": QUESTIONS}, "players": PLAYERS}
+
+
+class FakeWebSocket:
+    def __init__(self):
+        self.sent = []
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, text):
+        self.sent.append(json.loads(text))
+
+
+class FakeGames:
+    def __init__(self):
+        self.bulk_writes = []
+        self.fail = None
+
+    async def find_one(self, query, projection=None):
+        return GAME
+
+    async def find_one_and_update(self, query, update, projection=None, return_document=None):
+        self.bulk_writes.append([UpdateOne(query, update)])
+        return {"id": GAME["id"], "players": [{"id": query["players.id"], "score": update["$inc"]["players.$.score"]}]}
+
+    async def bulk_write(self, requests, ordered=True):
+        if self.fail:
+            raise self.fail
+        self.bulk_writes.append(requests)
+
+
+class FakeCollection:
+    def __init__(self):
+        self.docs = []
+        self.insert_many_calls = 0
+        self.fail = None
+
+    async def find_one(self, *args, **kwargs):
+        return None
+
+    async def insert_one(self, doc):
+        self.docs.append(doc)
+
+    def find(self, query, projection=None):
+        return Cursor([d for d in self.docs if all(d.get(k) == v for k, v in query.items())])
+
+    async def insert_many(self, docs, ordered=True):
+        self.insert_many_calls += 1
+        if self.fail:
+            raise self.fail
+        errors = []
+        for index, doc in enumerate(docs):
+            if any((d["game_id"], d["question_index"], d["player_id"]) == (doc["game_id"], doc["question_index"], doc["player_id"])
+                   for d in self.docs):
+                errors.append({"index": index, "code": DUPLICATE_KEY})
+            else:
+                self.docs.append(doc)
+        if errors:
+            raise BulkWriteError({"writeErrors": errors})
+
+    async def delete_many(self, query):
+        keys = {(query["game_id"], q["question_index"], q["player_id"]) for q in query["$or"]}
+        self.docs = [d for d in self.docs if (d["game_id"], d["question_index"], d["player_id"]) not in keys]
+
+    async def update_one(self, query, update, upsert=False):
+        pass
+
+
+class FakeDB:
+    def __init__(self):
+        self.games = FakeGames()
+        self.collections = {}
+
+    def __getitem__(self, name):
+        return self.collections.setdefault(name, FakeCollection())
+
+
+async def mass_round(answers):
+    """Enable mass mode, have players answer question 0, reveal and show the leaderboard"""
+    manager = ConnectionManager()
+    websocket_manager.manager, previous = manager, websocket_manager.manager
+    try:
+        db = FakeDB()
+        tv, director = FakeWebSocket(), FakeWebSocket()
+        phones = {p["id"]: FakeWebSocket() for p in PLAYERS}
+        await manager.connect_tv(tv, GAME["code"])
+        await manager.connect_director(director, GAME["code"])
+        await handle_director_message(GAME["code"], {"event": "audience:mass", "data": {"enabled": True}}, db)
+        for player_id, ws in phones.items():
+            await manager.connect_player(ws, GAME["code"], player_id)
+
+        for player_id, answer in answers:
+            await handle_player_message(GAME["code"], player_id, {
+                "event": "answer:submit", "data": {"answer": answer, "time_taken": 30, "question_index": 0}
+            }, db)
+        await handle_director_message(GAME["code"], {"event": "answer:reveal", "data": {"revealed": True}}, db)
+        await handle_director_message(GAME["code"], {"event": "leaderboard:show", "data": {}}, db)
+        event_log.forget(GAME["id"])
+        return db, tv, director, phones
+    finally:
+        websocket_manager.manager = previous
+
+
+def events(ws, name):
+    return [m["data"] for m in ws.sent if m["event"] == name]
+
+
+class TestMassAudience:
+    """In-memory scoring and ranks"""
+
+    def test_duplicate_rejected_before_queueing(self):
+        mass = MassAudience("g", "PKWY LIVE!", PLAYERS[:2])
+        assert mass.submit("p0", 0, "A", 1) is None
+        assert mass.submit("p0", 0, "B", 1) == "Question 0 already answered"
+        assert mass.submit("nobody", 0, "A", 1) == "Player not found"
+        assert len(mass.queue) == 1
+
+    def test_batch_replays(self):
+        state = {"players": [dict(p) for p in PLAYERS[:2]]}
+        apply_event(state, {"seq": 1, "event": "players:scored", "data": {"scores": [
+            {"player_id": "p1", "points": 100, "correct": True, "question_index": 0}
+        ]}})
+        assert [p["score"] for p in state["players"]] == [0, 100]
+
+
+class TestMassRound:
+    """A full question in mass-audience mode"""
+
+    def test_answers_batched_and_counted_before_reveal(self):
+        answers = [(p["id"], "A" if i % 3 else "B") for i, p in enumerate(PLAYERS)]
+        db, tv, director, phones = asyncio.run(mass_round(answers + [("p1", "B")]))
+
+        # Two bulk writes for 600 answers, not 1200 single ones
+        assert db["answers"].insert_many_calls == 1
+        assert len(db.games.bulk_writes) == 1 and len(db.games.bulk_writes[0]) == 600
+
+        reveal = events(tv, "answer:revealed")[0]
+        assert reveal["distribution"]["answered"] == 600
+        assert reveal["distribution"]["counts"] == {"A": 400, "B": 200}
+        assert not events(director, "player:answered")
+        assert events(director, "answers:batch")[0]["count"] == 600
+
+        acks = events(phones["p1"], "answer:ack")
+        assert [a["accepted"] for a in acks] == [False, True]
+
+    def test_players_get_rank_and_top_ten_only(self):
+        answers = [(p["id"], "A") for p in PLAYERS[:5]]
+        _, tv, _, phones = asyncio.run(mass_round(answers))
+
+        assert len(events(tv, "leaderboard:update")[0]) == 10
+        personal = events(phones["p599"], "leaderboard:personal")[0]
+        assert personal["rank"] == 6 and personal["players"] == 600
+        assert len(personal["top"]) == 10
+        assert events(phones["p0"], "leaderboard:personal")[0]["rank"] == 1
+        assert not events(phones["p0"], "leaderboard:update")
+
+
+def mass_room(db, answered=()):
+    """A loaded room in mass mode on its own manager, with players p0-p2 connected"""
+    manager = ConnectionManager()
+    for player_id, question_index in answered:
+        db["answers"].docs.append({"game_id": GAME["id"], "question_index": question_index, "player_id": player_id})
+
+    async def setup():
+        phones = {p["id"]: FakeWebSocket() for p in PLAYERS[:3]}
+        for player_id, ws in phones.items():
+            await manager.connect_player(ws, GAME["code"], player_id)
+        room = await websocket_manager.load_room(GAME["code"], db)
+        await websocket_manager.enable_mass_audience(GAME["code"], db, room)
+        return room, phones
+    return manager, setup
+
+
+def run_with(manager, coro_fn):
+    async def run():
+        websocket_manager.manager, previous = manager, websocket_manager.manager
+        try:
+            return await coro_fn()
+        finally:
+            websocket_manager.manager = previous
+            event_log.forget(GAME["id"])
+    return asyncio.run(run())
+
+
+class TestMassPersistence:
+    """Only answers that were stored are scored, in Mongo and in memory"""
+
+    def test_answers_stored_earlier_are_duplicates(self):
+        db = FakeDB()
+        manager, setup = mass_room(db, answered=[("p0", 0)])
+
+        async def run():
+            room, _ = await setup()
+            assert room["mass"].submit("p0", 0, "A", 1) == "Question 0 already answered"
+            return room
+        run_with(manager, run)
+
+    def test_only_inserted_answers_are_scored(self):
+        db = FakeDB()
+        manager, setup = mass_room(db)
+
+        async def run():
+            room, phones = await setup()
+            mass = room["mass"]
+            mass.submit("p0", 0, "A", 30)
+            mass.submit("p1", 0, "A", 30)
+            # p1's answer lands over another path while the batch is queued
+            db["answers"].docs.append({"game_id": GAME["id"], "question_index": 0, "player_id": "p1"})
+            await flush_mass_answers(GAME["code"], db)
+            return mass, phones
+        mass, phones = run_with(manager, run)
+
+        assert [u._filter["players.id"] for u in db.games.bulk_writes[0]] == ["p0"]
+        assert mass.scores["p0"] > 0 and mass.scores["p1"] == 0
+        assert events(phones["p1"], "answer:ack") == [
+            {"accepted": False, "question_index": 0, "reason": "Question 0 already answered"}
+        ]
+
+    def test_failed_batch_is_rejected_and_not_scored(self):
+        db = FakeDB()
+        db["answers"].fail = RuntimeError("primary stepped down")
+        manager, setup = mass_room(db)
+
+        async def run():
+            room, phones = await setup()
+            mass = room["mass"]
+            mass.submit("p0", 0, "A", 30)
+            await flush_mass_answers(GAME["code"], db)
+            return mass, phones
+        mass, phones = run_with(manager, run)
+
+        assert mass.scores["p0"] == 0 and not db.games.bulk_writes
+        assert events(phones["p0"], "answer:ack")[0]["accepted"] is False
+        # The player may answer again
+        assert mass.submit("p0", 0, "A", 30) is None
+
+    def test_unscored_answers_are_taken_back(self):
+        db = FakeDB()
+        manager, setup = mass_room(db)
+
+        async def run():
+            room, phones = await setup()
+            mass = room["mass"]
+            db.games.fail = RuntimeError("primary stepped down")
+            mass.submit("p0", 0, "A", 30)
+            await flush_mass_answers(GAME["code"], db)
+            first = events(phones["p0"], "answer:ack")[0]
+            # The retry is stored and scored once the score write works again
+            db.games.fail = None
+            again = await submit_mass_answer(GAME["code"], db, mass, "p0", 0, "A", 30)
+            return mass, first, again
+        mass, first, again = run_with(manager, run)
+
+        assert first["accepted"] is False
+        assert again["accepted"] and mass.scores["p0"] == again["new_score"] > 0
+        assert len(db["answers"].docs) == 1 and len(db.games.bulk_writes) == 1
+
+    def test_flush_loop_outlives_a_failed_flush(self, monkeypatch):
+        db = FakeDB()
+        manager, setup = mass_room(db)
+        monkeypatch.setattr(websocket_manager, "MASS_BATCH_SECONDS", 0)
+        real_flush, calls = websocket_manager.flush_mass_answers, []
+
+        async def flaky_flush(game_code, db):
+            calls.append(game_code)
+            if len(calls) == 1:
+                raise RuntimeError("socket closed mid-ack")
+            await real_flush(game_code, db)
+        monkeypatch.setattr(websocket_manager, "flush_mass_answers", flaky_flush)
+
+        async def run():
+            room, phones = await setup()
+            return await asyncio.wait_for(submit_mass_answer(GAME["code"], db, room["mass"], "p1", 0, "A", 30), 1)
+        ack = run_with(manager, run)
+
+        assert len(calls) == 2 and ack["accepted"]
+
+    def test_rest_answers_join_the_batch(self):
+        db = FakeDB()
+        manager, setup = mass_room(db)
+
+        async def run():
+            room, _ = await setup()
+            ack = await submit_mass_answer(GAME["code"], db, room["mass"], "p2", 0, "A", 30)
+            again = await submit_mass_answer(GAME["code"], db, room["mass"], "p2", 0, "A", 30)
+            return room["mass"], ack, again
+        mass, ack, again = run_with(manager, run)
+
+        assert ack["accepted"] and ack["new_score"] == mass.scores["p2"] > 0
+        assert again == {"accepted": False, "question_index": 0, "reason": "Question 0 already answered"}
+
+    def test_rest_score_changes_reach_the_standings(self):
+        db = FakeDB()
+        manager, setup = mass_room(db)
+        games_routes.set_db(db)
+
+        async def run():
+            room, _ = await setup()
+            response = await games_routes.update_player_score(GAME["code"], "p1", points=250, correct=True)
+            return room["mass"], response
+        mass, response = run_with(manager, run)
+
+        update = db.games.bulk_writes[0][0]
+        assert update._filter == {"code": GAME["code"], "players.id": "p1"} and "$inc" in update._doc
+        assert response["new_score"] == mass.scores["p1"] == 250 and mass.correct_answers["p1"] == 1
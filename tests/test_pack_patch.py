@@ -0,0 +1,167 @@
+"""
+PKWY Tavern Game Suite - Pack Patch Tests
+JSON-patch edits validate only what they touch and are kept as replayable deltas
+"""
+import asyncio
+
+import pytest
+
+from services import pack_versions
+from services.content_store import put_content
+from services.pack_patch import PatchError, apply_patch, patch_pack
+from services.pack_validation import PackValidationError
+from services.pack_versions import (
+    VersionConflict, commit_version, content_at, drop_history, list_versions, load_pack_content
+)
+from tests.test_content_store import Collection, FakeDB as ContentDB
+
+
+def live_pack(count):
+    return {"game_name": "PKWY LIVE!", "questions": [
+        {"difficulty": 1, "question_text": f"Q{i}", "choices": {"A": "a", "B": "b"}, "correct_answer": "A"}
+        for i in range(count)
+    ]}
+
+
+class FakeDB(ContentDB):
+    def __init__(self):
+        super().__init__()
+        self.game_packs = Collection(unique=("id",))
+        self.versions = Collection(unique=("pack_id", "version"))
+        self.game_pack_chunks = Collection()
+
+    def __getitem__(self, name):
+        if name == pack_versions.VERSIONS_COLLECTION:
+            return self.versions
+        return super().__getitem__(name)
+
+
+def stored_pack(db, content):
+    async def store():
+        pack = {"id": "pack-1", "game_format": "PKWY LIVE!", "content_hash": await put_content(db, content),
+                "created_at": "2026-01-01T00:00:00+00:00"}
+        await db.game_packs.insert_one(pack)
+        return pack
+    return asyncio.run(store())
+
+
+def edit(db, ops):
+    async def run():
+        pack = await db.game_packs.find_one({"id": "pack-1"})
+        content, delta = patch_pack(pack["game_format"], await load_pack_content(db, pack), ops)
+        return await commit_version(db, pack, ops=delta, content=content)
+    return asyncio.run(run())
+
+
+class TestApplyPatch:
+    """RFC 6902 operations, copy-on-write"""
+
+    def test_operations(self):
+        content = {"a": {"b": 1}, "list": [1, 2, 3]}
+        patched, touched = apply_patch(content, [
+            {"op": "replace", "path": "/a/b", "value": 2},
+            {"op": "add", "path": "/list/-", "value": 4},
+            {"op": "remove", "path": "/list/0"},
+            {"op": "move", "from": "/a/b", "path": "/c"},
+            {"op": "copy", "from": "/list/0", "path": "/list/0"},
+            {"op": "test", "path": "/c", "value": 2},
+        ])
+        assert patched == {"a": {}, "list": [2, 2, 3, 4], "c": 2}
+        assert content == {"a": {"b": 1}, "list": [1, 2, 3]}
+        assert ("list", 0) in touched and ("c", None) in touched
+
+    def test_untouched_parts_are_shared(self):
+        content = live_pack(3)
+        patched, touched = apply_patch(content, [{"op": "replace", "path": "/questions/1/question_text", "value": "x"}])
+        assert patched["questions"][0] is content["questions"][0]
+        assert patched["questions"][1] is not content["questions"][1]
+        assert touched == {("questions", 1)}
+
+    @pytest.mark.parametrize("op", [
+        {"op": "replace", "path": "/missing", "value": 1},
+        {"op": "remove", "path": "/questions/9"},
+        {"op": "add", "path": "/questions/01", "value": {}},
+        {"op": "test", "path": "/game_name", "value": "PERIL!"},
+        {"op": "replace", "path": "", "value": []},
+        {"op": "explode", "path": "/"},
+    ])
+    def test_bad_operations(self, op):
+        with pytest.raises(PatchError):
+            apply_patch(live_pack(2), [op])
+
+
+class TestPatchPack:
+    """Only touched items are validated; normalization lands in the delta"""
+
+    def test_only_touched_items_are_validated(self):
+        content = live_pack(3)
+        content["questions"][2]["difficulty"] = "hard"  # already broken, not touched
+        patched, delta = patch_pack("PKWY LIVE!", content, [
+            {"op": "replace", "path": "/questions/0/difficulty", "value": "2"}
+        ])
+        assert patched["questions"][0]["difficulty"] == 2
+        assert delta[-1] == {"op": "replace", "path": "/questions/0", "value": patched["questions"][0]}
+        assert apply_patch(content, delta)[0] == patched
+
+        with pytest.raises(PackValidationError) as raised:
+            patch_pack("PKWY LIVE!", content, [{"op": "remove", "path": "/questions/1/correct_answer"}])
+        assert [e["loc"] for e in raised.value.errors] == [["questions", 1, "correct_answer"]]
+
+    @pytest.mark.parametrize("ops,loc", [
+        ([{"op": "replace", "path": "/questions/2", "value": {"bogus": 1}},
+          {"op": "remove", "path": "/questions/0"}], 1),
+        ([{"op": "replace", "path": "/questions/1", "value": {"bogus": 1}},
+          {"op": "add", "path": "/questions/0", "value": live_pack(1)["questions"][0]}], 2),
+        ([{"op": "replace", "path": "/questions/2", "value": {"bogus": 1}},
+          {"op": "move", "from": "/questions/2", "path": "/questions/0"}], 0),
+    ])
+    def test_later_ops_shift_touched_items(self, ops, loc):
+        with pytest.raises(PackValidationError) as raised:
+            patch_pack("PKWY LIVE!", live_pack(3), ops)
+        assert {e["loc"][1] for e in raised.value.errors} == {loc}
+
+
+class TestVersions:
+    """Edits become versions; any version can be rebuilt"""
+
+    def test_history_and_snapshots(self, monkeypatch):
+        monkeypatch.setattr(pack_versions, "PACK_SNAPSHOT_INTERVAL", 3)
+        db = FakeDB()
+        stored_pack(db, live_pack(4))
+        for i in range(4):
+            assert edit(db, [{"op": "replace", "path": f"/questions/{i}/question_text", "value": f"Edited {i}"}]) == i + 1
+
+        pack = asyncio.run(db.game_packs.find_one({"id": "pack-1"}))
+        assert (pack["version"], pack["base_version"]) == (4, 3)
+        current = asyncio.run(load_pack_content(db, pack))
+        assert [q["question_text"] for q in current["questions"]] == [f"Edited {i}" for i in range(4)]
+        assert asyncio.run(content_at(db, "pack-1", 0)) == live_pack(4)
+        assert asyncio.run(content_at(db, "pack-1", 2))["questions"][1]["question_text"] == "Edited 1"
+
+        history = asyncio.run(list_versions(db, "pack-1"))
+        assert [(v["version"], v["snapshot"]) for v in history] == [(0, True), (1, False), (2, False), (3, True), (4, False)]
+        assert all(v["delta_bytes"] < 200 for v in history[1:])
+
+        asyncio.run(drop_history(db, "pack-1"))
+        assert db.versions.docs == []
+        # Only the pack's own reference to its snapshot is left
+        assert [d["refs"] for d in db.contents.docs] == [1]
+
+    def test_legacy_inline_pack_is_read_and_moved_on_first_edit(self):
+        db = FakeDB()
+        asyncio.run(db.game_packs.insert_one({"id": "pack-1", "game_format": "PKWY LIVE!", "content": live_pack(2)}))
+        assert asyncio.run(load_pack_content(db, {"id": "pack-1"})) == live_pack(2)
+
+        assert edit(db, [{"op": "replace", "path": "/questions/0/question_text", "value": "Fixed"}]) == 1
+        pack = db.game_packs.docs[0]
+        assert "content" not in pack and pack["content_hash"]
+        assert asyncio.run(content_at(db, "pack-1", 0)) == live_pack(2)
+        assert asyncio.run(load_pack_content(db, pack))["questions"][0]["question_text"] == "Fixed"
+
+    def test_stale_version_conflicts(self):
+        db = FakeDB()
+        pack = stored_pack(db, live_pack(2))
+        edit(db, [{"op": "replace", "path": "/questions/0/question_text", "value": "first"}])
+        patched, delta = patch_pack("PKWY LIVE!", live_pack(2), [{"op": "remove", "path": "/questions/1"}])
+        with pytest.raises(VersionConflict):
+            asyncio.run(commit_version(db, pack, ops=delta, content=patched))
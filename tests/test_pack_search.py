@@ -0,0 +1,168 @@
+"""
+PKWY Tavern Game Suite - Pack Search Tests
+Packs and questions are found by their words, ranked, and counted by facet
+"""
+import asyncio
+
+import pytest
+
+from services import pack_search as search_module
+from services.pack_search import InvertedIndex, PackSearch, question_documents, tokenize
+from tests.test_content_store import Cursor
+
+
+def live_pack(topic, count, difficulty=1):
+    return {"game_name": "PKWY LIVE!", "questions": [
+        {"difficulty": difficulty, "question_text": f"Which {topic} is number {i}?",
+         "choices": {"A": f"{topic} {i}", "B": "Nothing"}, "correct_answer": "A"}
+        for i in range(count)
+    ]}
+
+
+def peril_pack():
+    return {"game_name": "PERIL!", "categories": [
+        {"category_title": "Wine Country", "clues": [
+            {"value": 100, "difficulty": 2, "clue_text": "Napa's signature grape", "correct_answer": "Cabernet",
+             "wrong_answers": ["Merlot", "Riesling"]}
+        ]},
+        {"category_title": "Brewing", "clues": [
+            {"value": 200, "difficulty": 3, "clue_text": "Hops add this taste", "correct_answer": "Bitterness",
+             "wrong_answers": ["Sweetness"]}
+        ]},
+    ]}
+
+
+def pack(pack_id, name, game_format="PKWY LIVE!", tags=(), version=0, **fields):
+    return {"id": pack_id, "name": name, "game_format": game_format, "tags": list(tags), "version": version,
+            "description": "", "content_hash": f"hash-{pack_id}-{version}", **fields}
+
+
+def indexed(*packs):
+    index = InvertedIndex()
+    for meta, content in packs:
+        index.add(meta, question_documents(meta["game_format"], content))
+    return index
+
+
+class TestDocuments:
+    """Every string of every question is searchable, in question plan order"""
+
+    def test_tokenize(self):
+        assert tokenize("Which BEERS are brewed in the Café?") == ["beer", "brewed", "cafe"]
+
+    def test_category_formats_carry_their_titles(self):
+        docs = question_documents("PERIL!", peril_pack())
+        assert [d.question_index for d in docs] == [0, 1]
+        assert {"wine", "country", "napa", "cabernet", "merlot", "riesling"} <= set(docs[0].terms)
+        assert (docs[1].title, docs[1].difficulty) == ("Hops add this taste", 3)
+
+    def test_game_night_mix_numbers_across_rounds(self):
+        mix = {"game_name": "GAME NIGHT MIX", "rounds": [
+            {"format": "PKWY LIVE!", **live_pack("stout", 2)},
+            {"format": "PERIL!", **peril_pack()},
+        ]}
+        docs = question_documents("GAME NIGHT MIX", mix)
+        assert [d.question_index for d in docs] == [0, 1, 2, 3]
+        assert "cabernet" in docs[2].terms
+
+
+class TestSearch:
+    """Ranked hits, facet counts and filters"""
+
+    def test_ranking_and_facets(self):
+        index = indexed(
+            (pack("beer", "Beer Night", tags=["pub", "beer"]), live_pack("lager", 3, difficulty=2)),
+            (pack("wine", "Wine Tasting", "PERIL!", tags=["pub"]), peril_pack()),
+        )
+        result = index.search("beer")
+        # The pack named for it ranks above questions that only mention it
+        assert [h["kind"] for h in result["results"]] == ["pack"]
+        assert result["results"][0]["pack_id"] == "beer"
+
+        result = index.search("lager")
+        assert result["total"] == 3
+        assert [h["question_index"] for h in result["results"]] == [0, 1, 2]
+        assert result["facets"] == {"game_format": {"PKWY LIVE!": 3}, "tag": {"beer": 3, "pub": 3},
+                                    "difficulty": {"2": 3}}
+
+        assert index.search("lager 2")["results"][0]["question_index"] == 2
+        assert index.search("lager merlot")["total"] == 0
+        assert index.search("nonsense")["total"] == 0
+
+    def test_filters(self):
+        index = indexed(
+            (pack("beer", "Beer Night", tags=["pub"]), live_pack("stout", 4, difficulty=1)),
+            (pack("wine", "Wine Tasting", "PERIL!", tags=["pub"]), peril_pack()),
+        )
+        assert index.search("", {"difficulty": 3})["results"][0]["text"] == "Hops add this taste"
+        assert index.search("", {"tag": "pub", "kind": "pack"})["total"] == 2
+        assert index.search("stout", {"game_format": "PERIL!"})["total"] == 0
+        page = index.search("stout", {"kind": "question"}, limit=2, offset=2)
+        assert [h["question_index"] for h in page["results"]] == [2, 3] and page["total"] == 4
+
+    def test_replace_remove_and_compact(self, monkeypatch):
+        monkeypatch.setattr(search_module, "COMPACT_MIN_HOLES", 0)
+        index = indexed((pack("a", "Stout Night"), live_pack("stout", 3)), (pack("b", "Ales"), live_pack("ale", 2)))
+        index.add(pack("a", "Cider Night", version=1), question_documents("PKWY LIVE!", live_pack("cider", 1)))
+        assert index.search("stout")["total"] == 0
+        assert index.search("cider")["total"] == 2
+
+        index.remove("a")
+        assert index.search("cider")["total"] == 0
+        # Holes outnumbered live docs, so ids were renumbered from zero
+        assert index.packs["b"].span == range(0, 3)
+        assert index.search("ale")["results"][0]["pack_id"] == "b"
+        assert index.search("", {"kind": "question"})["total"] == 2
+
+
+class GamePacks:
+    def __init__(self, packs):
+        self.packs = packs
+
+    def find(self, query, projection=None):
+        return Cursor([dict(p) for p in self.packs])
+
+
+class FakeDB:
+    def __init__(self, packs):
+        self.game_packs = GamePacks(packs)
+
+
+class TestSync:
+    """Changes made by other workers are picked up by comparing pack fingerprints"""
+
+    def test_sync_adds_updates_and_drops(self, monkeypatch):
+        contents = {"hash-a-0": live_pack("stout", 2), "hash-a-1": live_pack("porter", 2),
+                    "hash-b-0": live_pack("cider", 1)}
+
+        async def load(db, p):
+            return contents[p["content_hash"]]
+        monkeypatch.setattr(search_module, "load_pack_content", load)
+
+        search = PackSearch()
+        db = FakeDB([pack("a", "Dark Beers"), pack("b", "Ciders")])
+        assert asyncio.run(search.sync(db)) == 2
+        assert asyncio.run(search.sync(db)) == 0
+        assert search.search("stout")["total"] == 2
+
+        db.game_packs.packs = [pack("a", "Dark Beers", version=1)]
+        assert asyncio.run(search.sync(db)) == 2
+        assert search.search("stout")["total"] == 0 and search.search("porter")["total"] == 2
+        assert search.search("cider")["total"] == 0
+
+    def test_older_edit_does_not_overwrite_newer(self):
+        search = PackSearch()
+        asyncio.run(search.index_pack(None, pack("a", "Newer", version=2), live_pack("stout", 1)))
+        asyncio.run(search.index_pack(None, pack("a", "Older", version=1), live_pack("stout", 1)))
+        assert search.search("newer")["total"] == 1 and search.search("older")["total"] == 0
+
+
+@pytest.mark.parametrize("game_format,content", [
+    ("SURVEY SAYS!", {"survey_questions": [{"question": "Name a bar snack", "answers": [{"answer": "Pretzels", "percent": 40}]}]}),
+    ("SPIN TO WIN!", {"puzzles": [{"category": "Drinks", "puzzle_with_blanks": "_ _", "full_answer": "Irish Coffee"}]}),
+    ("CHAINED UP", {"chains": [{"chain_title": "Taps", "words": ["Keg", "Pint"], "explanation": "Pour"}]}),
+    ("CLOSEST WINS!", {"numbers": [{"question_text": "Bottles on the wall", "correct_number": 99}]}),
+])
+def test_answer_strings_are_indexed(game_format, content):
+    terms = set(question_documents(game_format, content)[0].terms)
+    assert terms & {"pretzel", "irish", "pint", "bottle"}
@@ -0,0 +1,131 @@
+"""
+PKWY Tavern Game Suite - Pack Streaming Tests
+Uploads are parsed incrementally, validated per item and stored in chunks
+"""
+import asyncio
+import io
+import json
+
+import pytest
+
+from services import pack_stream
+from services.content_store import content_hash, get_content
+from services.pack_search import question_documents
+from services.pack_stream import PackStreamError, PackStreamParser, PackTooLarge, stream_pack
+from services.pack_validation import PackValidationError
+from tests.test_content_store import FakeDB
+from tests.test_pack_search import peril_pack
+
+
+def live_pack(count, **fields):
+    return {"game_name": "PKWY LIVE!", **fields, "questions": [
+        {"difficulty": i % 3 + 1, "question_text": f"Q{i} éè \"quoted\"", "choices": {"A": "a", "B": "b"},
+         "correct_answer": "A"}
+        for i in range(count)
+    ]}
+
+
+def parse(raw: bytes, piece: int):
+    parser = PackStreamParser()
+    events = []
+    for i in range(0, len(raw), piece):
+        events.extend(parser.feed(raw[i:i + piece]))
+    return events + parser.close()
+
+
+def upload(db, raw: bytes, **kwargs):
+    body = io.BytesIO(raw)
+
+    async def read(size):
+        return body.read(size)
+
+    return asyncio.run(stream_pack(db, read, **kwargs))
+
+
+class TestPackStreamParser:
+    """Events come out the same however the bytes are split"""
+
+    @pytest.mark.parametrize("piece", [1, 7, 4096])
+    def test_any_split_gives_the_same_events(self, piece):
+        content = live_pack(25, version=3, settings={"timer": [10, 20]}, empty=[])
+        events = parse(json.dumps(content, indent=1, ensure_ascii=False).encode(), piece)
+        assert ("field", "version", 3) in events
+        assert ("field", "settings", {"timer": [10, 20]}) in events
+        assert ("list", "empty", None) in events
+        items = [value for kind, key, value in events if kind == "item"]
+        assert items == content["questions"]
+
+    def test_size_limit(self):
+        parser = PackStreamParser(max_bytes=100)
+        with pytest.raises(PackTooLarge):
+            parser.feed(json.dumps(live_pack(5)).encode())
+
+    @pytest.mark.parametrize("raw", [b'{"questions": [{"a": 1}', b'["not", "an", "object"]',
+                                     b'{"questions": [{"a": tru}]}', b'{"a": 1} trailing'])
+    def test_malformed_input(self, raw):
+        with pytest.raises(PackStreamError):
+            parse(raw, 4)
+
+
+class TestStreamPack:
+    """Validated items land in content-store chunks that reassemble to the normalized pack"""
+
+    def test_round_trip_in_chunks(self, monkeypatch):
+        monkeypatch.setattr(pack_stream, "PACK_CHUNK_ITEMS", 10)
+        monkeypatch.setattr(pack_stream, "UPLOAD_READ_BYTES", 256)
+        db = FakeDB()
+        content = live_pack(25)
+        content["questions"][0]["difficulty"] = "1"
+
+        game_format, digest, _ = upload(db, json.dumps(content).encode())
+        assert game_format == "PKWY LIVE!"
+        assert db.contents.docs[0]["content"] == {"game_name": "PKWY LIVE!", "questions": []}
+        assert [len(d["items"]) for d in db.chunks.docs] == [10, 10, 5]
+        assert {d["content_id"] for d in db.chunks.docs} == {digest}
+
+        content["questions"][0]["difficulty"] = 1
+        assert digest == content_hash(content)
+        assert asyncio.run(get_content(db, digest)) == content
+
+    @pytest.mark.parametrize("game_format,content", [("PKWY LIVE!", live_pack(25)), ("PERIL!", peril_pack())])
+    def test_search_documents_match_the_stored_pack(self, monkeypatch, game_format, content):
+        monkeypatch.setattr(pack_stream, "PACK_CHUNK_ITEMS", 10)
+        db = FakeDB()
+        _, digest, questions = upload(db, json.dumps(content).encode())
+        assert questions == question_documents(game_format, asyncio.run(get_content(db, digest)))
+        assert [q.question_index for q in questions] == list(range(len(questions)))
+
+    def test_identical_upload_reuses_stored_content(self, monkeypatch):
+        monkeypatch.setattr(pack_stream, "PACK_CHUNK_ITEMS", 10)
+        db = FakeDB()
+        raw = json.dumps(live_pack(25)).encode()
+        assert upload(db, raw) == upload(db, raw)
+        assert db.contents.docs[0]["refs"] == 2
+        assert len(db.chunks.docs) == 3
+
+    def test_format_from_structure_when_game_name_is_missing(self, monkeypatch):
+        monkeypatch.setattr(pack_stream, "PACK_CHUNK_ITEMS", 20)
+        content = live_pack(15)
+        del content["game_name"]
+        game_format, _, _ = upload(FakeDB(), json.dumps(content).encode())
+        # Fifteen difficulty-ranked questions - settled once the buffered list was long enough
+        assert game_format == "LAST CALL STANDING"
+
+    def test_every_bad_item_is_reported_and_chunks_are_removed(self, monkeypatch):
+        monkeypatch.setattr(pack_stream, "PACK_CHUNK_ITEMS", 2)
+        db = FakeDB()
+        content = live_pack(8)
+        content["questions"][5]["difficulty"] = "hard"
+        del content["questions"][7]["correct_answer"]
+
+        with pytest.raises(PackValidationError) as raised:
+            upload(db, json.dumps(content).encode())
+        locs = [tuple(e["loc"]) for e in raised.value.errors]
+        assert locs == [("questions", 5, "difficulty"), ("questions", 7, "correct_answer")]
+        assert db.chunks.docs == [] and db.contents.docs == []
+
+    def test_too_large_upload_cleans_up(self):
+        db = FakeDB()
+        with pytest.raises(PackTooLarge):
+            upload(db, json.dumps(live_pack(2000)).encode(), max_bytes=100_000)
+        assert db.chunks.docs == []
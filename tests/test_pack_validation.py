@@ -0,0 +1,71 @@
+"""
+PKWY Tavern Game Suite - Pack Validation Tests
+Imported content is checked against its format's model before it is stored
+"""
+import pytest
+from fastapi import HTTPException
+
+from routes.game_packs import validate_game_content
+from services.pack_validation import PackValidationError, adapter_for, validate_pack
+
+
+def live_question(**overrides):
+    return {"difficulty": 1, "question_text": "Q", "choices": {"A": "a", "B": "b"}, "correct_answer": "A", **overrides}
+
+
+class TestValidatePack:
+    """Every problem is reported and good content comes back normalized"""
+
+    def test_adapters_are_built_once_per_format(self):
+        assert adapter_for("PKWY LIVE!") is adapter_for("PKWY LIVE!")
+        assert adapter_for("PKWY LIVE!") is not adapter_for("PERIL!")
+
+    def test_normalizes_and_keeps_unknown_keys(self):
+        content = validate_pack("PKWY LIVE!", {
+            "game_name": "PKWY LIVE!",
+            "theme": "Trivia Tuesday",
+            "questions": [live_question(difficulty="2", host_note="read slowly")]
+        })
+        assert content["questions"][0]["difficulty"] == 2
+        assert content["questions"][0]["host_note"] == "read slowly"
+        assert content["theme"] == "Trivia Tuesday"
+
+    def test_fills_defaults(self):
+        content = validate_pack("NO WHAMMY!", {
+            "board": [{"panel": 1, "content": 500}],
+            "spin_questions": [{"question_text": "Q", "choices": {}, "correct_answer": "A"}]
+        })
+        assert content["board"][0]["weight"] == 1.0
+
+    def test_collects_every_error(self):
+        with pytest.raises(PackValidationError) as raised:
+            validate_pack("PKWY LIVE!", {"questions": [
+                live_question(),
+                live_question(difficulty="hard"),
+                {"question_text": "no answer"},
+            ]})
+        locs = [tuple(e["loc"]) for e in raised.value.errors]
+        assert ("questions", 1, "difficulty") in locs
+        assert ("questions", 2, "correct_answer") in locs
+        assert ("questions", 2, "choices") in locs
+
+    def test_game_night_mix_checks_each_round(self):
+        round_ok = {"format": "CLOSEST WINS!", "round_name": "Guess",
+                    "numbers": [{"question_text": "Q", "correct_number": "12.5", "acceptable_range": 1, "over_rule": False}]}
+        round_bad = {"format": "SPIN TO WIN!", "puzzles": [{"category": "Drinks"}]}
+        content = validate_pack("GAME NIGHT MIX", {"rounds": [round_ok]})
+        assert content["rounds"][0]["numbers"][0]["correct_number"] == 12.5
+        assert content["rounds"][0]["round_name"] == "Guess"
+
+        with pytest.raises(PackValidationError) as raised:
+            validate_pack("GAME NIGHT MIX", {"rounds": [round_ok, round_bad, {"format": "MYSTERY"}]})
+        locs = [tuple(e["loc"]) for e in raised.value.errors]
+        assert ("rounds", 1, "puzzles", 0, "full_answer") in locs
+        assert ("rounds", 2) in locs
+
+    def test_route_helper_returns_422_with_errors(self):
+        with pytest.raises(HTTPException) as raised:
+            validate_game_content("PKWY LIVE!", {"questions": "nope"})
+        assert raised.value.status_code == 422
+        assert raised.value.detail["error_count"] == 1
+        assert raised.value.detail["errors"][0]["loc"] == ["questions"]
@@ -0,0 +1,131 @@
+"""
+PKWY Tavern Game Suite - Readiness Tests
+Background startup work gates the readiness probe until it has finished
+"""
+import asyncio
+import json
+import os
+
+import pytest
+
+from services.readiness import StartupTracker
+
+
+def run_startup(tracker, migration, warmups):
+    """Start a migration and the warm-ups behind it, wait for both"""
+    async def scenario():
+        for name, warmup in warmups.items():
+            tracker.register_warmup(name, warmup)
+        migrations = tracker.start("indexes", migration(), required=True)
+        tracker.start_warmups(None, after=migrations)
+        await tracker._running["warmups"]
+    asyncio.run(scenario())
+
+
+async def ok(*args):
+    return None
+
+
+async def boom(*args):
+    raise RuntimeError("index build failed")
+
+
+class TestStartupTracker:
+    """Tasks move pending -> running -> done/failed; readiness follows"""
+
+    def test_ready_once_everything_is_done(self):
+        tracker = StartupTracker()
+        tracker.register_warmup("rooms", ok)
+        assert not tracker.is_ready()
+        run_startup(tracker, ok, {})
+        assert tracker.is_ready()
+        assert {name: t["state"] for name, t in tracker.tasks.items()} == {"rooms": "done", "indexes": "done"}
+        assert "duration_ms" in tracker.tasks["indexes"]
+
+    def test_failed_warmup_does_not_block(self):
+        tracker = StartupTracker()
+        run_startup(tracker, ok, {"rooms": boom})
+        assert tracker.tasks["rooms"]["state"] == "failed" and tracker.is_ready()
+
+    def test_failed_migration_blocks_readiness(self):
+        tracker = StartupTracker()
+        warmed = []
+
+        async def warm(db):
+            warmed.append(True)
+        run_startup(tracker, boom, {"rooms": warm})
+
+        assert tracker.tasks["indexes"]["state"] == "failed"
+        assert tracker.tasks["indexes"]["error"] == "index build failed"
+        assert not tracker.is_ready()
+        # Warm-ups still ran once the migration had finished
+        assert warmed == [True]
+
+    def test_first_request_is_recorded_once(self):
+        tracker = StartupTracker()
+        tracker.mark_request_served()
+        first = tracker.first_request_ms
+        tracker.mark_request_served()
+        assert first is not None and tracker.report()["first_request_ms"] == first
+
+
+@pytest.fixture
+def server(monkeypatch):
+    # The Motor client is created at import but does not connect until used
+    monkeypatch.setenv("MONGO_URL", os.environ.get("MONGO_URL", "mongodb://localhost:27017"))
+    monkeypatch.setenv("DB_NAME", os.environ.get("DB_NAME", "pkwy_test"))
+    import server as module
+
+    async def ping(db):
+        return {"ok": True, "ping_ms": 0.1}
+    monkeypatch.setattr(module, "ping_database", ping)
+    monkeypatch.setattr(module, "startup", StartupTracker())
+    monkeypatch.setattr(module.manager, "draining", False)
+    monkeypatch.setattr(module.bridge, "mode", "change_stream")
+    return module
+
+
+def probe(server):
+    response = asyncio.run(server.readiness_check())
+    return response.status_code, json.loads(response.body)
+
+
+class TestReadyEndpoint:
+    """/api/ready answers 503 until startup work is done, then 200"""
+
+    def test_503_until_startup_finishes(self, server):
+        release = None
+
+        async def migration():
+            await release.wait()
+
+        async def scenario():
+            nonlocal release
+            release = asyncio.Event()
+            server.startup.register_warmup("rooms", ok)
+            migrations = server.startup.start("indexes", migration(), required=True)
+            server.startup.start_warmups(None, after=migrations)
+            await asyncio.sleep(0)
+            before = await server.readiness_check()
+            release.set()
+            await server.startup._running["warmups"]
+            after = await server.readiness_check()
+            return before, after
+
+        before, after = asyncio.run(scenario())
+        assert before.status_code == 503 and json.loads(before.body)["startup"]["tasks"]["indexes"]["state"] == "running"
+        assert after.status_code == 200 and json.loads(after.body)["ready"] is True
+
+    def test_failed_migration_keeps_503(self, server):
+        run_startup(server.startup, boom, {})
+        status, body = probe(server)
+        assert status == 503 and body["startup"]["tasks"]["indexes"]["state"] == "failed"
+
+    def test_draining_or_dead_bridge_is_not_ready(self, server, monkeypatch):
+        assert probe(server)[0] == 200
+        monkeypatch.setattr(server.bridge, "mode", "failed")
+        assert probe(server)[0] == 503
+        monkeypatch.setattr(server.bridge, "mode", "local")
+        monkeypatch.setattr(server.manager, "draining", True)
+        status, body = probe(server)
+        assert status == 503 and body["draining"] is True
@@ -0,0 +1,189 @@
+"""
+PKWY Tavern Game Suite - Room Warm-start Tests
+Rebuilds live rooms from persisted game documents
+"""
+import asyncio
+import json
+import time
+
+from services import websocket_manager
+from services.event_log import event_log
+from services.room_state import room_snapshot, timer_remaining, warm_start_rooms
+from services.websocket_manager import ConnectionManager, handle_player_message
+
+
+class FakeCursor:
+    """Minimal Motor cursor over a list of documents"""
+    
+    def __init__(self, docs):
+        self.docs = list(docs)
+    
+    def limit(self, n):
+        self.docs = self.docs[:n]
+        return self
+    
+    def batch_size(self, n):
+        return self
+    
+    async def to_list(self, length):
+        batch, self.docs = self.docs[:length], self.docs[length:]
+        return batch
+
+
+class FakeGames:
+    def __init__(self, docs):
+        self.docs = docs
+    
+    def find(self, query, projection=None):
+        statuses = query["status"]["$in"]
+        return FakeCursor(d for d in self.docs if d["status"] in statuses)
+
+
+class FakeDB:
+    def __init__(self, docs):
+        self.games = FakeGames(docs)
+
+
+def make_game(i, status):
+    return {
+        "id": f"game-{i}",
+        "code": f"G{i:05d}",
+        "game_format": "PKWY LIVE!",
+        "status": status,
+        "current_question_index": i % 10,
+        "content": {
+            "game_name": "PKWY LIVE!",
+            "questions": [
+                {"difficulty": 1, "question_text": f"Q{n}", "choices": {"A": "1", "B": "2"}, "correct_answer": "A"}
+                for n in range(12)
+            ]
+        },
+        "room_state": {
+            "display": {"state": "question"},
+            "timer": {"duration": 30, "started_at": time.time() - 10},
+            "buzzer": None
+        }
+    }
+
+
+class TestWarmStart:
+    """Startup rebuild of active and paused rooms"""
+    
+    def test_rebuilds_live_games_only(self):
+        """Active and paused games get rooms; waiting and finished do not"""
+        docs = [make_game(i, "active") for i in range(30)]
+        docs += [make_game(i, "paused") for i in range(30, 40)]
+        docs += [make_game(i, "finished") for i in range(40, 45)]
+        manager = ConnectionManager()
+        
+        started = time.perf_counter()
+        rebuilt = asyncio.run(warm_start_rooms(FakeDB(docs), manager))
+        elapsed = time.perf_counter() - started
+        
+        assert rebuilt == 40
+        assert len(manager.game_rooms) == 40
+        assert "G00042" not in manager.game_rooms
+        assert elapsed < 1.0
+    
+    def test_snapshot_is_consistent(self):
+        """Rebuilt room reports question, plan size, display and running timer"""
+        manager = ConnectionManager()
+        asyncio.run(warm_start_rooms(FakeDB([make_game(3, "active")]), manager))
+        
+        snapshot = room_snapshot(manager.game_rooms["G00003"])
+        assert snapshot["status"] == "active"
+        assert snapshot["question_index"] == 3
+        assert snapshot["question_count"] == 12
+        assert snapshot["display"] == {"state": "question"}
+        assert 19 <= snapshot["timer"]["remaining"] <= 20
+    
+    def test_expired_timer_clamps_to_zero(self):
+        """A timer that ran out during the restart reports zero, not negative"""
+        assert timer_remaining({"duration": 5, "started_at": 100.0}, now=200.0) == 0.0
+        assert timer_remaining(None) is None
+
+
+class FakeWebSocket:
+    def __init__(self):
+        self.sent = []
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, text):
+        self.sent.append(json.loads(text))
+
+
+class BuzzerGames:
+    """Records writes; the order of sends and writes is what the buzzer test checks"""
+
+    def __init__(self, log):
+        self.log = log
+
+    async def update_one(self, query, update):
+        self.log.append(("write", query, update))
+
+
+class BuzzerDB:
+    def __init__(self, log):
+        self.games = BuzzerGames(log)
+        self.events = BuzzerEvents(log)
+
+    def __getitem__(self, name):
+        return self.events
+
+
+class BuzzerEvents:
+    def __init__(self, log):
+        self.log = log
+
+    async def find_one(self, *args, **kwargs):
+        return None
+
+    async def insert_one(self, doc):
+        self.log.append(("event", doc["event"]))
+
+
+class TestBuzzer:
+    """The first press wins, is broadcast before any write, and is the one persisted"""
+
+    def test_first_press_holds_the_buzzer(self):
+        async def scenario():
+            manager = ConnectionManager()
+            websocket_manager.manager, previous = manager, websocket_manager.manager
+            try:
+                log = []
+                room = manager.ensure_room("BUZZ01")
+                room["state"].update(loaded=True, game_id="game-b", game_format="PERIL!", question_index=2)
+                tv, director = FakeWebSocket(), FakeWebSocket()
+                await manager.connect_tv(tv, "BUZZ01")
+                await manager.connect_director(director, "BUZZ01")
+                tv.sent.clear()
+                director.sent.clear()
+                original = tv.send_text
+
+                async def send_text(text):
+                    log.append(("send", json.loads(text)["event"]))
+                    await original(text)
+                tv.send_text = send_text
+
+                db = BuzzerDB(log)
+                await handle_player_message("BUZZ01", "p1", {"event": "buzzer:press", "data": {}}, db)
+                await handle_player_message("BUZZ01", "p2", {"event": "buzzer:press", "data": {}}, db)
+                event_log.forget("game-b")
+                return room, tv, director, log
+            finally:
+                websocket_manager.manager = previous
+
+        room, tv, director, log = asyncio.run(scenario())
+        assert room["state"]["buzzer"]["player_id"] == "p1"
+        assert [m["data"]["player_id"] for m in tv.sent if m["event"] == "buzzer:winner"] == ["p1"]
+        assert [(m["data"]["player_id"], m["data"]["first"]) for m in director.sent
+                if m["event"] == "buzzer:pressed"] == [("p1", True), ("p2", False)]
+
+        writes = [entry for entry in log if entry[0] == "write"]
+        assert len(writes) == 1
+        assert writes[0][1] == {"code": "BUZZ01", "current_question_index": 2, "room_state.buzzer": None}
+        assert writes[0][2]["$set"]["room_state.buzzer"]["player_id"] == "p1"
+        assert log.index(("send", "buzzer:winner")) < log.index(writes[0])
+        assert [entry for entry in log if entry[0] == "event"] == [("event", "buzzer:pressed")]
@@ -0,0 +1,208 @@
+"""
+PKWY Tavern Game Suite - Answer Scoring Tests
+Answers submitted over the player socket are scored, saved and acked in one step
+"""
+import asyncio
+import json
+
+from pymongo.errors import DuplicateKeyError
+
+from services.event_log import event_log
+from services.scoring import calculate_points, check_answer
+from services import websocket_manager
+from services.websocket_manager import ConnectionManager, handle_director_message, handle_player_message
+
+GAME = {
+    "id": "game-1",
+    "code": "ABC123",
+    "game_format": "PERIL!",
+    "status": "active",
+    "current_question_index": 0,
+    "content": {"categories": [{"name": "Bar Trivia", "clues": [
+        {"question": "q0", "correct_answer": "B", "value": 200, "time_limit": 30},
+        {"question": "q1", "correct_answer": "C", "value": 400, "time_limit": 30},
+    ]}]},
+    "players": [
+        {"id": "p1", "name": "Ann", "score": 0, "correct_answers": 0},
+        {"id": "p2", "name": "Bo", "score": 0, "correct_answers": 0},
+    ]
+}
+
+
+class FakeWebSocket:
+    def __init__(self):
+        self.sent = []
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, text):
+        self.sent.append(json.loads(text))
+
+
+class FakeGames:
+    """One game document with positional $inc on players"""
+
+    def __init__(self, game):
+        self.game = json.loads(json.dumps(game))
+        self.updates = []
+
+    async def find_one(self, query, projection=None):
+        return self.game if query.get("code") == self.game["code"] else None
+
+    async def find_one_and_update(self, query, update, projection=None, return_document=None):
+        for player in self.game["players"]:
+            if query["id"] == self.game["id"] and player["id"] == query["players.id"]:
+                player["score"] += update["$inc"]["players.$.score"]
+                player["correct_answers"] += update["$inc"]["players.$.correct_answers"]
+                return {"players": [dict(player)]}
+        return None
+
+    async def update_one(self, query, update):
+        self.updates.append(update)
+
+
+class FakeCollection:
+    """Insert-only collection with an optional unique key"""
+
+    def __init__(self, unique=None):
+        self.docs = []
+        self.unique = unique
+
+    async def insert_one(self, doc):
+        if self.unique:
+            key = tuple(doc[k] for k in self.unique)
+            if any(tuple(d[k] for k in self.unique) == key for d in self.docs):
+                raise DuplicateKeyError("duplicate answer")
+        self.docs.append(doc)
+
+    async def delete_one(self, query):
+        self.docs = [d for d in self.docs if any(d[k] != v for k, v in query.items())]
+
+    async def find_one(self, *args, **kwargs):
+        return None
+
+    async def update_one(self, query, update, upsert=False):
+        self.docs.append({**query, **update["$set"]})
+
+
+class FakeDB:
+    def __init__(self):
+        self.games = FakeGames(GAME)
+        self.collections = {
+            "answers": FakeCollection(unique=("game_id", "question_index", "player_id")),
+            "game_events": FakeCollection(),
+            "answer_analytics": FakeCollection(),
+        }
+
+    def __getitem__(self, name):
+        return self.collections[name]
+
+
+async def answer_round(submissions, director_events=()):
+    """Connect players and a director, submit (player_id, answer, question_index) in order,
+    then send director events"""
+    manager = ConnectionManager()
+    websocket_manager.manager, previous = manager, websocket_manager.manager
+    try:
+        db = FakeDB()
+        director = FakeWebSocket()
+        await manager.connect_director(director, GAME["code"])
+        phones = {}
+        for player in GAME["players"]:
+            phones[player["id"]] = FakeWebSocket()
+            await manager.connect_player(phones[player["id"]], GAME["code"], player["id"])
+
+        for player_id, answer, question_index in submissions:
+            await handle_player_message(GAME["code"], player_id, {
+                "event": "answer:submit",
+                "data": {"answer": answer, "time_taken": 30, "question_index": question_index}
+            }, db)
+        for event in director_events:
+            await handle_director_message(GAME["code"], {"event": event, "data": {}}, db)
+        event_log.forget(GAME["id"])
+        return db, director, phones
+    finally:
+        websocket_manager.manager = previous
+
+
+def acks(ws):
+    return [m["data"] for m in ws.sent if m["event"] == "answer:ack"]
+
+
+class TestScoringRules:
+    """check_answer / calculate_points"""
+
+    def test_multiple_choice_is_case_insensitive(self):
+        assert check_answer("PERIL!", {"correct_answer": "B"}, "b") == (True, "B")
+
+    def test_speed_bonus(self):
+        """Instant answers earn up to 50% extra, wrong answers nothing"""
+        clue = {"value": 200, "time_limit": 30}
+        assert calculate_points("PERIL!", clue, "B", 0, True) == 300
+        assert calculate_points("PERIL!", clue, "B", 30, True) == 200
+        assert calculate_points("PERIL!", clue, "B", 0, False) == 0
+
+
+class TestSocketAnswers:
+    """answer:submit over /ws/player"""
+
+    def test_scored_saved_and_acked(self):
+        """The player gets an ack with points; the score is incremented in place"""
+        db, director, phones = asyncio.run(answer_round([("p1", "B", 0), ("p2", "A", 0)]))
+
+        assert acks(phones["p1"]) == [{
+            "accepted": True, "question_index": 0, "correct": True,
+            "points_earned": 200, "new_score": 200, "correct_answer": "B"
+        }]
+        assert acks(phones["p2"])[0]["correct"] is False
+        assert db.games.game["players"][0]["correct_answers"] == 1
+        assert len(db["answers"].docs) == 2
+        assert [e["event"] for e in db["game_events"].docs] == ["player:scored", "player:scored"]
+
+    def test_director_tally(self):
+        """Directors see each answer with a running tally for the question"""
+        _, director, _ = asyncio.run(answer_round([("p1", "B", 0), ("p2", "A", 0), ("p1", "C", 1)]))
+
+        tallies = [m["data"]["tally"] for m in director.sent if m["event"] == "player:answered"]
+        assert [(t["question_index"], t["answered"], t["correct"]) for t in tallies] == [
+            (0, 1, 1), (0, 2, 1), (1, 1, 1)
+        ]
+        assert tallies[1]["counts"] == {"A": 1, "B": 1}
+
+    def test_second_answer_rejected(self):
+        """A double tap is acked as rejected and never scored twice"""
+        db, _, phones = asyncio.run(answer_round([("p1", "B", 0), ("p1", "B", 0)]))
+
+        second = acks(phones["p1"])[1]
+        assert second["accepted"] is False
+        assert db.games.game["players"][0]["score"] == 200
+
+    def test_unknown_question_rejected(self):
+        db, _, phones = asyncio.run(answer_round([("p1", "B", 9)]))
+        assert acks(phones["p1"]) == [{"accepted": False, "question_index": 9, "reason": "Question not found"}]
+        assert db["answers"].docs == []
+
+
+class TestAnswerDistribution:
+    """Live distribution for reveals, Ask the Audience and analytics"""
+
+    def test_reveal_carries_distribution(self):
+        _, director, _ = asyncio.run(answer_round([("p1", "B", 0), ("p2", "b", 0)], ["answer:reveal"]))
+
+        reveal = [m for m in director.sent if m["event"] == "answer:revealed"][0]["data"]
+        assert reveal["distribution"]["counts"] == {"B": 2}
+        assert reveal["distribution"]["percentages"] == {"B": 100}
+
+    def test_close_writes_analytics_once(self):
+        """Closing saves the tally and stops counting; a second close saves nothing"""
+        db, director, _ = asyncio.run(answer_round(
+            [("p1", "B", 0), ("p2", "A", 0)], ["question:close", "question:close"]
+        ))
+
+        closed = [m["data"] for m in director.sent if m["event"] == "question:closed"]
+        assert closed[0]["distribution"]["answered"] == 2
+        assert closed[1]["distribution"] is None
+        saved = db["answer_analytics"].docs
+        assert len(saved) == 1
+        assert saved[0]["game_id"] == GAME["id"] and saved[0]["counts"] == {"A": 1, "B": 1}
@@ -0,0 +1,88 @@
+"""
+PKWY Tavern Game Suite - Sheet Import Tests
+CSV question banks are converted column by column into validated packs
+"""
+import pytest
+
+from services.sheet_import import SheetError, convert_sheet, read_sheet
+
+
+def sheet(text: str):
+    return read_sheet(text.encode(), "bank.csv")
+
+
+class TestConvertSheet:
+    """Good rows become packs, bad rows are reported by spreadsheet row number"""
+
+    def test_choice_questions_and_bad_rows(self):
+        frame = sheet(
+            "Question Text,Difficulty,A,B,C,D,Correct Answer\n"
+            "What is 1+1?,1,1,2,3,,b\n"
+            "Bad difficulty,hard,x,y,,,A\n"
+            "Missing choice,2,x,y,,,D\n"
+            ",,,,,,\n"
+            "Colour?,2.0,red,blue,green,grey,Choice D\n"
+        )
+        result = convert_sheet(frame, "PKWY LIVE!", "Bank")
+        (name, content), = result.packs
+        assert name == "Bank"
+        assert content["questions"] == [
+            {"difficulty": 1, "question_text": "What is 1+1?", "choices": {"A": "1", "B": "2", "C": "3"},
+             "correct_answer": "B"},
+            {"difficulty": 2, "question_text": "Colour?",
+             "choices": {"A": "red", "B": "blue", "C": "green", "D": "grey"}, "correct_answer": "D"},
+        ]
+        assert (result.rows, result.imported_rows, result.bad_rows) == (4, 2, 2)
+        assert result.errors == [
+            {"row": 3, "errors": ["difficulty must be a whole number"]},
+            {"row": 4, "errors": ["correct_answer must be the letter of a filled choice"]},
+        ]
+
+    def test_pack_column_splits_packs(self):
+        frame = sheet(
+            "pack,question_text,difficulty,a,b,correct_answer\n"
+            "Monday,Q1,1,x,y,A\nTuesday,Q2,1,x,y,B\nMonday,Q3,2,x,y,A\n"
+        )
+        packs = dict(convert_sheet(frame, "LAST CALL STANDING").packs)
+        assert [q["question_text"] for q in packs["Monday"]["questions"]] == ["Q1", "Q3"]
+        assert len(packs["Tuesday"]["questions"]) == 1
+
+    def test_categories_and_list_columns(self):
+        frame = sheet(
+            "category_title,value,difficulty,clue_text,correct_answer,wrong_answer_1,wrong_answer_2\n"
+            "Beer,200,1,Dark stout,Guinness,Harp,Bass\n"
+            "Wine,200,1,Red grape,Merlot,Rose,\n"
+            "Beer,400,2,Hoppy,IPA,,\n"
+        )
+        result = convert_sheet(frame, "PERIL!")
+        content = result.packs[0][1]
+        assert [c["category_title"] for c in content["categories"]] == ["Beer", "Wine"]
+        assert content["categories"][0]["clues"][0]["wrong_answers"] == ["Harp", "Bass"]
+        assert content["categories"][1]["clues"][0]["wrong_answers"] == ["Rose"]
+        assert result.errors == [{"row": 4, "errors": ["wrong_answers is empty"]}]
+
+    def test_survey_answer_columns(self):
+        frame = sheet(
+            "question,answer_1,percent_1,answer_2,percent_2\n"
+            "Bar snack,Peanuts,60,Chips,40\n"
+            "Drink,Beer,lots,,\n"
+        )
+        result = convert_sheet(frame, "SURVEY SAYS!")
+        answers = result.packs[0][1]["survey_questions"][0]["answers"]
+        assert [(a["answer"], a["percent"]) for a in answers] == [("Peanuts", 60), ("Chips", 40)]
+        assert result.errors == [{"row": 3, "errors": ["every answer needs a whole-number percent"]}]
+
+    def test_numbers_and_flags(self):
+        frame = sheet(
+            "question_text,correct_number,acceptable_range,over_rule\n"
+            "Height,12.5,1,yes\nDepth,inf,1,maybe\n"
+        )
+        result = convert_sheet(frame, "CLOSEST WINS!")
+        assert result.packs[0][1]["numbers"][0]["over_rule"] is True
+        assert result.errors[0]["errors"] == ["correct_number must be a number", "over_rule must be yes or no"]
+
+    def test_missing_columns_and_unsupported_formats(self):
+        with pytest.raises(SheetError, match="difficulty"):
+            convert_sheet(sheet("question_text,a,b,correct_answer\nQ,x,y,A\n"), "PKWY LIVE!")
+        with pytest.raises(SheetError, match="cannot be imported"):
+            convert_sheet(sheet("panel,content\n1,500\n"), "NO WHAMMY!")
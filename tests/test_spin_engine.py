@@ -0,0 +1,151 @@
+"""
+PKWY Tavern Game Suite - Spin Engine Tests
+NO WHAMMY! spins are drawn server-side from weighted, seeded alias tables
+"""
+import asyncio
+import json
+from collections import Counter
+
+import pytest
+
+from services import websocket_manager
+from services.event_log import event_log
+from services.spin_engine import AliasTable, alias_table, draw_panel, wheel_for_game
+from services.websocket_manager import ConnectionManager, handle_director_message
+
+BOARD = [
+    {"panel": 1, "content": 500, "weight": 4},
+    {"panel": 2, "content": 1000, "weight": 2},
+    {"panel": 3, "content": "WHAMMY!", "weight": 1},
+    {"panel": 4, "content": 2500, "weight": 0.5},
+    {"panel": 5, "content": "WHAMMY!", "weight": 1},
+    {"panel": 6, "content": 250, "weight": 1.5},
+]
+GAME = {"id": "game-1", "code": "SPIN01", "game_format": "NO WHAMMY!", "status": "active",
+        "current_question_index": 0, "players": [],
+        "content": {"board": BOARD, "spin_questions": [{"question_text": "q", "choices": {}, "correct_answer": "A"}]}}
+
+# Chi-square critical value for 5 degrees of freedom at p = 0.001
+CHI_SQUARE_5_DF_P001 = 20.515
+
+
+class FakeWebSocket:
+    def __init__(self):
+        self.sent = []
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, text):
+        self.sent.append(json.loads(text))
+
+
+class FakeGames:
+    def __init__(self):
+        self.updates = []
+
+    async def find_one(self, query, projection=None):
+        return GAME
+
+    async def update_one(self, query, update):
+        self.updates.append(update)
+
+
+class FakeEvents:
+    async def find_one(self, *args, **kwargs):
+        return None
+
+    async def insert_one(self, doc):
+        pass
+
+
+class FakeDB:
+    def __init__(self):
+        self.games = FakeGames()
+        self.events = FakeEvents()
+
+    def __getitem__(self, name):
+        return self.events
+
+
+async def spin_session(spins, events=()):
+    """Spin a NO WHAMMY! board with one TV attached, after any other director events"""
+    manager = ConnectionManager()
+    websocket_manager.manager, previous = manager, websocket_manager.manager
+    try:
+        db = FakeDB()
+        tv = FakeWebSocket()
+        await manager.connect_tv(tv, GAME["code"])
+        room = await websocket_manager.load_room(GAME["code"], db)
+        tv.sent.clear()
+        for event, data in events:
+            await handle_director_message(GAME["code"], {"event": event, "data": data}, db)
+        for _ in range(spins):
+            await handle_director_message(GAME["code"], {"event": "board:spin", "data": {}}, db)
+        event_log.forget(GAME["id"])
+        return db, room, tv
+    finally:
+        websocket_manager.manager = previous
+
+
+class TestAliasTable:
+    """Weighted sampling"""
+
+    def test_distribution_matches_weights(self):
+        """Chi-square goodness of fit over 60k seeded spins"""
+        weights = [panel["weight"] for panel in BOARD]
+        table = AliasTable(weights)
+        spins = 60000
+        counts = Counter(draw_panel(table, "stats", n) for n in range(spins))
+
+        total = sum(weights)
+        chi_square = sum(
+            (counts[i] - spins * w / total) ** 2 / (spins * w / total)
+            for i, w in enumerate(weights)
+        )
+        assert chi_square < CHI_SQUARE_5_DF_P001
+
+    def test_zero_weight_never_lands(self):
+        table = AliasTable([1, 0, 1])
+        assert 1 not in {draw_panel(table, "zero", n) for n in range(2000)}
+
+    def test_rejects_empty_board(self):
+        with pytest.raises(ValueError):
+            AliasTable([])
+        assert wheel_for_game("NO WHAMMY!", {"board": []}) is None
+
+    def test_identical_boards_share_a_table(self):
+        assert wheel_for_game("NO WHAMMY!", {"board": BOARD}) is alias_table((4.0, 2.0, 1.0, 0.5, 1.0, 1.5))
+        assert wheel_for_game("PERIL!", {"board": BOARD}) is None
+
+
+class TestBoardSpin:
+    """board:spin from the director"""
+
+    def test_spins_replay_from_seed(self):
+        """Every broadcast panel can be recomputed from the persisted seed"""
+        db, room, tv = asyncio.run(spin_session(5))
+
+        spun = [m["data"] for m in tv.sent if m["event"] == "board:spun"]
+        assert [s["spin"] for s in spun] == [0, 1, 2, 3, 4]
+        assert set(spun[0]) == {"spin", "panel"}
+
+        seed = room["state"]["spin"]["seed"]
+        assert room["state"]["spin"]["count"] == 5
+        assert [s["panel"] for s in spun] == [draw_panel(room["wheel"], seed, n) for n in range(5)]
+        spin_writes = [u["$set"]["room_state.spin"] for u in db.games.updates if "room_state.spin" in u["$set"]]
+        assert spin_writes[-1] == {"seed": seed, "count": 5}
+
+    def test_spin_marks_panel_hit(self):
+        _, room, tv = asyncio.run(spin_session(1))
+        panel = next(m["data"]["panel"] for m in tv.sent if m["event"] == "board:spun")
+        assert room["board"].is_set("hit", panel)
+
+    def test_hit_outside_the_board_is_rejected(self):
+        db, room, tv = asyncio.run(spin_session(0, [
+            ("board:set", {"flag": "hit", "index": 10**9}),
+            ("board:set", {"flag": "hit", "index": len(BOARD)}),
+            ("board:set", {"flag": "hit", "index": len(BOARD) - 1}),
+        ]))
+        assert room["board"].bits["hit"] == 1 << (len(BOARD) - 1)
+        assert [u["$set"] for u in db.games.updates] == [{"room_state.board.hit": "20"}]
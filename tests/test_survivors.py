@@ -0,0 +1,144 @@
+"""
+PKWY Tavern Game Suite - Bulk Elimination Tests
+LAST CALL STANDING knocks out every miss in one write at question close
+"""
+import asyncio
+import json
+
+from services import websocket_manager
+from services.event_log import apply_event, event_log
+from services.survivors import eliminate_players, players_to_eliminate, survivors_from_players
+from services.websocket_manager import ConnectionManager, count_answer, handle_director_message
+
+PLAYERS = [{"id": f"p{i}", "name": f"Player {i}", "score": 0, "correct_answers": 0} for i in range(100)]
+GAME = {
+    "id": "game-1",
+    "code": "LAST01",
+    "game_format": "LAST CALL STANDING",
+    "status": "active",
+    "current_question_index": 0,
+    "content": {"questions": [{"question_text": "q0", "correct_answer": "A", "difficulty": 1}]},
+    "players": PLAYERS + [{"id": "gone", "name": "Gone", "score": 0, "correct_answers": 0, "eliminated": True}]
+}
+
+
+class FakeWebSocket:
+    def __init__(self):
+        self.sent = []
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, text):
+        self.sent.append(json.loads(text))
+
+
+class UpdateResult:
+    modified_count = 1
+
+
+class FakeGames:
+    """Serves the room load and records every update"""
+
+    def __init__(self):
+        self.updates = []
+
+    async def find_one(self, query, projection=None):
+        return GAME
+
+    async def update_one(self, query, update, array_filters=None):
+        self.updates.append((query, update, array_filters))
+        return UpdateResult()
+
+
+class FakeCollection:
+    def __init__(self):
+        self.docs = []
+
+    async def find_one(self, *args, **kwargs):
+        return None
+
+    async def insert_one(self, doc):
+        self.docs.append(doc)
+
+    async def update_one(self, query, update, upsert=False):
+        self.docs.append({**query, **update["$set"]})
+
+
+class FakeDB:
+    def __init__(self):
+        self.games = FakeGames()
+        self.collections = {"game_events": FakeCollection(), "answer_analytics": FakeCollection()}
+
+    def __getitem__(self, name):
+        return self.collections[name]
+
+
+async def close_round(correct_ids, wrong_ids):
+    """Answer the first question, then have the director close it"""
+    manager = ConnectionManager()
+    websocket_manager.manager, previous = manager, websocket_manager.manager
+    try:
+        db = FakeDB()
+        tv = FakeWebSocket()
+        await manager.connect_tv(tv, GAME["code"])
+        room = await websocket_manager.load_room(GAME["code"], db)
+        for player_id in correct_ids:
+            count_answer(room, 0, "A", True, player_id)
+        for player_id in wrong_ids:
+            count_answer(room, 0, "B", False, player_id)
+
+        await handle_director_message(GAME["code"], {"event": "question:close", "data": {}}, db)
+        event_log.forget(GAME["id"])
+        return db, room, tv
+    finally:
+        websocket_manager.manager = previous
+
+
+class TestSurvivorRules:
+    """Who goes out"""
+
+    def test_survivors_skip_eliminated(self):
+        assert "gone" not in survivors_from_players(GAME["players"])
+
+    def test_wrong_and_missing_go_out(self):
+        assert players_to_eliminate({"a", "b", "c"}, {"b"}) == ["a", "c"]
+
+    def test_everyone_missing_means_nobody_goes_out(self):
+        """A round nobody survives is replayed instead of ending with no winner"""
+        assert players_to_eliminate({"a", "b"}, set()) == []
+        assert players_to_eliminate({"a", "b"}, None) == []
+
+    def test_bulk_update_is_one_array_filtered_write(self):
+        db = FakeDB()
+        asyncio.run(eliminate_players(db, {"code": "LAST01"}, ["p1", "p2"]))
+        assert db.games.updates == [(
+            {"code": "LAST01"},
+            {"$set": {"players.$[out].eliminated": True}},
+            [{"out.id": {"$in": ["p1", "p2"]}}]
+        )]
+
+
+class TestQuestionClose:
+    """question:close in LAST CALL STANDING"""
+
+    def test_close_eliminates_in_one_write_and_one_event(self):
+        """100 players, 40 right, 30 wrong, 30 silent: 60 out in one update and one broadcast"""
+        correct = [f"p{i}" for i in range(40)]
+        wrong = [f"p{i}" for i in range(40, 70)]
+        db, room, tv = asyncio.run(close_round(correct, wrong))
+
+        assert len(db.games.updates) == 1
+        _, _, array_filters = db.games.updates[0]
+        assert len(array_filters[0]["out.id"]["$in"]) == 60
+
+        batches = [m["data"] for m in tv.sent if m["event"] == "players:eliminated"]
+        assert len(batches) == 1
+        assert batches[0]["survivors_count"] == 40
+        assert room["survivors"] == set(correct)
+
+    def test_replay_applies_batch(self):
+        """The recorded batch replays onto the game state"""
+        state = {"players": [dict(p) for p in PLAYERS[:3]]}
+        apply_event(state, {"seq": 1, "event": "players:eliminated", "data": {"player_ids": ["p0", "p2"]}})
+        assert [p.get("eliminated", False) for p in state["players"]] == [True, False, True]